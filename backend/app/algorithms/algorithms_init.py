@@ -1,12 +1,32 @@
+"""
+算法注册
+
+各算法包在导入时由包的 __init__ 向注册表注册，导入本模块即注册全部算法并导出算法类。
+"""
+# 多源参考模式
+from app.algorithms.multi_source.mrra import MrraAlgorithm
+from app.algorithms.multi_source.ransac import RansacAlgorithm
+from app.algorithms.multi_source.ransac_heuristic import RansacHeuristicAlgorithm
+from app.algorithms.multi_source.weighted_lstsq import WeightedLstsqAlgorithm
+
+# 单源盲测模式
+from app.algorithms.single_source.kalman import KalmanAlgorithm
+from app.algorithms.single_source.particle_filter import ParticleFilterAlgorithm
+from app.algorithms.single_source.spline import SplineAlgorithm
+from app.algorithms.single_source.imm import ImmAlgorithm
+
+__all__ = [
+    "register_all_algorithms",
+    "MrraAlgorithm",
+    "RansacAlgorithm",
+    "RansacHeuristicAlgorithm",
+    "WeightedLstsqAlgorithm",
+    "KalmanAlgorithm",
+    "ParticleFilterAlgorithm",
+    "SplineAlgorithm",
+    "ImmAlgorithm",
+]
+
+
 def register_all_algorithms():
-    """注册所有算法"""
-    # 多源参考模式
-    from app.algorithms.multi_source.mrra import MrraAlgorithm
-    from app.algorithms.multi_source.ransac import RansacAlgorithm
-    from app.algorithms.multi_source.ransac_heuristic import RansacHeuristicAlgorithm
-    from app.algorithms.multi_source.weighted_lstsq import WeightedLstsqAlgorithm
-
-    # 单源盲测模式
-    from app.algorithms.single_source.kalman import KalmanAlgorithm
-    from app.algorithms.single_source.particle_filter import ParticleFilterAlgorithm
-    from app.algorithms.single_source.spline import SplineAlgorithm
+    """注册所有算法（导入本模块时已完成注册，保留为显式调用的入口）"""
@@ -33,6 +33,9 @@ class AnalysisResult:
     # 元数据
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+    # 完整输出轨迹（融合轨迹或平滑轨迹），单独写入轨迹输出表，元数据中只保留前若干点
+    trajectory: List[Dict[str, Any]] = field(default_factory=list)
+
 
 class ProgressCallback:
     """进度回调接口"""
@@ -148,6 +151,27 @@ class BaseErrorAnalysisAlgorithm(ABC):
         """
         return {}
 
+    def is_deterministic(self, station_count: Optional[int] = None) -> bool:
+        """
+        相同配置和输入数据是否总是得到相同结果
+
+        配置了随机种子字段（random_seed）但其值为空时，每次运行使用新生成的种子，结果不可复现；
+        启用自助法时完成的重抽样次数受时间预算（bootstrap_time_budget）限制，
+        置信区间与运行时的机器负载有关，同样视为不可复现。
+
+        Args:
+            station_count: 参与分析的雷达站数（用于判断随机抽样是否实际发生，未知时为 None）
+
+        Returns:
+            bool: 结果是否可复现
+        """
+        config = self.config
+        if hasattr(config, "random_seed") and config.random_seed is None:
+            return False
+        if getattr(config, "bootstrap_samples", 0) > 0:
+            return False
+        return True
+
     @classmethod
     def supports_elevation(cls) -> bool:
         """
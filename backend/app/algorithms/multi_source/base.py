@@ -0,0 +1,196 @@
+"""
+多源算法基类
+
+所有多源参考算法共用同一预处理流程（加载→提取→插值→匹配），
+只在最后的求解步骤不同。基类负责预处理、进度上报和结果组装，
+子类只需实现 solve()。
+"""
+import time
+from abc import abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.algorithms.base import (
+    BaseErrorAnalysisAlgorithm,
+    AnalysisResult,
+    ProgressCallback,
+)
+from app.algorithms.multi_source.preprocessing.config import MrraConfig, CostWeights
+from app.algorithms.multi_source.preprocessing.pipeline import PreprocessingResult, run_preprocessing
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class SolveResult:
+    """求解步骤的输出"""
+    errors: Dict[int, Dict[str, float]]
+    match_statistics: Dict[str, Any] = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    summary: str = ""  # 附加在完成日志中的摘要
+    trajectory: List[Dict[str, Any]] = field(default_factory=list)  # 完整输出轨迹（如融合轨迹）
+
+
+class MultiSourceAlgorithm(BaseErrorAnalysisAlgorithm):
+    """
+    多源参考算法基类
+
+    子类实现 solve()，基于匹配组和雷达站位置计算各站系统误差。
+    """
+
+    # 求解步骤的进度描述（子类可覆盖）
+    SOLVE_STEP_MESSAGE: str = "计算系统误差"
+
+    def analyze(
+        self,
+        task_id: str,
+        radar_station_ids: List[int],
+        track_ids: List[str],
+        db_session: Session,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> AnalysisResult:
+        result = self.new_result(task_id)
+
+        try:
+            # 构建预处理配置
+            mrra_config = self._build_mrra_config()
+
+            def report_progress(fraction: float, task_progress: int, message: str):
+                result.progress = fraction
+                if progress_callback:
+                    progress_callback.on_progress(fraction, message)
+                self._update_task_progress(db_session, task_id, task_progress, message)
+
+            # 步骤1-3: 加载提取、插值、匹配（相同输入命中缓存时直接复用）
+            preprocessing = run_preprocessing(
+                db_session, task_id, radar_station_ids, track_ids,
+                mrra_config, report_progress=report_progress
+            )
+
+            # 步骤4: 算法求解
+            report_progress(0.7, 80, self.SOLVE_STEP_MESSAGE)
+
+            solve_start = time.perf_counter()
+            solved = self.solve(preprocessing.matched_groups, preprocessing.radar_positions)
+            solve_seconds = time.perf_counter() - solve_start
+
+            return self.complete_result(result, preprocessing, solved, solve_seconds)
+
+        except Exception as e:
+            logger.error(f"[{task_id}] {self.ALGORITHM_DISPLAY_NAME} 分析失败: {str(e)}", exc_info=True)
+            result.status = "failed"
+            result.error_message = str(e)
+            result.completed_at = datetime.now()
+            if progress_callback:
+                progress_callback.on_error(str(e))
+            return result
+
+    @abstractmethod
+    def solve(
+        self,
+        matched_groups: List[List[Dict]],
+        radar_positions: Dict[int, Tuple],
+    ) -> SolveResult:
+        """
+        基于匹配组计算各雷达站系统误差
+
+        该步骤不访问数据库，可以在子进程中执行。
+
+        Args:
+            matched_groups: 匹配组列表
+            radar_positions: 雷达站位置 {station_id: (lon, lat, alt)}
+
+        Returns:
+            SolveResult
+        """
+        pass
+
+    def new_result(self, task_id: str, started_at: Optional[datetime] = None) -> AnalysisResult:
+        """创建运行中的分析结果"""
+        return AnalysisResult(
+            task_id=task_id,
+            algorithm_name=self.ALGORITHM_NAME,
+            algorithm_version=self.ALGORITHM_VERSION,
+            status="running",
+            progress=0.0,
+            started_at=started_at or datetime.now(),
+        )
+
+    def complete_result(
+        self,
+        result: AnalysisResult,
+        preprocessing: PreprocessingResult,
+        solved: SolveResult,
+        solve_seconds: float,
+    ) -> AnalysisResult:
+        """
+        用预处理与求解输出填充分析结果
+
+        Args:
+            result: new_result() 创建的结果
+            preprocessing: 预处理结果
+            solved: 求解结果
+            solve_seconds: 求解耗时（秒）
+
+        Returns:
+            已完成的 AnalysisResult
+        """
+        result.progress = 1.0
+        result.status = "completed"
+        result.errors = solved.errors
+        result.completed_at = datetime.now()
+        result.processing_time_seconds = (
+            result.completed_at - result.started_at
+        ).total_seconds()
+        result.match_statistics = {
+            "total_match_groups": len(preprocessing.matched_groups),
+            **solved.match_statistics,
+        }
+        result.metadata = {
+            "algorithm": self.ALGORITHM_NAME,
+            "preprocessing": preprocessing.to_metadata(),
+            "solve_seconds": round(solve_seconds, 3),
+            **solved.metadata,
+        }
+        result.trajectory = solved.trajectory
+
+        message = (
+            f"[{result.task_id}] {self.ALGORITHM_DISPLAY_NAME} 分析完成，"
+            f"耗时 {result.processing_time_seconds:.2f} 秒"
+        )
+        if solved.summary:
+            message += f"，{solved.summary}"
+        logger.info(message)
+
+        return result
+
+    def _build_mrra_config(self) -> MrraConfig:
+        """将算法配置转换为预处理模块的 MrraConfig（按同名字段映射）"""
+        weights = getattr(self.config, "cost_weights", None)
+        cost_weights = CostWeights(**weights.model_dump()) if weights else CostWeights()
+
+        shared_fields = {
+            name: getattr(self.config, name)
+            for name in MrraConfig.model_fields
+            if name != "cost_weights" and hasattr(self.config, name)
+        }
+        return MrraConfig(**shared_fields, cost_weights=cost_weights)
+
+    def _update_task_progress(
+        self, db: Session, task_id: str, progress: int, message: str
+    ):
+        """更新数据库中任务的进度（如果存在对应任务）"""
+        try:
+            from app.models.error_analysis import ErrorAnalysisTask
+            task = db.query(ErrorAnalysisTask).filter(
+                ErrorAnalysisTask.task_id == task_id
+            ).first()
+            if task:
+                task.progress = progress
+                db.commit()
+        except Exception:
+            pass
@@ -0,0 +1,254 @@
+"""
+误差估计自助法（bootstrap）置信区间模块
+
+对匹配组有放回重抽样，以点估计为初值重新求解各雷达站误差，
+用各次重抽样估计的分位数给出方位角、距离、俯仰角误差的置信区间。
+各次重抽样相互独立，在进程池中并行求解；达到时间预算后停止提交新的重抽样，
+终止仍在计算的重抽样子进程，以已完成的结果计算置信区间。
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from app.algorithms.parallel import create_process_pool, resolve_worker_count, terminate_process_pool
+from app.algorithms.seeding import resolve_seed
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 误差分量名称（与误差结果字典的键一致）
+ERROR_COMPONENTS = ("azimuth_error", "range_error", "elevation_error")
+
+# 完成的重抽样次数少于该值时不给出置信区间
+BOOTSTRAP_MIN_REPLICATES = 10
+
+# 求解函数：(匹配组, 雷达站位置, 初值) -> 站号 -> (方位角, 距离, 俯仰角)
+SolveFunction = Callable[
+    [List[List[Dict]], Dict[int, Tuple], Optional[Dict[int, Tuple[float, float, float]]]],
+    Dict[int, Tuple[float, float, float]]
+]
+
+# 重抽样子进程的共享输入（fork 时由父进程直接继承，不经过序列化）
+_bootstrap_inputs: Dict[str, Any] = {}
+
+
+@dataclass
+class BootstrapResult:
+    """自助法置信区间结果"""
+    confidence_level: float
+    replicate_count: int                                    # 完成的重抽样次数
+    requested_count: int                                    # 配置的重抽样次数
+    elapsed_seconds: float
+    intervals: Dict[int, Dict[str, Tuple[float, float]]]    # 站号 -> 误差分量 -> (下限, 上限)
+    standard_errors: Dict[int, Dict[str, float]]            # 站号 -> 误差分量 -> 标准误差
+    seed: Optional[int] = None                              # 实际使用的随机种子（用于复现）
+
+    def to_metadata(self) -> Dict[str, Any]:
+        """转换为结果元数据（JSON 可序列化）"""
+        return {
+            "confidence_level": self.confidence_level,
+            "replicates": self.replicate_count,
+            "requested_replicates": self.requested_count,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "seed": self.seed,
+            "stations": {
+                str(sid): {
+                    component: {
+                        "lower": lower,
+                        "upper": upper,
+                        "std_error": self.standard_errors[sid][component],
+                    }
+                    for component, (lower, upper) in components.items()
+                }
+                for sid, components in self.intervals.items()
+            },
+        }
+
+
+def bootstrap_metadata(result: Optional[BootstrapResult]) -> Dict[str, Any]:
+    """置信区间结果转换为 SolveResult.metadata 条目（未计算时为空字典）"""
+    return {"bootstrap": result.to_metadata()} if result else {}
+
+
+def _resample(match_groups: List[List[Dict]], sample_size: int, seed: np.random.SeedSequence) -> List[List[Dict]]:
+    """有放回抽取匹配组（按原顺序排列，保持时间顺序）"""
+    rng = np.random.default_rng(seed)
+    indices = np.sort(rng.integers(0, len(match_groups), sample_size))
+    return [match_groups[index] for index in indices]
+
+
+def _init_bootstrap_worker(
+    solve: SolveFunction,
+    match_groups: List[List[Dict]],
+    radar_positions: Dict[int, Tuple],
+    point_estimate: Dict[int, Tuple[float, float, float]],
+    sample_size: int
+) -> None:
+    """重抽样子进程初始化"""
+    _bootstrap_inputs['solve'] = solve
+    _bootstrap_inputs['match_groups'] = match_groups
+    _bootstrap_inputs['radar_positions'] = radar_positions
+    _bootstrap_inputs['point_estimate'] = point_estimate
+    _bootstrap_inputs['sample_size'] = sample_size
+
+
+def _run_bootstrap_replicate(seed: np.random.SeedSequence) -> Dict[int, Tuple[float, float, float]]:
+    """子进程：求解一次重抽样"""
+    sample = _resample(_bootstrap_inputs['match_groups'], _bootstrap_inputs['sample_size'], seed)
+    return _bootstrap_inputs['solve'](
+        sample, _bootstrap_inputs['radar_positions'], _bootstrap_inputs['point_estimate']
+    )
+
+
+def bootstrap_radar_errors(
+    solve: SolveFunction,
+    match_groups: List[List[Dict]],
+    radar_positions: Dict[int, Tuple],
+    point_estimate: Dict[int, Tuple[float, float, float]],
+    config: MrraConfig
+) -> Optional[BootstrapResult]:
+    """
+    自助法估计各雷达站误差的置信区间
+
+    每次重抽样 min(匹配组数, max_match_groups) 个匹配组，以点估计为初值求解。
+    超出 bootstrap_time_budget 后不再提交新的重抽样，仍在计算的重抽样被终止。
+
+    Args:
+        solve: 误差求解函数（支持初值）
+        match_groups: 匹配组列表
+        radar_positions: 雷达站位置字典（包含高度）
+        point_estimate: 点估计 站号 -> (方位角, 距离, 俯仰角)
+        config: MRRA 配置
+
+    Returns:
+        置信区间结果；未启用或完成的重抽样不足时返回 None
+    """
+    requested = config.bootstrap_samples
+    if requested <= 0 or not match_groups:
+        return None
+
+    sample_size = min(len(match_groups), config.max_match_groups)
+    bootstrap_seed = resolve_seed(config.bootstrap_seed)
+    seeds = np.random.SeedSequence(bootstrap_seed).spawn(requested)
+    workers = resolve_worker_count(config.bootstrap_workers, requested)
+    logger.info(
+        f"自助法置信区间: {requested} 次重抽样（每次 {sample_size} 个匹配组）, "
+        f"{workers} 个进程, 时间预算 {config.bootstrap_time_budget} 秒"
+    )
+
+    start = time.perf_counter()
+    deadline = start + config.bootstrap_time_budget
+    if workers == 1:
+        replicates = []
+        for seed in seeds:
+            if time.perf_counter() >= deadline:
+                break
+            replicates.append(solve(_resample(match_groups, sample_size, seed), radar_positions, point_estimate))
+    else:
+        replicates = _run_replicates_in_pool(
+            seeds, workers, deadline,
+            (solve, match_groups, radar_positions, point_estimate, sample_size)
+        )
+    elapsed = time.perf_counter() - start
+
+    if len(replicates) < BOOTSTRAP_MIN_REPLICATES:
+        logger.warning(
+            f"自助法在时间预算内只完成 {len(replicates)} 次重抽样"
+            f"（少于 {BOOTSTRAP_MIN_REPLICATES} 次），不输出置信区间"
+        )
+        return None
+
+    if len(replicates) < requested:
+        logger.warning(f"自助法达到时间预算，完成 {len(replicates)}/{requested} 次重抽样")
+
+    result = summarize_replicates(replicates, point_estimate, config.bootstrap_confidence_level)
+    result.requested_count = requested
+    result.elapsed_seconds = elapsed
+    result.seed = bootstrap_seed
+    logger.info(f"自助法置信区间计算完成: {len(replicates)} 次重抽样, 耗时 {elapsed:.2f} 秒")
+    return result
+
+
+def _run_replicates_in_pool(
+    seeds: List[np.random.SeedSequence],
+    workers: int,
+    deadline: float,
+    initargs: Tuple
+) -> List[Dict[int, Tuple[float, float, float]]]:
+    """在进程池中求解重抽样，同时在途的任务数不超过进程数，超时后终止仍在计算的子进程"""
+    executor = create_process_pool(workers, _init_bootstrap_worker, initargs)
+    replicates = []
+    pending = set()
+    remaining = iter(seeds)
+    try:
+        while True:
+            while len(pending) < workers and time.perf_counter() < deadline:
+                seed = next(remaining, None)
+                if seed is None:
+                    break
+                pending.add(executor.submit(_run_bootstrap_replicate, seed))
+
+            if not pending:
+                break
+
+            done, pending = wait(
+                pending, timeout=max(deadline - time.perf_counter(), 0.0), return_when=FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for future in done:
+                try:
+                    replicates.append(future.result())
+                except Exception as e:
+                    logger.warning(f"自助法重抽样求解失败: {e}")
+    finally:
+        if pending:
+            # 超时（或异常）时仍有重抽样在子进程中计算，直接终止子进程，不让其继续占用 CPU
+            terminate_process_pool(executor)
+        else:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return replicates
+
+
+def summarize_replicates(
+    replicates: List[Dict[int, Tuple[float, float, float]]],
+    point_estimate: Dict[int, Tuple[float, float, float]],
+    confidence_level: float
+) -> BootstrapResult:
+    """
+    由重抽样估计计算百分位置信区间与标准误差
+
+    Args:
+        replicates: 各次重抽样的估计
+        point_estimate: 点估计（确定输出的雷达站）
+        confidence_level: 置信水平
+
+    Returns:
+        BootstrapResult（耗时与配置次数由调用方填写）
+    """
+    tail = (1.0 - confidence_level) / 2
+    intervals = {}
+    standard_errors = {}
+    for sid, estimate in point_estimate.items():
+        # 重抽样中未出现该站时保持点估计
+        values = np.array([replicate.get(sid, estimate) for replicate in replicates], dtype=np.float64)
+        lower, upper = np.quantile(values, [tail, 1.0 - tail], axis=0)
+        spread = values.std(axis=0, ddof=1)
+        intervals[sid] = {
+            component: (float(lower[k]), float(upper[k])) for k, component in enumerate(ERROR_COMPONENTS)
+        }
+        standard_errors[sid] = {component: float(spread[k]) for k, component in enumerate(ERROR_COMPONENTS)}
+
+    return BootstrapResult(
+        confidence_level=confidence_level,
+        replicate_count=len(replicates),
+        requested_count=len(replicates),
+        elapsed_seconds=0.0,
+        intervals=intervals,
+        standard_errors=standard_errors,
+    )
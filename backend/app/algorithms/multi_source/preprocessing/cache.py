@@ -0,0 +1,289 @@
+"""
+预处理结果缓存模块
+
+多源算法的 加载→提取→插值→匹配 流程只依赖于航迹批号、雷达站、
+部分预处理参数以及源数据版本。对相同输入的多个分析任务（例如同一数据
+上对比多种算法），缓存预处理结果即可直接进入算法特有的求解步骤。
+
+缓存分三级：
+- 内存 LRU（进程内，最近使用的若干条目）
+- 本地磁盘（写入时同步写入，同一主机的多个进程共享）
+- MinIO（可选，写入时同步上传，多主机部署时共享）
+
+磁盘与 MinIO 中的条目以 gzip 压缩的 JSON 存储（只含数据，读取共享存储中的条目不会执行代码）。
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from core.config import (
+    PREPROCESS_CACHE_DIR,
+    PREPROCESS_CACHE_DISK_ENTRIES,
+    PREPROCESS_CACHE_ENABLED,
+    PREPROCESS_CACHE_MAX_ENTRIES,
+    PREPROCESS_CACHE_MINIO,
+)
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 影响提取、插值、匹配结果的预处理参数
+CACHE_KEY_CONFIG_FIELDS: Tuple[str, ...] = (
+    "grid_resolution",
+    "time_window",
+    "time_window_ratio",
+    "match_distance_threshold",
+    "min_track_points",
+    "streaming",
+)
+
+# 缓存格式版本（预处理逻辑变化导致结果不兼容时递增）
+CACHE_FORMAT_VERSION = 2
+
+# MinIO 中的存储路径前缀
+MINIO_CACHE_FOLDER = "preprocess-cache"
+
+# 磁盘与 MinIO 中条目的文件后缀
+CACHE_FILE_SUFFIX = ".json.gz"
+
+# JSON 中日期时间值的标记键
+_DATETIME_TAG = "__datetime__"
+
+
+def build_cache_key(
+    track_ids: Iterable[str],
+    radar_positions: Dict[int, Tuple[float, float, float]],
+    config: MrraConfig,
+    source_version: str
+) -> str:
+    """
+    构建预处理缓存键
+
+    Args:
+        track_ids: 航迹批号列表
+        radar_positions: 雷达站位置 {station_id: (lon, lat, alt)}
+        config: MRRA 预处理配置
+        source_version: 源数据版本标识
+
+    Returns:
+        SHA-256 十六进制字符串
+    """
+    payload = {
+        "format": CACHE_FORMAT_VERSION,
+        "track_ids": sorted(str(t) for t in track_ids),
+        "stations": sorted(
+            [int(sid), [float(v) for v in position]]
+            for sid, position in radar_positions.items()
+        ),
+        "config": {field: getattr(config, field) for field in CACHE_KEY_CONFIG_FIELDS},
+        "source_version": source_version,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _encode_value(value: Any) -> Any:
+    """JSON 不支持的值：日期时间加标记，numpy 标量和数组转为 Python 值"""
+    if isinstance(value, datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f"预处理缓存不支持的值类型: {type(value).__name__}")
+
+
+def _decode_object(obj: Dict[str, Any]) -> Any:
+    """还原带标记的日期时间"""
+    if len(obj) == 1 and _DATETIME_TAG in obj:
+        return datetime.fromisoformat(obj[_DATETIME_TAG])
+    return obj
+
+
+def encode_entry(entry: Dict[str, Any]) -> bytes:
+    """
+    缓存条目 -> gzip 压缩的 JSON
+
+    Args:
+        entry: 预处理结果（字典、列表、数值、字符串、日期时间和 numpy 值）
+
+    Returns:
+        二进制数据
+    """
+    text = json.dumps(entry, default=_encode_value, separators=(",", ":"))
+    return gzip.compress(text.encode("utf-8"), compresslevel=1)
+
+
+def decode_entry(data: bytes) -> Dict[str, Any]:
+    """gzip 压缩的 JSON -> 缓存条目（元组还原为列表）"""
+    return json.loads(gzip.decompress(data).decode("utf-8"), object_hook=_decode_object)
+
+
+class PreprocessingCache:
+    """
+    预处理结果缓存
+
+    写入时同时写入内存、磁盘目录（可选同时上传 MinIO），其他进程和主机可以立即命中；
+    内存中按 LRU 淘汰。查询时依次检查内存、磁盘、MinIO，命中后提升回内存。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 8,
+        cache_dir: Optional[str] = None,
+        max_disk_entries: int = 64,
+        use_minio: bool = False,
+        enabled: bool = True
+    ):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 内存中最多保留的条目数
+            cache_dir: 落盘目录（None 表示系统临时目录）
+            max_disk_entries: 磁盘上最多保留的条目数
+            use_minio: 是否同步到 MinIO
+            enabled: 是否启用缓存
+        """
+        self.max_entries = max(1, max_entries)
+        self.cache_dir = Path(cache_dir or os.path.join(tempfile.gettempdir(), "rftip_preprocess_cache"))
+        self.max_disk_entries = max(0, max_disk_entries)
+        self.use_minio = use_minio
+        self.enabled = enabled
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        查询缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存的预处理结果，未命中返回 None
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+
+        entry = self._load_from_disk(key)
+        if entry is None and self.use_minio:
+            entry = self._load_from_minio(key)
+
+        if entry is not None:
+            self._put_memory(key, entry)
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        """
+        写入缓存（同时写入磁盘和 MinIO）
+
+        Args:
+            key: 缓存键
+            entry: 预处理结果（需可由 encode_entry 序列化）
+        """
+        if not self.enabled:
+            return
+        self._put_memory(key, entry)
+        self._write_through(key, entry)
+
+    def clear(self) -> None:
+        """清空内存缓存（磁盘与 MinIO 中的条目保留）"""
+        with self._lock:
+            self._memory.clear()
+
+    def _put_memory(self, key: str, entry: Dict[str, Any]) -> None:
+        """写入内存 LRU（淘汰的条目已在写入时保存到磁盘和 MinIO）"""
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _write_through(self, key: str, entry: Dict[str, Any]) -> None:
+        """将条目写入磁盘和 MinIO"""
+        if self.max_disk_entries == 0 and not self.use_minio:
+            return
+        try:
+            data = encode_entry(entry)
+        except Exception as e:
+            logger.warning(f"预处理缓存条目序列化失败，只保留在内存中: {e}")
+            return
+
+        if self.max_disk_entries > 0:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                path = self._disk_path(key)
+                # 多个进程可能同时写入同一条目，临时文件按进程和线程区分
+                tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, path)
+                self._trim_disk(keep=path)
+            except OSError as e:
+                logger.warning(f"预处理缓存落盘失败: {e}")
+
+        if self.use_minio:
+            try:
+                from app.services.minio_service import minio_service
+                minio_service.put_object_bytes(f"{MINIO_CACHE_FOLDER}/{key}{CACHE_FILE_SUFFIX}", data)
+            except Exception as e:
+                logger.warning(f"预处理缓存上传 MinIO 失败: {e}")
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{CACHE_FILE_SUFFIX}"
+
+    def _trim_disk(self, keep: Path) -> None:
+        """按修改时间删除超出上限的旧条目（刚写入的 keep 保留）"""
+        files = sorted(
+            (path for path in self.cache_dir.glob(f"*{CACHE_FILE_SUFFIX}") if path != keep),
+            key=lambda p: p.stat().st_mtime,
+        )
+        for path in files[:max(0, len(files) + 1 - self.max_disk_entries)]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _load_from_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._disk_path(key)
+        if not path.exists():
+            return None
+        try:
+            entry = decode_entry(path.read_bytes())
+            os.utime(path)
+            return entry
+        except Exception as e:
+            logger.warning(f"读取预处理缓存失败: {e}")
+            return None
+
+    def _load_from_minio(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            from app.services.minio_service import minio_service
+            return decode_entry(minio_service.download_file(f"{MINIO_CACHE_FOLDER}/{key}{CACHE_FILE_SUFFIX}"))
+        except Exception:
+            return None
+
+
+# 全局单例
+preprocessing_cache = PreprocessingCache(
+    max_entries=PREPROCESS_CACHE_MAX_ENTRIES,
+    cache_dir=PREPROCESS_CACHE_DIR or None,
+    max_disk_entries=PREPROCESS_CACHE_DISK_ENTRIES,
+    use_minio=PREPROCESS_CACHE_MINIO,
+    enabled=PREPROCESS_CACHE_ENABLED,
+)
@@ -0,0 +1,365 @@
+"""
+增量代价计算模块
+
+坐标下降每次只扰动一个雷达站的一个误差分量，只有包含该站的匹配组会变化。
+IncrementalCostEngine 缓存每个点的修正后坐标和每组的方差项，
+并维护 雷达站 → 匹配组 的倒排索引，试探一步只需重算受影响的组。
+
+扁平表使用雷达站局部坐标系（enu 后端）时，水平修正在站切平面极坐标上完成，
+修正后的水平位置为公共 ENU 坐标（东, 北）（米），不再做大地线正算。
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from app.algorithms.multi_source.preprocessing.config import CostWeights
+from app.algorithms.multi_source.preprocessing.geometry import polar_to_common
+from app.algorithms.multi_source.preprocessing.group_table import (
+    METERS_PER_DEGREE,
+    MatchGroupTable,
+    geod,
+    grouped_rms_spread,
+)
+
+
+def corrected_horizontal(
+    table: MatchGroupTable,
+    points: Union[slice, np.ndarray],
+    azimuth_offsets: np.ndarray,
+    range_offsets: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    按方位角、距离误差修正指定点的水平位置
+
+    方位角误差为观测角减去误差，距离误差为观测距离减去误差。
+
+    Args:
+        table: 匹配组扁平表
+        points: 点下标（slice(None) 表示全部点）
+        azimuth_offsets: 各点的方位角误差（度）
+        range_offsets: 各点的距离误差（米）
+
+    Returns:
+        (修正后经度, 修正后纬度, 修正后距离)；enu 后端为 (公共 ENU 东, 北, 修正后距离)
+    """
+    corr_az = table.azimuth[points] - azimuth_offsets
+    corr_dist = table.distance[points] - range_offsets
+    if table.uses_local_frames:
+        # 天向坐标（曲率下沉量）随水平距离平方缩放
+        distance = table.distance[points]
+        ratio = np.divide(corr_dist, distance, out=np.ones_like(corr_dist), where=distance > 0)
+        east, north = polar_to_common(
+            table.local_transform[:, :, points], corr_dist, corr_az, table.local_up[points] * ratio ** 2
+        )
+        return east, north, corr_dist
+
+    station_index = table.station_index[points]
+    new_lon, new_lat, _ = geod.fwd(
+        table.radar_lon[station_index],
+        table.radar_lat[station_index],
+        corr_az,
+        corr_dist
+    )
+    return np.asarray(new_lon), np.asarray(new_lat), corr_dist
+
+
+def elevation_columns(
+    table: MatchGroupTable,
+    points: Union[slice, np.ndarray],
+    new_lon: np.ndarray,
+    new_lat: np.ndarray,
+    corr_dist: np.ndarray,
+    elevation_offsets: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    按俯仰角误差修正高度，并换算为平面近似坐标
+
+    Args:
+        table: 匹配组扁平表
+        points: 点下标
+        new_lon: 修正后经度（enu 后端为公共 ENU 东向坐标）
+        new_lat: 修正后纬度（enu 后端为公共 ENU 北向坐标）
+        corr_dist: 修正后距离
+        elevation_offsets: 各点的俯仰角误差（度）
+
+    Returns:
+        (x, y, 高度)
+    """
+    corr_elevation = table.elevation[points] - elevation_offsets
+    new_alt = np.where(
+        corr_dist > 0,
+        table.radar_alt[table.station_index[points]] + corr_dist * np.sin(np.radians(corr_elevation)),
+        table.altitude[points]
+    )
+    if table.uses_local_frames:
+        return new_lon, new_lat, new_alt
+    x = new_lon * METERS_PER_DEGREE * np.cos(np.radians(new_lat))
+    y = new_lat * METERS_PER_DEGREE
+    return x, y, new_alt
+
+
+def horizontal_columns(
+    table: MatchGroupTable,
+    new_lon: np.ndarray,
+    new_lat: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    水平方差代价使用的坐标分量（度）
+
+    enu 后端的公共 ENU 坐标按公共原点纬度换算为度，与经纬度代价量纲一致。
+    """
+    if table.uses_local_frames:
+        lon_scale = METERS_PER_DEGREE * np.cos(np.radians(table.frames.reference_lat))
+        return new_lon / lon_scale, new_lat / METERS_PER_DEGREE
+    return new_lon, new_lat
+
+
+def corrected_columns(
+    table: MatchGroupTable,
+    points: Union[slice, np.ndarray],
+    azimuth_offsets: np.ndarray,
+    range_offsets: np.ndarray,
+    elevation_offsets: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, ...]:
+    """
+    按误差修正指定点的位置，得到计算方差用的坐标分量
+
+    Args:
+        table: 匹配组扁平表
+        points: 点下标（slice(None) 表示全部点）
+        azimuth_offsets: 各点的方位角误差（度）
+        range_offsets: 各点的距离误差（米）
+        elevation_offsets: 各点的俯仰角误差（度），为 None 时只修正水平位置
+
+    Returns:
+        不含俯仰角时为 (经度, 纬度)；含俯仰角时为平面近似坐标 (x, y, 高度)
+    """
+    new_lon, new_lat, corr_dist = corrected_horizontal(table, points, azimuth_offsets, range_offsets)
+    if elevation_offsets is None:
+        return horizontal_columns(table, new_lon, new_lat)
+    return elevation_columns(table, points, new_lon, new_lat, corr_dist, elevation_offsets)
+
+
+def penalty_cost(weights: CostWeights, errors: Dict[str, Dict[int, float]]) -> float:
+    """
+    误差平方正则项
+
+    Args:
+        weights: 代价权重
+        errors: 误差分量名称 -> 站号 -> 误差值
+
+    Returns:
+        各分量误差平方均值的加权和
+    """
+    term_weights = {
+        "azimuth": weights.azimuth_error_square,
+        "range": weights.range_error_square,
+        "elevation": weights.elevation_error_square,
+    }
+    total = 0.0
+    for kind, values in errors.items():
+        array = np.array(list(values.values())) if values else np.array([0.0])
+        total += term_weights[kind] * float(np.mean(array ** 2))
+    return total
+
+
+@dataclass
+class _StationGroups:
+    """单个雷达站的倒排索引"""
+    points: np.ndarray          # 该站的点下标
+    groups: np.ndarray          # 包含该站的组下标
+    group_points: np.ndarray    # 这些组的全部点下标（按组连续）
+    local_starts: np.ndarray    # group_points 中各组的起始位置
+    local_index: np.ndarray     # group_points 中各点所属的局部组下标
+    positions: np.ndarray       # 该站的点在 group_points 中的位置
+
+
+@dataclass
+class _PendingMove:
+    """已试探、尚未接受的一步"""
+    kind: str
+    station_id: int
+    value: float
+    index: Optional[_StationGroups]
+    horizontal: Optional[np.ndarray]
+    columns: Optional[np.ndarray]
+    spreads: Optional[np.ndarray]
+
+
+class IncrementalCostEngine:
+    """
+    增量代价引擎
+
+    用法：try_move() 试探单站单分量的一步并返回新代价，
+    accept() 接受最近一次试探，未接受的试探不影响引擎状态。
+    """
+
+    def __init__(
+        self,
+        table: MatchGroupTable,
+        weights: CostWeights,
+        azimuth_errors: Dict[int, float],
+        range_errors: Dict[int, float],
+        elevation_errors: Optional[Dict[int, float]] = None
+    ):
+        """
+        初始化增量代价引擎
+
+        Args:
+            table: 匹配组扁平表（含俯仰角时需按 require_altitude=True 构建）
+            weights: 代价权重
+            azimuth_errors: 初始方位角误差
+            range_errors: 初始距离误差
+            elevation_errors: 初始俯仰角误差，为 None 时使用水平方差代价
+        """
+        self.table = table
+        self.weights = weights
+        self.use_elevation = elevation_errors is not None
+
+        self._errors: Dict[str, Dict[int, float]] = {
+            "azimuth": dict(azimuth_errors),
+            "range": dict(range_errors),
+        }
+        if self.use_elevation:
+            self._errors["elevation"] = dict(elevation_errors)
+
+        self._station_lookup = {int(sid): index for index, sid in enumerate(table.stations)}
+        self._station_groups: Dict[int, Optional[_StationGroups]] = {}
+        self._pending: Optional[_PendingMove] = None
+        self._penalty = penalty_cost(weights, self._errors)
+
+        # 没有有效匹配组时代价与误差无关（保持与逐点实现相同的返回值）
+        self._constant_cost: Optional[float] = None
+        if table.group_count == 0:
+            degenerate = self.use_elevation and table.source_group_count > 0
+            self._constant_cost = float('inf') if degenerate else 0.0
+            return
+
+        # 缓存修正后的水平位置（俯仰角试探无需重新做大地线正算）和方差坐标分量
+        points = slice(None)
+        self._horizontal = np.vstack(corrected_horizontal(
+            table, points, table.station_values(azimuth_errors), table.station_values(range_errors)
+        ))
+        self._columns = self._columns_from_horizontal(
+            points, self._horizontal,
+            table.station_values(elevation_errors) if self.use_elevation else None
+        )
+        self._spreads = grouped_rms_spread(self._columns, table.group_starts, table.group_index)
+        self._spread_sum = float(self._spreads.sum())
+
+    @property
+    def cost(self) -> float:
+        """当前代价"""
+        return self._total(self._spread_sum, self._penalty)
+
+    def errors(self, kind: str) -> Dict[int, float]:
+        """当前的某一误差分量（返回副本）"""
+        return dict(self._errors[kind])
+
+    def try_move(self, kind: str, station_id: int, delta: float) -> float:
+        """
+        试探把某站某误差分量增加 delta
+
+        Args:
+            kind: 误差分量（azimuth / range / elevation）
+            station_id: 雷达站号
+            delta: 增量
+
+        Returns:
+            试探后的代价
+        """
+        value = self._errors[kind][station_id] + delta
+        trial_errors = dict(self._errors)
+        trial_errors[kind] = {**self._errors[kind], station_id: value}
+        penalty = penalty_cost(self.weights, trial_errors)
+
+        index = None if self._constant_cost is not None else self._station_index(station_id)
+        if index is None:
+            self._pending = _PendingMove(kind, station_id, value, None, None, None, None)
+            return self._total(self._spread_sum, penalty)
+
+        def offsets(name: str) -> np.ndarray:
+            current = value if name == kind else self._errors[name].get(station_id, 0.0)
+            return np.full(len(index.points), current)
+
+        if kind == "elevation":
+            horizontal = self._horizontal[:, index.points]
+        else:
+            horizontal = np.vstack(corrected_horizontal(
+                self.table, index.points, offsets("azimuth"), offsets("range")
+            ))
+        columns = self._columns_from_horizontal(
+            index.points, horizontal, offsets("elevation") if self.use_elevation else None
+        )
+
+        local = self._columns[:, index.group_points]
+        local[:, index.positions] = columns
+        spreads = grouped_rms_spread(local, index.local_starts, index.local_index)
+
+        spread_sum = self._spread_sum - float(self._spreads[index.groups].sum()) + float(spreads.sum())
+        self._pending = _PendingMove(kind, station_id, value, index, horizontal, columns, spreads)
+        return self._total(spread_sum, penalty)
+
+    def accept(self) -> None:
+        """接受最近一次试探"""
+        move = self._pending
+        if move is None:
+            raise ValueError("没有待接受的试探步")
+
+        self._errors[move.kind][move.station_id] = move.value
+        self._penalty = penalty_cost(self.weights, self._errors)
+        if move.index is not None:
+            self._horizontal[:, move.index.points] = move.horizontal
+            self._columns[:, move.index.points] = move.columns
+            self._spreads[move.index.groups] = move.spreads
+            # 接受时重新求和，避免增量更新的舍入误差累积
+            self._spread_sum = float(self._spreads.sum())
+        self._pending = None
+
+    def _columns_from_horizontal(
+        self,
+        points: Union[slice, np.ndarray],
+        horizontal: np.ndarray,
+        elevation_offsets: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """由修正后的水平位置得到方差坐标分量"""
+        if elevation_offsets is None:
+            return np.vstack(horizontal_columns(self.table, horizontal[0], horizontal[1]))
+        return np.vstack(elevation_columns(self.table, points, *horizontal, elevation_offsets))
+
+    def _total(self, spread_sum: float, penalty: float) -> float:
+        if self._constant_cost is not None:
+            return self._constant_cost
+        return self.weights.variance * spread_sum / self.table.group_count + penalty
+
+    def _station_index(self, station_id: int) -> Optional[_StationGroups]:
+        """获取（按需构建）雷达站的倒排索引"""
+        if station_id in self._station_groups:
+            return self._station_groups[station_id]
+
+        table = self.table
+        position = self._station_lookup.get(int(station_id))
+        points = np.zeros(0, dtype=np.int64)
+        if position is not None:
+            points = np.flatnonzero(table.station_index == position)
+
+        # 没有观测点的站只影响正则项
+        index = None
+        if len(points):
+            groups = np.unique(table.group_index[points])
+            starts = table.group_starts[groups]
+            sizes = table.group_sizes[groups]
+            local_starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+            group_points = np.repeat(starts - local_starts, sizes) + np.arange(sizes.sum())
+            index = _StationGroups(
+                points=points,
+                groups=groups,
+                group_points=group_points,
+                local_starts=local_starts,
+                local_index=np.repeat(np.arange(len(groups)), sizes),
+                positions=np.searchsorted(group_points, points),
+            )
+
+        self._station_groups[station_id] = index
+        return index
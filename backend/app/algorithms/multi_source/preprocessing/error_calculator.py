@@ -3,19 +3,25 @@
 
 负责计算和优化雷达系统误差
 """
-import copy
-import math
 import numpy as np
-import pyproj
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 
+from app.algorithms.multi_source.preprocessing.bootstrap import BootstrapResult, bootstrap_radar_errors
 from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from app.algorithms.multi_source.preprocessing.cost_engine import (
+    IncrementalCostEngine,
+    corrected_columns,
+    penalty_cost,
+)
+from app.algorithms.multi_source.preprocessing.group_table import MatchGroupTable, build_match_group_table
+from app.algorithms.multi_source.preprocessing.joint_solver import JointLeastSquaresSolver
+from app.algorithms.multi_source.preprocessing.sampling import limit_match_groups, sampling_order
 from core.logging import get_logger
 
 logger = get_logger(__name__)
 
-# 初始化地理坐标转换器（WGS84椭球）
-geod = pyproj.Geod(ellps='WGS84')
+# 渐进加密时每轮样本的放大倍数
+SAMPLE_GROWTH_FACTOR = 2
 
 
 class ErrorCalculator:
@@ -36,7 +42,7 @@ class ErrorCalculator:
 
     def calculate_cost(
         self,
-        match_groups: List[List[Dict]],
+        match_groups: Union[List[List[Dict]], MatchGroupTable],
         azimuth_errors: Dict[int, float],
         radar_positions: Dict[int, Tuple],
         range_errors: Optional[Dict[int, float]] = None,
@@ -45,7 +51,7 @@ class ErrorCalculator:
         计算综合代价函数，同时考虑方位角和距离误差
 
         Args:
-            match_groups: 匹配组列表
+            match_groups: 匹配组列表，或已展开的匹配组扁平表（优化迭代中复用）
             azimuth_errors: 各雷达站的方位角误差（单位：度）
             radar_positions: 雷达站位置（可以是二维或三维）
             range_errors: 各站的距离误差（单位：米），可选
@@ -53,67 +59,45 @@ class ErrorCalculator:
         Returns:
             综合代价值
         """
-        if not match_groups:
+        table = self._as_table(match_groups, radar_positions)
+        if table.source_group_count == 0:
             return 0.0
 
         # 如果没有距离误差字典，则默认全为0
         if range_errors is None:
             range_errors = {sid: 0.0 for sid in azimuth_errors.keys()}
 
-        variances: List[float] = []
-
-        for group in match_groups:
-            corrected_positions: List[Tuple[float, float]] = []
-            for point in group:
-                sid = point['station_id']
-                lon, lat = point['longitude'], point['latitude']
-
-                if sid not in radar_positions:
-                    continue
-
-                # 处理二维或三维的雷达位置
-                pos = radar_positions[sid]
-                if len(pos) >= 2:
-                    r_lon, r_lat = pos[0], pos[1]
-                else:
-                    continue
-
-                # 计算方位角和距离
-                az, back_az, dist = geod.inv(r_lon, r_lat, lon, lat)
-                da = azimuth_errors.get(sid, 0.0)
-                dr = range_errors.get(sid, 0.0)
-
-                # 方位角误差为观测角减去误差，距离误差为观测距离加上误差
-                corr_az = az - da
-                corr_dist = dist - dr
-                new_lon, new_lat, _ = geod.fwd(r_lon, r_lat, corr_az, corr_dist)
-                corrected_positions.append((new_lon, new_lat))
-
-            if len(corrected_positions) < 2:
-                continue
-
-            coords = np.array(corrected_positions)
-            mean_coords = coords.mean(axis=0)
-            diffs = coords - mean_coords
-            var = float(np.sqrt((diffs ** 2).sum(axis=1).mean()))
-            variances.append(var)
-
-        if not variances:
+        if table.group_count == 0:
             return 0.0
 
-        variance_cost = float(np.mean(variances))
-        az_values = np.array(list(azimuth_errors.values())) if azimuth_errors else np.array([0.0])
-        r_values = np.array(list(range_errors.values())) if range_errors else np.array([0.0])
-        az_sq = float(np.mean(az_values ** 2))
-        r_sq = float(np.mean(r_values ** 2))
+        # 方位角误差为观测角减去误差，距离误差为观测距离加上误差
+        new_lon, new_lat = corrected_columns(
+            table,
+            slice(None),
+            table.station_values(azimuth_errors),
+            table.station_values(range_errors)
+        )
+        variance_cost = float(np.mean(table.group_rms_spread(new_lon, new_lat)))
 
         total_cost = (
             self.config.cost_weights.variance * variance_cost
-            + self.config.cost_weights.azimuth_error_square * az_sq
-            + self.config.cost_weights.range_error_square * r_sq
+            + penalty_cost(self.config.cost_weights, {"azimuth": azimuth_errors, "range": range_errors})
         )
         return total_cost
 
+    def _as_table(
+        self,
+        match_groups: Union[List[List[Dict]], MatchGroupTable],
+        radar_positions: Dict[int, Tuple],
+        require_altitude: bool = False
+    ) -> MatchGroupTable:
+        """匹配组列表展开为扁平表，已是扁平表时直接返回"""
+        if isinstance(match_groups, MatchGroupTable):
+            return match_groups
+        return build_match_group_table(
+            match_groups, radar_positions, require_altitude, self.config.geometry_backend
+        )
+
     def optimize_azimuth_errors(
         self,
         match_groups: List[List[Dict]],
@@ -136,53 +120,31 @@ class ErrorCalculator:
         logger.info("开始方位角误差优化...")
 
         # 限制匹配组数量
-        if len(match_groups) > self.config.max_match_groups:
-            match_groups = match_groups[:self.config.max_match_groups]
-            logger.info(f"限制匹配组数量为: {self.config.max_match_groups}")
+        match_groups = self._limit_groups(match_groups)
 
-        # 初始化最佳解
+        # 匹配组只展开一次，迭代中反复复用
+        table = build_match_group_table(
+            match_groups, radar_positions, geometry_backend=self.config.geometry_backend
+        )
+
+        # 初始化最佳解，试探步只重算包含该站的匹配组
         stations = list(initial_azimuth_errors.keys())
-        best_az = copy.deepcopy(initial_azimuth_errors)
-        best_cost = self.calculate_cost(match_groups, best_az, radar_positions, range_errors)
+        engine = IncrementalCostEngine(
+            table, self.config.cost_weights, initial_azimuth_errors, range_errors
+        )
+        best_cost = engine.cost
 
         logger.info(f"方位角误差初始代价: {best_cost:.6f}")
-        logger.info(f"方位角误差初始值: {best_az}")
+        logger.info(f"方位角误差初始值: {initial_azimuth_errors}")
         logger.info(f"处理 {len(match_groups)} 个匹配组")
         logger.info(f"雷达站数量: {len(stations)}")
 
         # 方位角误差优化
-        step_count = 0
-        for step_az in self.config.optimization_steps:
-            logger.info(f"方位角优化步长 {step_az}° 开始")
-            improved = True
-            iteration = 0
-
-            while improved:
-                iteration += 1
-                improved = False
-
-                # 遍历每个站点
-                for sid in stations:
-                    step_count += 1
-                    # 尝试正负两个方向
-                    for delta_az in [step_az, -step_az]:
-                        temp_az = copy.deepcopy(best_az)
-                        temp_az[sid] += delta_az
-                        cost = self.calculate_cost(match_groups, temp_az, radar_positions, range_errors)
-
-                        if cost < best_cost:
-                            best_cost = cost
-                            best_az = temp_az
-                            improved = True
-                            logger.info(f"方位角优化 站{sid}: +{delta_az:.3f}° → 代价:{best_cost:.6f}")
-
-                # 如果没有改进，跳出循环
-                if not improved:
-                    logger.info(f"方位角步长 {step_az}° 收敛，迭代 {iteration} 次")
-                    break
-                elif iteration % 5 == 0:
-                    logger.info(f"方位角步长 {step_az}° 迭代{iteration}: 当前代价 {best_cost:.6f}")
+        best_cost, step_count = self._descend(
+            engine, "azimuth", self.config.optimization_steps, stations, "方位角", "°", 3
+        )
 
+        best_az = engine.errors("azimuth")
         logger.info("方位角误差优化完成")
         logger.info(f"总步数: {step_count}")
         logger.info(f"最终方位角误差: {best_az}")
@@ -212,51 +174,29 @@ class ErrorCalculator:
         logger.info("开始距离误差优化...")
 
         # 限制匹配组数量
-        if len(match_groups) > self.config.max_match_groups:
-            match_groups = match_groups[:self.config.max_match_groups]
+        match_groups = self._limit_groups(match_groups)
+
+        table = build_match_group_table(
+            match_groups, radar_positions, geometry_backend=self.config.geometry_backend
+        )
 
         # 初始化最佳解
         stations = list(azimuth_errors.keys())
-        best_r = copy.deepcopy(initial_range_errors)
-        best_cost = self.calculate_cost(match_groups, azimuth_errors, radar_positions, best_r)
+        engine = IncrementalCostEngine(
+            table, self.config.cost_weights, azimuth_errors, initial_range_errors
+        )
+        best_cost = engine.cost
 
         logger.info(f"距离误差初始代价: {best_cost:.6f}")
-        logger.info(f"距离误差初始值: {best_r}")
+        logger.info(f"距离误差初始值: {initial_range_errors}")
         logger.info(f"距离优化步长序列: {self.config.range_optimization_steps}")
 
         # 距离误差优化
-        step_count = 0
-        for step_r in self.config.range_optimization_steps:
-            logger.info(f"距离优化步长 {step_r}m 开始")
-            improved = True
-            iteration = 0
-
-            while improved:
-                iteration += 1
-                improved = False
-
-                # 遍历每个站点
-                for sid in stations:
-                    step_count += 1
-                    # 尝试正负两个方向
-                    for delta_r in [step_r, -step_r]:
-                        temp_r = copy.deepcopy(best_r)
-                        temp_r[sid] += delta_r
-                        cost = self.calculate_cost(match_groups, azimuth_errors, radar_positions, temp_r)
-
-                        if cost < best_cost:
-                            best_cost = cost
-                            best_r = temp_r
-                            improved = True
-                            logger.info(f"距离优化 站{sid}: +{delta_r:.1f}m → 代价:{best_cost:.6f}")
-
-                # 如果没有改进，跳出循环
-                if not improved:
-                    logger.info(f"距离步长 {step_r}m 收敛，迭代 {iteration} 次")
-                    break
-                elif iteration % 5 == 0:
-                    logger.info(f"距离步长 {step_r}m 迭代{iteration}: 当前代价 {best_cost:.6f}")
+        best_cost, step_count = self._descend(
+            engine, "range", self.config.range_optimization_steps, stations, "距离", "m", 1
+        )
 
+        best_r = engine.errors("range")
         logger.info("距离误差优化完成")
         logger.info(f"总步数: {step_count}")
         logger.info(f"最终距离误差: {best_r}")
@@ -266,7 +206,7 @@ class ErrorCalculator:
 
     def calculate_cost_with_elevation(
         self,
-        match_groups: List[List[Dict]],
+        match_groups: Union[List[List[Dict]], MatchGroupTable],
         azimuth_errors: Dict[int, float],
         range_errors: Dict[int, float],
         elevation_errors: Dict[int, float],
@@ -276,7 +216,7 @@ class ErrorCalculator:
         计算综合代价函数，同时考虑方位角、距离和俯仰角误差
 
         Args:
-            match_groups: 匹配组列表
+            match_groups: 匹配组列表，或已展开的匹配组扁平表（需包含雷达站高度）
             azimuth_errors: 各雷达站的方位角误差（单位：度）
             range_errors: 各站的距离误差（单位：米）
             elevation_errors: 各站的俯仰角误差（单位：度）
@@ -285,124 +225,30 @@ class ErrorCalculator:
         Returns:
             综合代价值
         """
-        if not match_groups:
+        table = self._as_table(match_groups, radar_positions, require_altitude=True)
+        if table.source_group_count == 0:
             return 0.0
 
-        variances_2d: List[float] = []
-        variances_alt: List[float] = []
-        variances_3d: List[float] = []
-
-        for group in match_groups:
-            if len(group) < 2:
-                continue
-
-            corrected_positions_2d: List[Tuple[float, float]] = []
-            corrected_altitudes: List[float] = []
-            corrected_positions_3d: List[Tuple[float, float, float]] = []
-
-            for point in group:
-                sid = point['station_id']
-                lon, lat, alt = point['longitude'], point['latitude'], point.get('altitude', 0.0)
-
-                if sid not in radar_positions:
-                    continue
-
-                # 获取雷达站位置和高度
-                pos = radar_positions[sid]
-                if len(pos) >= 3:
-                    r_lon, r_lat, r_alt = pos[0], pos[1], pos[2]
-                else:
-                    continue
-
-                # 计算方位角、距离
-                az, back_az, dist = geod.inv(r_lon, r_lat, lon, lat)
-
-                # 计算原始俯仰角
-                dx = (lon - r_lon) * 111000 * math.cos(math.radians(r_lat))
-                dy = (lat - r_lat) * 111000
-                horizontal_dist = math.sqrt(dx ** 2 + dy ** 2)
-                height_diff = alt - r_alt
-
-                # 计算原始俯仰角
-                if horizontal_dist > 0:
-                    original_elevation = math.degrees(math.atan2(height_diff, horizontal_dist))
-                else:
-                    original_elevation = 0.0
-
-                # 应用误差修正
-                da = azimuth_errors.get(sid, 0.0)
-                dr = range_errors.get(sid, 0.0)
-                de = elevation_errors.get(sid, 0.0)
-
-                # 修正后的方位角和距离
-                corr_az = az - da
-                corr_dist = dist - dr
-
-                # 修正后的俯仰角
-                corr_elevation = original_elevation - de
-
-                # 计算修正后的位置（2D）
-                new_lon, new_lat, _ = geod.fwd(r_lon, r_lat, corr_az, corr_dist)
-
-                # 计算修正后的高度
-                if corr_dist > 0:
-                    new_alt = r_alt + corr_dist * math.sin(math.radians(corr_elevation))
-                else:
-                    new_alt = alt
-
-                corrected_positions_2d.append((new_lon, new_lat))
-                corrected_altitudes.append(new_alt)
-                corrected_positions_3d.append((new_lon, new_lat, new_alt))
-
-            # 计算2D方差
-            if len(corrected_positions_2d) >= 2:
-                coords_2d = np.array(corrected_positions_2d)
-                mean_coords_2d = coords_2d.mean(axis=0)
-                diffs_2d = coords_2d - mean_coords_2d
-                var_2d = float(np.sqrt((diffs_2d ** 2).sum(axis=1).mean()))
-                variances_2d.append(var_2d)
-
-            # 计算高度方差
-            if len(corrected_altitudes) >= 2:
-                alts = np.array(corrected_altitudes)
-                mean_alt = alts.mean()
-                var_alt = float(np.sqrt(((alts - mean_alt) ** 2).mean()))
-                variances_alt.append(var_alt)
-
-            # 计算3D方差
-            if len(corrected_positions_3d) >= 2:
-                coords_3d = []
-                for lon, lat, alt in corrected_positions_3d:
-                    x = lon * 111000 * math.cos(math.radians(lat))
-                    y = lat * 111000
-                    coords_3d.append([x, y, alt])
-
-                coords_3d = np.array(coords_3d)
-                mean_coords_3d = coords_3d.mean(axis=0)
-                diffs_3d = coords_3d - mean_coords_3d
-                var_3d = float(np.sqrt((diffs_3d ** 2).sum(axis=1).mean()))
-                variances_3d.append(var_3d)
-
-        if not variances_2d:
+        if table.group_count == 0:
             return float('inf')
 
-        # 计算各项代价
-        variance_3d_cost = float(np.mean(variances_3d)) if variances_3d else 0.0
-
-        az_values = np.array(list(azimuth_errors.values())) if azimuth_errors else np.array([0.0])
-        r_values = np.array(list(range_errors.values())) if range_errors else np.array([0.0])
-        elev_values = np.array(list(elevation_errors.values())) if elevation_errors else np.array([0.0])
-
-        az_sq = float(np.mean(az_values ** 2))
-        r_sq = float(np.mean(r_values ** 2))
-        elev_sq = float(np.mean(elev_values ** 2))
+        # 修正后的位置和高度，按平面近似坐标计算3D方差
+        x, y, new_alt = corrected_columns(
+            table,
+            slice(None),
+            table.station_values(azimuth_errors),
+            table.station_values(range_errors),
+            table.station_values(elevation_errors)
+        )
+        variance_3d_cost = float(np.mean(table.group_rms_spread(x, y, new_alt)))
 
         # 综合代价
         total_cost = (
             self.config.cost_weights.variance * variance_3d_cost
-            + self.config.cost_weights.azimuth_error_square * az_sq
-            + self.config.cost_weights.range_error_square * r_sq
-            + self.config.cost_weights.elevation_error_square * elev_sq
+            + penalty_cost(
+                self.config.cost_weights,
+                {"azimuth": azimuth_errors, "range": range_errors, "elevation": elevation_errors}
+            )
         )
 
         return total_cost
@@ -431,60 +277,92 @@ class ErrorCalculator:
         logger.info("开始俯仰角误差优化...")
 
         # 限制匹配组数量
-        if len(match_groups) > self.config.max_match_groups:
-            match_groups = match_groups[:self.config.max_match_groups]
+        match_groups = self._limit_groups(match_groups)
+
+        table = build_match_group_table(
+            match_groups, radar_positions, require_altitude=True,
+            geometry_backend=self.config.geometry_backend
+        )
 
         # 初始化最佳解
         stations = list(azimuth_errors.keys())
-        best_elev = copy.deepcopy(initial_elevation_errors)
-        best_cost = self.calculate_cost_with_elevation(
-            match_groups, azimuth_errors, range_errors, best_elev, radar_positions
+        engine = IncrementalCostEngine(
+            table, self.config.cost_weights, azimuth_errors, range_errors, initial_elevation_errors
         )
+        best_cost = engine.cost
 
         logger.info(f"俯仰角误差初始代价: {best_cost:.6f}")
-        logger.info(f"俯仰角误差初始值: {best_elev}")
+        logger.info(f"俯仰角误差初始值: {initial_elevation_errors}")
 
         # 俯仰角误差优化
+        best_cost, step_count = self._descend(
+            engine, "elevation", self.config.optimization_steps, stations, "俯仰角", "°", 3
+        )
+
+        best_elev = engine.errors("elevation")
+        logger.info("俯仰角误差优化完成")
+        logger.info(f"总步数: {step_count}")
+        logger.info(f"最终俯仰角误差: {best_elev}")
+        logger.info(f"俯仰角误差优化后代价: {best_cost:.6f}")
+
+        return best_elev
+
+    def _descend(
+        self,
+        engine: IncrementalCostEngine,
+        kind: str,
+        steps: List[float],
+        stations: List[int],
+        name: str,
+        unit: str,
+        precision: int
+    ) -> Tuple[float, int]:
+        """
+        按步长序列对单个误差分量做坐标下降（逐站试探 ±步长，接受降低代价的步）
+
+        Args:
+            engine: 代价引擎（接受的步直接写入引擎）
+            kind: 误差分量
+            steps: 步长序列
+            stations: 参与优化的站号
+            name: 日志中的误差分量名称
+            unit: 步长单位
+            precision: 日志中步长的小数位数
+
+        Returns:
+            (优化后代价, 总步数)
+        """
+        best_cost = engine.cost
         step_count = 0
-        for step_elev in self.config.optimization_steps:
-            logger.info(f"俯仰角优化步长 {step_elev}° 开始")
+        for step in steps:
+            logger.info(f"{name}优化步长 {step}{unit} 开始")
             improved = True
             iteration = 0
 
             while improved:
                 iteration += 1
                 improved = False
+                step_count += len(stations)
 
-                # 遍历每个站点
+                # 遍历每个站点，尝试正负两个方向
                 for sid in stations:
-                    step_count += 1
-                    # 尝试正负两个方向
-                    for delta_elev in [step_elev, -step_elev]:
-                        temp_elev = copy.deepcopy(best_elev)
-                        temp_elev[sid] += delta_elev
-                        cost = self.calculate_cost_with_elevation(
-                            match_groups, azimuth_errors, range_errors, temp_elev, radar_positions
-                        )
+                    for delta in (step, -step):
+                        cost = engine.try_move(kind, sid, delta)
 
                         if cost < best_cost:
                             best_cost = cost
-                            best_elev = temp_elev
+                            engine.accept()
                             improved = True
-                            logger.info(f"俯仰角优化 站{sid}: +{delta_elev:.3f}° → 代价:{best_cost:.6f}")
+                            logger.info(f"{name}优化 站{sid}: +{delta:.{precision}f}{unit} → 代价:{best_cost:.6f}")
 
                 # 如果没有改进，跳出循环
                 if not improved:
-                    logger.info(f"俯仰角步长 {step_elev}° 收敛，迭代 {iteration} 次")
+                    logger.info(f"{name}步长 {step}{unit} 收敛，迭代 {iteration} 次")
                     break
                 elif iteration % 5 == 0:
-                    logger.info(f"俯仰角步长 {step_elev}° 迭代{iteration}: 当前代价 {best_cost:.6f}")
-
-        logger.info("俯仰角误差优化完成")
-        logger.info(f"总步数: {step_count}")
-        logger.info(f"最终俯仰角误差: {best_elev}")
-        logger.info(f"俯仰角误差优化后代价: {best_cost:.6f}")
+                    logger.info(f"{name}步长 {step}{unit} 迭代{iteration}: 当前代价 {best_cost:.6f}")
 
-        return best_elev
+        return best_cost, step_count
 
     def calculate_radar_errors(
         self,
@@ -498,6 +376,113 @@ class ErrorCalculator:
             match_groups: 匹配组列表
             radar_positions: 雷达站位置字典（包含高度）
 
+        Returns:
+            站号 -> (方位角误差, 距离误差, 俯仰角误差) 的字典
+        """
+        if (
+            self.config.group_sampling == "progressive"
+            and len(match_groups) > self.config.sample_initial_groups
+        ):
+            return self.calculate_radar_errors_progressively(match_groups, radar_positions)
+
+        return self._solve_radar_errors(match_groups, radar_positions)
+
+    def calculate_radar_errors_progressively(
+        self,
+        match_groups: List[List[Dict]],
+        radar_positions: Dict[int, Tuple[float, float, float]],
+    ) -> Dict[int, Tuple[float, float, float]]:
+        """
+        渐进加密求解：先在小样本上求解，逐轮扩大分层样本并以上一轮结果为初值，
+        直到相邻两轮的估计变化不超过最小优化步长（或样本达到 max_match_groups）
+
+        Args:
+            match_groups: 匹配组列表
+            radar_positions: 雷达站位置字典（包含高度）
+
+        Returns:
+            站号 -> (方位角误差, 距离误差, 俯仰角误差) 的字典
+        """
+        order = sampling_order(match_groups)
+        limit = min(len(match_groups), self.config.max_match_groups)
+        tolerance = np.array([
+            min(self.config.optimization_steps),
+            min(self.config.range_optimization_steps),
+            min(self.config.optimization_steps),
+        ])
+
+        size = min(self.config.sample_initial_groups, limit)
+        previous = None
+        while True:
+            sample = [match_groups[index] for index in np.sort(order[:size])]
+            logger.info(f"渐进加密: 使用 {size}/{len(match_groups)} 个匹配组求解")
+            estimate = self._solve_radar_errors(sample, radar_positions, previous)
+
+            if previous is not None:
+                change = np.array([
+                    np.abs(np.subtract(estimate[sid], previous[sid])) for sid in estimate
+                ]).max(axis=0)
+                if np.all(change <= tolerance + 1e-9):
+                    logger.info(f"渐进加密: 估计已稳定（样本 {size} 个匹配组）")
+                    break
+
+            if size >= limit:
+                break
+            previous = estimate
+            size = min(size * SAMPLE_GROWTH_FACTOR, limit)
+
+        return estimate
+
+    def calculate_confidence_intervals(
+        self,
+        match_groups: List[List[Dict]],
+        radar_positions: Dict[int, Tuple[float, float, float]],
+        point_estimate: Dict[int, Tuple[float, float, float]],
+    ) -> Optional[BootstrapResult]:
+        """
+        自助法重抽样匹配组，以点估计为初值重新求解，估计各站误差的置信区间
+
+        Args:
+            match_groups: 匹配组列表
+            radar_positions: 雷达站位置字典（包含高度）
+            point_estimate: calculate_radar_errors() 给出的点估计
+
+        Returns:
+            置信区间结果；未配置 bootstrap_samples 或时间预算内完成的重抽样不足时返回 None
+        """
+        return bootstrap_radar_errors(
+            self._solve_radar_errors, match_groups, radar_positions, point_estimate, self.config
+        )
+
+    def _limit_groups(self, match_groups: List[List[Dict]]) -> List[List[Dict]]:
+        """按配置的抽样策略把匹配组数量限制在 max_match_groups 以内"""
+        return limit_match_groups(match_groups, self.config.max_match_groups, self.config.group_sampling)
+
+    def _solve_radar_errors(
+        self,
+        match_groups: List[List[Dict]],
+        radar_positions: Dict[int, Tuple[float, float, float]],
+        initial_errors: Optional[Dict[int, Tuple[float, float, float]]] = None,
+    ) -> Dict[int, Tuple[float, float, float]]:
+        """按配置的求解器计算误差，initial_errors 为初值（默认全 0）"""
+        if self.config.solver == "least_squares":
+            return self.calculate_radar_errors_jointly(match_groups, radar_positions, initial_errors)
+        return self.calculate_radar_errors_by_descent(match_groups, radar_positions, initial_errors)
+
+    def calculate_radar_errors_by_descent(
+        self,
+        match_groups: List[List[Dict]],
+        radar_positions: Dict[int, Tuple[float, float, float]],
+        initial_errors: Optional[Dict[int, Tuple[float, float, float]]] = None,
+    ) -> Dict[int, Tuple[float, float, float]]:
+        """
+        坐标下降依次求解各雷达站的方位角、距离和俯仰角误差
+
+        Args:
+            match_groups: 匹配组列表
+            radar_positions: 雷达站位置字典（包含高度）
+            initial_errors: 初始误差 站号 -> (方位角, 距离, 俯仰角)，默认全 0
+
         Returns:
             站号 -> (方位角误差, 距离误差, 俯仰角误差) 的字典
         """
@@ -506,9 +491,10 @@ class ErrorCalculator:
         logger.info(f"处理雷达站: {list(radar_positions.keys())}")
 
         # 初始化误差
-        initial_azimuth_errors = {sid: 0.0 for sid in radar_positions.keys()}
-        initial_range_errors = {sid: 0.0 for sid in radar_positions.keys()}
-        initial_elevation_errors = {sid: 0.0 for sid in radar_positions.keys()}
+        initial_errors = initial_errors or {}
+        initial_azimuth_errors = {sid: initial_errors.get(sid, (0.0, 0.0, 0.0))[0] for sid in radar_positions}
+        initial_range_errors = {sid: initial_errors.get(sid, (0.0, 0.0, 0.0))[1] for sid in radar_positions}
+        initial_elevation_errors = {sid: initial_errors.get(sid, (0.0, 0.0, 0.0))[2] for sid in radar_positions}
 
         # 创建只包含经纬度的雷达位置字典
         radar_positions_2d = {sid: (lon, lat) for sid, (lon, lat, alt) in radar_positions.items()}
@@ -518,7 +504,7 @@ class ErrorCalculator:
             match_groups,
             initial_azimuth_errors,
             radar_positions_2d,
-            {sid: 0.0 for sid in initial_azimuth_errors.keys()}
+            initial_range_errors
         )
 
         logger.info("=== 步骤2: 计算距离误差 ===")
@@ -565,6 +551,41 @@ class ErrorCalculator:
 
         return combined
 
+    def calculate_radar_errors_jointly(
+        self,
+        match_groups: List[List[Dict]],
+        radar_positions: Dict[int, Tuple[float, float, float]],
+        initial_errors: Optional[Dict[int, Tuple[float, float, float]]] = None,
+    ) -> Dict[int, Tuple[float, float, float]]:
+        """
+        用联合最小二乘同时求解各雷达站的方位角、距离和俯仰角误差
+
+        Args:
+            match_groups: 匹配组列表
+            radar_positions: 雷达站位置字典（包含高度）
+            initial_errors: 初始误差 站号 -> (方位角, 距离, 俯仰角)，默认全 0
+
+        Returns:
+            站号 -> (方位角误差, 距离误差, 俯仰角误差) 的字典
+        """
+        logger.info("开始联合最小二乘误差计算...")
+        logger.info(f"共有 {len(match_groups)} 个匹配组")
+
+        combined = JointLeastSquaresSolver(self.config).solve(match_groups, radar_positions, initial_errors)
+
+        final_cost = self.calculate_cost_with_elevation(
+            self._limit_groups(match_groups),
+            {sid: errors[0] for sid, errors in combined.items()},
+            {sid: errors[1] for sid, errors in combined.items()},
+            {sid: errors[2] for sid, errors in combined.items()},
+            radar_positions
+        )
+        logger.info(f"综合最终代价: {final_cost:.6f}")
+        for sid, (az_err, range_err, elev_err) in combined.items():
+            logger.info(f"  雷达站 {sid}: 方位角={az_err:.3f}°, 距离={range_err:.1f}m, 俯仰角={elev_err:.3f}°")
+
+        return combined
+
 
 def calculate_error_results(
     match_groups: List[List[Dict]],
@@ -0,0 +1,178 @@
+"""
+匹配组扁平数组模块
+
+把匹配组（List[List[Dict]]）展开为按组连续排列的数组（组下标、站下标、纬度、经度、高度），
+供启发式 RANSAC、加权融合等逐组统计的算法按数组整体计算质心、偏差和加权平均。
+
+与 group_table 不同，这里不要求雷达站有位置信息，也不预先计算极坐标，
+每个点都原样保留。逐组归约的舍入与原来逐组调用 numpy / 逐点累加的写法逐位一致：
+- grouped_mean / grouped_std 按组大小分桶，对 (组数, 组大小) 矩阵逐行归约，
+  与对每组单独调用 np.mean / np.std 的求和顺序相同（np.add.reduceat 的求和顺序不同）
+- sequential_group_sum 按组内位置逐列累加，与 Python 中 total += value 的逐点累加相同
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+import numpy as np
+
+
+@dataclass
+class FlatMatchGroups:
+    """
+    匹配组扁平数组
+
+    点按组连续存放，group_starts 为每组第一个点的下标；空组的 group_starts 等于下一组的起点。
+    """
+
+    stations: List[int]         # 雷达站号（按首次出现顺序），长度 S
+    group_starts: np.ndarray    # 各组第一个点的下标，长度 G
+    group_sizes: np.ndarray     # 各组点数，长度 G
+    group_index: np.ndarray     # 点所属组下标，长度 N
+    station_index: np.ndarray   # 点所属雷达站在 stations 中的下标，长度 N
+    latitude: np.ndarray        # 观测纬度，长度 N
+    longitude: np.ndarray       # 观测经度，长度 N
+    altitude: np.ndarray        # 观测高度（缺失按 0 处理），长度 N
+
+    @property
+    def group_count(self) -> int:
+        """匹配组数量"""
+        return len(self.group_starts)
+
+    @property
+    def point_count(self) -> int:
+        """点数量"""
+        return len(self.group_index)
+
+    @property
+    def station_ids(self) -> np.ndarray:
+        """各点的雷达站号"""
+        return np.asarray(self.stations, dtype=np.int64)[self.station_index]
+
+    def group_mean(self, values: np.ndarray) -> np.ndarray:
+        """按组求均值（空组为 NaN）"""
+        return grouped_mean(values, self.group_starts, self.group_sizes)
+
+    def group_std(self, values: np.ndarray) -> np.ndarray:
+        """按组求总体标准差（空组为 NaN）"""
+        return grouped_std(values, self.group_starts, self.group_sizes)
+
+    def within_group_rank(self) -> np.ndarray:
+        """各点在组内的位置（0 起）"""
+        return np.arange(self.point_count) - self.group_starts[self.group_index]
+
+
+def flatten_match_groups(match_groups: List[List[Dict]]) -> FlatMatchGroups:
+    """
+    将匹配组展开为扁平数组
+
+    Args:
+        match_groups: 匹配组列表
+
+    Returns:
+        匹配组扁平数组（与 match_groups 一一对应，包含空组和单点组）
+    """
+    station_lookup: Dict[int, int] = {}
+    station_index: List[int] = []
+    latitude: List[float] = []
+    longitude: List[float] = []
+    altitude: List[float] = []
+    group_sizes: List[int] = []
+
+    for group in match_groups:
+        group_sizes.append(len(group))
+        for point in group:
+            station_index.append(station_lookup.setdefault(point["station_id"], len(station_lookup)))
+            latitude.append(point["latitude"])
+            longitude.append(point["longitude"])
+            altitude.append(point.get("altitude", 0.0) or 0.0)
+
+    sizes = np.array(group_sizes, dtype=np.intp)
+    return FlatMatchGroups(
+        stations=list(station_lookup),
+        group_starts=np.cumsum(sizes) - sizes,
+        group_sizes=sizes,
+        group_index=np.repeat(np.arange(len(sizes)), sizes),
+        station_index=np.array(station_index, dtype=np.intp),
+        latitude=np.array(latitude, dtype=np.float64),
+        longitude=np.array(longitude, dtype=np.float64),
+        altitude=np.array(altitude, dtype=np.float64),
+    )
+
+
+def _grouped_reduce(
+    values: np.ndarray,
+    group_starts: np.ndarray,
+    group_sizes: np.ndarray,
+    reduce: Callable[[np.ndarray], np.ndarray]
+) -> np.ndarray:
+    """按组大小分桶，对每桶 (组数, 组大小) 矩阵沿行归约；空组为 NaN"""
+    result = np.full(len(group_starts), np.nan)
+    for size in np.unique(group_sizes):
+        if size == 0:
+            continue
+        groups = np.flatnonzero(group_sizes == size)
+        result[groups] = reduce(values[group_starts[groups, None] + np.arange(size)])
+    return result
+
+
+def grouped_mean(values: np.ndarray, group_starts: np.ndarray, group_sizes: np.ndarray) -> np.ndarray:
+    """
+    按组求均值
+
+    Args:
+        values: 按组连续存放的数值
+        group_starts: 各组第一个点的下标
+        group_sizes: 各组点数
+
+    Returns:
+        各组均值，与逐组 np.mean 的结果逐位一致
+    """
+    return _grouped_reduce(values, group_starts, group_sizes, lambda matrix: matrix.mean(axis=1))
+
+
+def grouped_std(values: np.ndarray, group_starts: np.ndarray, group_sizes: np.ndarray) -> np.ndarray:
+    """按组求总体标准差（ddof=0），与逐组 np.std 的结果逐位一致"""
+    return _grouped_reduce(values, group_starts, group_sizes, lambda matrix: matrix.std(axis=1))
+
+
+def sequential_group_sum(values: np.ndarray, group_starts: np.ndarray, group_sizes: np.ndarray) -> np.ndarray:
+    """
+    按组从前到后逐点累加
+
+    Args:
+        values: 按组连续存放的数值
+        group_starts: 各组第一个点的下标
+        group_sizes: 各组点数
+
+    Returns:
+        各组累加和（从 0.0 开始），与逐点 total += value 的结果逐位一致
+    """
+    sums = np.zeros(len(group_starts))
+    for position in range(int(group_sizes.max(initial=0))):
+        active = np.flatnonzero(group_sizes > position)
+        sums[active] += values[group_starts[active] + position]
+    return sums
+
+
+def compact_groups(flat: FlatMatchGroups, keep: np.ndarray) -> FlatMatchGroups:
+    """
+    保留部分点，组的划分与顺序不变（点全部被移除的组成为空组）
+
+    Args:
+        flat: 匹配组扁平数组
+        keep: 各点是否保留
+
+    Returns:
+        新的匹配组扁平数组
+    """
+    sizes = np.bincount(flat.group_index[keep], minlength=flat.group_count).astype(np.intp)
+    return FlatMatchGroups(
+        stations=flat.stations,
+        group_starts=np.cumsum(sizes) - sizes,
+        group_sizes=sizes,
+        group_index=flat.group_index[keep],
+        station_index=flat.station_index[keep],
+        latitude=flat.latitude[keep],
+        longitude=flat.longitude[keep],
+        altitude=flat.altitude[keep],
+    )
@@ -0,0 +1,229 @@
+"""
+雷达站局部坐标系模块
+
+为每个雷达站预先计算一次 东北天（ENU）坐标系变换：
+观测点（投影到椭球面）先转换为所属站切平面内的极坐标（水平距离、方位角），
+方位角、距离误差直接在极坐标上做减法，再经一次线性变换换算到公共 ENU 坐标系
+（以各站经纬度中心为原点）计算方差。
+整个过程只有三角函数和矩阵乘法，不再对每个点、每次试探做 WGS84 大地线正算。
+
+与大地线模型的差别只在水平方向：误差沿切平面内的直线修正，而非沿椭球面大地线。
+误差为零时两种模型给出的点位置一致；300 km 范围内修正量的差异在米级以下。
+天向坐标（地球曲率下沉量）随水平距离按平方缩放，使修正后的点仍近似贴合椭球面。
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+
+# WGS84 椭球参数
+WGS84_A = 6378137.0
+WGS84_E2 = 6.69437999014e-3
+
+
+def geodetic_to_ecef(
+    lon: np.ndarray,
+    lat: np.ndarray,
+    alt: np.ndarray
+) -> np.ndarray:
+    """
+    经纬高转换为地心地固坐标
+
+    Args:
+        lon: 经度（度）
+        lat: 纬度（度）
+        alt: 椭球高（米）
+
+    Returns:
+        形状 (..., 3) 的 ECEF 坐标（米）
+    """
+    lon_rad = np.radians(lon)
+    lat_rad = np.radians(lat)
+    sin_lat = np.sin(lat_rad)
+    cos_lat = np.cos(lat_rad)
+    prime_vertical = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_lat ** 2)
+    return np.stack([
+        (prime_vertical + alt) * cos_lat * np.cos(lon_rad),
+        (prime_vertical + alt) * cos_lat * np.sin(lon_rad),
+        (prime_vertical * (1.0 - WGS84_E2) + alt) * sin_lat,
+    ], axis=-1)
+
+
+def enu_rotation(lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    """
+    ECEF 到 ENU 的旋转矩阵
+
+    Args:
+        lon: 原点经度（度）
+        lat: 原点纬度（度）
+
+    Returns:
+        形状 (..., 3, 3) 的矩阵，行依次为东、北、天方向单位向量
+    """
+    lon_rad = np.radians(lon)
+    lat_rad = np.radians(lat)
+    sin_lon, cos_lon = np.sin(lon_rad), np.cos(lon_rad)
+    sin_lat, cos_lat = np.sin(lat_rad), np.cos(lat_rad)
+    zeros = np.zeros_like(sin_lon)
+    return np.stack([
+        np.stack([-sin_lon, cos_lon, zeros], axis=-1),
+        np.stack([-sin_lat * cos_lon, -sin_lat * sin_lon, cos_lat], axis=-1),
+        np.stack([cos_lat * cos_lon, cos_lat * sin_lon, sin_lat], axis=-1),
+    ], axis=-2)
+
+
+@dataclass(frozen=True)
+class StationFrames:
+    """
+    各雷达站的局部坐标系
+
+    公共坐标 = to_common[s] @ 站坐标 + offset[s]
+    """
+
+    origin: np.ndarray          # 各站 ECEF 坐标，形状 (S, 3)
+    rotation: np.ndarray        # ECEF -> 站 ENU 旋转矩阵，形状 (S, 3, 3)
+    to_common: np.ndarray       # 站 ENU -> 公共 ENU 旋转矩阵，形状 (S, 3, 3)
+    offset: np.ndarray          # 各站在公共 ENU 中的位置，形状 (S, 3)
+    reference_lat: float        # 公共坐标系原点纬度（度）
+
+    def to_local(
+        self,
+        station_index: np.ndarray,
+        lon: np.ndarray,
+        lat: np.ndarray,
+        alt: np.ndarray
+    ) -> np.ndarray:
+        """
+        把观测点转换到所属雷达站的 ENU 坐标
+
+        Returns:
+            形状 (N, 3) 的 (东, 北, 天) 坐标（米）
+        """
+        relative = geodetic_to_ecef(lon, lat, alt) - self.origin[station_index]
+        return np.einsum('nij,nj->ni', self.rotation[station_index], relative)
+
+    def surface_polar(
+        self,
+        station_index: np.ndarray,
+        lon: np.ndarray,
+        lat: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        把观测点（投影到椭球面）转换为所属雷达站切平面内的极坐标
+
+        Returns:
+            (水平距离（米）, 方位角（度，正北顺时针）, 天向坐标（米，地球曲率导致的下沉量）)
+        """
+        east, north, up = self.to_local(station_index, lon, lat, np.zeros_like(lon)).T
+        return np.hypot(east, north), np.degrees(np.arctan2(east, north)), up
+
+    def horizontal_transform(self, station_index: np.ndarray) -> np.ndarray:
+        """
+        展开各点所属雷达站到公共 ENU 水平分量的变换系数
+
+        Args:
+            station_index: 各点所属雷达站下标
+
+        Returns:
+            形状 (2, 4, N) 的数组：(东, 北) 分别对站 (东, 北, 天) 坐标的系数及平移量
+        """
+        return np.ascontiguousarray(np.concatenate([
+            self.to_common[station_index, :2].transpose(1, 2, 0),
+            self.offset[station_index, :2].T[:, None, :],
+        ], axis=1))
+
+
+def polar_to_common(
+    transform: np.ndarray,
+    distance: np.ndarray,
+    azimuth: np.ndarray,
+    up: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    站切平面极坐标换算到公共 ENU 坐标的水平分量
+
+    Args:
+        transform: StationFrames.horizontal_transform() 给出的变换系数（与各点对应）
+        distance: 水平距离（米）
+        azimuth: 方位角（度）
+        up: 天向坐标（米）
+
+    Returns:
+        (东, 北)（米）
+    """
+    az = np.radians(azimuth)
+    east = distance * np.sin(az)
+    north = distance * np.cos(az)
+    common = transform[:, 0] * east + transform[:, 1] * north + transform[:, 2] * up + transform[:, 3]
+    return common[0], common[1]
+
+
+def polar_jacobian(
+    transform: np.ndarray,
+    distance: np.ndarray,
+    azimuth: np.ndarray,
+    up: np.ndarray
+) -> np.ndarray:
+    """
+    公共 ENU 水平坐标对 (方位角误差, 距离误差) 的偏导
+
+    修正量 = 观测量 - 误差，故偏导为对修正后极坐标偏导取负；
+    天向坐标随水平距离平方缩放，对距离的偏导为 2·天向坐标/距离。
+
+    Args:
+        transform: 变换系数
+        distance: 修正后水平距离（米）
+        azimuth: 修正后方位角（度）
+        up: 修正后天向坐标（米）
+
+    Returns:
+        形状 (2 个坐标分量, 2 个参数, N) 的数组（方位角按度计）
+    """
+    az = np.radians(azimuth)
+    sin_az, cos_az = np.sin(az), np.cos(az)
+    degree = np.pi / 180
+    curvature = np.divide(2 * up, distance, out=np.zeros_like(up), where=distance > 0)
+
+    d_azimuth = -(transform[:, 0] * cos_az - transform[:, 1] * sin_az) * distance * degree
+    d_range = -(transform[:, 0] * sin_az + transform[:, 1] * cos_az + transform[:, 2] * curvature)
+    return np.stack([d_azimuth, d_range], axis=1)
+
+
+@lru_cache(maxsize=32)
+def _cached_frames(positions: Tuple[Tuple[float, float], ...]) -> StationFrames:
+    lon, lat = np.array(positions, dtype=np.float64).reshape(-1, 2).T
+    reference_lon = float(lon.mean()) if len(lon) else 0.0
+    reference_lat = float(lat.mean()) if len(lat) else 0.0
+
+    origin = geodetic_to_ecef(lon, lat, np.zeros_like(lon))
+    rotation = enu_rotation(lon, lat)
+    reference_rotation = enu_rotation(np.float64(reference_lon), np.float64(reference_lat))
+    reference_origin = geodetic_to_ecef(np.float64(reference_lon), np.float64(reference_lat), np.float64(0.0))
+
+    frames = StationFrames(
+        origin=origin,
+        rotation=rotation,
+        to_common=np.einsum('ij,skj->sik', reference_rotation, rotation),
+        offset=(origin - reference_origin) @ reference_rotation.T,
+        reference_lat=reference_lat,
+    )
+    for array in (frames.origin, frames.rotation, frames.to_common, frames.offset):
+        array.setflags(write=False)
+    return frames
+
+
+def station_frames(radar_lon: np.ndarray, radar_lat: np.ndarray) -> StationFrames:
+    """
+    获取（按需计算并缓存）各雷达站的局部坐标系
+
+    坐标系原点取雷达站在椭球面上的投影，同一组雷达站位置只计算一次。
+
+    Args:
+        radar_lon: 雷达站经度数组
+        radar_lat: 雷达站纬度数组
+
+    Returns:
+        各雷达站的局部坐标系
+    """
+    return _cached_frames(tuple(zip(radar_lon.tolist(), radar_lat.tolist())))
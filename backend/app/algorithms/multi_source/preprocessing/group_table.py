@@ -0,0 +1,246 @@
+"""
+匹配组扁平表模块
+
+把匹配组（List[List[Dict]]）一次性展开为按组连续排列的 numpy 数组，
+并预先计算各点相对所属雷达站的方位角和距离。
+误差优化时每次评估代价只需做数组运算，无需再逐点遍历字典。
+
+几何后端为 enu 时，方位角和距离改为雷达站切平面（ENU）内的极坐标
+（见 geometry 模块），代价计算不再需要大地线正算。
+"""
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pyproj
+
+from app.algorithms.multi_source.preprocessing.geometry import StationFrames, station_frames
+
+# 初始化地理坐标转换器（WGS84椭球）
+geod = pyproj.Geod(ellps='WGS84')
+
+# 经纬度到米的近似换算系数（与误差计算模块保持一致）
+METERS_PER_DEGREE = 111000
+
+
+@dataclass
+class MatchGroupTable:
+    """
+    匹配组扁平表
+
+    点按组连续存放，group_starts 为每组第一个点的下标，可直接用于 np.add.reduceat。
+    只保留所属雷达站有位置信息的点，有效点数少于 2 的组整体剔除。
+    """
+
+    stations: np.ndarray        # 雷达站号（升序），长度 S
+    radar_lon: np.ndarray       # 雷达站经度，长度 S
+    radar_lat: np.ndarray       # 雷达站纬度，长度 S
+    radar_alt: np.ndarray       # 雷达站高度，长度 S（二维位置为 NaN）
+    group_index: np.ndarray     # 点所属组下标（0..G-1），长度 N
+    group_starts: np.ndarray    # 各组第一个点的下标，长度 G
+    source_groups: np.ndarray   # 各组在原匹配组列表中的下标，长度 G
+    station_index: np.ndarray   # 点所属雷达站在 stations 中的下标，长度 N
+    longitude: np.ndarray       # 观测经度，长度 N
+    latitude: np.ndarray        # 观测纬度，长度 N
+    altitude: np.ndarray        # 观测高度，长度 N
+    azimuth: np.ndarray         # 雷达站到观测点的方位角（度），长度 N
+    distance: np.ndarray        # 雷达站到观测点的大地线距离（enu 后端为切平面水平距离）（米），长度 N
+    elevation: np.ndarray       # 观测俯仰角（度），雷达站无高度时为 NaN，长度 N
+    source_group_count: int     # 原匹配组数量（含被剔除的组）
+    frames: Optional[StationFrames] = None          # 雷达站局部坐标系（仅 enu 后端）
+    local_transform: Optional[np.ndarray] = None    # 各点到公共 ENU 的变换系数（仅 enu 后端），形状 (2, 4, N)
+    local_up: Optional[np.ndarray] = None           # 切平面天向坐标（米）（仅 enu 后端），长度 N
+
+    @property
+    def uses_local_frames(self) -> bool:
+        """是否使用雷达站局部坐标系（enu 后端）"""
+        return self.frames is not None
+
+    @property
+    def group_count(self) -> int:
+        """有效匹配组数量"""
+        return len(self.group_starts)
+
+    @property
+    def point_count(self) -> int:
+        """有效点数量"""
+        return len(self.group_index)
+
+    @property
+    def group_sizes(self) -> np.ndarray:
+        """各组点数"""
+        return np.diff(np.append(self.group_starts, self.point_count))
+
+    def station_values(self, values: Dict[int, float]) -> np.ndarray:
+        """
+        把按站号给出的参数展开到每个点
+
+        Args:
+            values: 站号 -> 参数值，缺失的站按 0 处理
+
+        Returns:
+            长度 N 的数组
+        """
+        per_station = np.array(
+            [values.get(int(sid), 0.0) for sid in self.stations], dtype=np.float64
+        )
+        return per_station[self.station_index]
+
+    def group_sum(self, values: np.ndarray) -> np.ndarray:
+        """按组求和"""
+        if self.point_count == 0:
+            return np.zeros(0)
+        return np.add.reduceat(values, self.group_starts)
+
+    def group_rms_spread(self, *columns: np.ndarray) -> np.ndarray:
+        """
+        计算每组点到组质心距离的均方根
+
+        Args:
+            columns: 各坐标分量数组（长度 N）
+
+        Returns:
+            长度 G 的数组，等价于逐组 sqrt(mean(sum((x - mean(x))**2, axis=1)))
+        """
+        return grouped_rms_spread(np.vstack(columns), self.group_starts, self.group_index)
+
+
+def grouped_rms_spread(
+    columns: np.ndarray,
+    group_starts: np.ndarray,
+    group_index: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    按组计算点到组质心距离的均方根
+
+    Args:
+        columns: 坐标矩阵，形状 (分量数, 点数)，点按组连续存放
+        group_starts: 各组第一个点的下标
+        group_index: 各点所属组下标，可选（反复调用时传入以免重复展开）
+
+    Returns:
+        每组的均方根距离
+    """
+    if columns.shape[1] == 0:
+        return np.zeros(0)
+
+    sizes = np.diff(np.append(group_starts, columns.shape[1]))
+    if group_index is None:
+        group_index = np.repeat(np.arange(len(group_starts)), sizes)
+    means = np.add.reduceat(columns, group_starts, axis=1) / sizes
+    squared = ((columns - means[:, group_index]) ** 2).sum(axis=0)
+    return np.sqrt(np.add.reduceat(squared, group_starts) / sizes)
+
+
+def build_match_group_table(
+    match_groups: List[List[Dict]],
+    radar_positions: Dict[int, Tuple],
+    require_altitude: bool = False,
+    geometry_backend: str = "geodesic"
+) -> MatchGroupTable:
+    """
+    将匹配组展开为扁平表
+
+    Args:
+        match_groups: 匹配组列表
+        radar_positions: 雷达站位置（可以是二维或三维）
+        require_altitude: 是否只保留有高度信息的雷达站（俯仰角代价需要）
+        geometry_backend: 几何后端，geodesic（WGS84 大地线）或 enu（雷达站局部坐标系）
+
+    Returns:
+        匹配组扁平表
+    """
+    min_dims = 3 if require_altitude else 2
+    positions = {
+        sid: pos for sid, pos in radar_positions.items() if len(pos) >= min_dims
+    }
+    stations = np.array(sorted(positions), dtype=np.int64)
+    station_lookup = {int(sid): index for index, sid in enumerate(stations)}
+
+    radar_lon = np.array([positions[sid][0] for sid in stations], dtype=np.float64)
+    radar_lat = np.array([positions[sid][1] for sid in stations], dtype=np.float64)
+    radar_alt = np.array(
+        [positions[sid][2] if len(positions[sid]) >= 3 else math.nan for sid in stations],
+        dtype=np.float64
+    )
+
+    station_index: List[int] = []
+    longitude: List[float] = []
+    latitude: List[float] = []
+    altitude: List[float] = []
+    group_starts: List[int] = []
+    source_groups: List[int] = []
+
+    for source_index, group in enumerate(match_groups):
+        valid = [point for point in group if point['station_id'] in station_lookup]
+        if len(valid) < 2:
+            continue
+
+        group_starts.append(len(station_index))
+        source_groups.append(source_index)
+        for point in valid:
+            station_index.append(station_lookup[point['station_id']])
+            longitude.append(point['longitude'])
+            latitude.append(point['latitude'])
+            altitude.append(point.get('altitude', 0.0))
+
+    station_index_arr = np.array(station_index, dtype=np.int64)
+    lon = np.array(longitude, dtype=np.float64)
+    lat = np.array(latitude, dtype=np.float64)
+    alt = np.array(altitude, dtype=np.float64)
+    starts = np.array(group_starts, dtype=np.int64)
+
+    sizes = np.diff(np.append(starts, len(station_index_arr)))
+    group_index = np.repeat(np.arange(len(starts)), sizes)
+
+    r_lon = radar_lon[station_index_arr]
+    r_lat = radar_lat[station_index_arr]
+    r_alt = radar_alt[station_index_arr]
+
+    frames = None
+    local_transform = None
+    local_up = None
+    if geometry_backend == "enu":
+        frames = station_frames(radar_lon, radar_lat)
+        local_transform = frames.horizontal_transform(station_index_arr)
+        distance, azimuth, local_up = frames.surface_polar(station_index_arr, lon, lat)
+    elif len(lon):
+        azimuth, _, distance = geod.inv(r_lon, r_lat, lon, lat)
+        azimuth = np.asarray(azimuth, dtype=np.float64)
+        distance = np.asarray(distance, dtype=np.float64)
+    else:
+        azimuth = np.zeros(0)
+        distance = np.zeros(0)
+
+    # 原始俯仰角（平面近似水平距离）
+    dx = (lon - r_lon) * METERS_PER_DEGREE * np.cos(np.radians(r_lat))
+    dy = (lat - r_lat) * METERS_PER_DEGREE
+    horizontal_dist = np.sqrt(dx ** 2 + dy ** 2)
+    elevation = np.where(
+        horizontal_dist > 0,
+        np.degrees(np.arctan2(alt - r_alt, horizontal_dist)),
+        0.0
+    )
+    elevation[np.isnan(r_alt)] = math.nan
+
+    return MatchGroupTable(
+        stations=stations,
+        radar_lon=radar_lon,
+        radar_lat=radar_lat,
+        radar_alt=radar_alt,
+        group_index=group_index,
+        group_starts=starts,
+        source_groups=np.array(source_groups, dtype=np.int64),
+        station_index=station_index_arr,
+        longitude=lon,
+        latitude=lat,
+        altitude=alt,
+        azimuth=azimuth,
+        distance=distance,
+        elevation=elevation,
+        source_group_count=len(match_groups),
+        frames=frames,
+        local_transform=local_transform,
+        local_up=local_up,
+    )
@@ -0,0 +1,282 @@
+"""
+联合最小二乘求解模块
+
+把所有雷达站的 (方位角, 距离, 俯仰角) 误差作为一个参数向量，
+用 scipy.optimize.least_squares 联合求解，替代逐分量的固定步长坐标下降。
+
+残差由两部分组成：
+1. 每个点修正后坐标（平面近似 x, y 与高度）相对所在匹配组质心的偏差，
+   按 sqrt(方差权重 / (组数 × 组内点数)) 缩放，平方和即各组均方偏差的平均值；
+2. 各误差分量的正则项，按 sqrt(误差平方项权重 / 站数) 缩放。
+
+雅可比矩阵按链式法则解析组装：大地线正算对修正方位角、修正距离的偏导用逐点差分求得
+（每次只需 3 次向量化正算，与雷达站数量无关），其余环节（平面近似坐标、高度、组质心）为解析式。
+某点的残差只依赖同组各站的参数，雅可比矩阵按组稀疏。
+enu 几何后端下水平坐标对参数的偏导为解析式（见 geometry.polar_jacobian）。
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.optimize import least_squares
+from scipy.sparse import coo_matrix, csr_matrix
+
+from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from app.algorithms.multi_source.preprocessing.cost_engine import corrected_columns, corrected_horizontal
+from app.algorithms.multi_source.preprocessing.geometry import polar_jacobian
+from app.algorithms.multi_source.preprocessing.group_table import (
+    METERS_PER_DEGREE,
+    MatchGroupTable,
+    build_match_group_table,
+)
+from app.algorithms.multi_source.preprocessing.sampling import limit_match_groups
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 每站参数个数：方位角（度）、距离（米）、俯仰角（度）
+PARAMS_PER_STATION = 3
+# 坐标分量个数：x、y、高度
+COORDINATE_COUNT = 3
+# 大地线正算差分步长（方位角：度，距离：米）
+AZIMUTH_STEP = 1e-5
+RANGE_STEP = 1.0
+
+
+def _group_pairs(table: MatchGroupTable) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    枚举同组内的所有点对 (i, j)
+
+    Returns:
+        (点 i 下标, 点 j 下标)，每组 n 个点产生 n×n 个点对
+    """
+    sizes = table.group_sizes[table.group_index]
+    pair_i = np.repeat(np.arange(table.point_count), sizes)
+    block_starts = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    offset = np.arange(len(pair_i)) - block_starts
+    pair_j = table.group_starts[table.group_index[pair_i]] + offset
+    return pair_i, pair_j
+
+
+class JointLeastSquaresSolver:
+    """
+    联合最小二乘误差求解器
+    """
+
+    def __init__(self, config: MrraConfig):
+        """
+        初始化联合求解器
+
+        Args:
+            config: MRRA 配置
+        """
+        self.config = config
+
+    def residuals(self, params: np.ndarray, table: MatchGroupTable) -> np.ndarray:
+        """
+        计算残差向量
+
+        Args:
+            params: 参数向量 [方位角误差×S, 距离误差×S, 俯仰角误差×S]
+            table: 匹配组扁平表（含雷达站高度）
+
+        Returns:
+            残差向量
+        """
+        weights = self.config.cost_weights
+        station_count = len(table.stations)
+        azimuth, ranges, elevation = params.reshape(PARAMS_PER_STATION, station_count)
+
+        columns = np.vstack(corrected_columns(
+            table,
+            slice(None),
+            azimuth[table.station_index],
+            ranges[table.station_index],
+            elevation[table.station_index]
+        ))
+
+        sizes = table.group_sizes
+        centroids = np.add.reduceat(columns, table.group_starts, axis=1) / sizes
+        scale = np.sqrt(weights.variance / (table.group_count * sizes))[table.group_index]
+        spread = ((columns - centroids[:, table.group_index]) * scale).ravel()
+
+        regularization = np.concatenate([
+            np.sqrt(weights.azimuth_error_square / station_count) * azimuth,
+            np.sqrt(weights.range_error_square / station_count) * ranges,
+            np.sqrt(weights.elevation_error_square / station_count) * elevation,
+        ])
+        return np.concatenate([spread, regularization])
+
+    def jacobian(
+        self,
+        params: np.ndarray,
+        table: MatchGroupTable,
+        pairs: Tuple[np.ndarray, np.ndarray]
+    ) -> csr_matrix:
+        """
+        计算残差的稀疏雅可比矩阵
+
+        点 i 的残差 r_i = scale_g · (c_i - mean_g(c))，对雷达站 s 参数的偏导为
+        scale_g · Σ_j (δ_ij - 1/n_g) · ∂c_j/∂p_s，求和遍历组内属于站 s 的点 j。
+
+        Args:
+            params: 参数向量
+            table: 匹配组扁平表
+            pairs: _group_pairs() 给出的组内点对
+
+        Returns:
+            形状 (残差数, 参数数) 的稀疏矩阵
+        """
+        weights = self.config.cost_weights
+        station_count = len(table.stations)
+        point_count = table.point_count
+        azimuth, ranges, elevation = params.reshape(PARAMS_PER_STATION, station_count)
+        derivatives = self._coordinate_derivatives(
+            table,
+            azimuth[table.station_index],
+            ranges[table.station_index],
+            elevation[table.station_index]
+        )
+
+        pair_i, pair_j = pairs
+        sizes = table.group_sizes[table.group_index]
+        scale = np.sqrt(weights.variance / (table.group_count * sizes))
+        centering = scale[pair_i] * ((pair_i == pair_j) - 1.0 / sizes[pair_i])
+        station_j = table.station_index[pair_j]
+
+        rows = []
+        cols = []
+        values = []
+        for component in range(COORDINATE_COUNT):
+            for param in range(PARAMS_PER_STATION):
+                rows.append(component * point_count + pair_i)
+                cols.append(param * station_count + station_j)
+                values.append(centering * derivatives[component, param][pair_j])
+
+        regularization_weights = np.repeat([
+            weights.azimuth_error_square,
+            weights.range_error_square,
+            weights.elevation_error_square,
+        ], station_count)
+        param_count = PARAMS_PER_STATION * station_count
+        rows.append(COORDINATE_COUNT * point_count + np.arange(param_count))
+        cols.append(np.arange(param_count))
+        values.append(np.sqrt(regularization_weights / station_count))
+
+        return coo_matrix(
+            (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(COORDINATE_COUNT * point_count + param_count, param_count)
+        ).tocsr()
+
+    @staticmethod
+    def _coordinate_derivatives(
+        table: MatchGroupTable,
+        az_offsets: np.ndarray,
+        r_offsets: np.ndarray,
+        el_offsets: np.ndarray
+    ) -> np.ndarray:
+        """
+        各点方差坐标分量对所属雷达站误差参数的偏导
+
+        Returns:
+            形状 (坐标分量, 参数, 点数) 的数组
+        """
+        point_count = table.point_count
+        lon, lat, corr_dist = corrected_horizontal(table, slice(None), az_offsets, r_offsets)
+
+        if table.uses_local_frames:
+            # 公共 ENU 水平坐标对 (方位角, 距离) 的偏导为解析式
+            distance = table.distance
+            ratio = np.divide(corr_dist, distance, out=np.ones_like(corr_dist), where=distance > 0)
+            (dx_daz, dx_dr), (dy_daz, dy_dr) = polar_jacobian(
+                table.local_transform, corr_dist, table.azimuth - az_offsets, table.local_up * ratio ** 2
+            )
+        else:
+            # 大地线正算对误差参数的偏导（修正量 = 观测量 - 误差，故差分方向取反）
+            lon_az, lat_az, _ = corrected_horizontal(table, slice(None), az_offsets - AZIMUTH_STEP, r_offsets)
+            lon_r, lat_r, _ = corrected_horizontal(table, slice(None), az_offsets, r_offsets - RANGE_STEP)
+            dlon = (-(lon_az - lon) / AZIMUTH_STEP, -(lon_r - lon) / RANGE_STEP)
+            dlat = (-(lat_az - lat) / AZIMUTH_STEP, -(lat_r - lat) / RANGE_STEP)
+
+            # 平面近似坐标 x = lon·K·cos(lat)，y = lat·K
+            lat_rad = np.radians(lat)
+            dx_dlon = METERS_PER_DEGREE * np.cos(lat_rad)
+            dx_dlat = -METERS_PER_DEGREE * lon * np.sin(lat_rad) * np.pi / 180
+            dx_daz, dx_dr = (dx_dlon * dlon[k] + dx_dlat * dlat[k] for k in range(2))
+            dy_daz, dy_dr = (METERS_PER_DEGREE * dlat[k] for k in range(2))
+
+        # 高度 = 站高 + 修正距离·sin(修正俯仰角)（修正距离不为正时保持观测高度）
+        corr_elevation = np.radians(table.elevation - el_offsets)
+        positive = corr_dist > 0
+
+        zeros = np.zeros(point_count)
+        return np.array([
+            [dx_daz, dx_dr, zeros],
+            [dy_daz, dy_dr, zeros],
+            [
+                zeros,
+                np.where(positive, -np.sin(corr_elevation), 0.0),
+                np.where(positive, -corr_dist * np.cos(corr_elevation) * np.pi / 180, 0.0),
+            ],
+        ])
+
+    def solve(
+        self,
+        match_groups: List[List[Dict]],
+        radar_positions: Dict[int, Tuple[float, float, float]],
+        initial_errors: Optional[Dict[int, Tuple[float, float, float]]] = None
+    ) -> Dict[int, Tuple[float, float, float]]:
+        """
+        联合求解各雷达站的方位角、距离和俯仰角误差
+
+        Args:
+            match_groups: 匹配组列表
+            radar_positions: 雷达站位置字典（包含高度）
+            initial_errors: 初始误差 站号 -> (方位角, 距离, 俯仰角)，默认全 0
+
+        Returns:
+            站号 -> (方位角误差, 距离误差, 俯仰角误差) 的字典
+        """
+        match_groups = limit_match_groups(
+            match_groups, self.config.max_match_groups, self.config.group_sampling
+        )
+
+        table = build_match_group_table(
+            match_groups, radar_positions, require_altitude=True,
+            geometry_backend=self.config.geometry_backend
+        )
+        combined = {sid: (0.0, 0.0, 0.0) for sid in radar_positions.keys()}
+        if table.group_count == 0:
+            logger.warning("没有可用于联合求解的匹配组，误差保持为 0")
+            return combined
+
+        station_count = len(table.stations)
+        logger.info(
+            f"联合最小二乘求解: {table.group_count} 个匹配组, "
+            f"{table.point_count} 个点, {PARAMS_PER_STATION * station_count} 个参数"
+        )
+
+        initial_errors = initial_errors or {}
+        x0 = np.array([
+            [initial_errors.get(int(sid), (0.0, 0.0, 0.0))[param] for sid in table.stations]
+            for param in range(PARAMS_PER_STATION)
+        ]).ravel()
+
+        pairs = _group_pairs(table)
+        result = least_squares(
+            lambda params: self.residuals(params, table),
+            x0,
+            jac=lambda params: self.jacobian(params, table, pairs),
+            x_scale='jac',
+            method='trf',
+            tr_solver='lsmr',
+        )
+        logger.info(
+            f"联合最小二乘求解完成: {result.message}（函数评估 {result.nfev} 次, "
+            f"代价 {result.cost:.6f}）"
+        )
+
+        azimuth, ranges, elevation = result.x.reshape(PARAMS_PER_STATION, station_count)
+        for index, sid in enumerate(table.stations):
+            combined[int(sid)] = (float(azimuth[index]), float(ranges[index]), float(elevation[index]))
+
+        return combined
@@ -0,0 +1,353 @@
+"""
+多源算法预处理流程模块
+
+封装所有多源算法共用的 加载→提取→插值→匹配 流程，
+相同输入（航迹、雷达站、预处理参数、源数据版本）命中缓存时直接复用匹配结果。
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.algorithms.multi_source.preprocessing.cache import (
+    PreprocessingCache,
+    build_cache_key,
+    preprocessing_cache,
+)
+from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from app.algorithms.multi_source.preprocessing.streaming import run_streaming_preprocessing
+from app.algorithms.multi_source.preprocessing.track_extractor import load_track_points_by_track_ids, extract_key_tracks
+from app.algorithms.multi_source.preprocessing.track_interpolator import (
+    copy_interpolated_points,
+    interpolate_and_save_tracks,
+    save_segment_summaries,
+    summarize_track_segments,
+)
+from app.algorithms.multi_source.preprocessing.track_matcher import (
+    load_matched_groups,
+    match_tracks_from_database,
+    save_matched_groups,
+)
+from app.models.flight_track import RadarStation, FlightTrackRaw
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 进度上报函数：(回调进度 0-1, 任务进度 0-100, 描述)
+ProgressReporter = Callable[[float, int, str], None]
+
+
+@dataclass
+class PreprocessingResult:
+    """预处理结果"""
+
+    radar_positions: Dict[int, Tuple[float, float, float]]
+    segments: List[Dict]
+    matched_groups: List[List[Dict]]
+    reference_time: datetime
+    cache_hit: bool = False
+    source_task_id: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def to_metadata(self) -> Dict[str, Any]:
+        """转换为结果元数据"""
+        return {
+            "cache_hit": self.cache_hit,
+            "source_task_id": self.source_task_id,
+            "timings": {name: round(seconds, 3) for name, seconds in self.timings.items()},
+        }
+
+
+def load_radar_positions(
+    db: Session,
+    radar_station_ids: List[int]
+) -> Dict[int, Tuple[float, float, float]]:
+    """
+    查询雷达站位置
+
+    Args:
+        db: 数据库会话
+        radar_station_ids: 雷达站ID列表
+
+    Returns:
+        {station_id: (lon, lat, alt)}
+    """
+    radar_stations = db.query(RadarStation).filter(
+        RadarStation.id.in_(radar_station_ids)
+    ).all()
+
+    return {
+        station.id: (station.longitude, station.latitude, station.altitude or 0.0)
+        for station in radar_stations
+    }
+
+
+def get_source_data_version(db: Session, track_ids: List[str]) -> str:
+    """
+    计算所选航迹源数据的版本标识
+
+    航迹数据只追加写入，记录数、最大ID和最新创建时间可以反映数据变化。
+
+    Args:
+        db: 数据库会话
+        track_ids: 航迹批号列表
+
+    Returns:
+        版本标识字符串
+    """
+    count, max_id, max_created = db.query(
+        func.count(FlightTrackRaw.id),
+        func.max(FlightTrackRaw.id),
+        func.max(FlightTrackRaw.created_at),
+    ).filter(
+        FlightTrackRaw.batch_id.in_(track_ids)
+    ).one()
+
+    return f"{count}:{max_id}:{max_created.isoformat() if max_created else ''}"
+
+
+def get_reference_time(db: Session, track_ids: List[str]) -> datetime:
+    """
+    获取参考时间（第一条记录所在日期的零点）
+
+    Args:
+        db: 数据库会话
+        track_ids: 航迹批号列表
+
+    Returns:
+        参考时间
+    """
+    first_track = db.query(FlightTrackRaw).filter(
+        FlightTrackRaw.batch_id.in_(track_ids)
+    ).order_by(FlightTrackRaw.timestamp).first()
+
+    if not first_track:
+        return datetime.utcnow()
+    return first_track.timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def save_preprocessing_outputs(
+    db: Session,
+    task_id: str,
+    source_task_id: str,
+    segments: List[Dict],
+    matched_groups: List[List[Dict]],
+    reference_time: datetime
+) -> bool:
+    """
+    将已有的预处理结果（插值点、航迹段、匹配组）写入指定任务
+
+    用于缓存命中或批量分析时，让每个任务都有自己的插值点、航迹段和匹配组记录：
+    插值点从源任务复制，匹配组中的点ID改写为复制后的点ID，不依赖源任务的数据继续存在。
+
+    Args:
+        db: 数据库会话
+        task_id: 任务ID
+        source_task_id: 插值点所属的源任务ID
+        segments: 航迹段摘要列表
+        matched_groups: 匹配组列表
+        reference_time: 参考时间
+
+    Returns:
+        是否写入；源任务的插值点已被删除时不写入任何记录并返回 False
+    """
+    point_ids = copy_interpolated_points(db, source_task_id, task_id)
+    if not point_ids:
+        return False
+
+    save_segment_summaries(db, task_id, segments, reference_time)
+    save_matched_groups(db, task_id, [
+        [{**point, 'id': point_ids.get(point.get('id'))} for point in group]
+        for group in matched_groups
+    ], reference_time)
+    return True
+
+
+def run_preprocessing(
+    db: Session,
+    task_id: str,
+    radar_station_ids: List[int],
+    track_ids: List[str],
+    config: MrraConfig,
+    report_progress: Optional[ProgressReporter] = None,
+    cache: Optional[PreprocessingCache] = None,
+) -> PreprocessingResult:
+    """
+    执行多源算法预处理流程（加载并提取航迹、插值、匹配）
+
+    插值点、航迹段和匹配组总会写入当前任务；命中缓存时跳过提取、插值和匹配计算，
+    插值点从首次计算的任务复制（该任务的插值点已被删除时按未命中重新计算）。
+
+    Args:
+        db: 数据库会话
+        task_id: 任务ID
+        radar_station_ids: 雷达站ID列表
+        track_ids: 航迹批号列表
+        config: MRRA 预处理配置
+        report_progress: 进度上报函数
+        cache: 预处理缓存（默认使用全局缓存）
+
+    Returns:
+        PreprocessingResult
+
+    Raises:
+        ValueError: 雷达站、航迹数据或匹配结果为空
+    """
+    cache = cache if cache is not None else preprocessing_cache
+    timings: Dict[str, float] = {}
+
+    def report(fraction: float, task_progress: int, message: str):
+        if report_progress:
+            report_progress(fraction, task_progress, message)
+
+    radar_positions = load_radar_positions(db, radar_station_ids)
+    if not radar_positions:
+        raise ValueError("没有找到指定的雷达站位置信息")
+
+    cache_key = None
+    if cache.enabled:
+        cache_key = build_cache_key(
+            track_ids, radar_positions, config, get_source_data_version(db, track_ids)
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            stage_start = time.perf_counter()
+            reference_time = cached['reference_time']
+            if save_preprocessing_outputs(
+                db, task_id, cached['source_task_id'], cached['segments'], cached['matched_groups'], reference_time
+            ):
+                logger.info(f"[{task_id}] 预处理缓存命中，复用任务 {cached['source_task_id']} 的匹配结果")
+                report(0.5, 60, "复用预处理缓存")
+                timings['persist'] = time.perf_counter() - stage_start
+                return PreprocessingResult(
+                    radar_positions=radar_positions,
+                    segments=cached['segments'],
+                    matched_groups=cached['matched_groups'],
+                    reference_time=reference_time,
+                    cache_hit=True,
+                    source_task_id=cached['source_task_id'],
+                    timings=timings,
+                )
+            logger.warning(f"[{task_id}] 预处理缓存对应任务 {cached['source_task_id']} 的插值点已删除，重新预处理")
+
+    if config.streaming:
+        reference_time, segments, matched_groups = _run_streaming_stages(
+            db, task_id, radar_positions, track_ids, config, report, timings
+        )
+    else:
+        reference_time, segments, matched_groups = _run_batch_stages(
+            db, task_id, radar_positions, track_ids, config, report, timings
+        )
+
+    if cache_key is not None:
+        cache.put(cache_key, {
+            'source_task_id': task_id,
+            'reference_time': reference_time,
+            'segments': segments,
+            'matched_groups': matched_groups,
+        })
+
+    return PreprocessingResult(
+        radar_positions=radar_positions,
+        segments=segments,
+        matched_groups=matched_groups,
+        reference_time=reference_time,
+        timings=timings,
+    )
+
+
+def _run_batch_stages(
+    db: Session,
+    task_id: str,
+    radar_positions: Dict[int, Tuple[float, float, float]],
+    track_ids: List[str],
+    config: MrraConfig,
+    report: ProgressReporter,
+    timings: Dict[str, float]
+) -> Tuple[datetime, List[Dict], List[List[Dict]]]:
+    """
+    批量模式：一次加载全部数据后依次提取、插值、匹配
+
+    Returns:
+        (参考时间, 航迹段摘要列表, 匹配组列表)
+    """
+    # 步骤1: 加载并提取航迹
+    report(0.1, 10, "加载并提取航迹")
+    stage_start = time.perf_counter()
+
+    station_data = load_track_points_by_track_ids(db, track_ids, radar_positions)
+    if not station_data:
+        raise ValueError("没有找到有效的航迹数据")
+
+    key_tracks = extract_key_tracks(station_data, config)
+    if not key_tracks:
+        raise ValueError("没有提取到关键航迹")
+
+    timings['extract'] = time.perf_counter() - stage_start
+
+    # 步骤2: 插值
+    report(0.3, 40, "航迹插值")
+    stage_start = time.perf_counter()
+
+    reference_time = get_reference_time(db, track_ids)
+    interpolate_and_save_tracks(db, task_id, key_tracks, config, reference_time)
+
+    timings['interpolate'] = time.perf_counter() - stage_start
+
+    # 步骤3: 匹配
+    report(0.5, 60, "航迹匹配")
+    stage_start = time.perf_counter()
+
+    matched_groups = match_tracks_from_database(db, task_id, config)
+    if not matched_groups:
+        raise ValueError("没有匹配到航迹组")
+
+    save_matched_groups(db, task_id, matched_groups, reference_time)
+
+    timings['match'] = time.perf_counter() - stage_start
+
+    return reference_time, summarize_track_segments(key_tracks), matched_groups
+
+
+def _run_streaming_stages(
+    db: Session,
+    task_id: str,
+    radar_positions: Dict[int, Tuple[float, float, float]],
+    track_ids: List[str],
+    config: MrraConfig,
+    report: ProgressReporter,
+    timings: Dict[str, float]
+) -> Tuple[datetime, List[Dict], List[List[Dict]]]:
+    """
+    流式模式：按时间顺序读取数据，在滑动窗口内同时完成提取、插值、匹配
+
+    Returns:
+        (参考时间, 航迹段摘要列表, 匹配组列表)
+    """
+    report(0.1, 10, "流式预处理")
+    stage_start = time.perf_counter()
+    last_progress = [10]
+
+    def on_progress(fraction: float):
+        task_progress = 10 + int(50 * fraction)
+        if task_progress > last_progress[0]:
+            last_progress[0] = task_progress
+            report(0.1 + 0.4 * fraction, task_progress, "流式预处理")
+
+    # 匹配组在流式处理中逐窗口保存，结束后一次性加载误差计算所需的字段
+    reference_time, segments, group_count = run_streaming_preprocessing(
+        db, task_id, list(radar_positions), track_ids, config, on_progress=on_progress
+    )
+    if not segments:
+        raise ValueError("没有提取到关键航迹")
+    if not group_count:
+        raise ValueError("没有匹配到航迹组")
+
+    matched_groups = load_matched_groups(db, task_id, reference_time)
+
+    timings['stream'] = time.perf_counter() - stage_start
+
+    return reference_time, segments, matched_groups
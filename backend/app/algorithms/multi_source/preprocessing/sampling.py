@@ -0,0 +1,153 @@
+"""
+匹配组分层抽样模块
+
+按 时间段 × 雷达站组合 × 空间位置 对匹配组分层，按比例抽样，
+替代直接截取前 N 个匹配组（会使估计偏向最早的时段）。
+
+抽样采用秩次打分：层内随机排序后第 r 个组的得分为 (r + u) / 层大小（u 为 [0,1) 随机数），
+取得分最小的 n 个组。各层入选数与层大小成正比，且小样本是大样本的子集，
+渐进加密时可以直接在上一轮样本的基础上扩充。
+"""
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 时间分层数
+TIME_STRATA = 8
+# 空间分层数（经度、纬度各自按分位数切分）
+SPATIAL_STRATA = 4
+# 抽样随机种子（保证同一输入得到同一样本）
+SAMPLING_SEED = 0
+
+
+def _quantile_bins(values: np.ndarray, bins: int) -> np.ndarray:
+    """按分位数把数值切分为 bins 段，返回各值所在段号"""
+    if len(values) == 0 or bins <= 1:
+        return np.zeros(len(values), dtype=np.int64)
+    edges = np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1])
+    return np.searchsorted(edges, values, side='right')
+
+
+def group_strata(match_groups: Sequence[List[Dict]]) -> np.ndarray:
+    """
+    计算每个匹配组所属的层
+
+    Args:
+        match_groups: 匹配组列表
+
+    Returns:
+        各组的层编号
+    """
+    count = len(match_groups)
+    times = np.zeros(count)
+    lons = np.zeros(count)
+    lats = np.zeros(count)
+    station_keys = []
+
+    for index, group in enumerate(match_groups):
+        if group:
+            times[index] = group[0].get('time_seconds', 0.0)
+            lons[index] = sum(p['longitude'] for p in group) / len(group)
+            lats[index] = sum(p['latitude'] for p in group) / len(group)
+        station_keys.append(tuple(sorted({p['station_id'] for p in group})))
+
+    # 雷达站组合编号
+    combination_ids: Dict[tuple, int] = {}
+    combination = np.array(
+        [combination_ids.setdefault(key, len(combination_ids)) for key in station_keys], dtype=np.int64
+    )
+
+    keys = np.stack([
+        _quantile_bins(times, TIME_STRATA),
+        combination,
+        _quantile_bins(lons, SPATIAL_STRATA),
+        _quantile_bins(lats, SPATIAL_STRATA),
+    ], axis=1)
+    _, strata = np.unique(keys, axis=0, return_inverse=True)
+    return strata.reshape(-1)
+
+
+def sampling_order(match_groups: Sequence[List[Dict]], seed: int = SAMPLING_SEED) -> np.ndarray:
+    """
+    计算分层抽样的入选顺序
+
+    取返回数组的前 n 项即为大小为 n 的分层样本。
+
+    Args:
+        match_groups: 匹配组列表
+        seed: 随机种子
+
+    Returns:
+        匹配组下标数组（按入选先后排列）
+    """
+    count = len(match_groups)
+    if count == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    rng = np.random.default_rng(seed)
+    strata = group_strata(match_groups)
+
+    # 层内随机排序后的秩次
+    shuffle = rng.permutation(count)
+    order = shuffle[np.argsort(strata[shuffle], kind='stable')]
+    sizes = np.bincount(strata)
+    starts = np.cumsum(sizes) - sizes
+    ranks = np.empty(count, dtype=np.int64)
+    ranks[order] = np.arange(count) - starts[strata[order]]
+
+    scores = (ranks + rng.random(count)) / sizes[strata]
+    return np.argsort(scores, kind='stable')
+
+
+def stratified_sample(
+    match_groups: List[List[Dict]],
+    sample_size: int,
+    seed: int = SAMPLING_SEED
+) -> List[List[Dict]]:
+    """
+    分层抽取匹配组（保持原有时间顺序）
+
+    Args:
+        match_groups: 匹配组列表
+        sample_size: 样本大小，不小于组数时返回全部
+        seed: 随机种子
+
+    Returns:
+        抽样后的匹配组列表
+    """
+    if len(match_groups) <= sample_size:
+        return match_groups
+
+    selected = np.sort(sampling_order(match_groups, seed)[:sample_size])
+    return [match_groups[index] for index in selected]
+
+
+def limit_match_groups(
+    match_groups: List[List[Dict]],
+    max_groups: int,
+    strategy: str = "stratified"
+) -> List[List[Dict]]:
+    """
+    把匹配组数量限制在 max_groups 以内
+
+    Args:
+        match_groups: 匹配组列表
+        max_groups: 最大匹配组数
+        strategy: truncate 截取前 N 组；其余策略使用分层抽样
+
+    Returns:
+        限制后的匹配组列表
+    """
+    if len(match_groups) <= max_groups:
+        return match_groups
+
+    if strategy == "truncate":
+        logger.info(f"截取前 {max_groups} 个匹配组（共 {len(match_groups)} 个）")
+        return match_groups[:max_groups]
+
+    logger.info(f"分层抽取 {max_groups} 个匹配组（共 {len(match_groups)} 个）")
+    return stratified_sample(match_groups, max_groups)
@@ -0,0 +1,581 @@
+"""
+流式预处理模块
+
+按时间顺序分页读取原始航迹数据，在有界的滑动窗口内完成关键航迹提取、
+插值和匹配，匹配组随窗口推进增量产生并立即保存。内存占用只取决于时间窗口内的
+数据量，与分析的总时间跨度无关，可以处理跨天的长时段数据。
+
+处理规则与批量流程（extract_key_tracks → interpolate_and_save_tracks →
+match_tracks_from_database）一致：
+- 提取：每个雷达站使用独立的 TrackExtractor，按整秒推进
+- 分段：同一批号相邻关键点间隔超过 100 秒即切分，每段去掉首 2 个和末 1 个点，
+  点数不足 min_track_points 的航迹段丢弃
+- 匹配：原始点在 ceil(t) 时刻被消费，插值点在不早于 ceil(t) 的第一个活动时刻被消费
+
+关键点总是落在检测时刻之前的一个时间窗口内，因此可以计算一个水位线：
+早于水位线的时刻不会再出现新的点，这些时刻的匹配结果即为最终结果。
+"""
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from app.algorithms.multi_source.preprocessing.track_extractor import TrackExtractor, TrackPoint
+from app.algorithms.multi_source.preprocessing.track_interpolator import (
+    TrackInterpolator,
+    save_segment_summaries,
+)
+from app.algorithms.multi_source.preprocessing.track_matcher import (
+    _build_match_arrays,
+    _groups_from_indices,
+    _match_active_seconds,
+    save_matched_groups,
+)
+from app.models.error_analysis import TrackInterpolatedPoint
+from app.models.flight_track import FlightTrackRaw
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 关键航迹段切分间隔（秒），与 extract_key_tracks 一致
+SEGMENT_GAP_SECONDS = 100
+
+# 每页从数据库读取的原始记录数
+STREAM_PAGE_SIZE = 5000
+
+
+def _point_order(point: Dict) -> Tuple:
+    """点数据排序键：时间、雷达站、批号"""
+    return point['time_seconds'], point['station_id'], point['track_id']
+
+
+class _StationState:
+    """单个雷达站的提取状态"""
+
+    def __init__(self, extractor: TrackExtractor):
+        self.extractor = extractor
+        self.pending_second: Optional[int] = None
+        self.pending_points: List[TrackPoint] = []
+        # 批号 -> 尚未确定顺序的关键点
+        self.unsettled: Dict[str, List[Tuple]] = defaultdict(list)
+        self.last_prune: Optional[int] = None
+
+
+class _OpenSegment:
+    """正在累积的关键航迹段"""
+
+    def __init__(self, station_id: int, track_id: str):
+        self.station_id = station_id
+        self.track_id = track_id
+        self.count = 0                          # 已确定的关键点数
+        self.last_time: Optional[float] = None  # 最近一个关键点时间（用于切分）
+        self.head: List[Tuple] = []             # 确认保留前暂存的关键点
+        self.held: Optional[Tuple] = None       # 确认后暂存的最后一个关键点（航迹段结束时丢弃）
+        self.prev_emitted: Optional[Dict] = None
+        self.segment_index: Optional[int] = None
+        self.station_segment_index: Optional[int] = None
+        self.start_seconds: Optional[float] = None
+        self.end_seconds: Optional[float] = None
+        self.kept_count = 0
+
+    @property
+    def confirmed(self) -> bool:
+        return self.segment_index is not None
+
+
+class StreamingTrackProcessor:
+    """
+    流式航迹处理器
+
+    按时间顺序接收原始航迹点（add_point），调用 advance() 时输出
+    水位线之前已确定的匹配组。不访问数据库，新产生的原始点和插值点
+    通过 on_points 回调交给调用方保存（回调可以为点填写 'id'）。
+    """
+
+    def __init__(
+        self,
+        config: MrraConfig,
+        station_bounds: Dict[int, Tuple[np.ndarray, np.ndarray]],
+        on_points: Optional[Callable[[List[Dict]], None]] = None
+    ):
+        """
+        初始化流式处理器
+
+        Args:
+            config: MRRA 配置
+            station_bounds: 雷达站ID -> (最小坐标 [经度, 纬度], 最大坐标 [经度, 纬度])
+            on_points: 新点回调，参数为插值器格式的点字典列表
+        """
+        self.config = config
+        self.on_points = on_points
+        self.interpolator = TrackInterpolator(config)
+
+        self.stations: Dict[int, _StationState] = {
+            station_id: _StationState(TrackExtractor(config, min_coord, max_coord))
+            for station_id, (min_coord, max_coord) in station_bounds.items()
+        }
+        self.open_segments: Dict[Tuple[int, str], _OpenSegment] = {}
+        self.segments: List[Dict] = []
+
+        self.current_time = -math.inf
+        self.point_count = 0
+        self._segment_counter = 0
+        self._station_segment_counter: Dict[int, int] = defaultdict(int)
+
+        self._new_points: List[Dict] = []
+        self._originals: List[Dict] = []
+        self._interpolated: List[Dict] = []
+
+    def add_point(self, point: TrackPoint) -> None:
+        """
+        添加一个原始航迹点（所有雷达站的点需按时间顺序添加）
+
+        Args:
+            point: 航迹点
+        """
+        state = self.stations.get(point.station_id)
+        if state is None:
+            return
+
+        second = math.ceil(point.time_seconds)
+        if state.pending_second is not None and second > state.pending_second:
+            self._flush_station(state)
+
+        state.pending_second = second
+        state.pending_points.append(point)
+        self.current_time = max(self.current_time, point.time_seconds)
+
+    def advance(self, final: bool = False) -> List[List[Dict]]:
+        """
+        推进水位线并输出已确定的匹配组
+
+        Args:
+            final: 数据是否已全部添加（为 True 时结束所有航迹段并输出剩余匹配组）
+
+        Returns:
+            本次新确定的匹配组列表
+        """
+        if self.current_time == -math.inf:
+            return []
+
+        watermark = math.inf
+
+        for station_id, state in self.stations.items():
+            if final:
+                if state.pending_points:
+                    self._flush_station(state)
+                settle_before = math.inf
+            else:
+                # 之后的检测时刻不早于 next_second，关键点时间不早于 next_second - time_window
+                next_second = state.pending_second if state.pending_points else math.ceil(self.current_time)
+                settle_before = next_second - self.config.time_window
+                watermark = min(watermark, settle_before)
+
+            self._settle(station_id, state, settle_before)
+
+        if final:
+            for segment in list(self.open_segments.values()):
+                self._close_segment(segment)
+        else:
+            for segment in self.open_segments.values():
+                if segment.confirmed:
+                    watermark = min(watermark, segment.prev_emitted['time_seconds'])
+                elif len(segment.head) > 2:
+                    watermark = min(watermark, segment.head[2][2])
+
+        cutoff = math.inf if final else math.ceil(watermark)
+        return self._match_before(cutoff)
+
+    def _flush_station(self, state: _StationState) -> None:
+        """将雷达站当前整秒的点送入提取器"""
+        current_time = state.pending_second
+        extractor = state.extractor
+        extractor.add_points(current_time, state.pending_points)
+        state.pending_points = []
+
+        for key_point in extractor.key_points:
+            state.unsettled[key_point[1]].append(key_point)
+        extractor.key_points = []
+
+        # 新关键点时间不早于 current_time - time_window，更早的去重标记不再需要
+        window = self.config.time_window
+        if state.last_prune is None or current_time - state.last_prune >= window:
+            cutoff = current_time - window
+            extractor.processed_flags = {
+                key for key in extractor.processed_flags if key[2] >= cutoff
+            }
+            state.last_prune = current_time
+
+    def _settle(self, station_id: int, state: _StationState, settle_before: float) -> None:
+        """按时间顺序处理早于 settle_before 的关键点"""
+        for track_id in list(state.unsettled):
+            points = state.unsettled[track_id]
+            ready = sorted((p for p in points if p[2] < settle_before), key=lambda p: p[2])
+            if not ready:
+                continue
+
+            remaining = [p for p in points if p[2] >= settle_before]
+            if remaining:
+                state.unsettled[track_id] = remaining
+            else:
+                del state.unsettled[track_id]
+
+            for key_point in ready:
+                self._accept_key_point(station_id, track_id, key_point)
+
+    def _accept_key_point(self, station_id: int, track_id: str, key_point: Tuple) -> None:
+        """将一个已确定顺序的关键点加入所属航迹段"""
+        key = (station_id, track_id)
+        segment = self.open_segments.get(key)
+
+        if segment is not None and key_point[2] - segment.last_time > SEGMENT_GAP_SECONDS:
+            self._close_segment(segment)
+            segment = None
+
+        if segment is None:
+            segment = _OpenSegment(station_id, track_id)
+            self.open_segments[key] = segment
+
+        segment.count += 1
+        segment.last_time = key_point[2]
+
+        if segment.confirmed:
+            self._emit(segment, segment.held)
+            segment.held = key_point
+            return
+
+        segment.head.append(key_point)
+
+        # 航迹段最终保留第 2 ~ n-2 个点，点数达到 min_track_points 后即可确认保留
+        if segment.count - 3 >= self.config.min_track_points:
+            self._segment_counter += 1
+            self._station_segment_counter[station_id] += 1
+            segment.segment_index = self._segment_counter
+            segment.station_segment_index = self._station_segment_counter[station_id]
+
+            for point in segment.head[2:-1]:
+                self._emit(segment, point)
+            segment.held = segment.head[-1]
+            segment.head = []
+
+    def _close_segment(self, segment: _OpenSegment) -> None:
+        """结束航迹段（丢弃暂存的最后一个点），记录航迹段摘要"""
+        del self.open_segments[(segment.station_id, segment.track_id)]
+        if not segment.confirmed:
+            return
+
+        self.segments.append({
+            'station_id': segment.station_id,
+            'segment_id': segment.station_segment_index,
+            'track_id': segment.track_id,
+            'start_seconds': segment.start_seconds,
+            'end_seconds': segment.end_seconds,
+            'point_count': segment.kept_count,
+        })
+
+    def _emit(self, segment: _OpenSegment, key_point: Tuple) -> None:
+        """输出一个保留的关键点及其与上一个点之间的插值点"""
+        current = {
+            'station_id': segment.station_id,
+            'track_id': segment.track_id,
+            'time_seconds': key_point[2],
+            'lon': key_point[3],
+            'lat': key_point[4],
+            'alt': key_point[5]
+        }
+        original = {
+            'station_id': segment.station_id,
+            'track_id': segment.track_id,
+            'time_seconds': key_point[2],
+            'longitude': key_point[3],
+            'latitude': key_point[4],
+            'altitude': key_point[5],
+            'segment_index': segment.segment_index,
+            'is_original': 1
+        }
+        self._new_points.append(original)
+
+        if segment.prev_emitted is None:
+            # 航迹段第一个点同时作为插值序列的起点
+            self._new_points.append({**original, 'is_original': 0})
+            segment.start_seconds = key_point[2]
+        else:
+            self._new_points.extend(self.interpolator.interpolate_between(
+                segment.prev_emitted, current, segment.segment_index
+            ))
+
+        segment.prev_emitted = current
+        segment.end_seconds = key_point[2]
+        segment.kept_count += 1
+
+    def _match_before(self, cutoff: float) -> List[List[Dict]]:
+        """匹配所有所属时刻早于 cutoff 的原始点"""
+        if self._new_points:
+            if self.on_points:
+                self.on_points(self._new_points)
+            self.point_count += len(self._new_points)
+
+            for point in self._new_points:
+                match_point = {
+                    'id': point.get('id'),
+                    'station_id': point['station_id'],
+                    'track_id': point['track_id'],
+                    'time_seconds': point['time_seconds'],
+                    'longitude': point['longitude'],
+                    'latitude': point['latitude'],
+                    'altitude': point['altitude'] or 0.0,
+                    'segment_id': point['segment_index']
+                }
+                if point['is_original'] == 1:
+                    self._originals.append(match_point)
+                else:
+                    self._interpolated.append(match_point)
+
+            self._new_points = []
+            self._originals.sort(key=_point_order)
+            self._interpolated.sort(key=_point_order)
+
+        ready_count = 0
+        while ready_count < len(self._originals) and math.ceil(self._originals[ready_count]['time_seconds']) < cutoff:
+            ready_count += 1
+
+        if ready_count == 0:
+            return []
+
+        ready = self._originals[:ready_count]
+        self._originals = self._originals[ready_count:]
+
+        if not self._interpolated:
+            return []
+
+        # 时间范围取就绪原始点自身的范围，使窗口边界不影响原始点的所属时刻
+        time_range = (
+            int(ready[0]['time_seconds']),
+            math.ceil(ready[-1]['time_seconds'])
+        )
+        arrays = _build_match_arrays(ready, self._interpolated, time_range)
+        index_groups = _match_active_seconds(
+            arrays, self.config.match_distance_threshold, 0, len(arrays['active_seconds'])
+        )
+        matched_groups = _groups_from_indices(index_groups, ready, self._interpolated)
+
+        # 已分配到活动时刻的插值点被消费，其余留到下一个窗口
+        consumed = int(arrays['b_bounds'][-1])
+        self._interpolated = self._interpolated[consumed:]
+
+        return matched_groups
+
+
+def load_station_bounds(
+    db: Session,
+    track_ids: List[str],
+    radar_station_ids: List[int]
+) -> Tuple[Dict[int, Tuple[np.ndarray, np.ndarray]], Optional[datetime], Optional[datetime]]:
+    """
+    通过聚合查询获取各雷达站的坐标范围和整体时间范围
+
+    Args:
+        db: 数据库会话
+        track_ids: 航迹批号列表
+        radar_station_ids: 雷达站ID列表
+
+    Returns:
+        (雷达站ID -> (最小坐标, 最大坐标), 最早时间, 最晚时间)
+    """
+    rows = db.query(
+        FlightTrackRaw.radar_station_id,
+        func.min(FlightTrackRaw.longitude),
+        func.min(FlightTrackRaw.latitude),
+        func.max(FlightTrackRaw.longitude),
+        func.max(FlightTrackRaw.latitude),
+        func.min(FlightTrackRaw.timestamp),
+        func.max(FlightTrackRaw.timestamp),
+    ).filter(
+        FlightTrackRaw.batch_id.in_(track_ids),
+        FlightTrackRaw.radar_station_id.in_(radar_station_ids)
+    ).group_by(FlightTrackRaw.radar_station_id).all()
+
+    bounds = {
+        station_id: (np.array([min_lon, min_lat]), np.array([max_lon, max_lat]))
+        for station_id, min_lon, min_lat, max_lon, max_lat, _, _ in rows
+    }
+    first_time = min((row[5] for row in rows), default=None)
+    last_time = max((row[6] for row in rows), default=None)
+
+    return bounds, first_time, last_time
+
+
+def iter_raw_track_pages(
+    db: Session,
+    track_ids: List[str],
+    radar_station_ids: List[int],
+    page_size: int = STREAM_PAGE_SIZE
+) -> Iterator[List]:
+    """
+    按 (时间, ID) 顺序分页读取原始航迹记录（键集分页，只查询需要的列）
+
+    Args:
+        db: 数据库会话
+        track_ids: 航迹批号列表
+        radar_station_ids: 雷达站ID列表
+        page_size: 每页记录数
+
+    Yields:
+        每页的记录列表
+    """
+    last_key = None
+
+    while True:
+        query = db.query(
+            FlightTrackRaw.id,
+            FlightTrackRaw.radar_station_id,
+            FlightTrackRaw.batch_id,
+            FlightTrackRaw.timestamp,
+            FlightTrackRaw.longitude,
+            FlightTrackRaw.latitude,
+            FlightTrackRaw.altitude,
+        ).filter(
+            FlightTrackRaw.batch_id.in_(track_ids),
+            FlightTrackRaw.radar_station_id.in_(radar_station_ids)
+        )
+
+        if last_key is not None:
+            last_timestamp, last_id = last_key
+            query = query.filter(or_(
+                FlightTrackRaw.timestamp > last_timestamp,
+                and_(FlightTrackRaw.timestamp == last_timestamp, FlightTrackRaw.id > last_id)
+            ))
+
+        rows = query.order_by(FlightTrackRaw.timestamp, FlightTrackRaw.id).limit(page_size).all()
+        if not rows:
+            return
+
+        yield rows
+
+        if len(rows) < page_size:
+            return
+        last_key = (rows[-1].timestamp, rows[-1].id)
+
+
+def save_stream_points(
+    db: Session,
+    task_id: str,
+    points: List[Dict],
+    reference_time: datetime
+) -> None:
+    """
+    保存一个窗口内新产生的原始点和插值点，并将数据库ID写回点字典
+
+    Args:
+        db: 数据库会话
+        task_id: 任务ID
+        points: 插值器格式的点字典列表
+        reference_time: 参考时间
+    """
+    records = [
+        TrackInterpolatedPoint(
+            task_id=task_id,
+            segment_id=point['segment_index'],
+            station_id=point['station_id'],
+            track_id=point['track_id'],
+            time_seconds=point['time_seconds'],
+            timestamp=reference_time + timedelta(seconds=point['time_seconds']),
+            longitude=point['longitude'],
+            latitude=point['latitude'],
+            altitude=point['altitude'],
+            is_original=point['is_original']
+        )
+        for point in points
+    ]
+    db.add_all(records)
+    db.flush()
+
+    for point, record in zip(points, records):
+        point['id'] = record.id
+
+    db.commit()
+
+
+def run_streaming_preprocessing(
+    db: Session,
+    task_id: str,
+    radar_station_ids: List[int],
+    track_ids: List[str],
+    config: MrraConfig,
+    on_progress: Optional[Callable[[float], None]] = None
+) -> Tuple[datetime, List[Dict], int]:
+    """
+    流式执行提取、插值、匹配，并保存航迹段、插值点和匹配组
+
+    参考时间取第一条记录的时间（截断到整秒），避免跨天数据的秒数无限增长。
+    每个窗口确定的匹配组立即写入数据库，内存中只保留匹配组计数。
+
+    Args:
+        db: 数据库会话
+        task_id: 任务ID
+        radar_station_ids: 雷达站ID列表
+        track_ids: 航迹批号列表
+        config: MRRA 配置
+        on_progress: 进度回调，参数为已处理数据的时间比例（0-1）
+
+    Returns:
+        (参考时间, 航迹段摘要列表, 匹配组数量)
+
+    Raises:
+        ValueError: 没有找到有效的航迹数据
+    """
+    station_bounds, first_time, last_time = load_station_bounds(db, track_ids, radar_station_ids)
+    if not station_bounds:
+        raise ValueError("没有找到有效的航迹数据")
+
+    reference_time = first_time.replace(microsecond=0)
+    total_seconds = max((last_time - reference_time).total_seconds(), 1.0)
+
+    processor = StreamingTrackProcessor(
+        config,
+        station_bounds,
+        on_points=lambda points: save_stream_points(db, task_id, points, reference_time)
+    )
+
+    group_count = 0
+    row_count = 0
+
+    def save_groups(groups: List[List[Dict]]) -> None:
+        nonlocal group_count
+        if groups:
+            save_matched_groups(db, task_id, groups, reference_time, first_group_id=group_count + 1)
+            group_count += len(groups)
+
+    for rows in iter_raw_track_pages(db, track_ids, list(station_bounds)):
+        for row in rows:
+            processor.add_point(TrackPoint(
+                station_id=row.radar_station_id,
+                track_id=row.batch_id,
+                time_seconds=(row.timestamp - reference_time).total_seconds(),
+                longitude=row.longitude,
+                latitude=row.latitude,
+                altitude=row.altitude or 0.0,
+                raw_track_id=row.id
+            ))
+        row_count += len(rows)
+
+        save_groups(processor.advance())
+
+        if on_progress:
+            on_progress(min(processor.current_time / total_seconds, 1.0))
+
+    save_groups(processor.advance(final=True))
+
+    save_segment_summaries(db, task_id, processor.segments, reference_time)
+
+    logger.info(
+        f"[{task_id}] 流式预处理完成: {row_count} 条原始记录, {len(processor.segments)} 个航迹段, "
+        f"{processor.point_count} 个点, {group_count} 个匹配组"
+    )
+
+    return reference_time, processor.segments, group_count
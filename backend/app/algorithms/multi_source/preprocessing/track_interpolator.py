@@ -6,10 +6,12 @@
 import numpy as np
 from typing import List, Tuple, Dict, Optional
 from datetime import datetime, timedelta
+from sqlalchemy import insert, literal, select
 from sqlalchemy.orm import Session
 
 from app.models.error_analysis import TrackInterpolatedPoint, TrackSegment
 from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from core.database import bulk_insert
 from core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -101,37 +103,60 @@ class TrackInterpolator:
                 'lat': current_point[4],
                 'alt': current_point[5]
             }
+            interpolated_points.extend(
+                self.interpolate_between(prev_point, current, segment_index)
+            )
+            prev_point = current
 
-            # 计算速度向量 (经度/秒, 纬度/秒, 高度/秒)
-            time_diff = current['time_seconds'] - prev_point['time_seconds']
-            if time_diff > 0:
-                velocity = (
-                    (current['lon'] - prev_point['lon']) / time_diff,
-                    (current['lat'] - prev_point['lat']) / time_diff,
-                    (current['alt'] - prev_point['alt']) / time_diff
-                )
+        return original_points, interpolated_points
 
-                # 在每个整数时间点插值
-                for t in np.arange(prev_point['time_seconds'] + 1, current['time_seconds'] + 0.1, 1.0):
-                    interpolated_position = (
-                        prev_point['lon'] + velocity[0] * (t - prev_point['time_seconds']),
-                        prev_point['lat'] + velocity[1] * (t - prev_point['time_seconds']),
-                        prev_point['alt'] + velocity[2] * (t - prev_point['time_seconds'])
-                    )
-                    interpolated_points.append({
-                        'station_id': station_id,
-                        'track_id': track_id,
-                        'time_seconds': float(t),
-                        'longitude': interpolated_position[0],
-                        'latitude': interpolated_position[1],
-                        'altitude': interpolated_position[2],
-                        'segment_index': segment_index,
-                        'is_original': 0
-                    })
+    def interpolate_between(
+        self,
+        prev_point: Dict,
+        current: Dict,
+        segment_index: int
+    ) -> List[Dict]:
+        """
+        在相邻两个航迹点之间按整秒线性插值
 
-            prev_point = current
+        Args:
+            prev_point: 前一个点 {station_id, track_id, time_seconds, lon, lat, alt}
+            current: 当前点，格式同上
+            segment_index: 航迹段索引
 
-        return original_points, interpolated_points
+        Returns:
+            插值点字典列表（不含前一个点，包含不超过当前点时间的整秒时刻）
+        """
+        interpolated_points = []
+
+        # 计算速度向量 (经度/秒, 纬度/秒, 高度/秒)
+        time_diff = current['time_seconds'] - prev_point['time_seconds']
+        if time_diff > 0:
+            velocity = (
+                (current['lon'] - prev_point['lon']) / time_diff,
+                (current['lat'] - prev_point['lat']) / time_diff,
+                (current['alt'] - prev_point['alt']) / time_diff
+            )
+
+            # 在每个整数时间点插值
+            for t in np.arange(prev_point['time_seconds'] + 1, current['time_seconds'] + 0.1, 1.0):
+                interpolated_position = (
+                    prev_point['lon'] + velocity[0] * (t - prev_point['time_seconds']),
+                    prev_point['lat'] + velocity[1] * (t - prev_point['time_seconds']),
+                    prev_point['alt'] + velocity[2] * (t - prev_point['time_seconds'])
+                )
+                interpolated_points.append({
+                    'station_id': current['station_id'],
+                    'track_id': current['track_id'],
+                    'time_seconds': float(t),
+                    'longitude': interpolated_position[0],
+                    'latitude': interpolated_position[1],
+                    'altitude': interpolated_position[2],
+                    'segment_index': segment_index,
+                    'is_original': 0
+                })
+
+        return interpolated_points
 
     def save_to_database(
         self,
@@ -156,45 +181,25 @@ class TrackInterpolator:
         """
         logger.info(f"保存 {len(original_points)} 个原始点和 {len(interpolated_points)} 个插值点到数据库")
 
-        total_saved = 0
-
-        # 保存原始点
-        for point in original_points:
-            timestamp = reference_time + timedelta(seconds=point['time_seconds'])
-            db_point = TrackInterpolatedPoint(
-                task_id=task_id,
-                segment_id=point['segment_index'],
-                station_id=point['station_id'],
-                track_id=point['track_id'],
-                time_seconds=point['time_seconds'],
-                timestamp=timestamp,
-                longitude=point['longitude'],
-                latitude=point['latitude'],
-                altitude=point['altitude'],
-                is_original=1
-            )
-            db.add(db_point)
-            total_saved += 1
-
-        # 保存插值点
-        for point in interpolated_points:
-            timestamp = reference_time + timedelta(seconds=point['time_seconds'])
-            db_point = TrackInterpolatedPoint(
-                task_id=task_id,
-                segment_id=point['segment_index'],
-                station_id=point['station_id'],
-                track_id=point['track_id'],
-                time_seconds=point['time_seconds'],
-                timestamp=timestamp,
-                longitude=point['longitude'],
-                latitude=point['latitude'],
-                altitude=point['altitude'],
-                is_original=0
-            )
-            db.add(db_point)
-            total_saved += 1
+        def to_row(point: Dict, is_original: int) -> Dict:
+            return {
+                'task_id': task_id,
+                'segment_id': point['segment_index'],
+                'station_id': point['station_id'],
+                'track_id': point['track_id'],
+                'time_seconds': point['time_seconds'],
+                'timestamp': reference_time + timedelta(seconds=point['time_seconds']),
+                'longitude': point['longitude'],
+                'latitude': point['latitude'],
+                'altitude': point['altitude'],
+                'is_original': is_original
+            }
+
+        # 原始点在前、插值点在后，按批插入
+        rows = [to_row(point, 1) for point in original_points]
+        rows.extend(to_row(point, 0) for point in interpolated_points)
+        total_saved = bulk_insert(db, TrackInterpolatedPoint, rows)
 
-        db.commit()
         logger.info(f"成功保存 {total_saved} 个点到数据库")
 
         return total_saved
@@ -218,34 +223,79 @@ class TrackInterpolator:
         Returns:
             保存的航迹段数量
         """
-        logger.info("保存航迹段信息到数据库")
-
-        segment_count = 0
-
-        for station_id, track_segments in key_tracks.items():
-            for segment_index, (track_id, segment_points) in enumerate(track_segments, start=1):
-                if not segment_points:
-                    continue
-
-                start_time = reference_time + timedelta(seconds=segment_points[0][2])
-                end_time = reference_time + timedelta(seconds=segment_points[-1][2])
-
-                segment = TrackSegment(
-                    task_id=task_id,
-                    segment_id=segment_index,
-                    station_id=station_id,
-                    track_id=track_id,
-                    start_time=start_time,
-                    end_time=end_time,
-                    point_count=len(segment_points)
-                )
-                db.add(segment)
-                segment_count += 1
+        return save_segment_summaries(
+            db, task_id, summarize_track_segments(key_tracks), reference_time
+        )
+
+
+def summarize_track_segments(
+    key_tracks: Dict[int, List[Tuple[str, List[Tuple]]]]
+) -> List[Dict]:
+    """
+    生成航迹段摘要（航迹段ID在每个雷达站内从1开始编号）
+
+    Args:
+        key_tracks: 关键航迹字典
+
+    Returns:
+        航迹段摘要列表，每项包含 station_id、segment_id、track_id、
+        start_seconds、end_seconds、point_count
+    """
+    segments = []
 
-        db.commit()
-        logger.info(f"成功保存 {segment_count} 个航迹段")
+    for station_id, track_segments in key_tracks.items():
+        for segment_index, (track_id, segment_points) in enumerate(track_segments, start=1):
+            if not segment_points:
+                continue
+
+            segments.append({
+                'station_id': station_id,
+                'segment_id': segment_index,
+                'track_id': track_id,
+                'start_seconds': segment_points[0][2],
+                'end_seconds': segment_points[-1][2],
+                'point_count': len(segment_points),
+            })
+
+    return segments
+
+
+def save_segment_summaries(
+    db: Session,
+    task_id: str,
+    segments: List[Dict],
+    reference_time: datetime
+) -> int:
+    """
+    保存航迹段摘要到数据库
+
+    Args:
+        db: 数据库会话
+        task_id: 任务ID
+        segments: 航迹段摘要列表
+        reference_time: 参考时间
+
+    Returns:
+        保存的航迹段数量
+    """
+    logger.info("保存航迹段信息到数据库")
+
+    rows = [
+        {
+            'task_id': task_id,
+            'segment_id': summary['segment_id'],
+            'station_id': summary['station_id'],
+            'track_id': summary['track_id'],
+            'start_time': reference_time + timedelta(seconds=summary['start_seconds']),
+            'end_time': reference_time + timedelta(seconds=summary['end_seconds']),
+            'point_count': summary['point_count']
+        }
+        for summary in segments
+    ]
+    bulk_insert(db, TrackSegment, rows)
+    logger.info(f"成功保存 {len(segments)} 个航迹段")
 
-        return segment_count
+    return len(segments)
 
 
 def interpolate_and_save_tracks(
@@ -303,3 +353,43 @@ def interpolate_and_save_tracks(
     logger.info(f"航迹插值完成: 共 {segment_index - 1} 个航迹段, {total_points} 个点")
 
     return total_points
+
+
+def copy_interpolated_points(db: Session, source_task_id: str, task_id: str) -> Dict[int, int]:
+    """
+    将源任务的插值点复制到指定任务（INSERT ... SELECT，点数据不经过 Python）
+
+    按源任务点ID顺序插入，新点ID随插入顺序递增，两侧按ID排序一一对应。
+
+    Args:
+        db: 数据库会话
+        source_task_id: 插值点所属的源任务ID
+        task_id: 目标任务ID
+
+    Returns:
+        源点ID -> 新点ID；源任务的插值点已被删除时为空字典
+    """
+    columns = [
+        column.name for column in TrackInterpolatedPoint.__table__.columns
+        if column.name not in ("id", "task_id")
+    ]
+    source_points = select(
+        literal(task_id).label("task_id"),
+        *(TrackInterpolatedPoint.__table__.c[name] for name in columns),
+    ).where(
+        TrackInterpolatedPoint.task_id == source_task_id
+    ).order_by(TrackInterpolatedPoint.id)
+
+    db.execute(insert(TrackInterpolatedPoint).from_select(["task_id", *columns], source_points))
+    db.commit()
+
+    def point_ids(owner: str) -> List[int]:
+        return db.scalars(
+            select(TrackInterpolatedPoint.id).where(
+                TrackInterpolatedPoint.task_id == owner
+            ).order_by(TrackInterpolatedPoint.id)
+        ).all()
+
+    mapping = dict(zip(point_ids(source_task_id), point_ids(task_id)))
+    logger.info(f"从任务 {source_task_id} 复制 {len(mapping)} 个插值点到任务 {task_id}")
+    return mapping
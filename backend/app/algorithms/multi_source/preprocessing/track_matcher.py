@@ -3,13 +3,25 @@
 
 负责匹配不同雷达的航迹点
 """
-from datetime import datetime
+import base64
+from datetime import datetime, timedelta
 import numpy as np
-from typing import List, Tuple, Set, Dict, Optional
+from typing import List, Tuple, Set, Dict, Optional, Union
 from sqlalchemy.orm import Session
 
 from app.models.error_analysis import TrackInterpolatedPoint, MatchGroup
 from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from app.algorithms.parallel import (
+    SharedArrays,
+    SharedArraySpec,
+    attach_shared_arrays,
+    create_process_pool,
+    map_in_order,
+    resolve_worker_count,
+    split_into_chunks,
+)
+from core.config import MATCH_POINTS_ENCODING
+from core.database import bulk_insert
 from core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -154,6 +166,221 @@ def load_interpolated_points(
     return original_points, interpolated_points
 
 
+# 低于该插值点数时串行匹配（进程池启动开销大于收益）
+PARALLEL_MATCH_MIN_POINTS = 50000
+
+
+def _build_match_arrays(
+    original_points: List[Dict],
+    interpolated_points: List[Dict],
+    time_range: Optional[Tuple[int, int]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    将点数据转换为按匹配时刻分桶的数组
+
+    逐秒匹配中，原始点在第一个满足 time_seconds <= t 的时刻被消费；
+    插值点只在存在原始点的时刻（活动时刻）被消费。因此每个点所属的
+    匹配时刻可以预先计算，各时刻之间互不依赖，可以任意切分并行处理。
+
+    Args:
+        original_points: 原始点列表（按时间排序）
+        interpolated_points: 插值点列表（按时间排序）
+        time_range: 匹配时间范围 [min_time, max_time]（两端均包含），默认取插值点的时间范围
+
+    Returns:
+        数组字典：坐标、雷达站、航迹键编码以及每个活动时刻的点索引边界
+    """
+    # (雷达站, 航迹批号) 编码为整数，用于快速判重
+    key_codes: Dict[Tuple[int, str], int] = {}
+
+    def encode(points: List[Dict]) -> np.ndarray:
+        return np.array(
+            [key_codes.setdefault((p['station_id'], p['track_id']), len(key_codes)) for p in points],
+            dtype=np.int64
+        )
+
+    a_key = encode(original_points)
+    b_key = encode(interpolated_points)
+
+    a_time = np.array([p['time_seconds'] for p in original_points], dtype=np.float64)
+    b_time = np.array([p['time_seconds'] for p in interpolated_points], dtype=np.float64)
+
+    if time_range is None:
+        min_time = int(interpolated_points[0]['time_seconds'])
+        max_time = int(interpolated_points[-1]['time_seconds']) + 1
+    else:
+        min_time, max_time = time_range
+
+    # 原始点所属时刻：max(min_time, ceil(t))，所属时刻晚于 max_time 的点不参与匹配
+    a_second = np.maximum(np.ceil(a_time), min_time)
+    a_count = int(np.searchsorted(a_second, max_time, side='right'))
+    a_second = a_second[:a_count]
+
+    active_seconds = np.unique(a_second)
+    a_bounds = np.append(np.searchsorted(a_second, active_seconds, side='left'), a_count)
+
+    # 插值点所属时刻：不早于 ceil(t) 的第一个活动时刻
+    b_second = np.maximum(np.ceil(b_time), min_time)
+    b_bucket = np.searchsorted(active_seconds, b_second, side='left')
+    b_bounds = np.searchsorted(b_bucket, np.arange(len(active_seconds) + 1), side='left')
+
+    return {
+        'a_lon': np.array([p['longitude'] for p in original_points], dtype=np.float64),
+        'a_lat': np.array([p['latitude'] for p in original_points], dtype=np.float64),
+        'a_station': np.array([p['station_id'] for p in original_points], dtype=np.int64),
+        'a_key': a_key,
+        'b_lon': np.array([p['longitude'] for p in interpolated_points], dtype=np.float64),
+        'b_lat': np.array([p['latitude'] for p in interpolated_points], dtype=np.float64),
+        'b_station': np.array([p['station_id'] for p in interpolated_points], dtype=np.int64),
+        'b_key': b_key,
+        'a_bounds': a_bounds.astype(np.int64),
+        'b_bounds': b_bounds.astype(np.int64),
+        'active_seconds': active_seconds.astype(np.int64),
+    }
+
+
+def _match_active_seconds(
+    arrays: Dict[str, np.ndarray],
+    threshold: float,
+    start: int,
+    end: int
+) -> List[np.ndarray]:
+    """
+    对活动时刻区间 [start, end) 逐时刻执行贪心匹配
+
+    匹配规则与 TrackMatcher.match_points 一致：按顺序遍历原始点，在插值点中
+    寻找距离小于阈值、来自不同雷达且航迹未被处理的点。
+
+    Args:
+        arrays: _build_match_arrays 生成的数组
+        threshold: 匹配距离阈值（度）
+        start: 起始活动时刻索引
+        end: 结束活动时刻索引
+
+    Returns:
+        匹配组列表，每组为索引数组：原始点记为 i，插值点记为 -(j + 1)
+    """
+    a_lon, a_lat = arrays['a_lon'], arrays['a_lat']
+    a_station, a_key = arrays['a_station'], arrays['a_key']
+    b_lon, b_lat = arrays['b_lon'], arrays['b_lat']
+    b_station, b_key = arrays['b_station'], arrays['b_key']
+    a_bounds, b_bounds = arrays['a_bounds'], arrays['b_bounds']
+
+    groups: List[np.ndarray] = []
+
+    for k in range(start, end):
+        a0, a1 = int(a_bounds[k]), int(a_bounds[k + 1])
+        b0, b1 = int(b_bounds[k]), int(b_bounds[k + 1])
+        if a1 <= a0 or b1 <= b0:
+            continue
+
+        bucket_lon = b_lon[b0:b1]
+        bucket_lat = b_lat[b0:b1]
+        processed_keys: Set[int] = set()
+
+        for i in range(a0, a1):
+            key_a = int(a_key[i])
+            if key_a in processed_keys:
+                continue
+            processed_keys.add(key_a)
+
+            distances = np.sqrt((bucket_lon - a_lon[i]) ** 2 + (bucket_lat - a_lat[i]) ** 2)
+            candidates = np.flatnonzero(distances < threshold)
+            if len(candidates) == 0:
+                continue
+
+            members = [i]
+            group_stations = {int(a_station[i])}
+
+            for offset in candidates:
+                j = b0 + int(offset)
+                key_b = int(b_key[j])
+                station_b = int(b_station[j])
+                if key_b in processed_keys or station_b in group_stations:
+                    continue
+                members.append(-(j + 1))
+                group_stations.add(station_b)
+                processed_keys.add(key_b)
+
+            if len(members) > 1:
+                groups.append(np.array(members, dtype=np.int64))
+
+    return groups
+
+
+def _match_chunk_worker(spec: SharedArraySpec, threshold: float, start: int, end: int) -> List[np.ndarray]:
+    """进程池任务：挂载共享内存数组并匹配一个时间片"""
+    arrays = attach_shared_arrays(spec)
+    return _match_active_seconds(arrays, threshold, start, end)
+
+
+def match_points_by_time(
+    original_points: List[Dict],
+    interpolated_points: List[Dict],
+    config: MrraConfig
+) -> List[List[Dict]]:
+    """
+    按时间逐秒匹配原始点与插值点
+
+    数据量较大时将时间轴切分为多个时间片，通过共享内存分发到进程池并行匹配，
+    结果按时间片顺序合并，与串行匹配结果完全一致。
+
+    Args:
+        original_points: 原始点列表（按时间排序）
+        interpolated_points: 插值点列表（按时间排序）
+        config: MRRA 配置
+
+    Returns:
+        匹配组列表，每个匹配组包含多个匹配点
+    """
+    if not original_points or not interpolated_points:
+        return []
+
+    arrays = _build_match_arrays(original_points, interpolated_points)
+    active_count = len(arrays['active_seconds'])
+    threshold = config.match_distance_threshold
+
+    workers = 1
+    if len(interpolated_points) >= PARALLEL_MATCH_MIN_POINTS:
+        workers = resolve_worker_count(config.match_workers, active_count)
+
+    if workers <= 1:
+        index_groups = _match_active_seconds(arrays, threshold, 0, active_count)
+    else:
+        # 以每个时刻的点数作为计算量权重切分时间片
+        weights = np.diff(arrays['a_bounds']) * np.maximum(np.diff(arrays['b_bounds']), 1)
+        chunks = split_into_chunks(weights, workers * 4)
+        logger.info(f"并行匹配: {workers} 个进程, {len(chunks)} 个时间片, {active_count} 个活动时刻")
+
+        with SharedArrays(arrays) as shared, create_process_pool(workers) as executor:
+            chunk_results = map_in_order(
+                executor,
+                _match_chunk_worker,
+                [(shared.spec, threshold, start, end) for start, end in chunks]
+            )
+        index_groups = [group for chunk_groups in chunk_results for group in chunk_groups]
+
+    return _groups_from_indices(index_groups, original_points, interpolated_points)
+
+
+def _groups_from_indices(
+    index_groups: List[np.ndarray],
+    original_points: List[Dict],
+    interpolated_points: List[Dict]
+) -> List[List[Dict]]:
+    """将 _match_active_seconds 输出的索引组还原为点字典组（组内按雷达站、批号排序）"""
+    matched_groups = []
+    for members in index_groups:
+        group = [
+            original_points[idx] if idx >= 0 else interpolated_points[-idx - 1]
+            for idx in members
+        ]
+        group.sort(key=lambda p: (p['station_id'], p['track_id']))
+        matched_groups.append(group)
+
+    return matched_groups
+
+
 def match_tracks_from_database(
     db: Session,
     task_id: str,
@@ -179,129 +406,224 @@ def match_tracks_from_database(
         logger.warning("没有插值点数据，无法进行匹配")
         return []
 
-    # 计算坐标范围
-    coords = np.array([[p['longitude'], p['latitude']] for p in interpolated_points])
-    min_coord = coords.min(axis=0)
-    max_coord = coords.max(axis=0)
+    all_matched_groups = match_points_by_time(original_points, interpolated_points, config)
 
-    # 创建匹配器
-    matcher = TrackMatcher(config, min_coord, max_coord)
+    logger.info(f"航迹匹配完成: 共 {len(all_matched_groups)} 个匹配组")
 
-    # 按时间进行匹配
-    all_matched_groups = []
-    index_a = 0  # 原始点索引
-    index_b = 0  # 插值点索引
+    return all_matched_groups
 
-    # 获取时间范围
-    min_time = int(interpolated_points[0]['time_seconds'])
-    max_time = int(interpolated_points[-1]['time_seconds']) + 1
 
-    for current_time in range(min_time, max_time + 1):
-        # 进度报告
-        if current_time % 3600 == 0:
-            hour = current_time // 3600
-            logger.info(f"匹配分析时刻 {hour:02d}:00:00")
+# 匹配点紧凑编码的字段布局（point_id 缺失时记为 -1）
+PACKED_MATCH_POINT_DTYPE = np.dtype([
+    ('station_id', '<i4'),
+    ('point_id', '<i8'),
+    ('longitude', '<f8'),
+    ('latitude', '<f8'),
+    ('altitude', '<f8'),
+])
+PACKED_MATCH_POINTS_FORMAT = "packed-v1"
 
-        # 收集当前时间的原始点
-        points_a = []
-        while index_a < len(original_points) and original_points[index_a]['time_seconds'] <= current_time:
-            points_a.append(original_points[index_a])
-            index_a += 1
 
-        if not points_a:
-            continue
+def encode_match_points(match_points: List[Dict], encoding: str = "json") -> Union[List[Dict], Dict]:
+    """
+    按存储格式编码匹配点列表
 
-        # 收集当前时间的插值点
-        points_b = []
-        while index_b < len(interpolated_points) and interpolated_points[index_b]['time_seconds'] <= current_time:
-            points_b.append(interpolated_points[index_b])
-            index_b += 1
+    Args:
+        match_points: 匹配点字典列表（station_id, point_id, longitude, latitude, altitude）
+        encoding: json 保持字典列表；packed 编码为 {"format", "data"}，data 为 base64 二进制
 
-        if not points_b:
-            continue
+    Returns:
+        可写入 JSON 列的值
+    """
+    if encoding != "packed":
+        return match_points
+
+    packed = np.empty(len(match_points), dtype=PACKED_MATCH_POINT_DTYPE)
+    for index, point in enumerate(match_points):
+        point_id = point.get('point_id')
+        packed[index] = (
+            point['station_id'],
+            -1 if point_id is None else point_id,
+            point['longitude'],
+            point['latitude'],
+            point.get('altitude') or 0.0,
+        )
 
-        # 进行匹配
-        matched_groups = matcher.match_points(current_time, points_a, points_b)
-        all_matched_groups.extend(matched_groups)
+    return {
+        "format": PACKED_MATCH_POINTS_FORMAT,
+        "data": base64.b64encode(packed.tobytes()).decode("ascii"),
+    }
 
-    # 对每个匹配组排序
-    for group in all_matched_groups:
-        group.sort(key=lambda p: (p['station_id'], p['track_id']))
 
-    logger.info(f"航迹匹配完成: 共 {len(all_matched_groups)} 个匹配组")
+def decode_match_points(value: Union[List[Dict], Dict, None]) -> List[Dict]:
+    """
+    解码 MatchGroup.match_points（兼容 json 与 packed 两种格式）
 
-    return all_matched_groups
+    Args:
+        value: match_points 列的值
+
+    Returns:
+        匹配点字典列表
+    """
+    if not value:
+        return []
+    if isinstance(value, list):
+        return value
+    if value.get("format") != PACKED_MATCH_POINTS_FORMAT:
+        raise ValueError(f"未知的匹配点编码格式: {value.get('format')}")
+
+    packed = np.frombuffer(base64.b64decode(value["data"]), dtype=PACKED_MATCH_POINT_DTYPE)
+    return [
+        {
+            'station_id': int(station_id),
+            'point_id': None if point_id < 0 else int(point_id),
+            'longitude': float(longitude),
+            'latitude': float(latitude),
+            'altitude': float(altitude),
+        }
+        for station_id, point_id, longitude, latitude, altitude in packed.tolist()
+    ]
+
+
+def compute_group_statistics(matched_groups: List[List[Dict]]) -> Dict[str, np.ndarray]:
+    """
+    一次性计算所有匹配组的质量指标（各点到组中心距离的均值、最大值、方差）
+
+    Args:
+        matched_groups: 匹配组列表（不含空组）
+
+    Returns:
+        {'avg_distance', 'max_distance', 'variance'}，每项为长度等于组数的数组
+    """
+    sizes = np.array([len(group) for group in matched_groups], dtype=np.int64)
+    if len(sizes) == 0:
+        empty = np.empty(0, dtype=np.float64)
+        return {'avg_distance': empty, 'max_distance': empty, 'variance': empty}
+
+    longitude = np.array([p['longitude'] for group in matched_groups for p in group], dtype=np.float64)
+    latitude = np.array([p['latitude'] for group in matched_groups for p in group], dtype=np.float64)
+    group_index = np.repeat(np.arange(len(sizes)), sizes)
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+    center_lon = np.bincount(group_index, weights=longitude) / sizes
+    center_lat = np.bincount(group_index, weights=latitude) / sizes
+    distances = np.sqrt(
+        (longitude - center_lon[group_index]) ** 2 + (latitude - center_lat[group_index]) ** 2
+    )
+
+    avg_distance = np.bincount(group_index, weights=distances) / sizes
+    max_distance = np.maximum.reduceat(distances, offsets)
+    variance = np.bincount(group_index, weights=(distances - avg_distance[group_index]) ** 2) / sizes
+
+    return {'avg_distance': avg_distance, 'max_distance': max_distance, 'variance': variance}
 
 
 def save_matched_groups(
     db: Session,
     task_id: str,
     matched_groups: List[List[Dict]],
-    reference_time: datetime
+    reference_time: datetime,
+    encoding: Optional[str] = None,
+    first_group_id: int = 1
 ) -> int:
     """
     保存匹配结果到数据库
 
+    质量指标对所有组向量化计算，记录按批插入（不经过 ORM 工作单元）。
+    匹配时间取组内首个点的时间（点没有 time_seconds 时取参考时间），
+    load_matched_groups 据此还原组时间。
+
     Args:
         db: 数据库会话
         task_id: 任务ID
         matched_groups: 匹配组列表
         reference_time: 参考时间
+        encoding: 匹配点存储格式（json / packed，默认取 MATCH_POINTS_ENCODING）
+        first_group_id: 第一个匹配组的组号（分批保存时接续之前的组号）
 
     Returns:
         保存的匹配组数量
     """
     logger.info(f"保存 {len(matched_groups)} 个匹配组到数据库")
 
-    group_count = 0
-
-    for group_index, group in enumerate(matched_groups, start=1):
-        if not group:
-            continue
-
-        # 获取匹配时间（使用第一个点的时间）
-        match_time = reference_time
+    encoding = encoding or MATCH_POINTS_ENCODING
 
-        # 计算质量指标
-        positions = np.array([[p['longitude'], p['latitude']] for p in group])
-        center = positions.mean(axis=0)
-        distances = np.sqrt(np.sum((positions - center) ** 2, axis=1))
-
-        avg_distance = float(np.mean(distances))
-        max_distance = float(np.max(distances))
-        variance = float(np.var(distances))
+    # 空组不保存，但保留组号
+    indexed_groups = [
+        (group_index, group)
+        for group_index, group in enumerate(matched_groups, start=first_group_id)
+        if group
+    ]
+    statistics = compute_group_statistics([group for _, group in indexed_groups])
 
+    rows = []
+    for row_index, (group_index, group) in enumerate(indexed_groups):
         # 构建匹配点列表
-        match_points = []
-        for point in group:
-            match_points.append({
+        match_points = [
+            {
                 'station_id': point['station_id'],
                 'point_id': point.get('id'),
                 'longitude': point['longitude'],
                 'latitude': point['latitude'],
                 'altitude': point.get('altitude', 0.0)
-            })
-
-        # 创建匹配组记录
-        match_group = MatchGroup(
-            task_id=task_id,
-            group_id=group_index,
-            match_time=match_time,
-            match_points=match_points,
-            point_count=len(group),
-            avg_distance=avg_distance,
-            max_distance=max_distance,
-            variance=variance
-        )
-        db.add(match_group)
-        group_count += 1
+            }
+            for point in group
+        ]
 
-    db.commit()
+        rows.append({
+            'task_id': task_id,
+            'group_id': group_index,
+            'match_time': reference_time + timedelta(seconds=group[0].get('time_seconds', 0.0)),
+            'match_points': encode_match_points(match_points, encoding),
+            'point_count': len(group),
+            'avg_distance': float(statistics['avg_distance'][row_index]),
+            'max_distance': float(statistics['max_distance'][row_index]),
+            'variance': float(statistics['variance'][row_index]),
+        })
+
+    group_count = bulk_insert(db, MatchGroup, rows)
     logger.info(f"成功保存 {group_count} 个匹配组")
 
     return group_count
 
 
+def load_matched_groups(db: Session, task_id: str, reference_time: datetime) -> List[List[Dict]]:
+    """
+    从数据库加载任务已保存的匹配组（按组号顺序）
+
+    还原的点包含误差计算所需的字段：id、station_id、longitude、latitude、altitude，
+    以及匹配组时间 time_seconds（相对参考时间的秒数）。
+
+    Args:
+        db: 数据库会话
+        task_id: 任务ID
+        reference_time: 参考时间
+
+    Returns:
+        匹配组列表
+    """
+    rows = db.query(MatchGroup.match_time, MatchGroup.match_points).filter(
+        MatchGroup.task_id == task_id
+    ).order_by(MatchGroup.group_id).yield_per(5000)
+
+    matched_groups = []
+    for match_time, match_points in rows:
+        time_seconds = (match_time - reference_time).total_seconds()
+        matched_groups.append([
+            {
+                'id': point.get('point_id'),
+                'station_id': point['station_id'],
+                'longitude': point['longitude'],
+                'latitude': point['latitude'],
+                'altitude': point.get('altitude') or 0.0,
+                'time_seconds': time_seconds,
+            }
+            for point in decode_match_points(match_points)
+        ])
+
+    return matched_groups
+
+
 def analyze_match_statistics(matched_groups: List[List[Dict]]) -> Dict[int, int]:
     """
     分析匹配统计信息
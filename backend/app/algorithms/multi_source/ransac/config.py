@@ -25,6 +25,7 @@ class RansacAlgorithmConfig(BaseModel):
     time_window: int = Field(default=60, ge=10, le=600, description="时间窗口长度（秒）")
     time_window_ratio: float = Field(default=0.75, ge=0.1, le=1.0, description="时间窗口比例")
     match_distance_threshold: float = Field(default=0.12, ge=0.01, le=1.0, description="匹配距离阈值（度）")
+    streaming: bool = Field(default=False, description="流式预处理（按时间顺序滑动窗口处理，内存占用与时间跨度无关）")
 
     # ========== 航迹提取配置 ==========
     min_track_points: int = Field(default=10, ge=3, le=100, description="最小航迹点数")
@@ -46,6 +47,10 @@ class RansacAlgorithmConfig(BaseModel):
         default=0.5, ge=0.1, le=0.9,
         description="离群率阈值，某雷达站被判定为故障的离群比例"
     )
+    random_seed: Optional[int] = Field(
+        default=None, ge=0,
+        description="组合数超过最大迭代次数时随机抽取最小样本的随机种子（为空时每次运行自动生成，实际使用的种子记录在结果中）"
+    )
 
     # ========== 优化参数 ==========
     optimization_steps: List[float] = Field(
@@ -57,6 +62,33 @@ class RansacAlgorithmConfig(BaseModel):
         description="距离优化步长序列（米）"
     )
     max_match_groups: int = Field(default=15000, ge=1000, le=100000, description="最大匹配组数")
+    solver: str = Field(
+        default="descent",
+        description="误差求解器: descent（坐标下降）、least_squares（联合非线性最小二乘）"
+    )
+    group_sampling: str = Field(
+        default="truncate",
+        description=(
+            "匹配组抽样: truncate（截取前 N 组）、stratified（分层抽样）、"
+            "progressive（分层抽样并逐步加密直至估计稳定，配合 least_squares 明显更快，"
+            "配合 descent 估计更准但更慢）"
+        )
+    )
+    sample_initial_groups: int = Field(default=2000, ge=100, le=100000, description="渐进加密的初始样本匹配组数")
+    geometry_backend: str = Field(
+        default="geodesic",
+        description="几何计算后端: geodesic（WGS84 大地线正反算）、enu（各雷达站局部东北天坐标系，适合 300 km 以内覆盖范围）"
+    )
+
+    # ========== 置信区间配置 ==========
+    bootstrap_samples: int = Field(default=0, ge=0, le=5000, description="自助法重抽样次数（0 表示不计算置信区间）")
+    bootstrap_confidence_level: float = Field(default=0.95, gt=0.5, lt=1.0, description="置信区间的置信水平")
+    bootstrap_time_budget: float = Field(
+        default=300.0, gt=0, le=86400,
+        description="自助法时间预算（秒），超时后以已完成的重抽样计算置信区间"
+    )
+    bootstrap_workers: int = Field(default=0, ge=0, le=64, description="自助法并行进程数（0 表示使用部署默认值）")
+    bootstrap_seed: Optional[int] = Field(default=None, ge=0, description="自助法随机种子（为空时每次运行自动生成，实际使用的种子记录在结果中）")
 
     # ========== 代价函数权重 ==========
     cost_weights: Optional[RansacCostWeights] = Field(default=None, description="代价函数权重")
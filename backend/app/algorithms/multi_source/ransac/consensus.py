@@ -0,0 +1,158 @@
+"""
+批量 RANSAC 一致集搜索模块
+
+匹配组的点数很少（每站至多一个点），逐组创建 RANSACRegressor 的对象开销远大于拟合本身。
+这里按组大小分桶，把同样大小的匹配组堆成 (组数, 组大小) 的矩阵，
+对所有最小样本组合一次性拟合直线、计算残差和内点：
+组合数不超过 max_trials 时穷举全部组合，否则随机抽取 max_trials 个组合（同桶各组共用）。
+
+最优一致集的选取规则与 sklearn RANSACRegressor 一致：
+内点数最多者优先，内点数相同时取样本模型在内点上的 R² 最高者；
+样本模型为普通最小二乘直线（与 LinearRegression 相同，自变量无变化时斜率取 0）。
+所有样本模型都没有内点时（RANSACRegressor 拟合失败）整组视为内点。
+"""
+import itertools
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+# 单批 组数 × 组合数 × 组大小 的上限，控制中间数组内存
+MAX_BATCH_ELEMENTS = 4_000_000
+
+
+def subset_combinations(
+    size: int,
+    min_samples: int,
+    max_trials: int,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """
+    生成组内的最小样本组合
+
+    Args:
+        size: 组大小
+        min_samples: 最小样本数
+        max_trials: 最大试探次数
+        rng: 随机数生成器（仅在组合数超过 max_trials 时使用）
+
+    Returns:
+        形状 (组合数, min_samples) 的组内下标
+    """
+    if math.comb(size, min_samples) <= max_trials:
+        return np.array(list(itertools.combinations(range(size), min_samples)), dtype=np.intp)
+    return np.sort(np.argsort(rng.random((max_trials, size)), axis=1)[:, :min_samples], axis=1)
+
+
+def _fit_lines(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """沿最后一维对样本做最小二乘直线拟合，返回 (斜率, 截距)"""
+    x_mean = x.mean(axis=-1)
+    y_mean = y.mean(axis=-1)
+    dx = x - x_mean[..., None]
+    sxx = np.sum(dx * dx, axis=-1)
+    sxy = np.sum(dx * (y - y_mean[..., None]), axis=-1)
+    slope = np.divide(sxy, sxx, out=np.zeros_like(sxy), where=sxx > 0)
+    return slope, y_mean - slope * x_mean
+
+
+def _r2_scores(y: np.ndarray, predicted: np.ndarray, inliers: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    样本模型在内点上的 R²（与 sklearn r2_score 一致：
+    内点方差为 0 时，残差为 0 记 1，否则记 0；内点少于 2 个时无定义）
+    """
+    safe_counts = np.maximum(counts, 1)
+    y_mean = np.sum(np.where(inliers, y, 0.0), axis=-1) / safe_counts
+    ss_total = np.sum(np.where(inliers, (y - y_mean[..., None]) ** 2, 0.0), axis=-1)
+    ss_residual = np.sum(np.where(inliers, (y - predicted) ** 2, 0.0), axis=-1)
+
+    scores = np.where(ss_residual == 0, 1.0, 0.0)
+    np.subtract(1.0, ss_residual / np.where(ss_total != 0, ss_total, 1.0), out=scores, where=ss_total != 0)
+    scores[counts < 2] = np.nan
+    return scores
+
+
+def best_consensus(
+    x: np.ndarray,
+    y: np.ndarray,
+    combinations: np.ndarray,
+    residual_threshold: float
+) -> np.ndarray:
+    """
+    对一批同样大小的组选出最优一致集
+
+    Args:
+        x: 自变量，形状 (组数, 组大小)
+        y: 因变量，形状 (组数, 组大小)
+        combinations: subset_combinations() 给出的组内样本组合
+        residual_threshold: 残差阈值（绝对误差）
+
+    Returns:
+        形状 (组数, 组大小) 的内点掩码
+    """
+    slope, intercept = _fit_lines(x[:, combinations], y[:, combinations])
+    predicted = slope[..., None] * x[:, None, :] + intercept[..., None]
+    targets = np.broadcast_to(y[:, None, :], predicted.shape)
+
+    inliers = np.abs(targets - predicted) <= residual_threshold
+    counts = inliers.sum(axis=-1)
+    scores = _r2_scores(targets, predicted, inliers, counts)
+
+    # 内点数最多者优先，其次 R² 最高（同分取先出现的组合）
+    ranked = np.where(
+        counts == counts.max(axis=1, keepdims=True),
+        np.where(np.isnan(scores), -np.inf, scores),
+        np.nan
+    )
+    best = np.nanargmax(ranked, axis=1)
+    mask = inliers[np.arange(len(x)), best]
+
+    # 没有任何样本模型得到内点（RANSACRegressor 此时拟合失败）时全部视为内点
+    mask[counts.max(axis=1) == 0] = True
+    return mask
+
+
+def consensus_inlier_mask(
+    x: np.ndarray,
+    y: np.ndarray,
+    group_sizes: np.ndarray,
+    min_samples: int,
+    residual_threshold: float,
+    max_trials: int,
+    seed: Optional[int] = None
+) -> np.ndarray:
+    """
+    对按组连续排列的点批量执行 RANSAC，返回各点是否为内点
+
+    点数少于 min_samples 的组不做 RANSAC，全部视为内点。
+
+    Args:
+        x: 自变量（所有组的点依次排列）
+        y: 因变量
+        group_sizes: 各组点数
+        min_samples: 最小样本数
+        residual_threshold: 残差阈值
+        max_trials: 最大试探次数（组合数不超过该值时穷举）
+        seed: 随机抽取组合时的随机种子
+
+    Returns:
+        与 x 等长的内点掩码
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    group_sizes = np.asarray(group_sizes, dtype=np.intp)
+    group_starts = np.cumsum(group_sizes) - group_sizes
+    mask = np.ones(len(x), dtype=bool)
+    rng = np.random.default_rng(seed)
+
+    for size in np.unique(group_sizes):
+        if size < min_samples:
+            continue
+        groups = np.flatnonzero(group_sizes == size)
+        combinations = subset_combinations(int(size), min_samples, max_trials, rng)
+        batch = max(1, MAX_BATCH_ELEMENTS // (len(combinations) * int(size)))
+
+        for start in range(0, len(groups), batch):
+            index = group_starts[groups[start:start + batch], None] + np.arange(size)
+            mask[index] = best_consensus(x[index], y[index], combinations, residual_threshold)
+
+    return mask
@@ -9,32 +9,25 @@
 5. 用健康站数据计算最终系统误差
 """
 import numpy as np
-import pyproj
-from typing import List, Optional, Dict, Any, Tuple
-from datetime import datetime
-from collections import defaultdict
-
-from app.algorithms.base import (
-    BaseErrorAnalysisAlgorithm,
-    AnalysisResult,
-    ProgressCallback,
-)
+from typing import List, Dict, Any, Set, Tuple
+
+from app.algorithms.multi_source.base import MultiSourceAlgorithm, SolveResult
 from app.algorithms.multi_source.ransac_heuristic.config import (
     RansacHeuristicAlgorithmConfig,
 )
-from app.algorithms.multi_source.preprocessing.config import MrraConfig, CostWeights
-from app.algorithms.multi_source.preprocessing.track_extractor import load_track_points_by_track_ids, extract_key_tracks
-from app.algorithms.multi_source.preprocessing.track_interpolator import interpolate_and_save_tracks
-from app.algorithms.multi_source.preprocessing.track_matcher import match_tracks_from_database, save_matched_groups
-from app.algorithms.multi_source.preprocessing.error_calculator import ErrorCalculator
-from app.models.flight_track import RadarStation, FlightTrackRaw
-from sqlalchemy.orm import Session
+from app.algorithms.multi_source.preprocessing.flat_groups import (
+    FlatMatchGroups,
+    compact_groups,
+    flatten_match_groups,
+)
+from app.algorithms.multi_source.preprocessing.geometry import station_frames
+from app.algorithms.multi_source.preprocessing.group_table import geod
 from core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-class RansacHeuristicAlgorithm(BaseErrorAnalysisAlgorithm):
+class RansacHeuristicAlgorithm(MultiSourceAlgorithm):
     """
     启发式 RANSAC 算法
 
@@ -52,6 +45,8 @@ class RansacHeuristicAlgorithm(BaseErrorAnalysisAlgorithm):
         "然后基于健康站数据计算各站的系统误差。"
     )
 
+    SOLVE_STEP_MESSAGE = "启发式 RANSAC 故障站检测"
+
     ConfigClass = RansacHeuristicAlgorithmConfig
 
     def __init__(self, config: RansacHeuristicAlgorithmConfig):
@@ -61,160 +56,30 @@ class RansacHeuristicAlgorithm(BaseErrorAnalysisAlgorithm):
         if not isinstance(self.config, RansacHeuristicAlgorithmConfig):
             raise ValueError("配置必须是 RansacHeuristicAlgorithmConfig 类型")
 
-    def analyze(
+    def solve(
         self,
-        task_id: str,
-        radar_station_ids: List[int],
-        track_ids: List[str],
-        db_session: Session,
-        progress_callback: Optional[ProgressCallback] = None,
-    ) -> AnalysisResult:
-        start_time = datetime.now()
-
-        result = AnalysisResult(
-            task_id=task_id,
-            algorithm_name=self.ALGORITHM_NAME,
-            algorithm_version=self.ALGORITHM_VERSION,
-            status="running",
-            progress=0.0,
-            started_at=start_time,
-        )
-
-        try:
-            # 获取雷达站位置
-            radar_stations = db_session.query(RadarStation).filter(
-                RadarStation.id.in_(radar_station_ids)
-            ).all()
-
-            radar_positions = {
-                station.id: (station.longitude, station.latitude, station.altitude or 0.0)
-                for station in radar_stations
-            }
+        matched_groups: List[List[Dict]],
+        radar_positions: Dict[int, Tuple],
+    ) -> SolveResult:
+        """启发式故障站检测，并基于健康站数据计算系统误差"""
+        heuristic_results = self._heuristic_ransac(matched_groups, radar_positions)
 
-            if not radar_positions:
-                raise ValueError("没有找到指定的雷达站位置信息")
-
-            # 构建 MRRA 兼容配置
-            mrra_config = self._build_mrra_config()
-
-            # 步骤1: 加载并提取航迹
-            if progress_callback:
-                progress_callback.on_progress(0.1, "加载并提取航迹")
-            self._update_task_progress(db_session, task_id, 10, "加载并提取航迹")
-
-            station_data = load_track_points_by_track_ids(
-                db_session, track_ids, radar_positions
-            )
-            if not station_data:
-                raise ValueError("没有找到有效的航迹数据")
-
-            key_tracks = extract_key_tracks(station_data, mrra_config)
-            if not key_tracks:
-                raise ValueError("没有提取到关键航迹")
-
-            result.progress = 0.3
-
-            # 步骤2: 插值
-            if progress_callback:
-                progress_callback.on_progress(0.3, "航迹插值")
-            self._update_task_progress(db_session, task_id, 40, "航迹插值")
-
-            first_track = db_session.query(FlightTrackRaw).filter(
-                FlightTrackRaw.batch_id.in_(track_ids)
-            ).order_by(FlightTrackRaw.timestamp).first()
-            reference_time = (
-                first_track.timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
-                if first_track
-                else datetime.utcnow()
-            )
-
-            interpolate_and_save_tracks(
-                db_session, task_id, key_tracks, mrra_config, reference_time
-            )
-
-            result.progress = 0.5
-
-            # 步骤3: 匹配
-            if progress_callback:
-                progress_callback.on_progress(0.5, "航迹匹配")
-            self._update_task_progress(db_session, task_id, 60, "航迹匹配")
-
-            matched_groups = match_tracks_from_database(
-                db_session, task_id, mrra_config
-            )
-            if not matched_groups:
-                raise ValueError("没有匹配到航迹组")
-
-            save_matched_groups(db_session, task_id, matched_groups, reference_time)
-
-            result.progress = 0.7
-
-            # 步骤4: 启发式 RANSAC 分析
-            if progress_callback:
-                progress_callback.on_progress(0.7, "启发式 RANSAC 故障站检测")
-            self._update_task_progress(db_session, task_id, 80, "启发式 RANSAC 分析中")
-
-            heuristic_results = self._heuristic_ransac(matched_groups, radar_positions)
-
-            result.progress = 1.0
-
-            # 完成
-            result.status = "completed"
-            result.errors = heuristic_results["errors"]
-            result.completed_at = datetime.now()
-            result.processing_time_seconds = (
-                result.completed_at - start_time
-            ).total_seconds()
-            result.match_statistics = {
-                "total_match_groups": len(matched_groups),
+        return SolveResult(
+            errors=heuristic_results["errors"],
+            match_statistics={
                 "station_outlier_rates": heuristic_results["outlier_rates"],
                 "fault_stations": heuristic_results["fault_stations"],
                 "healthy_stations": heuristic_results["healthy_stations"],
-            }
-            result.metadata = {
-                "algorithm": "ransac_heuristic",
+            },
+            metadata={
                 "jump_threshold": self.config.jump_threshold,
                 "min_healthy_stations": self.config.min_healthy_stations,
                 "outlier_ratio_threshold": self.config.outlier_ratio_threshold,
-            }
-
-            logger.info(
-                f"[{task_id}] 启发式 RANSAC 分析完成，耗时 {result.processing_time_seconds:.2f} 秒，"
-                f"健康站: {heuristic_results['healthy_stations']}, 故障站: {heuristic_results['fault_stations']}"
-            )
-
-            return result
-
-        except Exception as e:
-            logger.error(f"[{task_id}] 启发式 RANSAC 分析失败: {str(e)}", exc_info=True)
-            result.status = "failed"
-            result.error_message = str(e)
-            result.completed_at = datetime.now()
-            if progress_callback:
-                progress_callback.on_error(str(e))
-            return result
-
-    def _build_mrra_config(self) -> MrraConfig:
-        """将配置转换为 MRRA 兼容配置"""
-        if self.config.cost_weights:
-            cost_weights = CostWeights(
-                variance=self.config.cost_weights.variance,
-                azimuth_error_square=self.config.cost_weights.azimuth_error_square,
-                range_error_square=self.config.cost_weights.range_error_square,
-                elevation_error_square=self.config.cost_weights.elevation_error_square,
-            )
-        else:
-            cost_weights = CostWeights()
-        return MrraConfig(
-            grid_resolution=self.config.grid_resolution,
-            time_window=self.config.time_window,
-            time_window_ratio=self.config.time_window_ratio,
-            match_distance_threshold=self.config.match_distance_threshold,
-            min_track_points=self.config.min_track_points,
-            optimization_steps=self.config.optimization_steps,
-            range_optimization_steps=self.config.range_optimization_steps,
-            max_match_groups=self.config.max_match_groups,
-            cost_weights=cost_weights,
+            },
+            summary=(
+                f"健康站: {heuristic_results['healthy_stations']}, "
+                f"故障站: {heuristic_results['fault_stations']}"
+            ),
         )
 
     def _heuristic_ransac(
@@ -231,49 +96,17 @@ class RansacHeuristicAlgorithm(BaseErrorAnalysisAlgorithm):
         3. 按偏差排序，检测差值突变点
         4. 突变点之前是健康站，之后是故障站
         """
-        # 统计每个站在所有匹配组中的故障判定次数
-        station_total = defaultdict(int)
-        station_outlier_count = defaultdict(int)
-
-        for group in matched_groups:
-            if len(group) < 2:
-                continue
-
-            # 计算几何中心（简单平均）
-            lats = np.array([p["latitude"] for p in group])
-            lons = np.array([p["longitude"] for p in group])
-            center_lat = np.mean(lats)
-            center_lon = np.mean(lons)
-
-            # 计算每个站与中心的偏差（欧氏距离）
-            station_deviations = []
-            for i, point in enumerate(group):
-                sid = point["station_id"]
-                lat = point["latitude"]
-                lon = point["longitude"]
-                deviation = np.sqrt((lat - center_lat)**2 + (lon - center_lon)**2)
-                station_deviations.append((sid, deviation))
-                station_total[sid] += 1
-
-            # 按偏差从小到大排序
-            station_deviations.sort(key=lambda x: x[1])
-
-            # 检测差值突变点
-            _, faulty_stations_in_group = self._detect_jump_point(
-                station_deviations
-            )
-
-            # 统计故障站
-            for sid, _ in faulty_stations_in_group:
-                station_outlier_count[sid] += 1
-
-        # 计算离群率，确定全局故障站和健康站
+        # 少于 2 个点的组不参与判定
+        flat = flatten_match_groups([group for group in matched_groups if len(group) >= 2])
+        station_total, station_outlier_count = self._count_faulty_detections(flat)
+
+        # 计算离群率，确定全局故障站和健康站（站按首次出现的顺序）
         outlier_rates = {}
         fault_stations = []
         healthy_stations_set = set()
 
-        for sid in station_total:
-            rate = station_outlier_count[sid] / station_total[sid]
+        for index, sid in enumerate(flat.stations):
+            rate = int(station_outlier_count[index]) / int(station_total[index])
             outlier_rates[sid] = round(rate, 4)
             if rate >= self.config.outlier_ratio_threshold:
                 fault_stations.append(sid)
@@ -292,8 +125,6 @@ class RansacHeuristicAlgorithm(BaseErrorAnalysisAlgorithm):
 
         if not fault_stations:
             # 没有故障站，全部为 0
-            for sid in healthy_stations_list:
-                errors[sid] = {"azimuth_error": 0.0, "range_error": 0.0, "elevation_error": 0.0}
             return {
                 "errors": errors,
                 "outlier_rates": outlier_rates,
@@ -302,61 +133,35 @@ class RansacHeuristicAlgorithm(BaseErrorAnalysisAlgorithm):
             }
 
         # 计算故障站误差：以健康站共识位置为基准
-        geod = pyproj.Geod(ellps='WGS84')
-
-        az_accum = defaultdict(list)
-        range_accum = defaultdict(list)
-        elev_accum = defaultdict(list)
-
-        for group in matched_groups:
-            if len(group) < 2:
-                continue
-
-            healthy_points = [p for p in group if p["station_id"] in healthy_stations_set]
-            faulty_points = [p for p in group if p["station_id"] in set(fault_stations)]
-
-            if len(healthy_points) < 2 or not faulty_points:
-                continue
-
-            # 健康站共识位置（基准）
-            ref_lat = np.mean([p["latitude"] for p in healthy_points])
-            ref_lon = np.mean([p["longitude"] for p in healthy_points])
-            ref_alt = np.mean([p.get("altitude", 0) or 0 for p in healthy_points])
-
-            for point in faulty_points:
-                sid = point["station_id"]
-                if sid not in radar_positions:
-                    continue
-                r_lon, r_lat, r_alt = radar_positions[sid]
-                p_lat = point["latitude"]
-                p_lon = point["longitude"]
-                p_alt = point.get("altitude", 0) or 0
-
-                # 雷达站到观测点
-                obs_az, _, obs_dist = geod.inv(r_lon, r_lat, p_lon, p_lat)
-                # 雷达站到共识位置
-                ref_az, _, ref_dist = geod.inv(r_lon, r_lat, ref_lon, ref_lat)
-
-                # 方位角差值处理 360° 跨越
-                az_diff = obs_az - ref_az
-                if az_diff > 180:
-                    az_diff -= 360
-                elif az_diff < -180:
-                    az_diff += 360
-
-                az_accum[sid].append(az_diff)
-                range_accum[sid].append(obs_dist - ref_dist)
-
-                if ref_dist > 0:
-                    obs_elev = np.degrees(np.arctan2(p_alt - r_alt, obs_dist))
-                    ref_elev = np.degrees(np.arctan2(ref_alt - r_alt, ref_dist))
-                    elev_accum[sid].append(obs_elev - ref_elev)
+        station_ids, observed, reference = self._fault_references(
+            flat, healthy_stations_set, set(fault_stations), radar_positions
+        )
+
+        az_diff = range_diff = elev_diff = np.zeros(0)
+        elev_valid = np.zeros(0, dtype=bool)
+
+        if len(station_ids):
+            # 雷达站到观测点、到共识位置的极坐标（一次性按数组计算）
+            stations, station_index = np.unique(station_ids, return_inverse=True)
+            positions = np.array([radar_positions[int(sid)][:3] for sid in stations], dtype=np.float64)
+
+            obs_az, obs_dist, obs_elev = self._station_polar(positions, station_index, observed)
+            ref_az, ref_dist, ref_elev = self._station_polar(positions, station_index, reference)
+
+            # 方位角差值处理 360° 跨越
+            az_diff = obs_az - ref_az
+            az_diff = np.where(az_diff > 180, az_diff - 360, np.where(az_diff < -180, az_diff + 360, az_diff))
+            range_diff = obs_dist - ref_dist
+            elev_diff = obs_elev - ref_elev
+            elev_valid = ref_dist > 0
 
         for sid in fault_stations:
+            selected = station_ids == sid
+            elev_selected = selected & elev_valid
             errors[sid] = {
-                "azimuth_error": float(np.mean(az_accum[sid])) if az_accum[sid] else 0.0,
-                "range_error": float(np.mean(range_accum[sid])) if range_accum[sid] else 0.0,
-                "elevation_error": float(np.mean(elev_accum[sid])) if elev_accum[sid] else 0.0,
+                "azimuth_error": float(np.mean(az_diff[selected])) if selected.any() else 0.0,
+                "range_error": float(np.mean(range_diff[selected])) if selected.any() else 0.0,
+                "elevation_error": float(np.mean(elev_diff[elev_selected])) if elev_selected.any() else 0.0,
             }
 
         return {
@@ -366,62 +171,145 @@ class RansacHeuristicAlgorithm(BaseErrorAnalysisAlgorithm):
             "healthy_stations": healthy_stations_list,
         }
 
-    def _detect_jump_point(
+    def _station_polar(
         self,
-        station_deviations: List[Tuple[int, float]]
-    ) -> Tuple[List[Tuple[int, float]], List[Tuple[int, float]]]:
+        positions: np.ndarray,
+        station_index: np.ndarray,
+        points: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        计算各点相对所属雷达站的方位角、距离和俯仰角
+
+        Args:
+            positions: 雷达站 (经度, 纬度, 高度)，形状 (S, 3)
+            station_index: 各点所属雷达站在 positions 中的下标
+            points: 各点 (经度, 纬度, 高度)，形状 (N, 3)
+
+        Returns:
+            (方位角（度）, 距离（米）, 俯仰角（度）)
         """
-        检测差值突变点
+        lon, lat, alt = points.T
+        r_lon, r_lat, r_alt = positions[station_index].T
+        if self.config.geometry_backend == "enu":
+            frames = station_frames(positions[:, 0], positions[:, 1])
+            distance, azimuth, _ = frames.surface_polar(station_index, lon, lat)
+        else:
+            azimuth, _, distance = geod.inv(r_lon, r_lat, lon, lat)
+            azimuth, distance = np.asarray(azimuth), np.asarray(distance)
+
+        elevation = np.degrees(np.arctan2(alt - r_alt, distance))
+        return azimuth, distance, elevation
+
+    def _count_faulty_detections(self, flat: FlatMatchGroups) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        逐组判定故障站，统计各站的参与次数和被判为故障的次数
+
+        对每个匹配组：
+        1. 计算几何中心（简单平均）和每个站与中心的偏差（欧氏距离）
+        2. 组内按偏差从小到大排序（偏差相同时保持原顺序），检测差值突变点
+        3. 突变点之前是健康站，之后是故障站
+
+        Args:
+            flat: 匹配组扁平数组（每组至少 2 个点）
+
+        Returns:
+            (各站参与次数, 各站被判为故障的次数)，按 flat.stations 顺序
+        """
+        station_count = len(flat.stations)
+        station_total = np.bincount(flat.station_index, minlength=station_count)
+        if flat.point_count == 0:
+            return station_total, np.zeros(station_count, dtype=np.int64)
+
+        center_lat = flat.group_mean(flat.latitude)[flat.group_index]
+        center_lon = flat.group_mean(flat.longitude)[flat.group_index]
+        deviation = np.sqrt((flat.latitude - center_lat) ** 2 + (flat.longitude - center_lon) ** 2)
+
+        # 组内排序：lexsort 为稳定排序，偏差相同的站保持原顺序
+        order = np.lexsort((deviation, flat.group_index))
+        faulty = self._detect_jump_points(flat, deviation[order])
+
+        station_outlier_count = np.bincount(flat.station_index[order][faulty], minlength=station_count)
+        return station_total, station_outlier_count
+
+    def _detect_jump_points(self, flat: FlatMatchGroups, sorted_deviation: np.ndarray) -> np.ndarray:
+        """
+        检测各组的差值突变点
+
+        每组取相邻偏差差值最大处（并列时取第一个）为突变点，差值超过阈值时在突变点分割；
+        健康站数量至少为 min_healthy_stations。
+
+        Args:
+            flat: 匹配组扁平数组（每组至少 2 个点）
+            sorted_deviation: 组内已按偏差从小到大排序的偏差
+
+        Returns:
+            排序后各点是否为故障站
+        """
+        rank = flat.within_group_rank()
+
+        # 组内第 i 个点与前一点的偏差差值（i >= 1），每组第一个点不参与
+        jumps = np.full(flat.point_count, -np.inf)
+        jumps[1:] = np.diff(sorted_deviation)
+        jumps[rank == 0] = -np.inf
+
+        max_jump = np.maximum.reduceat(jumps, flat.group_starts)
+        first_max = np.minimum.reduceat(
+            np.where(jumps == max_jump[flat.group_index], rank, flat.point_count), flat.group_starts
+        )
+
+        healthy_count = np.full(flat.group_count, self.config.min_healthy_stations)
+        split = max_jump > self.config.jump_threshold
+        healthy_count[split] = np.maximum(healthy_count[split], first_max[split])
+
+        return rank >= healthy_count[flat.group_index]
+
+    def _fault_references(
+        self,
+        flat: FlatMatchGroups,
+        healthy_stations: Set[int],
+        fault_stations: Set[int],
+        radar_positions: Dict[int, Tuple]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        收集故障站观测及所在组的健康站共识位置
+
+        只使用至少有 2 个健康站观测和 1 个故障站观测的匹配组。
 
         Args:
-            station_deviations: [(station_id, deviation), ...]，已按偏差从小到大排序
+            flat: 匹配组扁平数组
+            healthy_stations: 健康站集合
+            fault_stations: 故障站集合
+            radar_positions: 雷达站位置（没有位置信息的故障站观测被忽略）
 
         Returns:
-            (healthy_stations, faulty_stations): 健康站和故障站列表
+            (故障站号, 观测 (经度, 纬度, 高度), 共识位置 (经度, 纬度, 高度))，按组和组内顺序排列
         """
-        n = len(station_deviations)
-        if n < 2:
-            return station_deviations, []
-
-        # 确保至少有 min_healthy_stations 个健康站
-        healthy_count = self.config.min_healthy_stations
-
-        # 计算相邻偏差的差值
-        jumps = []
-        for i in range(n - 1):
-            sid1, dev1 = station_deviations[i]
-            sid2, dev2 = station_deviations[i + 1]
-            jump = dev2 - dev1
-            jumps.append((i + 1, jump, sid2, dev2))
-
-        # 找到最大差值的位置
-        if jumps:
-            max_jump_idx, max_jump, _, _ = max(jumps, key=lambda x: x[1])
-
-            # 如果最大差值超过阈值，则在突变点分割
-            if max_jump > self.config.jump_threshold:
-                healthy_count = max(healthy_count, max_jump_idx)
-
-        # 取前 healthy_count 个为健康站
-        healthy_stations = station_deviations[:healthy_count]
-        faulty_stations = station_deviations[healthy_count:]
-
-        return healthy_stations, faulty_stations
-
-    def _update_task_progress(
-        self, db: Session, task_id: str, progress: int, message: str
-    ):
-        """更新数据库中任务的进度"""
-        try:
-            from app.models.error_analysis import ErrorAnalysisTask
-            task = db.query(ErrorAnalysisTask).filter(
-                ErrorAnalysisTask.task_id == task_id
-            ).first()
-            if task:
-                task.progress = progress
-                db.commit()
-        except Exception:
-            pass
+        is_healthy = np.isin(flat.station_index, [
+            index for index, sid in enumerate(flat.stations) if sid in healthy_stations
+        ])
+        is_faulty = np.isin(flat.station_index, [
+            index for index, sid in enumerate(flat.stations) if sid in fault_stations
+        ])
+        healthy_counts = np.bincount(flat.group_index[is_healthy], minlength=flat.group_count)
+        faulty_counts = np.bincount(flat.group_index[is_faulty], minlength=flat.group_count)
+        usable = (flat.group_sizes >= 2) & (healthy_counts >= 2) & (faulty_counts > 0)
+
+        # 健康站共识位置（基准）
+        healthy = compact_groups(flat, is_healthy)
+        ref_lat = healthy.group_mean(healthy.latitude)
+        ref_lon = healthy.group_mean(healthy.longitude)
+        ref_alt = healthy.group_mean(healthy.altitude)
+
+        positioned = np.isin(flat.station_index, [
+            index for index, sid in enumerate(flat.stations) if sid in radar_positions
+        ])
+        selected = is_faulty & positioned & usable[flat.group_index]
+        groups = flat.group_index[selected]
+
+        station_ids = flat.station_ids[selected]
+        observed = np.column_stack((flat.longitude[selected], flat.latitude[selected], flat.altitude[selected]))
+        reference = np.column_stack((ref_lon[groups], ref_lat[groups], ref_alt[groups]))
+        return station_ids, observed, reference
 
     @staticmethod
     def get_default_config() -> RansacHeuristicAlgorithmConfig:
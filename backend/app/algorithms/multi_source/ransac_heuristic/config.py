@@ -31,6 +31,7 @@ class RansacHeuristicAlgorithmConfig(BaseModel):
     time_window: int = Field(default=60, ge=10, le=600, description="时间窗口长度（秒）")
     time_window_ratio: float = Field(default=0.75, ge=0.1, le=1.0, description="时间窗口比例")
     match_distance_threshold: float = Field(default=0.12, ge=0.01, le=1.0, description="匹配距离阈值（度）")
+    streaming: bool = Field(default=False, description="流式预处理（按时间顺序滑动窗口处理，内存占用与时间跨度无关）")
 
     # ========== 航迹提取配置 ==========
     min_track_points: int = Field(default=10, ge=3, le=100, description="最小航迹点数")
@@ -59,6 +60,23 @@ class RansacHeuristicAlgorithmConfig(BaseModel):
         description="距离优化步长序列（米）"
     )
     max_match_groups: int = Field(default=15000, ge=1000, le=100000, description="最大匹配组数")
+    solver: str = Field(
+        default="descent",
+        description="误差求解器: descent（坐标下降）、least_squares（联合非线性最小二乘）"
+    )
+    group_sampling: str = Field(
+        default="truncate",
+        description=(
+            "匹配组抽样: truncate（截取前 N 组）、stratified（分层抽样）、"
+            "progressive（分层抽样并逐步加密直至估计稳定，配合 least_squares 明显更快，"
+            "配合 descent 估计更准但更慢）"
+        )
+    )
+    sample_initial_groups: int = Field(default=2000, ge=100, le=100000, description="渐进加密的初始样本匹配组数")
+    geometry_backend: str = Field(
+        default="geodesic",
+        description="几何计算后端: geodesic（WGS84 大地线正反算）、enu（各雷达站局部东北天坐标系，适合 300 km 以内覆盖范围）"
+    )
 
     # ========== 代价函数权重 ==========
     cost_weights: Optional[RansacHeuristicCostWeights] = Field(
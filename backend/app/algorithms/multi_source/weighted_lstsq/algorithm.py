@@ -10,31 +10,24 @@
 6. 计算各站系统误差（方位角、距离、俯仰角）
 7. 输出融合轨迹
 """
-import math
 import numpy as np
-from typing import List, Optional, Dict, Any, Tuple
-from datetime import datetime
-from collections import defaultdict
-
-from app.algorithms.base import (
-    BaseErrorAnalysisAlgorithm,
-    AnalysisResult,
-    ProgressCallback,
-)
-from app.algorithms.multi_source.weighted_lstsq.config import WeightedLstsqAlgorithmConfig, WeightedLstsqCostWeights
-from app.algorithms.multi_source.preprocessing.config import MrraConfig
-from app.algorithms.multi_source.preprocessing.track_extractor import load_track_points_by_track_ids, extract_key_tracks
-from app.algorithms.multi_source.preprocessing.track_interpolator import interpolate_and_save_tracks
-from app.algorithms.multi_source.preprocessing.track_matcher import match_tracks_from_database, save_matched_groups
+from typing import List, Dict, Any, Tuple
+
+from app.algorithms.multi_source.base import MultiSourceAlgorithm, SolveResult
+from app.algorithms.multi_source.weighted_lstsq.config import WeightedLstsqAlgorithmConfig
+from app.algorithms.multi_source.preprocessing.bootstrap import bootstrap_metadata
 from app.algorithms.multi_source.preprocessing.error_calculator import ErrorCalculator
-from app.models.flight_track import RadarStation, FlightTrackRaw
-from sqlalchemy.orm import Session
+from app.algorithms.multi_source.preprocessing.flat_groups import (
+    compact_groups,
+    flatten_match_groups,
+    sequential_group_sum,
+)
 from core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-class WeightedLstsqAlgorithm(BaseErrorAnalysisAlgorithm):
+class WeightedLstsqAlgorithm(MultiSourceAlgorithm):
     """
     加权最小二乘融合算法
 
@@ -50,6 +43,8 @@ class WeightedLstsqAlgorithm(BaseErrorAnalysisAlgorithm):
         "输出最优估计轨迹及各站系统误差。支持反方差、均匀、按匹配数等多种权重策略。"
     )
 
+    SOLVE_STEP_MESSAGE = "加权最小二乘融合"
+
     ConfigClass = WeightedLstsqAlgorithmConfig
 
     def __init__(self, config: WeightedLstsqAlgorithmConfig):
@@ -59,157 +54,30 @@ class WeightedLstsqAlgorithm(BaseErrorAnalysisAlgorithm):
         if not isinstance(self.config, WeightedLstsqAlgorithmConfig):
             raise ValueError("配置必须是 WeightedLstsqAlgorithmConfig 类型")
 
-    def analyze(
+    def solve(
         self,
-        task_id: str,
-        radar_station_ids: List[int],
-        track_ids: List[str],
-        db_session: Session,
-        progress_callback: Optional[ProgressCallback] = None,
-    ) -> AnalysisResult:
-        start_time = datetime.now()
-
-        result = AnalysisResult(
-            task_id=task_id,
-            algorithm_name=self.ALGORITHM_NAME,
-            algorithm_version=self.ALGORITHM_VERSION,
-            status="running",
-            progress=0.0,
-            started_at=start_time,
-        )
-
-        try:
-            # 获取雷达站位置
-            radar_stations = db_session.query(RadarStation).filter(
-                RadarStation.id.in_(radar_station_ids)
-            ).all()
-
-            radar_positions = {
-                station.id: (station.longitude, station.latitude, station.altitude or 0.0)
-                for station in radar_stations
-            }
-
-            if not radar_positions:
-                raise ValueError("没有找到指定的雷达站位置信息")
-
-            mrra_config = self._build_mrra_config()
-
-            # 步骤1: 加载并提取航迹
-            if progress_callback:
-                progress_callback.on_progress(0.1, "加载并提取航迹")
-            self._update_task_progress(db_session, task_id, 10, "加载并提取航迹")
-
-            station_data = load_track_points_by_track_ids(
-                db_session, track_ids, radar_positions
-            )
-            if not station_data:
-                raise ValueError("没有找到有效的航迹数据")
-
-            key_tracks = extract_key_tracks(station_data, mrra_config)
-            if not key_tracks:
-                raise ValueError("没有提取到关键航迹")
-
-            result.progress = 0.3
-
-            # 步骤2: 插值
-            if progress_callback:
-                progress_callback.on_progress(0.3, "航迹插值")
-            self._update_task_progress(db_session, task_id, 40, "航迹插值")
-
-            first_track = db_session.query(FlightTrackRaw).filter(
-                FlightTrackRaw.batch_id.in_(track_ids)
-            ).order_by(FlightTrackRaw.timestamp).first()
-            reference_time = (
-                first_track.timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
-                if first_track
-                else datetime.utcnow()
-            )
-
-            interpolate_and_save_tracks(
-                db_session, task_id, key_tracks, mrra_config, reference_time
-            )
-
-            result.progress = 0.5
-
-            # 步骤3: 匹配
-            if progress_callback:
-                progress_callback.on_progress(0.5, "航迹匹配")
-            self._update_task_progress(db_session, task_id, 60, "航迹匹配")
-
-            matched_groups = match_tracks_from_database(
-                db_session, task_id, mrra_config
-            )
-            if not matched_groups:
-                raise ValueError("没有匹配到航迹组")
-
-            save_matched_groups(db_session, task_id, matched_groups, reference_time)
-
-            result.progress = 0.7
-
-            # 步骤4: 加权融合（核心步骤）
-            if progress_callback:
-                progress_callback.on_progress(0.7, "加权最小二乘融合")
-            self._update_task_progress(db_session, task_id, 80, "加权融合中")
-
-            fusion_results = self._weighted_fusion(matched_groups, radar_positions)
-
-            result.progress = 1.0
+        matched_groups: List[List[Dict]],
+        radar_positions: Dict[int, Tuple],
+    ) -> SolveResult:
+        """加权融合多站观测，计算系统误差并输出融合轨迹"""
+        fusion_results = self._weighted_fusion(matched_groups, radar_positions)
 
-            # 完成
-            result.status = "completed"
-            result.errors = fusion_results["errors"]
-            result.completed_at = datetime.now()
-            result.processing_time_seconds = (
-                result.completed_at - start_time
-            ).total_seconds()
-            result.match_statistics = {
-                "total_match_groups": len(matched_groups),
+        return SolveResult(
+            errors=fusion_results["errors"],
+            match_statistics={
                 "fusion_points": len(fusion_results["fused_trajectory"]),
                 "station_weights": fusion_results["station_weights"],
                 "weighting_method": self.config.weighting_method,
                 "outlier_removed": fusion_results["outlier_removed_count"],
-            }
-            result.metadata = {
-                "algorithm": "weighted_lstsq",
+            },
+            metadata={
                 "weighting_method": self.config.weighting_method,
                 "outlier_removal": self.config.outlier_removal,
                 "fused_trajectory": fusion_results["fused_trajectory"][:100],
-            }
-
-            logger.info(
-                f"[{task_id}] 加权融合完成，耗时 {result.processing_time_seconds:.2f} 秒，"
-                f"融合轨迹点: {len(fusion_results['fused_trajectory'])}"
-            )
-
-            return result
-
-        except Exception as e:
-            logger.error(f"[{task_id}] 加权融合失败: {str(e)}", exc_info=True)
-            result.status = "failed"
-            result.error_message = str(e)
-            result.completed_at = datetime.now()
-            if progress_callback:
-                progress_callback.on_error(str(e))
-            return result
-
-    def _build_mrra_config(self) -> MrraConfig:
-        # 如果 cost_weights 为 None，使用默认值
-        weights = self.config.cost_weights or WeightedLstsqCostWeights()
-        return MrraConfig(
-            grid_resolution=self.config.grid_resolution,
-            time_window=self.config.time_window,
-            time_window_ratio=self.config.time_window_ratio,
-            match_distance_threshold=self.config.match_distance_threshold,
-            min_track_points=self.config.min_track_points,
-            optimization_steps=self.config.optimization_steps,
-            range_optimization_steps=self.config.range_optimization_steps,
-            max_match_groups=self.config.max_match_groups,
-            cost_weights={
-                "variance": weights.variance,
-                "azimuth_error_square": weights.azimuth_error_square,
-                "range_error_square": weights.range_error_square,
-                "elevation_error_square": weights.elevation_error_square,
+                **bootstrap_metadata(fusion_results.get("bootstrap")),
             },
+            summary=f"融合轨迹点: {len(fusion_results['fused_trajectory'])}",
+            trajectory=fusion_results["fused_trajectory"],
         )
 
     def _weighted_fusion(
@@ -225,44 +93,76 @@ class WeightedLstsqAlgorithm(BaseErrorAnalysisAlgorithm):
         3. 加权融合得到各时间点的真实位置
         4. 用 ErrorCalculator 计算系统误差
         """
-        # 阶段1：计算各站的观测偏差统计量
-        station_deviations = defaultdict(list)
-        station_match_count = defaultdict(int)
+        station_weights, filtered_groups, fused_trajectory, outlier_removed_count = self._fuse_groups(
+            matched_groups, radar_positions
+        )
 
-        for group in matched_groups:
-            if len(group) < 2:
-                continue
+        # 阶段5：用 ErrorCalculator 计算系统误差
+        mrra_config = self._build_mrra_config()
+        error_calc = ErrorCalculator(mrra_config)
+
+        station_errors = error_calc.calculate_radar_errors(filtered_groups, radar_positions)
+        bootstrap = error_calc.calculate_confidence_intervals(filtered_groups, radar_positions, station_errors)
+
+        errors = {}
+        for sid, (az_err, range_err, elev_err) in station_errors.items():
+            errors[sid] = {
+                "azimuth_error": az_err,
+                "range_error": range_err,
+                "elevation_error": elev_err,
+            }
 
-            # 计算组质心
-            lats = [p["latitude"] for p in group]
-            lons = [p["longitude"] for p in group]
-            centroid_lat = np.mean(lats)
-            centroid_lon = np.mean(lons)
-
-            for point in group:
-                sid = point["station_id"]
-                station_match_count[sid] += 1
-                # 计算该观测到质心的距离（度）
-                dev = math.sqrt(
-                    (point["latitude"] - centroid_lat) ** 2
-                    + (point["longitude"] - centroid_lon) ** 2
-                )
-                station_deviations[sid].append(dev)
+        return {
+            "errors": errors,
+            "station_weights": {str(k): round(v, 6) for k, v in station_weights.items()},
+            "fused_trajectory": fused_trajectory,
+            "outlier_removed_count": outlier_removed_count,
+            "bootstrap": bootstrap,
+        }
+
+    def _fuse_groups(
+        self,
+        matched_groups: List[List[Dict]],
+        radar_positions: Dict[int, Tuple],
+    ) -> Tuple[Dict[int, float], List[List[Dict]], List[Dict[str, Any]], int]:
+        """
+        计算各站权重、移除离群观测并加权融合（按匹配组扁平数组整体计算）
+
+        Args:
+            matched_groups: 匹配组列表
+            radar_positions: 雷达站位置
+
+        Returns:
+            (归一化的各站权重, 移除离群观测后的匹配组, 融合轨迹, 移除的离群观测数)
+        """
+        flat = flatten_match_groups(matched_groups)
+
+        # 阶段1：计算各站的观测偏差统计量（只使用至少 2 个点的组）
+        in_pairs = flat.group_sizes[flat.group_index] >= 2
+        centroid_lat = flat.group_mean(flat.latitude)[flat.group_index]
+        centroid_lon = flat.group_mean(flat.longitude)[flat.group_index]
+        # 观测到组质心的距离（度）
+        deviation = np.sqrt((flat.latitude - centroid_lat) ** 2 + (flat.longitude - centroid_lon) ** 2)
+
+        station_lookup = {sid: index for index, sid in enumerate(flat.stations)}
+        station_match_count = np.bincount(flat.station_index[in_pairs], minlength=len(flat.stations))
 
         # 阶段2：计算各站权重
         station_weights = {}
         for sid in radar_positions:
-            if sid not in station_deviations or len(station_deviations[sid]) == 0:
+            index = station_lookup.get(sid)
+            if index is None or station_match_count[index] == 0:
                 station_weights[sid] = 1.0
                 continue
 
-            devs = np.array(station_deviations[sid])
+            # 偏差按匹配组顺序排列，方差与逐组累积的结果一致
+            devs = deviation[in_pairs & (flat.station_index == index)]
             variance = np.var(devs) if len(devs) > 1 else 1.0
 
             if self.config.weighting_method == "inverse_variance":
                 station_weights[sid] = 1.0 / (variance + 1e-10)
             elif self.config.weighting_method == "match_count":
-                station_weights[sid] = float(station_match_count.get(sid, 1))
+                station_weights[sid] = float(station_match_count[index])
             else:
                 station_weights[sid] = 1.0
 
@@ -271,105 +171,55 @@ class WeightedLstsqAlgorithm(BaseErrorAnalysisAlgorithm):
         if total_weight > 0:
             station_weights = {k: v / total_weight for k, v in station_weights.items()}
 
-        # 阶段3：离群点移除（可选）
-        outlier_removed_count = 0
-        filtered_groups = []
-
-        if self.config.outlier_removal:
-            for group in matched_groups:
-                if len(group) < 3:
-                    filtered_groups.append(group)
-                    continue
-
-                lats = np.array([p["latitude"] for p in group])
-                lons = np.array([p["longitude"] for p in group])
-                centroid_lat = np.mean(lats)
-                centroid_lon = np.mean(lons)
-
-                distances = np.sqrt(
-                    (lats - centroid_lat) ** 2 + (lons - centroid_lon) ** 2
-                )
-                mean_dist = np.mean(distances)
-                std_dist = np.std(distances) if len(distances) > 1 else 0.0
-
-                filtered = []
-                for i, point in enumerate(group):
-                    if std_dist > 0 and distances[i] > mean_dist + 3 * std_dist:
-                        outlier_removed_count += 1
-                    else:
-                        filtered.append(point)
-
-                filtered_groups.append(filtered if filtered else group)
-        else:
-            filtered_groups = matched_groups
-
-        # 阶段4：加权融合轨迹
-        fused_trajectory = []
-        for group in filtered_groups:
-            if not group:
-                continue
-
-            total_w = 0.0
-            w_lat = 0.0
-            w_lon = 0.0
-            w_alt = 0.0
-
-            for point in group:
-                sid = point["station_id"]
-                w = station_weights.get(sid, 1.0 / len(radar_positions))
-                w_lat += w * point["latitude"]
-                w_lon += w * point["longitude"]
-                w_alt += w * (point.get("altitude", 0.0) or 0.0)
-                total_w += w
-
-            if total_w > 0:
-                fused_point = {
-                    "latitude": w_lat / total_w,
-                    "longitude": w_lon / total_w,
-                    "altitude": w_alt / total_w,
-                    "match_group_size": len(group),
-                }
-
-                if group:
-                    fused_point["time_seconds"] = group[0].get("time_seconds", 0.0)
-                    fused_point["station_ids"] = [p["station_id"] for p in group]
-
-                fused_trajectory.append(fused_point)
-
-        # 阶段5：用 ErrorCalculator 计算系统误差
-        mrra_config = self._build_mrra_config()
-        error_calc = ErrorCalculator(mrra_config)
-
-        station_errors = error_calc.calculate_radar_errors(filtered_groups, radar_positions)
-
-        errors = {}
-        for sid, (az_err, range_err, elev_err) in station_errors.items():
-            errors[sid] = {
-                "azimuth_error": az_err,
-                "range_error": range_err,
-                "elevation_error": elev_err,
-            }
-
-        return {
-            "errors": errors,
-            "station_weights": {str(k): round(v, 6) for k, v in station_weights.items()},
-            "fused_trajectory": fused_trajectory,
-            "outlier_removed_count": outlier_removed_count,
-        }
+        # 阶段3：离群点移除（可选，3-sigma 准则，只处理至少 3 个点的组）
+        keep = np.ones(flat.point_count, dtype=bool)
+        if self.config.outlier_removal and flat.point_count:
+            group_mean = flat.group_mean(deviation)[flat.group_index]
+            group_std = flat.group_std(deviation)[flat.group_index]
+            outliers = (
+                (flat.group_sizes[flat.group_index] >= 3)
+                & (group_std > 0)
+                & (deviation > group_mean + 3 * group_std)
+            )
+            # 全部被移除的组保留原样
+            emptied = np.bincount(flat.group_index[~outliers], minlength=flat.group_count) == 0
+            outliers &= ~emptied[flat.group_index]
+            keep = ~outliers
+
+        outlier_removed_count = int(np.count_nonzero(~keep))
+        filtered = compact_groups(flat, keep)
+        changed = set(flat.group_index[~keep].tolist())
+        filtered_groups = [
+            [point for point, kept in zip(group, keep[start:start + len(group)]) if kept]
+            if index in changed else group
+            for index, (group, start) in enumerate(zip(matched_groups, flat.group_starts.tolist()))
+        ]
+
+        # 阶段4：加权融合轨迹（逐点累加顺序与舍入与逐组循环一致）
+        default_weight = 1.0 / len(radar_positions)
+        point_weights = np.array(
+            [station_weights.get(sid, default_weight) for sid in filtered.stations], dtype=np.float64
+        )[filtered.station_index]
+        starts, sizes = filtered.group_starts, filtered.group_sizes
+        total_w = sequential_group_sum(point_weights, starts, sizes)
+        divisor = np.where(total_w > 0, total_w, 1.0)
+        fused_lat = sequential_group_sum(point_weights * filtered.latitude, starts, sizes) / divisor
+        fused_lon = sequential_group_sum(point_weights * filtered.longitude, starts, sizes) / divisor
+        fused_alt = sequential_group_sum(point_weights * filtered.altitude, starts, sizes) / divisor
 
-    def _update_task_progress(
-        self, db: Session, task_id: str, progress: int, message: str
-    ):
-        try:
-            from app.models.error_analysis import ErrorAnalysisTask
-            task = db.query(ErrorAnalysisTask).filter(
-                ErrorAnalysisTask.task_id == task_id
-            ).first()
-            if task:
-                task.progress = progress
-                db.commit()
-        except Exception:
-            pass
+        fused_trajectory = []
+        for index in np.flatnonzero((sizes > 0) & (total_w > 0)).tolist():
+            group = filtered_groups[index]
+            fused_trajectory.append({
+                "latitude": float(fused_lat[index]),
+                "longitude": float(fused_lon[index]),
+                "altitude": float(fused_alt[index]),
+                "match_group_size": len(group),
+                "time_seconds": group[0].get("time_seconds", 0.0),
+                "station_ids": [p["station_id"] for p in group],
+            })
+
+        return station_weights, filtered_groups, fused_trajectory, outlier_removed_count
 
     @staticmethod
     def get_default_config() -> WeightedLstsqAlgorithmConfig:
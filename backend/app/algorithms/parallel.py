@@ -0,0 +1,226 @@
+"""
+并行计算工具模块
+
+为算法提供统一的多进程支持：
+- 解析并行进程数（算法配置 > 部署配置 > CPU 核数）
+- 创建进程池（Linux 下使用 fork，避免子进程重新导入整个应用），超时时直接终止子进程
+- 通过共享内存在进程间传递只读 numpy 数组，避免大数组的序列化开销
+"""
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.config import ANALYSIS_MAX_WORKERS
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 共享数组规格：名称 -> (共享内存名, 形状, dtype 字符串)
+SharedArraySpec = Dict[str, Tuple[str, Tuple[int, ...], str]]
+
+
+def resolve_worker_count(requested: int = 0, task_count: Optional[int] = None) -> int:
+    """
+    解析实际使用的并行进程数
+
+    Args:
+        requested: 算法配置中请求的进程数（0 表示使用部署默认值）
+        task_count: 待执行的任务数量（进程数不超过任务数）
+
+    Returns:
+        进程数（至少为 1）
+    """
+    if requested and requested > 0:
+        workers = requested
+    elif ANALYSIS_MAX_WORKERS > 0:
+        workers = ANALYSIS_MAX_WORKERS
+    else:
+        workers = os.cpu_count() or 1
+
+    if task_count is not None:
+        workers = min(workers, task_count)
+
+    return max(1, workers)
+
+
+def create_process_pool(
+    workers: int,
+    initializer: Optional[Callable] = None,
+    initargs: Tuple = ()
+) -> ProcessPoolExecutor:
+    """
+    创建进程池
+
+    Args:
+        workers: 进程数
+        initializer: 子进程初始化函数
+        initargs: 初始化函数参数
+
+    Returns:
+        ProcessPoolExecutor 实例
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        mp_context = multiprocessing.get_context("fork")
+    else:
+        mp_context = multiprocessing.get_context()
+
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp_context,
+        initializer=initializer,
+        initargs=initargs
+    )
+
+
+def terminate_process_pool(executor: ProcessPoolExecutor) -> None:
+    """
+    立即停止进程池：取消排队的任务并终止仍在计算的子进程
+
+    ProcessPoolExecutor.shutdown 只能取消尚未开始的任务，已在子进程中运行的任务
+    会一直算完；超时放弃的任务需要直接终止子进程才能释放 CPU。
+
+    Args:
+        executor: create_process_pool 创建的进程池
+    """
+    processes = list((getattr(executor, "_processes", None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join()
+
+
+class SharedArrays:
+    """
+    共享内存数组集合
+
+    由主进程创建并写入数据，子进程通过 spec 挂载为只读视图。
+    使用完毕后需调用 close()（或使用 with 语句）释放共享内存。
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        """
+        初始化共享内存数组
+
+        Args:
+            arrays: 数组名称 -> numpy 数组
+        """
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.spec: SharedArraySpec = {}
+
+        try:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._blocks.append(block)
+
+                view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+                view[...] = array
+                self.spec[name] = (block.name, array.shape, array.dtype.str)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """释放共享内存"""
+        for block in self._blocks:
+            try:
+                block.close()
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks = []
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+# 子进程内已挂载的共享内存（按共享内存名缓存，避免重复挂载）
+_attached_blocks: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def attach_shared_arrays(spec: SharedArraySpec) -> Dict[str, np.ndarray]:
+    """
+    在子进程中挂载共享内存数组
+
+    Args:
+        spec: SharedArrays.spec
+
+    Returns:
+        数组名称 -> 只读 numpy 视图
+    """
+    arrays: Dict[str, np.ndarray] = {}
+
+    for name, (block_name, shape, dtype) in spec.items():
+        block = _attached_blocks.get(block_name)
+        if block is None:
+            block = shared_memory.SharedMemory(name=block_name)
+            _attached_blocks[block_name] = block
+
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        view.flags.writeable = False
+        arrays[name] = view
+
+    return arrays
+
+
+def split_into_chunks(weights: np.ndarray, chunk_count: int) -> List[Tuple[int, int]]:
+    """
+    按权重将连续序列切分为负载大致均衡的若干区间
+
+    Args:
+        weights: 每个元素的计算量权重
+        chunk_count: 期望的区间数量
+
+    Returns:
+        [(起始索引, 结束索引), ...]，区间左闭右开且按顺序排列
+    """
+    n = len(weights)
+    if n == 0:
+        return []
+
+    chunk_count = max(1, min(chunk_count, n))
+    cumulative = np.cumsum(weights, dtype=np.float64)
+    total = cumulative[-1]
+
+    if total <= 0:
+        boundaries = np.linspace(0, n, chunk_count + 1).astype(np.int64)
+    else:
+        targets = total * np.arange(1, chunk_count) / chunk_count
+        inner = np.searchsorted(cumulative, targets, side='left') + 1
+        boundaries = np.concatenate(([0], inner, [n]))
+
+    boundaries = np.unique(np.clip(boundaries, 0, n))
+    return [
+        (int(start), int(end))
+        for start, end in zip(boundaries[:-1], boundaries[1:])
+        if end > start
+    ]
+
+
+def map_in_order(
+    executor: ProcessPoolExecutor,
+    func: Callable,
+    args_list: List[Tuple[Any, ...]]
+) -> List[Any]:
+    """
+    在进程池中执行任务，并按提交顺序返回结果
+
+    Args:
+        executor: 进程池
+        func: 模块级函数（需可序列化）
+        args_list: 每个任务的参数元组
+
+    Returns:
+        按提交顺序排列的结果列表
+    """
+    futures = [executor.submit(func, *args) for args in args_list]
+    return [future.result() for future in futures]
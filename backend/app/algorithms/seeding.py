@@ -0,0 +1,27 @@
+"""
+随机种子
+
+随机算法（粒子滤波、RANSAC 抽样、自助法重抽样）的种子配置为空时，每次运行自动生成一个种子并记录在结果中，
+用该种子重新运行即可复现这次结果。需要拆分到多个批次或进程的随机过程通过
+np.random.SeedSequence(seed).spawn(n) 为每个批次 / 重抽样派生独立的子种子，结果与进程数和分片方式无关。
+"""
+import secrets
+from typing import Optional
+
+# 自动生成的种子位数（保持在 JSON / JavaScript 可精确表示的整数范围内）
+GENERATED_SEED_BITS = 53
+
+
+def resolve_seed(seed: Optional[int]) -> int:
+    """
+    返回实际使用的随机种子
+
+    Args:
+        seed: 配置的种子（为空时自动生成）
+
+    Returns:
+        配置的种子，或新生成的种子
+    """
+    if seed is not None:
+        return seed
+    return secrets.randbits(GENERATED_SEED_BITS)
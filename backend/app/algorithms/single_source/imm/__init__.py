@@ -0,0 +1,4 @@
+from app.algorithms.registry import register_algorithm
+from app.algorithms.single_source.imm.algorithm import ImmAlgorithm
+
+register_algorithm(ImmAlgorithm)
@@ -0,0 +1,79 @@
+"""
+交互式多模型（IMM）滤波算法配置模型
+"""
+from pydantic import BaseModel, Field
+
+
+class ImmAlgorithmConfig(BaseModel):
+    """
+    交互式多模型滤波算法配置
+
+    用于单源盲测模式，匀速 / 协调转弯 / 匀加速三个运动模型并行滤波，适合含转弯、爬升等机动的航迹。
+    状态在以航迹首点为原点的北、东、天局部米制坐标系中估计，噪声参数均为米制单位。
+    """
+
+    # ========== 观测噪声 ==========
+    measurement_std: float = Field(
+        default=100.0, ge=1.0, le=10000.0,
+        description="测量噪声标准差（米），同时作为初始位置不确定性"
+    )
+
+    # ========== 运动模型噪声 ==========
+    cv_process_noise: float = Field(
+        default=0.1, ge=0.001, le=1000.0,
+        description="匀速模型加速度功率谱密度（m²/s³），越小直线段越平滑"
+    )
+    ct_process_noise: float = Field(
+        default=0.1, ge=0.001, le=1000.0,
+        description="协调转弯模型加速度功率谱密度（m²/s³）"
+    )
+    turn_rate_noise: float = Field(
+        default=1e-5, ge=1e-8, le=1.0,
+        description="协调转弯模型转弯率功率谱密度（rad²/s³），越大转弯率变化跟踪越快"
+    )
+    ca_process_noise: float = Field(
+        default=3.0, ge=0.001, le=1000.0,
+        description="匀加速模型加加速度功率谱密度（m²/s⁵）"
+    )
+
+    # ========== 初始不确定性 ==========
+    initial_velocity_std: float = Field(
+        default=300.0, ge=1.0, le=2000.0,
+        description="初始速度不确定性标准差（米/秒）"
+    )
+    initial_acceleration_std: float = Field(
+        default=10.0, ge=0.1, le=200.0,
+        description="初始加速度不确定性标准差（米/秒²）"
+    )
+    initial_turn_rate_std: float = Field(
+        default=0.05, ge=0.001, le=1.0,
+        description="初始转弯率不确定性标准差（弧度/秒）"
+    )
+
+    # ========== 模型切换 ==========
+    model_stay_probability: float = Field(
+        default=0.95, ge=0.5, lt=1.0,
+        description="每步保持当前运动模型的概率（越大模型切换越慢、直线段越平滑）"
+    )
+
+    # ========== 数据处理配置 ==========
+    min_track_points: int = Field(
+        default=5, ge=2, le=100,
+        description="最小航迹点数"
+    )
+    batch_workers: int = Field(default=0, ge=0, le=64, description="批次并行进程数（0 表示使用部署默认值）")
+
+    class Config:
+        use_enum_values = True
+        from_attributes = True
+        json_schema_extra = {
+            "example": {
+                "measurement_std": 100.0,
+                "cv_process_noise": 0.1,
+                "ct_process_noise": 0.1,
+                "turn_rate_noise": 1e-5,
+                "ca_process_noise": 3.0,
+                "model_stay_probability": 0.95,
+                "min_track_points": 5,
+            }
+        }
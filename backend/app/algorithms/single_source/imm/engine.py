@@ -0,0 +1,327 @@
+"""
+批量交互式多模型（IMM）滤波引擎
+
+匀速（CV）卡尔曼模型在转弯、爬升段会滞后。IMM 同时运行三个运动模型，
+按各模型对观测的似然在线调整模型概率，输出按概率加权的组合估计：
+
+- cv：匀速模型，白噪声加速度
+- ct：水平协调转弯模型（转弯率 ω 作为状态，扩展卡尔曼线性化），垂直方向匀速
+- ca：匀加速模型，白噪声加加速度
+
+三个模型共用 10 维状态 [北, 东, 天, v北, v东, v天, a北, a东, a天, ω]（米、秒、弧度），
+模型不使用的分量（cv 的加速度和 ω，ct 的加速度，ca 的 ω）在预测时重置为先验（均值 0、初始方差）。
+
+与卡尔曼批量引擎相同，航迹按点数从多到少排序后按时间步对齐，第 t 步的有效航迹是前 n_t 条；
+每步的交互（混合）、各模型预测与更新、模型概率更新和组合都对所有航迹和模型批量计算。
+"""
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+
+from app.algorithms.single_source.kalman.engine import process_noise_matrices, transition_matrices
+
+# 每块同时推进的航迹数
+IMM_BATCH_TRACKS = 1024
+
+# 模型顺序（模型概率输出按此顺序排列）
+IMM_MODELS = ("cv", "ct", "ca")
+
+# 状态维数与观测维数
+STATE_DIM = 10
+MEASUREMENT_DIM = 3
+
+# 状态分量索引
+_VELOCITY = np.arange(3, 6)
+_ACCELERATION = np.arange(6, 9)
+_TURN_RATE = 9
+
+# |ωT| 小于该值时协调转弯系数使用级数展开，避免除以接近 0 的 ω
+_SMALL_TURN_ANGLE = 1e-3
+
+
+@dataclass
+class ImmParameters:
+    """IMM 滤波参数（米制单位）"""
+    measurement_std: float          # 测量噪声标准差（米），三个位置分量相同
+    cv_process_noise: float         # cv 模型加速度功率谱密度（m²/s³）
+    ct_process_noise: float         # ct 模型加速度功率谱密度（m²/s³）
+    turn_rate_noise: float          # ct 模型转弯率功率谱密度（rad²/s³）
+    ca_process_noise: float         # ca 模型加加速度功率谱密度（m²/s⁵）
+    initial_velocity_std: float     # 初始速度标准差（米/秒）
+    initial_acceleration_std: float  # 初始加速度标准差（米/秒²）
+    initial_turn_rate_std: float    # 初始转弯率标准差（弧度/秒）
+    model_stay_probability: float   # 每步保持当前模型的概率（其余概率均分给另外两个模型）
+
+
+@dataclass
+class ImmTrackOutput:
+    """单条航迹的 IMM 滤波输出"""
+    positions: np.ndarray           # 组合位置估计，形状 (n, 3)（米）
+    covariance_traces: np.ndarray   # 组合位置协方差矩阵的迹（米²），长度 n
+    model_probabilities: np.ndarray  # 各点模型概率，形状 (n, 3)，顺序同 IMM_MODELS
+
+
+def model_transition_matrix(stay_probability: float) -> np.ndarray:
+    """模型马尔可夫转移矩阵 Π[i, j] = P(下一步为模型 j | 当前为模型 i)"""
+    model_count = len(IMM_MODELS)
+    switch = (1.0 - stay_probability) / (model_count - 1)
+    return np.full((model_count, model_count), switch) + np.eye(model_count) * (stay_probability - switch)
+
+
+def batch_imm_filter(
+    measurements: Sequence[np.ndarray],
+    intervals: Sequence[np.ndarray],
+    params: ImmParameters,
+) -> List[ImmTrackOutput]:
+    """
+    对多条航迹批量执行 CV / CT / CA 三模型 IMM 滤波
+
+    每条航迹以第一个观测为初始位置（速度、加速度、转弯率为 0），三个模型初始概率相同；
+    第一个点只做更新，之后每点先交互、按时间间隔预测再更新。
+
+    Args:
+        measurements: 各航迹的米制观测（北、东、天），形状 (n_i, 3)
+        intervals: 各航迹相邻点的时间间隔（秒），长度 n_i，第一个元素不使用
+        params: 滤波参数
+
+    Returns:
+        与输入顺序一致的各航迹滤波输出
+    """
+    lengths = np.array([len(z) for z in measurements], dtype=np.intp)
+    # 稳定排序：点数相同的航迹保持输入顺序
+    order = np.argsort(-lengths, kind="stable")
+
+    outputs: List[ImmTrackOutput] = [None] * len(measurements)
+    for start in range(0, len(order), IMM_BATCH_TRACKS):
+        chunk = order[start:start + IMM_BATCH_TRACKS]
+        chunk_outputs = _filter_chunk(
+            [np.asarray(measurements[k], dtype=np.float64) for k in chunk],
+            [np.asarray(intervals[k], dtype=np.float64) for k in chunk],
+            params,
+        )
+        for k, output in zip(chunk, chunk_outputs):
+            outputs[k] = output
+    return outputs
+
+
+def _reset_unused(Q: np.ndarray, params: ImmParameters, acceleration: bool, turn_rate: bool) -> None:
+    """
+    模型不使用的分量重置为先验（均值 0、方差为初始不确定性）
+
+    若以零方差置零，交互时其他模型的这些分量会被压缩为接近 0 的方差，
+    ct / ca 模型需要很多步才能重新估计出转弯率或加速度，机动开始段的模型切换明显滞后
+    """
+    if acceleration:
+        Q[:, _ACCELERATION, _ACCELERATION] = params.initial_acceleration_std ** 2
+    if turn_rate:
+        Q[:, _TURN_RATE, _TURN_RATE] = params.initial_turn_rate_std ** 2
+
+
+def predict_cv(x: np.ndarray, P: np.ndarray, dt: np.ndarray, params: ImmParameters):
+    """cv 模型预测（加速度和转弯率重置为先验），返回 (x, P)"""
+    F = np.zeros((len(dt), STATE_DIM, STATE_DIM))
+    F[:, :6, :6] = transition_matrices(dt)
+    Q = np.zeros_like(F)
+    Q[:, :6, :6] = process_noise_matrices(dt, params.cv_process_noise, "white_acceleration")
+    _reset_unused(Q, params, acceleration=True, turn_rate=True)
+    return np.einsum("nij,nj->ni", F, x), F @ P @ F.transpose(0, 2, 1) + Q
+
+
+def predict_ca(x: np.ndarray, P: np.ndarray, dt: np.ndarray, params: ImmParameters):
+    """ca 模型预测（白噪声加加速度，转弯率重置为先验），返回 (x, P)"""
+    F = np.zeros((len(dt), STATE_DIM, STATE_DIM))
+    F[:, :6, :6] = transition_matrices(dt)
+    idx = np.arange(3)
+    F[:, idx, _ACCELERATION] = (dt ** 2 / 2)[:, None]
+    F[:, _VELOCITY, _ACCELERATION] = dt[:, None]
+    F[:, _ACCELERATION, _ACCELERATION] = 1.0
+
+    # 每轴 Q = q × [[dt⁵/20, dt⁴/8, dt³/6], [dt⁴/8, dt³/3, dt²/2], [dt³/6, dt²/2, dt]]
+    Q = np.zeros_like(F)
+    blocks = (idx, _VELOCITY, _ACCELERATION)
+    coefficients = (
+        (dt ** 5 / 20, dt ** 4 / 8, dt ** 3 / 6),
+        (dt ** 4 / 8, dt ** 3 / 3, dt ** 2 / 2),
+        (dt ** 3 / 6, dt ** 2 / 2, dt),
+    )
+    for row, row_coefficients in zip(blocks, coefficients):
+        for column, coefficient in zip(blocks, row_coefficients):
+            Q[:, row, column] = coefficient[:, None] * params.ca_process_noise
+    _reset_unused(Q, params, acceleration=False, turn_rate=True)
+    return np.einsum("nij,nj->ni", F, x), F @ P @ F.transpose(0, 2, 1) + Q
+
+
+def predict_ct(x: np.ndarray, P: np.ndarray, dt: np.ndarray, params: ImmParameters):
+    """
+    ct 模型预测：水平协调转弯（转弯率为状态 ω），垂直匀速，加速度重置为先验
+
+    协方差按状态转移对 ω 的雅可比矩阵传播（扩展卡尔曼滤波），返回 (x, P)
+    """
+    omega = x[:, _TURN_RATE]
+    angle = omega * dt
+    small = np.abs(angle) < _SMALL_TURN_ANGLE
+    safe_omega = np.where(small, 1.0, omega)
+    sin_a, cos_a = np.sin(angle), np.cos(angle)
+
+    # a = sin(ωT) / ω，b = (1 - cos(ωT)) / ω 及其对 ω 的导数（小转角时用级数展开）
+    a = np.where(small, dt - omega ** 2 * dt ** 3 / 6, sin_a / safe_omega)
+    b = np.where(small, omega * dt ** 2 / 2 - omega ** 3 * dt ** 4 / 24, (1 - cos_a) / safe_omega)
+    da = np.where(small, -omega * dt ** 3 / 3, (dt * cos_a * omega - sin_a) / safe_omega ** 2)
+    db = np.where(small, dt ** 2 / 2 - omega ** 2 * dt ** 4 / 8, (dt * sin_a * omega - (1 - cos_a)) / safe_omega ** 2)
+
+    F = np.zeros((len(dt), STATE_DIM, STATE_DIM))
+    F[:, 0, 0] = F[:, 1, 1] = F[:, 2, 2] = 1.0
+    F[:, 0, 3], F[:, 0, 4] = a, -b
+    F[:, 1, 3], F[:, 1, 4] = b, a
+    F[:, 3, 3], F[:, 3, 4] = cos_a, -sin_a
+    F[:, 4, 3], F[:, 4, 4] = sin_a, cos_a
+    F[:, 2, 5] = dt
+    F[:, 5, 5] = 1.0
+    F[:, _TURN_RATE, _TURN_RATE] = 1.0
+    x_predicted = np.einsum("nij,nj->ni", F, x)
+
+    # 雅可比矩阵的 ω 列
+    vn, ve = x[:, 3], x[:, 4]
+    F[:, 0, _TURN_RATE] = da * vn - db * ve
+    F[:, 1, _TURN_RATE] = db * vn + da * ve
+    F[:, 3, _TURN_RATE] = -dt * (sin_a * vn + cos_a * ve)
+    F[:, 4, _TURN_RATE] = dt * (cos_a * vn - sin_a * ve)
+
+    Q = np.zeros_like(F)
+    Q[:, :6, :6] = process_noise_matrices(dt, params.ct_process_noise, "white_acceleration")
+    Q[:, _TURN_RATE, _TURN_RATE] = params.turn_rate_noise * dt
+    _reset_unused(Q, params, acceleration=True, turn_rate=False)
+    return x_predicted, F @ P @ F.transpose(0, 2, 1) + Q
+
+
+# 与 IMM_MODELS 顺序一致的各模型预测函数
+_PREDICTORS = (predict_cv, predict_ct, predict_ca)
+
+
+def _mix(
+    x: np.ndarray,
+    P: np.ndarray,
+    mu: np.ndarray,
+    transition: np.ndarray,
+):
+    """
+    IMM 交互：按模型转移概率混合各模型的状态与协方差
+
+    Args:
+        x: 各模型状态，形状 (模型数, n, 10)
+        P: 各模型协方差，形状 (模型数, n, 10, 10)
+        mu: 模型概率，形状 (n, 模型数)
+        transition: 模型转移矩阵
+
+    Returns:
+        (混合后状态, 混合后协方差, 预测模型概率 c (n, 模型数))
+    """
+    model_count, n = x.shape[:2]
+    predicted_mu = mu @ transition
+    # w[n, j, i] = P(上一步为模型 i | 当前为模型 j)
+    weights = (mu[:, None, :] * transition.T) / predicted_mu[:, :, None]
+
+    # P0_j = Σ_i w_ji (P_i + d_i d_i') - d̄_j d̄_j'，d 为相对 cv 模型状态的偏移（避免大坐标值相减的舍入误差）
+    offsets = (x - x[0]).transpose(1, 0, 2)                    # (n, i, 10)
+    second_moments = P.transpose(1, 0, 2, 3) + offsets[..., :, None] * offsets[..., None, :]
+    mixed_offsets = weights @ offsets                          # (n, j, 10)
+    P_mixed = (weights @ second_moments.reshape(n, model_count, -1)).reshape(n, model_count, STATE_DIM, STATE_DIM)
+    P_mixed -= mixed_offsets[..., :, None] * mixed_offsets[..., None, :]
+    x_mixed = mixed_offsets + x[0][:, None, :]
+    return x_mixed.transpose(1, 0, 2), P_mixed.transpose(1, 0, 2, 3), predicted_mu
+
+
+def _filter_chunk(
+    measurements: List[np.ndarray],
+    intervals: List[np.ndarray],
+    params: ImmParameters,
+) -> List[ImmTrackOutput]:
+    """滤波一块航迹（已按点数从多到少排序）"""
+    track_count = len(measurements)
+    model_count = len(IMM_MODELS)
+    lengths = np.array([len(z) for z in measurements], dtype=np.intp)
+    steps = int(lengths[0]) if track_count else 0
+
+    # 按时间步对齐的观测与时间间隔；第 t 步的有效航迹为前 active[t] 条
+    z = np.zeros((steps, track_count, MEASUREMENT_DIM))
+    dt = np.zeros((steps, track_count))
+    for k, (track_z, track_dt) in enumerate(zip(measurements, intervals)):
+        z[:lengths[k], k] = track_z
+        dt[:lengths[k], k] = track_dt
+    active = np.searchsorted(-lengths, -np.arange(steps), side="left")
+
+    transition = model_transition_matrix(params.model_stay_probability)
+    identity = np.eye(STATE_DIM)
+    R = np.eye(MEASUREMENT_DIM) * params.measurement_std ** 2
+    P0 = np.diag(
+        [params.measurement_std ** 2] * 3
+        + [params.initial_velocity_std ** 2] * 3
+        + [params.initial_acceleration_std ** 2] * 3
+        + [params.initial_turn_rate_std ** 2]
+    )
+
+    x = np.zeros((model_count, track_count, STATE_DIM))
+    x[:, :, :MEASUREMENT_DIM] = z[0] if steps else 0.0
+    P = np.broadcast_to(P0, (model_count, track_count, STATE_DIM, STATE_DIM)).copy()
+    mu = np.full((track_count, model_count), 1.0 / model_count)
+
+    positions = np.zeros((steps, track_count, MEASUREMENT_DIM))
+    traces = np.zeros((steps, track_count))
+    probabilities = np.zeros((steps, track_count, model_count))
+
+    for t in range(steps):
+        n = int(active[t])
+        xs, Ps, mus = x[:, :n], P[:, :n], mu[:n]
+
+        if t > 0:
+            xs, Ps, predicted_mu = _mix(xs, Ps, mus, transition)
+            step_dt = dt[t, :n]
+            predictions = [
+                predict(xs[m], Ps[m], step_dt, params) for m, predict in enumerate(_PREDICTORS)
+            ]
+            xs = np.stack([prediction[0] for prediction in predictions])
+            Ps = np.stack([prediction[1] for prediction in predictions])
+        else:
+            predicted_mu = mus
+
+        # 各模型更新：H 取状态的前三维，PH' 即 P 的前三列
+        PHT = Ps[..., :MEASUREMENT_DIM]
+        S = PHT[..., :MEASUREMENT_DIM, :] + R
+        S_inv = np.linalg.inv(S)
+        K = PHT @ S_inv
+        residual = z[t, :n] - xs[..., :MEASUREMENT_DIM]
+        xs = xs + np.einsum("mnij,mnj->mni", K, residual)
+
+        # Joseph 形式：P = (I - KH) P (I - KH)' + K R K'
+        I_KH = np.broadcast_to(identity, Ps.shape).copy()
+        I_KH[..., :MEASUREMENT_DIM] -= K
+        Ps = I_KH @ Ps @ I_KH.transpose(0, 1, 3, 2) + K @ R @ K.transpose(0, 1, 3, 2)
+
+        # 模型概率：μ_j ∝ c_j × N(残差; 0, S_j)，在对数域归一化避免下溢
+        _, log_det = np.linalg.slogdet(S)
+        log_likelihood = -0.5 * (np.einsum("mni,mnij,mnj->mn", residual, S_inv, residual) + log_det)
+        log_mu = np.log(predicted_mu) + log_likelihood.T
+        log_mu -= log_mu.max(axis=1, keepdims=True)
+        mus = np.exp(log_mu)
+        mus /= mus.sum(axis=1, keepdims=True)
+
+        x[:, :n], P[:, :n], mu[:n] = xs, Ps, mus
+
+        # 组合估计（只需要位置和位置协方差）
+        model_positions = xs[..., :MEASUREMENT_DIM]
+        combined = np.einsum("nm,mni->ni", mus, model_positions)
+        spread = model_positions - combined
+        position_traces = np.trace(Ps[..., :MEASUREMENT_DIM, :MEASUREMENT_DIM], axis1=2, axis2=3)
+        positions[t, :n] = combined
+        traces[t, :n] = np.einsum("nm,mn->n", mus, position_traces + (spread ** 2).sum(axis=2))
+        probabilities[t, :n] = mus
+
+    return [
+        ImmTrackOutput(
+            positions=positions[:lengths[k], k],
+            covariance_traces=traces[:lengths[k], k],
+            model_probabilities=probabilities[:lengths[k], k],
+        )
+        for k in range(track_count)
+    ]
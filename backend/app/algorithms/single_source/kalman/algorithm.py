@@ -1,15 +1,12 @@
 """
 卡尔曼滤波算法实现
 
-6 状态变量: [lat, lon, alt, v_lat, v_lon, v_alt]
-匀速运动模型
+6 状态变量: [lat, lon, alt, v_lat, v_lon, v_alt]（local_metric 坐标系下为北、东、天位置和速度，米）
+匀速运动模型，可选 RTS 后向平滑
 """
 import numpy as np
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
-from collections import defaultdict
-
-from filterpy.kalman import KalmanFilter
 
 from app.algorithms.base import (
     BaseErrorAnalysisAlgorithm,
@@ -17,12 +14,17 @@ from app.algorithms.base import (
     ProgressCallback,
 )
 from app.algorithms.single_source.kalman.config import KalmanAlgorithmConfig
-from app.models.flight_track import RadarStation, FlightTrackRaw
+from app.algorithms.single_source.kalman.engine import batch_kalman_filter
+from app.algorithms.single_source.local_frame import local_metric_frame
+from app.algorithms.single_source.runner import iter_track_groups, run_batches, summarize_track_groups
 from sqlalchemy.orm import Session
 from core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# 并行时每个分片至少包含的点数（保持批量滤波的规模）
+KALMAN_SHARD_POINTS = 20000
+
 
 class KalmanAlgorithm(BaseErrorAnalysisAlgorithm):
     """
@@ -32,7 +34,7 @@ class KalmanAlgorithm(BaseErrorAnalysisAlgorithm):
     """
 
     ALGORITHM_NAME = "kalman"
-    ALGORITHM_VERSION = "1.0.0"
+    ALGORITHM_VERSION = "1.1.0"
     ALGORITHM_DISPLAY_NAME = "卡尔曼滤波算法"
     ALGORITHM_DESCRIPTION = (
         "基于匀速运动模型的卡尔曼滤波，对单站雷达轨迹进行平滑去噪，"
@@ -75,39 +77,36 @@ class KalmanAlgorithm(BaseErrorAnalysisAlgorithm):
             if progress_callback:
                 progress_callback.on_progress(0.1, "加载轨迹数据")
 
-            # 加载原始轨迹数据
-            tracks = db_session.query(FlightTrackRaw).filter(
-                FlightTrackRaw.batch_id.in_(track_ids),
-                FlightTrackRaw.radar_station_id.in_(radar_station_ids),
-            ).order_by(FlightTrackRaw.timestamp).all()
+            # 按 (雷达站, 批次) 分组加载，点数不足的航迹不参与滤波
+            summary = summarize_track_groups(
+                db_session, track_ids, radar_station_ids, self.config.min_track_points
+            )
+            total_tracks = summary.total_groups
+            filter_groups = iter_track_groups(
+                db_session, track_ids, radar_station_ids, self.config.min_track_points
+            )
 
-            if not tracks:
+            if not total_tracks:
                 raise ValueError("没有找到指定的轨迹数据")
 
-            # 按 batch_id 分组
-            track_groups = defaultdict(list)
-            for t in tracks:
-                track_groups[t.batch_id].append(t)
-
-            total_tracks = len(track_groups)
             smoothed_all = []
             errors = {}
-            track_idx = 0
-
-            for batch_id, group in track_groups.items():
-                # 按时间排序
-                group.sort(key=lambda t: t.timestamp)
-
-                if len(group) < self.config.min_track_points:
-                    track_idx += 1
-                    continue
 
-                if progress_callback:
-                    progress = 0.1 + 0.8 * (track_idx / total_tracks)
-                    progress_callback.on_progress(progress, f"滤波处理: {batch_id}")
-
-                # 执行卡尔曼滤波
-                smoothed = self._apply_kalman_filter(group)
+            if progress_callback:
+                progress_callback.on_progress(0.2, f"批量滤波处理: {summary.group_count} 条航迹")
+
+            # 分片内的航迹一次性批量滤波，分片数据量较大时多进程并行
+            for smoothed in run_batches(
+                filter_groups,
+                len,
+                self._apply_kalman_filters,
+                total=summary.group_count,
+                total_weight=summary.point_count,
+                workers=self.config.batch_workers,
+                progress_callback=progress_callback,
+                label="卡尔曼滤波",
+                min_shard_weight=KALMAN_SHARD_POINTS,
+            ):
                 smoothed_all.extend(smoothed)
 
                 # 计算平滑前后的偏差作为"误差"
@@ -129,8 +128,6 @@ class KalmanAlgorithm(BaseErrorAnalysisAlgorithm):
                     if point.get("orig_alt") is not None and point.get("altitude") is not None:
                         errors[sid]["_alt_diff_sq"] += (point["orig_alt"] - point["altitude"]) ** 2
 
-                track_idx += 1
-
             # 计算平均偏差
             for sid in errors:
                 n = errors[sid]["_count"]
@@ -159,12 +156,16 @@ class KalmanAlgorithm(BaseErrorAnalysisAlgorithm):
                 "total_smoothed_points": len(smoothed_all),
                 "process_noise": self.config.process_noise,
                 "measurement_noise": self.config.measurement_noise,
+                "process_noise_model": self.config.process_noise_model,
+                "rts_smoothing": self.config.rts_smoothing,
+                "coordinate_frame": self.config.coordinate_frame,
             }
             result.metadata = {
                 "algorithm": "kalman",
                 "smoothed_trajectory": smoothed_all[:500],
                 "total_points": len(smoothed_all),
             }
+            result.trajectory = smoothed_all
 
             logger.info(f"[{task_id}] 卡尔曼滤波完成，处理 {len(smoothed_all)} 个点")
             return result
@@ -178,72 +179,80 @@ class KalmanAlgorithm(BaseErrorAnalysisAlgorithm):
 
     def _apply_kalman_filter(self, points: List) -> List[Dict]:
         """对一组轨迹点应用卡尔曼滤波"""
-        kf = KalmanFilter(dim_x=6, dim_z=3)
-
-        # 初始状态
-        dt = 1.0
-        kf.F = np.array([
-            [1, 0, 0, dt, 0, 0],
-            [0, 1, 0, 0, dt, 0],
-            [0, 0, 1, 0, 0, dt],
-            [0, 0, 0, 1, 0, 0],
-            [0, 0, 0, 0, 1, 0],
-            [0, 0, 0, 0, 0, 1],
-        ])
-
-        kf.H = np.array([
-            [1, 0, 0, 0, 0, 0],
-            [0, 1, 0, 0, 0, 0],
-            [0, 0, 1, 0, 0, 0],
-        ])
-
-        kf.Q = np.eye(6) * self.config.process_noise
-        kf.R = np.eye(3) * self.config.measurement_noise
-        kf.P = np.eye(6) * self.config.initial_uncertainty
-
-        # 初始化
-        first = points[0]
-        kf.x = np.array([
-            first.latitude, first.longitude, first.altitude or 0,
-            0, 0, 0
-        ]).reshape(6, 1)
+        return self._apply_kalman_filters([points])[0]
+
+    def _apply_kalman_filters(self, groups: List[List]) -> List[List[Dict]]:
+        """
+        对多组轨迹点批量应用卡尔曼滤波（匀速模型，见 engine.batch_kalman_filter）
+
+        local_metric 坐标系下每条航迹以首点为原点换算为米制坐标滤波，结果再换算回经纬度
+
+        Args:
+            groups: 各航迹按时间排序的轨迹点
+
+        Returns:
+            与 groups 顺序一致的各航迹滤波结果
+        """
+        measurements = []
+        intervals = []
+        for points in groups:
+            measurements.append(np.array(
+                [(p.latitude, p.longitude, p.altitude or 0) for p in points], dtype=np.float64
+            ))
+            # 实际时间间隔（下限 0.1 秒），第一个点只做更新
+            intervals.append(np.array([0.0] + [
+                max((points[i].timestamp - points[i - 1].timestamp).total_seconds(), 0.1)
+                for i in range(1, len(points))
+            ]))
+
+        config = self.config
+        if config.coordinate_frame == "local_metric":
+            frames = [local_metric_frame(z[0]) for z in measurements]
+            measurements = [frame.to_local(z) for frame, z in zip(frames, measurements)]
+            measurement_variance = config.metric_measurement_std ** 2
+            outputs = batch_kalman_filter(
+                measurements,
+                intervals,
+                process_noise=config.metric_process_noise,
+                measurement_noise=measurement_variance,
+                initial_uncertainty=measurement_variance,
+                initial_velocity_uncertainty=config.metric_initial_velocity_std ** 2,
+                process_noise_model=config.process_noise_model,
+                smooth=config.rts_smoothing,
+            )
+            for frame, output in zip(frames, outputs):
+                output.positions = frame.to_geodetic(output.positions)
+        else:
+            outputs = batch_kalman_filter(
+                measurements,
+                intervals,
+                process_noise=config.process_noise,
+                measurement_noise=config.measurement_noise,
+                initial_uncertainty=config.initial_uncertainty,
+                process_noise_model=config.process_noise_model,
+                smooth=config.rts_smoothing,
+            )
 
         results = []
-        for i, point in enumerate(points):
-            if i > 0:
-                # 计算实际时间间隔
-                dt_actual = (point.timestamp - points[i-1].timestamp).total_seconds()
-                dt_actual = max(dt_actual, 0.1)
-
-                kf.F = np.array([
-                    [1, 0, 0, dt_actual, 0, 0],
-                    [0, 1, 0, 0, dt_actual, 0],
-                    [0, 0, 1, 0, 0, dt_actual],
-                    [0, 0, 0, 1, 0, 0],
-                    [0, 0, 0, 0, 1, 0],
-                    [0, 0, 0, 0, 0, 1],
-                ])
-
-                kf.predict()
-
-            measurement = np.array([
-                point.latitude, point.longitude, point.altitude or 0
+        for points, output in zip(groups, outputs):
+            positions = output.positions.tolist()
+            traces = output.covariance_traces.tolist()
+            results.append([
+                {
+                    "batch_id": point.batch_id,
+                    "station_id": point.radar_station_id,
+                    "timestamp": point.timestamp.isoformat() if point.timestamp else None,
+                    "latitude": lat,
+                    "longitude": lon,
+                    "altitude": alt,
+                    "orig_lat": point.latitude,
+                    "orig_lon": point.longitude,
+                    "orig_alt": point.altitude or 0,
+                    "covariance_trace": trace,
+                    "is_original": 0,
+                }
+                for point, (lat, lon, alt), trace in zip(points, positions, traces)
             ])
-            kf.update(measurement)
-
-            results.append({
-                "batch_id": point.batch_id,
-                "station_id": point.radar_station_id,
-                "timestamp": point.timestamp.isoformat() if point.timestamp else None,
-                "latitude": float(kf.x[0, 0]),
-                "longitude": float(kf.x[1, 0]),
-                "altitude": float(kf.x[2, 0]),
-                "orig_lat": point.latitude,
-                "orig_lon": point.longitude,
-                "orig_alt": point.altitude or 0,
-                "covariance_trace": float(np.trace(kf.P)),
-                "is_original": 0,
-            })
 
         return results
 
@@ -269,4 +278,9 @@ class KalmanAlgorithm(BaseErrorAnalysisAlgorithm):
                 process_noise=1.0,
                 measurement_noise=0.1,
             ),
+            "rts_metric": KalmanAlgorithmConfig(
+                process_noise_model="white_acceleration",
+                rts_smoothing=True,
+                coordinate_frame="local_metric",
+            ),
         }
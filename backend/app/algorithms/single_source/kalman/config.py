@@ -1,7 +1,7 @@
 """
 卡尔曼滤波算法配置模型
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class KalmanAlgorithmConfig(BaseModel):
@@ -25,11 +25,46 @@ class KalmanAlgorithmConfig(BaseModel):
         description="初始状态不确定性"
     )
 
+    # ========== 运动模型配置 ==========
+    process_noise_model: str = Field(
+        default="constant",
+        description=(
+            "过程噪声模型：constant（Q = I × 过程噪声，与时间间隔无关）/ "
+            "white_acceleration（白噪声加速度模型，Q 随时间间隔缩放）"
+        )
+    )
+    rts_smoothing: bool = Field(
+        default=False,
+        description="前向滤波后执行 Rauch–Tung–Striebel 后向平滑（改善航迹起始段，协方差迹为平滑后的值）"
+    )
+    coordinate_frame: str = Field(
+        default="geodetic",
+        description=(
+            "状态坐标系：geodetic（直接使用经纬度）/ "
+            "local_metric（以航迹首点为原点的北、东、天局部米制坐标，使用下方米制噪声参数）"
+        )
+    )
+
+    # ========== 米制坐标系噪声参数（coordinate_frame=local_metric） ==========
+    metric_process_noise: float = Field(
+        default=1.0, ge=0.001, le=1000.0,
+        description="米制坐标系过程噪声（white_acceleration 模型为加速度功率谱密度，m²/s³）"
+    )
+    metric_measurement_std: float = Field(
+        default=100.0, ge=1.0, le=10000.0,
+        description="米制坐标系测量噪声标准差（米），同时作为初始位置不确定性"
+    )
+    metric_initial_velocity_std: float = Field(
+        default=300.0, ge=1.0, le=2000.0,
+        description="米制坐标系初始速度不确定性标准差（米/秒）"
+    )
+
     # ========== 数据处理配置 ==========
     min_track_points: int = Field(
         default=5, ge=2, le=100,
         description="最小航迹点数"
     )
+    batch_workers: int = Field(default=0, ge=0, le=64, description="批次并行进程数（0 表示使用部署默认值）")
 
     class Config:
         use_enum_values = True
@@ -39,6 +74,25 @@ class KalmanAlgorithmConfig(BaseModel):
                 "process_noise": 0.1,
                 "measurement_noise": 1.0,
                 "initial_uncertainty": 100.0,
+                "process_noise_model": "constant",
+                "rts_smoothing": False,
+                "coordinate_frame": "geodetic",
                 "min_track_points": 5,
             }
         }
+
+    @field_validator('process_noise_model')
+    @classmethod
+    def validate_process_noise_model(cls, v: str) -> str:
+        """验证过程噪声模型"""
+        if v not in ("constant", "white_acceleration"):
+            raise ValueError(f"不支持的过程噪声模型: {v}")
+        return v
+
+    @field_validator('coordinate_frame')
+    @classmethod
+    def validate_coordinate_frame(cls, v: str) -> str:
+        """验证状态坐标系"""
+        if v not in ("geodetic", "local_metric"):
+            raise ValueError(f"不支持的状态坐标系: {v}")
+        return v
@@ -0,0 +1,244 @@
+"""
+批量卡尔曼滤波引擎
+
+逐点调用 filterpy 的 predict / update 时，6×6 小矩阵运算的 Python 调用开销远大于计算本身。
+这里把多条航迹按时间步对齐，状态和协方差堆叠为 (航迹数, 6, 6) 数组，
+每个时间步用批量矩阵乘法同时推进所有航迹：
+
+- 航迹按点数从多到少排序，第 t 步仍有观测的航迹正好是前 n_t 条，直接取前缀计算，
+  长度不一的航迹不需要填充无效步
+- 航迹数很多时按 KALMAN_BATCH_TRACKS 分块，块内航迹长度相近，中间数组的内存可控
+
+每步的计算与 filterpy.kalman.KalmanFilter 相同（匀速模型，Joseph 形式的协方差更新），
+结果与逐航迹使用 filterpy 的结果在浮点舍入范围内一致。
+
+可选的 Rauch–Tung–Striebel 后向平滑（与 KalmanFilter.rts_smoother 相同）需要保存
+每步的滤波状态和协方差，此时按 KALMAN_SMOOTHER_MAX_ELEMENTS 限制每块的航迹数。
+
+过程噪声模型：
+- constant：Q = I × process_noise，与时间间隔无关（原有行为）
+- white_acceleration：连续白噪声加速度模型，每轴 Q = q × [[dt³/3, dt²/2], [dt²/2, dt]]，
+  随时间间隔正确缩放（q 为加速度噪声的功率谱密度）
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+# 每块同时推进的航迹数
+KALMAN_BATCH_TRACKS = 2048
+
+# 后向平滑时每块保存的滤波协方差元素数上限（步数 × 航迹数 × 36）
+KALMAN_SMOOTHER_MAX_ELEMENTS = 8_000_000
+
+# 支持的过程噪声模型
+PROCESS_NOISE_MODELS = ("constant", "white_acceleration")
+
+# 状态维数 [lat, lon, alt, v_lat, v_lon, v_alt] 与观测维数 [lat, lon, alt]
+STATE_DIM = 6
+MEASUREMENT_DIM = 3
+
+
+@dataclass
+class KalmanTrackOutput:
+    """单条航迹的滤波输出（启用后向平滑时为平滑结果）"""
+    positions: np.ndarray           # 滤波后位置，形状 (n, 3)，与观测同单位
+    covariance_traces: np.ndarray   # 各点状态协方差矩阵的迹，长度 n
+
+
+def batch_kalman_filter(
+    measurements: Sequence[np.ndarray],
+    intervals: Sequence[np.ndarray],
+    process_noise: float,
+    measurement_noise: float,
+    initial_uncertainty: float,
+    initial_velocity_uncertainty: Optional[float] = None,
+    process_noise_model: str = "constant",
+    smooth: bool = False,
+) -> List[KalmanTrackOutput]:
+    """
+    对多条航迹批量执行匀速模型卡尔曼滤波
+
+    每条航迹以第一个观测为初始位置（速度为 0），第一个点只做更新，之后每点先按时间间隔预测再更新。
+
+    Args:
+        measurements: 各航迹的观测（三个位置分量），形状 (n_i, 3)
+        intervals: 各航迹相邻点的时间间隔（秒），长度 n_i，第一个元素不使用
+        process_noise: 过程噪声（constant 模型为 Q 的对角元素，white_acceleration 模型为功率谱密度）
+        measurement_noise: 测量噪声（R = I × measurement_noise）
+        initial_uncertainty: 初始位置不确定性（P0 位置分量的方差）
+        initial_velocity_uncertainty: 初始速度不确定性（P0 速度分量的方差），为空时与位置相同
+        process_noise_model: 过程噪声模型，constant 或 white_acceleration
+        smooth: 是否执行 RTS 后向平滑
+
+    Returns:
+        与输入顺序一致的各航迹滤波（或平滑）输出
+    """
+    if process_noise_model not in PROCESS_NOISE_MODELS:
+        raise ValueError(f"不支持的过程噪声模型: {process_noise_model}")
+    if initial_velocity_uncertainty is None:
+        initial_velocity_uncertainty = initial_uncertainty
+    P0 = np.diag([initial_uncertainty] * MEASUREMENT_DIM + [initial_velocity_uncertainty] * MEASUREMENT_DIM)
+
+    lengths = np.array([len(z) for z in measurements], dtype=np.intp)
+    # 稳定排序：点数相同的航迹保持输入顺序
+    order = np.argsort(-lengths, kind="stable")
+
+    outputs: List[KalmanTrackOutput] = [None] * len(measurements)
+    start = 0
+    while start < len(order):
+        chunk_size = KALMAN_BATCH_TRACKS
+        if smooth:
+            steps = max(int(lengths[order[start]]), 1)
+            chunk_size = min(chunk_size, max(1, KALMAN_SMOOTHER_MAX_ELEMENTS // (steps * STATE_DIM ** 2)))
+        chunk = order[start:start + chunk_size]
+        chunk_outputs = _filter_chunk(
+            [np.asarray(measurements[k], dtype=np.float64) for k in chunk],
+            [np.asarray(intervals[k], dtype=np.float64) for k in chunk],
+            process_noise, measurement_noise, P0, process_noise_model, smooth
+        )
+        for k, output in zip(chunk, chunk_outputs):
+            outputs[k] = output
+        start += chunk_size
+    return outputs
+
+
+def transition_matrices(dt: np.ndarray) -> np.ndarray:
+    """匀速模型状态转移矩阵，形状 (n, 6, 6)"""
+    F = np.broadcast_to(np.eye(STATE_DIM), (len(dt), STATE_DIM, STATE_DIM)).copy()
+    idx = np.arange(MEASUREMENT_DIM)
+    F[:, idx, idx + MEASUREMENT_DIM] = dt[:, None]
+    return F
+
+
+def process_noise_matrices(dt: np.ndarray, process_noise: float, model: str) -> np.ndarray:
+    """
+    过程噪声协方差矩阵
+
+    Args:
+        dt: 各航迹的时间间隔（秒）
+        process_noise: 过程噪声强度
+        model: constant 或 white_acceleration
+
+    Returns:
+        形状 (n, 6, 6) 的 Q
+    """
+    if model == "constant":
+        return np.broadcast_to(np.eye(STATE_DIM) * process_noise, (len(dt), STATE_DIM, STATE_DIM))
+
+    Q = np.zeros((len(dt), STATE_DIM, STATE_DIM))
+    idx = np.arange(MEASUREMENT_DIM)
+    Q[:, idx, idx] = (dt ** 3 / 3)[:, None]
+    Q[:, idx, idx + MEASUREMENT_DIM] = Q[:, idx + MEASUREMENT_DIM, idx] = (dt ** 2 / 2)[:, None]
+    Q[:, idx + MEASUREMENT_DIM, idx + MEASUREMENT_DIM] = dt[:, None]
+    return Q * process_noise
+
+
+def _filter_chunk(
+    measurements: List[np.ndarray],
+    intervals: List[np.ndarray],
+    process_noise: float,
+    measurement_noise: float,
+    P0: np.ndarray,
+    process_noise_model: str,
+    smooth: bool,
+) -> List[KalmanTrackOutput]:
+    """滤波一块航迹（已按点数从多到少排序）"""
+    track_count = len(measurements)
+    lengths = np.array([len(z) for z in measurements], dtype=np.intp)
+    steps = int(lengths[0]) if track_count else 0
+
+    # 按时间步对齐的观测与时间间隔，形状 (步数, 航迹数, ...)；第 t 步的有效航迹为前 active[t] 条
+    z = np.zeros((steps, track_count, MEASUREMENT_DIM))
+    dt = np.zeros((steps, track_count))
+    for k, (track_z, track_dt) in enumerate(zip(measurements, intervals)):
+        z[:lengths[k], k] = track_z
+        dt[:lengths[k], k] = track_dt
+    active = np.searchsorted(-lengths, -np.arange(steps), side="left")
+
+    identity = np.eye(STATE_DIM)
+    R = np.eye(MEASUREMENT_DIM) * measurement_noise
+
+    x = np.zeros((track_count, STATE_DIM))
+    x[:, :MEASUREMENT_DIM] = z[0] if steps else 0.0
+    P = np.broadcast_to(P0, (track_count, STATE_DIM, STATE_DIM)).copy()
+
+    # 后向平滑需要每步的滤波结果
+    if smooth:
+        x_filtered = np.zeros((steps, track_count, STATE_DIM))
+        P_filtered = np.zeros((steps, track_count, STATE_DIM, STATE_DIM))
+    positions = np.zeros((steps, track_count, MEASUREMENT_DIM))
+    traces = np.zeros((steps, track_count))
+
+    for t in range(steps):
+        n = int(active[t])
+        xs, Ps = x[:n], P[:n]
+
+        if t > 0:
+            # 预测：x = F x，P = F P F' + Q
+            F = transition_matrices(dt[t, :n])
+            xs = np.einsum("nij,nj->ni", F, xs)
+            Ps = F @ Ps @ F.transpose(0, 2, 1) + process_noise_matrices(dt[t, :n], process_noise, process_noise_model)
+
+        # 更新：H 取状态的前三维，PH' 即 P 的前三列
+        PHT = Ps[:, :, :MEASUREMENT_DIM]
+        S = PHT[:, :MEASUREMENT_DIM, :] + R
+        K = PHT @ np.linalg.inv(S)
+        xs = xs + np.einsum("nij,nj->ni", K, z[t, :n] - xs[:, :MEASUREMENT_DIM])
+
+        # Joseph 形式：P = (I - KH) P (I - KH)' + K R K'
+        I_KH = np.broadcast_to(identity, Ps.shape).copy()
+        I_KH[:, :, :MEASUREMENT_DIM] -= K
+        Ps = I_KH @ Ps @ I_KH.transpose(0, 2, 1) + K @ R @ K.transpose(0, 2, 1)
+
+        x[:n], P[:n] = xs, Ps
+        if smooth:
+            x_filtered[t, :n], P_filtered[t, :n] = xs, Ps
+        else:
+            positions[t, :n] = xs[:, :MEASUREMENT_DIM]
+            traces[t, :n] = np.trace(Ps, axis1=1, axis2=2)
+
+    if smooth and steps:
+        _rts_backward(x_filtered, P_filtered, dt, active, process_noise, process_noise_model)
+        positions = x_filtered[:, :, :MEASUREMENT_DIM]
+        traces = np.trace(P_filtered, axis1=2, axis2=3)
+
+    return [
+        KalmanTrackOutput(positions=positions[:lengths[k], k], covariance_traces=traces[:lengths[k], k])
+        for k in range(track_count)
+    ]
+
+
+def _rts_backward(
+    x: np.ndarray,
+    P: np.ndarray,
+    dt: np.ndarray,
+    active: np.ndarray,
+    process_noise: float,
+    process_noise_model: str,
+) -> None:
+    """
+    Rauch–Tung–Striebel 后向平滑（原地把滤波结果替换为平滑结果）
+
+    每条航迹的最后一点平滑结果即滤波结果；第 t 步只更新第 t + 1 步仍有观测的航迹（前 active[t + 1] 条）。
+
+    Args:
+        x: 各步滤波状态，形状 (步数, 航迹数, 6)
+        P: 各步滤波协方差，形状 (步数, 航迹数, 6, 6)
+        dt: 各步时间间隔，形状 (步数, 航迹数)
+        active: 各步有观测的航迹数
+        process_noise: 过程噪声强度
+        process_noise_model: 过程噪声模型
+    """
+    for t in range(x.shape[0] - 2, -1, -1):
+        n = int(active[t + 1])
+        F = transition_matrices(dt[t + 1, :n])
+        Q = process_noise_matrices(dt[t + 1, :n], process_noise, process_noise_model)
+
+        x_t, P_t = x[t, :n], P[t, :n]
+        P_predicted = F @ P_t @ F.transpose(0, 2, 1) + Q
+        # C = P F' inv(P_predicted)
+        C = P_t @ F.transpose(0, 2, 1) @ np.linalg.inv(P_predicted)
+
+        x[t, :n] = x_t + np.einsum("nij,nj->ni", C, x[t + 1, :n] - np.einsum("nij,nj->ni", F, x_t))
+        P[t, :n] = P_t + C @ (P[t + 1, :n] - P_predicted) @ C.transpose(0, 2, 1)
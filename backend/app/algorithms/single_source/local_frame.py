@@ -0,0 +1,53 @@
+"""
+航迹局部米制坐标系
+
+以航迹第一个点为原点，用该纬度处 WGS84 椭球的子午圈、卯酉圈曲率半径
+把经纬度线性换算为东向、北向距离（米），高度直接作为天向坐标。
+换算是线性的，可以精确还原为经纬度；单条航迹覆盖范围内（数百公里）
+与严格 ENU 的差异只影响运动模型的"直线"定义，对滤波平滑没有实际影响。
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.algorithms.multi_source.preprocessing.geometry import WGS84_A, WGS84_E2
+
+
+@dataclass
+class LocalMetricFrame:
+    """航迹局部米制坐标系"""
+    origin: np.ndarray          # 原点 (lat, lon, alt)
+    meters_per_degree: np.ndarray   # (北向 米/度纬度, 东向 米/度经度, 1.0)
+
+    def to_local(self, positions: np.ndarray) -> np.ndarray:
+        """(lat, lon, alt) -> (北, 东, 天)（米），形状 (n, 3)"""
+        return (positions - self.origin) * self.meters_per_degree
+
+    def to_geodetic(self, local: np.ndarray) -> np.ndarray:
+        """(北, 东, 天)（米） -> (lat, lon, alt)，形状 (n, 3)"""
+        return local / self.meters_per_degree + self.origin
+
+
+def local_metric_frame(origin: np.ndarray) -> LocalMetricFrame:
+    """
+    以给定点为原点构建局部米制坐标系
+
+    Args:
+        origin: 原点 (lat, lon, alt)
+
+    Returns:
+        LocalMetricFrame
+    """
+    origin = np.asarray(origin, dtype=np.float64)
+    lat = np.radians(origin[0])
+    denominator = 1.0 - WGS84_E2 * np.sin(lat) ** 2
+    meridian = WGS84_A * (1.0 - WGS84_E2) / denominator ** 1.5
+    prime_vertical = WGS84_A / np.sqrt(denominator)
+    return LocalMetricFrame(
+        origin=origin,
+        meters_per_degree=np.array([
+            np.radians(meridian),
+            np.radians(prime_vertical * np.cos(lat)),
+            1.0,
+        ]),
+    )
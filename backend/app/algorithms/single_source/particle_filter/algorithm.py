@@ -3,19 +3,24 @@
 
 状态空间: [lat, lon, alt, v_lat, v_lon, v_alt]
 使用系统重采样策略
+
+粒子状态为 (N, 6) 数组，每步用一次 (N, 6) 标准正态抽样乘以各维噪声标准差完成预测，
+重采样在累积权重上用 np.searchsorted 一次定位所有粒子。
+各批次的随机数来自由 random_seed 派生的独立 np.random.Generator，种子相同则结果可复现，
+且与批次并行的分片方式无关；random_seed 为空时自动生成种子并记录在 match_statistics 中。
 """
 import numpy as np
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
-from collections import defaultdict
 
 from app.algorithms.base import (
     BaseErrorAnalysisAlgorithm,
     AnalysisResult,
     ProgressCallback,
 )
+from app.algorithms.seeding import resolve_seed
 from app.algorithms.single_source.particle_filter.config import ParticleFilterAlgorithmConfig
-from app.models.flight_track import FlightTrackRaw
+from app.algorithms.single_source.runner import iter_track_groups, run_batches, summarize_track_groups
 from sqlalchemy.orm import Session
 from core.logging import get_logger
 
@@ -30,7 +35,7 @@ class ParticleFilterAlgorithm(BaseErrorAnalysisAlgorithm):
     """
 
     ALGORITHM_NAME = "particle_filter"
-    ALGORITHM_VERSION = "1.0.0"
+    ALGORITHM_VERSION = "1.1.0"
     ALGORITHM_DISPLAY_NAME = "粒子滤波算法"
     ALGORITHM_DESCRIPTION = (
         "基于蒙特卡洛方法的粒子滤波，适用于非线性非高斯噪声场景，"
@@ -73,35 +78,37 @@ class ParticleFilterAlgorithm(BaseErrorAnalysisAlgorithm):
             if progress_callback:
                 progress_callback.on_progress(0.1, "加载轨迹数据")
 
-            tracks = db_session.query(FlightTrackRaw).filter(
-                FlightTrackRaw.batch_id.in_(track_ids),
-                FlightTrackRaw.radar_station_id.in_(radar_station_ids),
-            ).order_by(FlightTrackRaw.timestamp).all()
+            # 按 (雷达站, 批次) 分组加载，点数不足的航迹不参与滤波
+            summary = summarize_track_groups(
+                db_session, track_ids, radar_station_ids, self.config.min_track_points
+            )
+            total_tracks = summary.total_groups
+            filter_groups = iter_track_groups(
+                db_session, track_ids, radar_station_ids, self.config.min_track_points
+            )
 
-            if not tracks:
+            if not total_tracks:
                 raise ValueError("没有找到指定的轨迹数据")
 
-            track_groups = defaultdict(list)
-            for t in tracks:
-                track_groups[t.batch_id].append(t)
-
-            total_tracks = len(track_groups)
             smoothed_all = []
             errors = {}
-            track_idx = 0
-
-            for batch_id, group in track_groups.items():
-                group.sort(key=lambda t: t.timestamp)
-
-                if len(group) < self.config.min_track_points:
-                    track_idx += 1
-                    continue
 
-                if progress_callback:
-                    progress = 0.1 + 0.8 * (track_idx / total_tracks)
-                    progress_callback.on_progress(progress, f"粒子滤波: {batch_id}")
-
-                smoothed = self._apply_particle_filter(group)
+            # 每个航迹使用独立的随机数序列，结果与分片和进程数无关；
+            # 子序列按航迹顺序逐个派生，与一次派生全部子序列结果相同
+            random_seed = resolve_seed(self.config.random_seed)
+            seed_sequence = np.random.SeedSequence(random_seed)
+
+            for smoothed in run_batches(
+                ((group, seed_sequence.spawn(1)[0]) for group in filter_groups),
+                lambda task: len(task[0]),
+                self._apply_particle_filters,
+                total=summary.group_count,
+                total_weight=summary.point_count,
+                workers=self.config.batch_workers,
+                progress_callback=progress_callback,
+                progress_range=(0.1, 0.9),
+                label="粒子滤波",
+            ):
                 smoothed_all.extend(smoothed)
 
                 for point in smoothed:
@@ -115,8 +122,6 @@ class ParticleFilterAlgorithm(BaseErrorAnalysisAlgorithm):
                     if point.get("orig_alt") is not None:
                         errors[sid]["_alt_diff_sq"] += (point["orig_alt"] - point["altitude"]) ** 2
 
-                track_idx += 1
-
             for sid in errors:
                 n = errors[sid]["_count"]
                 if n > 0:
@@ -137,12 +142,15 @@ class ParticleFilterAlgorithm(BaseErrorAnalysisAlgorithm):
                 "total_tracks": total_tracks,
                 "total_smoothed_points": len(smoothed_all),
                 "num_particles": self.config.num_particles,
+                "particle_dtype": self.config.particle_dtype,
+                "random_seed": random_seed,
             }
             result.metadata = {
                 "algorithm": "particle_filter",
                 "smoothed_trajectory": smoothed_all[:500],
                 "total_points": len(smoothed_all),
             }
+            result.trajectory = smoothed_all
 
             logger.info(f"[{task_id}] 粒子滤波完成，处理 {len(smoothed_all)} 个点")
             return result
@@ -154,53 +162,78 @@ class ParticleFilterAlgorithm(BaseErrorAnalysisAlgorithm):
             result.completed_at = datetime.now()
             return result
 
-    def _apply_particle_filter(self, points: List) -> List[Dict]:
-        """对一组轨迹点应用粒子滤波"""
+    def _noise_scales(self) -> np.ndarray:
+        """预测噪声各维标准差 [lat, lon, alt, v_lat, v_lon, v_alt]"""
+        std = self.config.process_noise_std
+        return np.array([std, std, std * 100, std * 0.1, std * 0.1, std * 10])
+
+    def _apply_particle_filters(self, tasks: List[Tuple[List, np.random.SeedSequence]]) -> List[List[Dict]]:
+        """
+        对多组轨迹点逐组应用粒子滤波（单源批次执行器的分片处理函数）
+
+        Args:
+            tasks: [(按时间排序的轨迹点, 该批次的随机种子), ...]
+
+        Returns:
+            与 tasks 顺序一致的各批次滤波结果
+        """
+        return [self._apply_particle_filter(points, np.random.default_rng(seed)) for points, seed in tasks]
+
+    def _apply_particle_filter(self, points: List, rng: Optional[np.random.Generator] = None) -> List[Dict]:
+        """
+        对一组轨迹点应用粒子滤波
+
+        Args:
+            points: 按时间排序的轨迹点
+            rng: 随机数生成器，为空时按 random_seed 新建
+
+        Returns:
+            各点的滤波结果
+        """
+        if rng is None:
+            rng = np.random.default_rng(self.config.random_seed)
         N = self.config.num_particles
-        dim = 6  # [lat, lon, alt, v_lat, v_lon, v_alt]
+        dtype = np.dtype(self.config.particle_dtype)
+        scales = self._noise_scales().astype(dtype)
+        threshold = N * self.config.effective_particle_threshold
+        measurement_scale = 2 * self.config.measurement_noise_std ** 2
 
-        # 初始化粒子
+        # 初始化粒子（位置加初始噪声，速度为 0）
         first = points[0]
-        particles = np.zeros((N, dim))
-        particles[:, 0] = first.latitude + np.random.normal(0, self.config.process_noise_std, N)
-        particles[:, 1] = first.longitude + np.random.normal(0, self.config.process_noise_std, N)
-        particles[:, 2] = (first.altitude or 0) + np.random.normal(0, self.config.process_noise_std * 100, N)
-        particles[:, 3:6] = 0.0
+        particles = np.zeros((N, 6), dtype=dtype)
+        particles[:, :3] = (
+            np.array([first.latitude, first.longitude, first.altitude or 0], dtype=dtype)
+            + rng.standard_normal((N, 3), dtype=dtype) * scales[:3]
+        )
 
-        weights = np.ones(N) / N
+        times = [p.timestamp for p in points]
+        observations = np.array([(p.latitude, p.longitude, p.altitude or 0) for p in points], dtype=dtype)
 
         results = []
         for i, point in enumerate(points):
             if i > 0:
-                dt = (point.timestamp - points[i-1].timestamp).total_seconds()
-                dt = max(dt, 0.1)
-
-                # 预测（匀速模型 + 过程噪声）
-                particles[:, 0] += particles[:, 3] * dt + np.random.normal(0, self.config.process_noise_std, N)
-                particles[:, 1] += particles[:, 4] * dt + np.random.normal(0, self.config.process_noise_std, N)
-                particles[:, 2] += particles[:, 5] * dt + np.random.normal(0, self.config.process_noise_std * 100, N)
-
-                # 速度也加小噪声
-                particles[:, 3] += np.random.normal(0, self.config.process_noise_std * 0.1, N)
-                particles[:, 4] += np.random.normal(0, self.config.process_noise_std * 0.1, N)
-                particles[:, 5] += np.random.normal(0, self.config.process_noise_std * 10, N)
-
-            # 更新权重（高斯似然）
-            obs = np.array([point.latitude, point.longitude, point.altitude or 0])
-            diff = particles[:, :3] - obs
-            dist_sq = np.sum(diff ** 2, axis=1)
-            weights = np.exp(-dist_sq / (2 * self.config.measurement_noise_std ** 2))
+                dt = max((times[i] - times[i - 1]).total_seconds(), 0.1)
+
+                # 预测（匀速模型 + 过程噪声），6 维噪声一次抽样
+                noise = rng.standard_normal((N, 6), dtype=dtype)
+                noise *= scales
+                particles[:, :3] += particles[:, 3:] * dtype.type(dt)
+                particles += noise
+
+            # 更新权重（高斯似然），权重始终用 float64 计算以免下溢
+            diff = particles[:, :3] - observations[i]
+            dist_sq = np.einsum("ij,ij->i", diff, diff).astype(np.float64)
+            weights = np.exp(-dist_sq / measurement_scale)
             weights += 1e-300
             weights /= weights.sum()
 
             # 估计状态（加权平均）
-            state = np.average(particles, weights=weights, axis=0)
+            state = weights @ particles
 
             # 有效粒子数检查
-            n_eff = 1.0 / np.sum(weights ** 2)
-            if n_eff < N * self.config.effective_particle_threshold:
-                particles = self._resample(particles, weights)
-                weights = np.ones(N) / N
+            n_eff = 1.0 / np.dot(weights, weights)
+            if n_eff < threshold:
+                particles = self._resample(particles, weights, rng)
 
             results.append({
                 "batch_id": point.batch_id,
@@ -217,26 +250,30 @@ class ParticleFilterAlgorithm(BaseErrorAnalysisAlgorithm):
 
         return results
 
-    def _resample(self, particles: np.ndarray, weights: np.ndarray) -> np.ndarray:
-        """系统重采样"""
+    def _resample(
+        self,
+        particles: np.ndarray,
+        weights: np.ndarray,
+        rng: Optional[np.random.Generator] = None,
+    ) -> np.ndarray:
+        """
+        系统（或多项式）重采样
+
+        第 i 个采样位置选中累积权重中第一个大于它的粒子，用 np.searchsorted 一次完成
+        """
+        if rng is None:
+            rng = np.random.default_rng(self.config.random_seed)
         N = len(weights)
-        indices = np.zeros(N, dtype=int)
 
         if self.config.resampling_method == "systematic":
-            positions = (np.arange(N) + np.random.uniform()) / N
+            positions = (np.arange(N) + rng.random()) / N
         else:
-            positions = np.random.uniform(0, 1, N)
+            positions = rng.random(N)
 
         cumsum = np.cumsum(weights)
-        i, j = 0, 0
-        while i < N:
-            if positions[i] < cumsum[j]:
-                indices[i] = j
-                i += 1
-            else:
-                j += 1
-
-        return particles[indices].copy()
+        # 累积权重末项因舍入可能略小于 1，越界的位置取最后一个粒子
+        indices = np.minimum(np.searchsorted(cumsum, positions, side="right"), N - 1)
+        return particles[indices]
 
     @staticmethod
     def get_default_config() -> ParticleFilterAlgorithmConfig:
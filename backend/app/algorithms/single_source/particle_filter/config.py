@@ -1,7 +1,9 @@
 """
 粒子滤波算法配置模型
 """
-from pydantic import BaseModel, Field
+from typing import Optional
+
+from pydantic import BaseModel, Field, field_validator
 
 
 class ParticleFilterAlgorithmConfig(BaseModel):
@@ -35,8 +37,16 @@ class ParticleFilterAlgorithmConfig(BaseModel):
         description="有效粒子数阈值比例（低于此比例触发重采样）"
     )
 
+    # ========== 计算配置 ==========
+    particle_dtype: str = Field(
+        default="float64",
+        description="粒子状态数值精度: float64、float32（内存和带宽减半，适合大粒子数）"
+    )
+    random_seed: Optional[int] = Field(default=None, ge=0, description="随机种子（为空时每次运行自动生成，实际使用的种子记录在结果中）")
+
     # ========== 数据处理 ==========
     min_track_points: int = Field(default=5, ge=2, le=100, description="最小航迹点数")
+    batch_workers: int = Field(default=0, ge=0, le=64, description="批次并行进程数（0 表示使用部署默认值）")
 
     class Config:
         use_enum_values = True
@@ -47,5 +57,22 @@ class ParticleFilterAlgorithmConfig(BaseModel):
                 "process_noise_std": 0.001,
                 "measurement_noise_std": 0.01,
                 "resampling_method": "systematic",
+                "particle_dtype": "float64",
             }
         }
+
+    @field_validator('resampling_method')
+    @classmethod
+    def validate_resampling_method(cls, v: str) -> str:
+        """验证重采样方法"""
+        if v not in ("systematic", "multinomial"):
+            raise ValueError(f"不支持的重采样方法: {v}")
+        return v
+
+    @field_validator('particle_dtype')
+    @classmethod
+    def validate_particle_dtype(cls, v: str) -> str:
+        """验证粒子数值精度"""
+        if v not in ("float64", "float32"):
+            raise ValueError(f"不支持的粒子数值精度: {v}")
+        return v
@@ -0,0 +1,275 @@
+"""
+单源算法批次执行器
+
+单源算法（卡尔曼滤波、粒子滤波、样条平滑、IMM）对各批次航迹独立处理。执行器：
+- 按 (雷达站, 批次) 分组读取轨迹点：数据库按 radar_station_id, batch_id, timestamp 排序，
+  游标分批读取并逐组切分，不在 Python 中整体排序；同一架飞机不同雷达站的观测各自成组，
+  不会交错成一条时间序列
+- 边读取边处理：按点数把连续的批次攒成分片，数据量较大时提交到进程池并行处理，
+  同时在途的分片数有上限，任一时刻只持有有限个分片的轨迹点，与总数据量无关
+- 按批次顺序流式返回结果，每个分片完成时通过 ProgressCallback 报告已完成的批次数
+"""
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.algorithms.base import ProgressCallback
+from app.algorithms.parallel import create_process_pool, resolve_worker_count
+from app.models.flight_track import FlightTrackRaw
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 加载轨迹点时游标每次读取的行数
+TRACK_QUERY_BATCH_SIZE = 10000
+
+# 总点数少于该值时串行处理（进程池的启动和结果回传开销大于收益）
+PARALLEL_MIN_POINTS = 20000
+
+# 并行时每个进程分到的分片数（分片越多负载越均衡、进度越细，回传次数也越多）
+SHARDS_PER_WORKER = 4
+
+# 并行时每个进程同时在途（已提交未取回）的分片数上限，限制同时持有的轨迹点
+MAX_PENDING_SHARDS_PER_WORKER = 2
+
+# 分片处理函数：批次任务列表 -> 与之顺序一致的结果列表
+ShardFunction = Callable[[List[Any]], List[Any]]
+
+# 子进程的处理函数（fork 时由父进程直接继承，不经过序列化）
+_runner_inputs: Dict[str, Any] = {}
+
+
+@dataclass(frozen=True)
+class SingleSourcePoint:
+    """单源算法使用的轨迹点（只包含算法需要的字段，可序列化）"""
+    batch_id: str
+    radar_station_id: int
+    timestamp: datetime
+    latitude: float
+    longitude: float
+    altitude: Optional[float]
+
+
+@dataclass(frozen=True)
+class TrackGroupSummary:
+    """所选批次和雷达站的轨迹分组统计"""
+    total_groups: int   # (雷达站, 批次) 组总数
+    group_count: int    # 点数不少于 min_points 的组数
+    point_count: int    # 这些组的总点数
+
+
+def _track_filter(track_ids: List[str], radar_station_ids: List[int]):
+    return (
+        FlightTrackRaw.batch_id.in_(track_ids),
+        FlightTrackRaw.radar_station_id.in_(radar_station_ids),
+    )
+
+
+def summarize_track_groups(
+    db_session: Session,
+    track_ids: List[str],
+    radar_station_ids: List[int],
+    min_points: int = 1,
+) -> TrackGroupSummary:
+    """
+    按 (雷达站, 批次) 聚合计数，不读取轨迹点
+
+    Args:
+        db_session: 数据库会话
+        track_ids: 批次号列表
+        radar_station_ids: 雷达站ID列表
+        min_points: 参与处理的最少点数
+
+    Returns:
+        TrackGroupSummary
+    """
+    counts = [
+        count for (count,) in db_session.query(func.count(FlightTrackRaw.id)).filter(
+            *_track_filter(track_ids, radar_station_ids)
+        ).group_by(FlightTrackRaw.radar_station_id, FlightTrackRaw.batch_id)
+    ]
+    kept = [count for count in counts if count >= min_points]
+    return TrackGroupSummary(total_groups=len(counts), group_count=len(kept), point_count=sum(kept))
+
+
+def iter_track_groups(
+    db_session: Session,
+    track_ids: List[str],
+    radar_station_ids: List[int],
+    min_points: int = 1,
+) -> Iterator[List[SingleSourcePoint]]:
+    """
+    逐组读取所选批次和雷达站的轨迹点，点数不足的组在读取时即丢弃
+
+    Args:
+        db_session: 数据库会话
+        track_ids: 批次号列表
+        radar_station_ids: 雷达站ID列表
+        min_points: 参与处理的最少点数
+
+    Yields:
+        每个 (雷达站, 批次) 按时间排序的轨迹点，按雷达站ID、批次号排列
+    """
+    rows = db_session.query(
+        FlightTrackRaw.batch_id,
+        FlightTrackRaw.radar_station_id,
+        FlightTrackRaw.timestamp,
+        FlightTrackRaw.latitude,
+        FlightTrackRaw.longitude,
+        FlightTrackRaw.altitude,
+    ).filter(
+        *_track_filter(track_ids, radar_station_ids)
+    ).order_by(
+        FlightTrackRaw.radar_station_id,
+        FlightTrackRaw.batch_id,
+        FlightTrackRaw.timestamp,
+    ).yield_per(TRACK_QUERY_BATCH_SIZE)
+
+    for group in _split_groups(rows):
+        points = [SingleSourcePoint(*row) for row in group]
+        if len(points) >= min_points:
+            yield points
+
+
+def _split_groups(rows: Iterable[Any]) -> Iterator[List[Any]]:
+    """
+    把按 (雷达站, 批次) 排序的行逐组切分（流式读取，不在本地排序）
+
+    Raises:
+        ValueError: 同一组的行不连续（查询结果未按组排序）
+    """
+    finished = set()
+    for key, group in groupby(rows, key=lambda row: (row.radar_station_id, row.batch_id)):
+        if key in finished:
+            raise ValueError(f"轨迹点未按 (雷达站, 批次) 排序: 雷达站 {key[0]} 批次 {key[1]} 的点不连续")
+        finished.add(key)
+        yield list(group)
+
+
+def _init_runner_worker(process: ShardFunction) -> None:
+    """子进程初始化：保存处理函数"""
+    _runner_inputs["process"] = process
+
+
+def _run_shard(tasks: List[Any]) -> List[Any]:
+    """进程池任务：处理一个分片"""
+    return _runner_inputs["process"](tasks)
+
+
+def iter_shards(tasks: Iterable[Any], weight: Callable[[Any], float], shard_weight: float) -> Iterator[List[Any]]:
+    """
+    按顺序把任务攒成计算量不小于 shard_weight 的分片（最后一个分片可以更小）
+
+    Args:
+        tasks: 批次任务（可以是迭代器，逐个消费）
+        weight: 任务的计算量（通常为点数）
+        shard_weight: 分片的目标计算量（不大于单个任务时每个任务一个分片）
+
+    Yields:
+        分片任务列表
+    """
+    shard: List[Any] = []
+    accumulated = 0.0
+    for task in tasks:
+        shard.append(task)
+        accumulated += weight(task)
+        if accumulated >= shard_weight:
+            yield shard
+            shard, accumulated = [], 0.0
+    if shard:
+        yield shard
+
+
+def run_batches(
+    tasks: Iterable[Any],
+    weight: Callable[[Any], float],
+    process: ShardFunction,
+    total: Optional[int] = None,
+    total_weight: Optional[float] = None,
+    workers: int = 0,
+    progress_callback: Optional[ProgressCallback] = None,
+    progress_range: Tuple[float, float] = (0.2, 0.9),
+    label: str = "处理批次",
+    min_shard_weight: int = 0,
+) -> Iterator[Any]:
+    """
+    边消费边分片处理批次任务，按任务顺序逐个返回结果
+
+    结果与串行处理完全一致（分片只改变计算的进程，不改变每个任务的输入），
+    需要随机数的算法应为每个任务准备独立的随机种子。
+    tasks 可以是迭代器（如 iter_track_groups），此时需给出 total 和 total_weight
+    （如 summarize_track_groups 的统计），用于决定是否并行、分片大小和进度；
+    任务只在攒成分片时读取，并行时同时在途的分片数不超过 进程数 × MAX_PENDING_SHARDS_PER_WORKER。
+
+    Args:
+        tasks: 批次任务（通常为各批次的轨迹点）
+        weight: 任务的计算量（通常为点数）
+        process: 分片处理函数，接收任务列表并返回顺序一致的结果列表
+        total: 任务数（None 表示由 tasks 计算，会把 tasks 全部读入）
+        total_weight: 总计算量（None 表示由 tasks 计算）
+        workers: 请求的并行进程数（0 表示使用部署默认值）
+        progress_callback: 进度回调
+        progress_range: 批次处理阶段占用的进度区间
+        label: 进度消息前缀
+        min_shard_weight: 分片的最小计算量（批量计算的算法用于保持批量规模）
+
+    Yields:
+        各任务的结果，顺序与 tasks 一致
+    """
+    if total is None or total_weight is None:
+        tasks = list(tasks)
+        total = len(tasks)
+        total_weight = sum(weight(task) for task in tasks)
+    if not total:
+        return
+
+    worker_count = 1
+    if total_weight >= PARALLEL_MIN_POINTS:
+        worker_count = resolve_worker_count(workers, total)
+    shard_weight = float(min_shard_weight)
+    if worker_count > 1:
+        shard_weight = max(shard_weight, total_weight / (worker_count * SHARDS_PER_WORKER))
+    shards = iter_shards(tasks, weight, shard_weight)
+
+    progress_start, progress_end = progress_range
+    completed = 0
+
+    def report(shard_size: int) -> None:
+        nonlocal completed
+        completed += shard_size
+        if progress_callback:
+            progress = progress_start + (progress_end - progress_start) * min(completed / total, 1.0)
+            progress_callback.on_progress(progress, f"{label}: 已完成 {completed}/{total} 批次")
+
+    if worker_count <= 1:
+        for shard in shards:
+            results = process(shard)
+            report(len(shard))
+            yield from results
+        return
+
+    logger.info(f"单源批次并行处理: {worker_count} 个进程, {total} 个批次")
+    executor = create_process_pool(worker_count, _init_runner_worker, (process,))
+    try:
+        pending = deque()
+        max_pending = worker_count * MAX_PENDING_SHARDS_PER_WORKER
+        for shard in shards:
+            pending.append((executor.submit(_run_shard, shard), len(shard)))
+            if len(pending) >= max_pending:
+                # 按提交顺序取回最早的分片，释放其轨迹点后再读取新的分片
+                future, size = pending.popleft()
+                results = future.result()
+                report(size)
+                yield from results
+        while pending:
+            future, size = pending.popleft()
+            results = future.result()
+            report(size)
+            yield from results
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
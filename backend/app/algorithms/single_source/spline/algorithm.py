@@ -1,13 +1,13 @@
 """
 样条平滑算法实现
 
-使用 scipy.interpolate.UnivariateSpline 对经度、纬度、高度分别平滑
+使用 scipy.interpolate.UnivariateSpline 对经度、纬度、高度分别平滑；
+gcv 模式下按航迹和坐标轴用广义交叉验证自动选择平滑参数（见 gcv.py）
 """
 import numpy as np
 from scipy.interpolate import UnivariateSpline
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
-from collections import defaultdict
 
 from app.algorithms.base import (
     BaseErrorAnalysisAlgorithm,
@@ -15,7 +15,8 @@ from app.algorithms.base import (
     ProgressCallback,
 )
 from app.algorithms.single_source.spline.config import SplineAlgorithmConfig
-from app.models.flight_track import FlightTrackRaw
+from app.algorithms.single_source.spline.gcv import GCV_MIN_POINTS, gcv_smoothing_splines
+from app.algorithms.single_source.runner import iter_track_groups, run_batches, summarize_track_groups
 from sqlalchemy.orm import Session
 from core.logging import get_logger
 
@@ -73,35 +74,32 @@ class SplineAlgorithm(BaseErrorAnalysisAlgorithm):
             if progress_callback:
                 progress_callback.on_progress(0.1, "加载轨迹数据")
 
-            tracks = db_session.query(FlightTrackRaw).filter(
-                FlightTrackRaw.batch_id.in_(track_ids),
-                FlightTrackRaw.radar_station_id.in_(radar_station_ids),
-            ).order_by(FlightTrackRaw.timestamp).all()
+            # 按 (雷达站, 批次) 分组加载，点数不足的航迹不参与平滑
+            summary = summarize_track_groups(
+                db_session, track_ids, radar_station_ids, self.config.min_track_points
+            )
+            total_tracks = summary.total_groups
+            smooth_groups = iter_track_groups(
+                db_session, track_ids, radar_station_ids, self.config.min_track_points
+            )
 
-            if not tracks:
+            if not total_tracks:
                 raise ValueError("没有找到指定的轨迹数据")
 
-            track_groups = defaultdict(list)
-            for t in tracks:
-                track_groups[t.batch_id].append(t)
-
-            total_tracks = len(track_groups)
             smoothed_all = []
             errors = {}
-            track_idx = 0
-
-            for batch_id, group in track_groups.items():
-                group.sort(key=lambda t: t.timestamp)
-
-                if len(group) < self.config.min_track_points:
-                    track_idx += 1
-                    continue
-
-                if progress_callback:
-                    progress = 0.1 + 0.8 * (track_idx / total_tracks)
-                    progress_callback.on_progress(progress, f"样条平滑: {batch_id}")
 
-                smoothed = self._apply_spline(group)
+            for smoothed in run_batches(
+                smooth_groups,
+                len,
+                self._apply_splines,
+                total=summary.group_count,
+                total_weight=summary.point_count,
+                workers=self.config.batch_workers,
+                progress_callback=progress_callback,
+                progress_range=(0.1, 0.9),
+                label="样条平滑",
+            ):
                 smoothed_all.extend(smoothed)
 
                 for point in smoothed:
@@ -115,8 +113,6 @@ class SplineAlgorithm(BaseErrorAnalysisAlgorithm):
                     if point.get("orig_alt") is not None:
                         errors[sid]["_alt_diff_sq"] += (point["orig_alt"] - point["altitude"]) ** 2
 
-                track_idx += 1
-
             for sid in errors:
                 n = errors[sid]["_count"]
                 if n > 0:
@@ -136,6 +132,7 @@ class SplineAlgorithm(BaseErrorAnalysisAlgorithm):
             result.match_statistics = {
                 "total_tracks": total_tracks,
                 "total_smoothed_points": len(smoothed_all),
+                "smoothing_mode": self.config.smoothing_mode,
                 "smoothing_factor": self.config.smoothing_factor,
                 "spline_degree": self.config.spline_degree,
             }
@@ -144,6 +141,7 @@ class SplineAlgorithm(BaseErrorAnalysisAlgorithm):
                 "smoothed_trajectory": smoothed_all[:500],
                 "total_points": len(smoothed_all),
             }
+            result.trajectory = smoothed_all
 
             logger.info(f"[{task_id}] 样条平滑完成，处理 {len(smoothed_all)} 个点")
             return result
@@ -155,6 +153,29 @@ class SplineAlgorithm(BaseErrorAnalysisAlgorithm):
             result.completed_at = datetime.now()
             return result
 
+    def _apply_splines(self, groups: List[List]) -> List[List[Dict]]:
+        """对多组轨迹点逐组应用样条平滑（单源批次执行器的分片处理函数）"""
+        return [self._apply_spline(points) for points in groups]
+
+    def _fit_splines(self, t: np.ndarray, axes: Tuple[np.ndarray, ...]) -> List[Callable]:
+        """
+        拟合各坐标轴的平滑样条
+
+        gcv 模式下按航迹、坐标轴用广义交叉验证选择平滑参数（点数不足 GCV_MIN_POINTS 时使用固定平滑因子）
+
+        Args:
+            t: 严格递增的时间轴（秒）
+            axes: 各坐标轴的观测值
+
+        Returns:
+            与 axes 顺序一致的样条（可按时间求值）
+        """
+        if self.config.smoothing_mode == "gcv" and len(t) >= GCV_MIN_POINTS:
+            return gcv_smoothing_splines(t, np.vstack(axes)).splines
+
+        degree = min(self.config.spline_degree, len(t) - 1)
+        return [UnivariateSpline(t, values, k=degree, s=self.config.smoothing_factor) for values in axes]
+
     def _apply_spline(self, points: List) -> List[Dict]:
         """对一组轨迹点应用样条平滑"""
         n = len(points)
@@ -191,12 +212,8 @@ class SplineAlgorithm(BaseErrorAnalysisAlgorithm):
                 for p in points
             ]
 
-        degree = min(self.config.spline_degree, len(t_u) - 1)
-
         try:
-            spl_lat = UnivariateSpline(t_u, lats_u, k=degree, s=self.config.smoothing_factor)
-            spl_lon = UnivariateSpline(t_u, lons_u, k=degree, s=self.config.smoothing_factor)
-            spl_alt = UnivariateSpline(t_u, alts_u, k=degree, s=self.config.smoothing_factor)
+            spl_lat, spl_lon, spl_alt = self._fit_splines(t_u, (lats_u, lons_u, alts_u))
         except Exception:
             return [
                 {
@@ -272,6 +289,9 @@ class SplineAlgorithm(BaseErrorAnalysisAlgorithm):
                 smoothing_factor=0.01,
                 spline_degree=3,
             ),
+            "adaptive": SplineAlgorithmConfig(
+                smoothing_mode="gcv",
+            ),
             "interpolated": SplineAlgorithmConfig(
                 smoothing_factor=0.1,
                 spline_degree=3,
@@ -1,7 +1,7 @@
 """
 样条平滑算法配置模型
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class SplineAlgorithmConfig(BaseModel):
@@ -12,6 +12,13 @@ class SplineAlgorithmConfig(BaseModel):
     """
 
     # ========== 平滑参数 ==========
+    smoothing_mode: str = Field(
+        default="fixed",
+        description=(
+            "平滑参数选择方式：fixed（所有航迹、各坐标轴使用固定的平滑因子）/ "
+            "gcv（按航迹和坐标轴用广义交叉验证自动选择，三次平滑样条，忽略平滑因子和样条阶数）"
+        )
+    )
     smoothing_factor: float = Field(
         default=0.1, ge=0.001, le=100.0,
         description="平滑因子（越大越平滑，但可能欠拟合）"
@@ -23,6 +30,7 @@ class SplineAlgorithmConfig(BaseModel):
 
     # ========== 数据处理 ==========
     min_track_points: int = Field(default=5, ge=4, le=100, description="最小航迹点数")
+    batch_workers: int = Field(default=0, ge=0, le=64, description="批次并行进程数（0 表示使用部署默认值）")
     interpolate: bool = Field(
         default=False,
         description="是否在原始点之间插值（增加轨迹密度）"
@@ -37,9 +45,18 @@ class SplineAlgorithmConfig(BaseModel):
         from_attributes = True
         json_schema_extra = {
             "example": {
+                "smoothing_mode": "fixed",
                 "smoothing_factor": 0.1,
                 "spline_degree": 3,
                 "min_track_points": 5,
                 "interpolate": False,
             }
         }
+
+    @field_validator('smoothing_mode')
+    @classmethod
+    def validate_smoothing_mode(cls, v: str) -> str:
+        """验证平滑参数选择方式"""
+        if v not in ("fixed", "gcv"):
+            raise ValueError(f"不支持的平滑参数选择方式: {v}")
+        return v
@@ -9,7 +9,9 @@ from app.models.error_analysis import (
     TrackSegment,
     MatchGroup,
     ErrorResult,
-    TrackInterpolatedPoint
+    ErrorConfidenceInterval,
+    TrackInterpolatedPoint,
+    TrajectoryOutputPoint
 )
 
 __all__ = [
@@ -26,5 +28,7 @@ __all__ = [
     "TrackSegment",
     "MatchGroup",
     "ErrorResult",
+    "ErrorConfidenceInterval",
     "TrackInterpolatedPoint",
+    "TrajectoryOutputPoint",
 ]
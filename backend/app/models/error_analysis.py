@@ -50,6 +50,17 @@ class ErrorAnalysisTask(Base):
     error_message = Column(Text, nullable=True, comment="错误信息")
     result_metadata = Column(JSON, nullable=True, comment="分析结果元数据（融合轨迹等）")
 
+    # 结果复用：相同指纹的已完成任务的结果直接关联，不重新计算
+    fingerprint = Column(String(64), nullable=True, comment="任务指纹（算法、版本、配置、雷达站、轨迹和源数据版本的哈希）")
+    result_task_id = Column(String(36), nullable=True, comment="结果来源任务ID（为空表示结果由本任务计算）")
+
+    # 任务队列：优先级、批量分析批次、工作进程租约
+    priority = Column(Integer, default=0, server_default="0", nullable=False, comment="优先级（越大越先执行）")
+    batch_id = Column(String(36), nullable=True, comment="批量分析批次ID（同批任务共用一次预处理）")
+    worker_id = Column(String(100), nullable=True, comment="领取任务的工作进程")
+    lease_expires_at = Column(DateTime, nullable=True, comment="租约到期时间（工作进程心跳续约）")
+    attempts = Column(Integer, default=0, server_default="0", nullable=False, comment="已执行次数")
+
     # 时间信息
     created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
     started_at = Column(DateTime, nullable=True, comment="开始时间")
@@ -70,9 +81,16 @@ class ErrorAnalysisTask(Base):
         """获取配置参数"""
         return self.config or {}
 
+    @property
+    def result_source_id(self) -> str:
+        """结果数据（误差结果、匹配组、轨迹输出等）所在的任务ID"""
+        return self.result_task_id or self.task_id
+
     __table_args__ = (
         Index("idx_user_id", "user_id"),
         Index("idx_status", "status"),
+        Index("idx_fingerprint_status", "fingerprint", "status"),
+        Index("idx_queue", "status", "priority", "created_at"),
         {"comment": "误差分析任务表"}
     )
 
@@ -164,6 +182,9 @@ class ErrorResult(Base):
 
     # 关系
     task = relationship("ErrorAnalysisTask", back_populates="error_results")
+    confidence_intervals = relationship(
+        "ErrorConfidenceInterval", back_populates="error_result", cascade="all, delete-orphan"
+    )
 
     __table_args__ = (
         Index("uk_task_station", "task_id", "station_id", unique=True),
@@ -172,6 +193,34 @@ class ErrorResult(Base):
     )
 
 
+class ErrorConfidenceInterval(Base):
+    """误差置信区间表（自助法重抽样估计）"""
+    __tablename__ = "error_confidence_intervals"
+
+    id = Column(Integer, primary_key=True, autoincrement=True, comment="主键ID")
+    error_result_id = Column(Integer, ForeignKey("error_results.id"), nullable=False, comment="关联误差结果ID")
+
+    # 误差分量: azimuth_error / range_error / elevation_error
+    component = Column(String(20), nullable=False, comment="误差分量")
+
+    # 区间
+    lower = Column(Float, nullable=False, comment="置信区间下限")
+    upper = Column(Float, nullable=False, comment="置信区间上限")
+    std_error = Column(Float, nullable=True, comment="标准误差")
+    confidence_level = Column(Float, nullable=False, comment="置信水平")
+    replicate_count = Column(Integer, nullable=False, comment="重抽样次数")
+
+    created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
+
+    # 关系
+    error_result = relationship("ErrorResult", back_populates="confidence_intervals")
+
+    __table_args__ = (
+        Index("uk_result_component", "error_result_id", "component", unique=True),
+        {"comment": "误差置信区间表"}
+    )
+
+
 class TrackInterpolatedPoint(Base):
     """插值点表"""
     __tablename__ = "track_interpolated_points"
@@ -241,3 +290,44 @@ class SmoothedTrajectoryResult(Base):
         Index("idx_smooth_station_batch", "station_id", "batch_id"),
         {"comment": "平滑轨迹结果表"}
     )
+
+
+class TrajectoryOutputPoint(Base):
+    """算法输出轨迹点表（融合轨迹、平滑轨迹的完整输出，每点一行，按任务批量写入）"""
+    __tablename__ = "trajectory_output_points"
+
+    id = Column(Integer, primary_key=True, autoincrement=True, comment="主键ID")
+    task_id = Column(String(36), ForeignKey("error_analysis_tasks.task_id"), nullable=False, comment="关联任务ID")
+
+    # 轨迹类型: fused（多源加权融合）/ smoothed（单源平滑）
+    kind = Column(String(20), nullable=False, comment="轨迹类型")
+    sequence = Column(Integer, nullable=False, comment="点序号（任务内按算法输出顺序）")
+
+    # 时间：融合轨迹为匹配组时间（秒），平滑轨迹为 UTC 时间戳（秒）
+    time_seconds = Column(Float, nullable=True, comment="时间（秒）")
+    timestamp = Column(DateTime, nullable=True, comment="时间戳（平滑轨迹）")
+
+    # 雷达站和轨迹信息（平滑轨迹）
+    station_id = Column(Integer, nullable=True, comment="雷达站号")
+    batch_id = Column(String(50), nullable=True, comment="轨迹批号")
+
+    # 输出位置
+    longitude = Column(Float, nullable=False, comment="经度")
+    latitude = Column(Float, nullable=False, comment="纬度")
+    altitude = Column(Float, nullable=True, comment="高度")
+
+    # 平滑轨迹：原始观测与状态协方差
+    orig_longitude = Column(Float, nullable=True, comment="原始经度")
+    orig_latitude = Column(Float, nullable=True, comment="原始纬度")
+    orig_altitude = Column(Float, nullable=True, comment="原始高度")
+    covariance_trace = Column(Float, nullable=True, comment="状态协方差矩阵的迹")
+
+    # 融合轨迹：参与融合的观测
+    group_size = Column(Integer, nullable=True, comment="融合的观测数")
+    station_ids = Column(JSON, nullable=True, comment="参与融合的雷达站号列表")
+
+    __table_args__ = (
+        Index("idx_output_task_kind_seq", "task_id", "kind", "sequence"),
+        Index("idx_output_task_kind_time", "task_id", "kind", "time_seconds"),
+        {"comment": "算法输出轨迹点表"}
+    )
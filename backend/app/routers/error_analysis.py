@@ -6,7 +6,7 @@
 """
 from typing import Annotated, List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
@@ -15,6 +15,8 @@ from app.routers.auth import get_current_active_user, UserResponse
 from app.schemas.error_analysis import (
     ErrorAnalysisRequest,
     ErrorAnalysisTaskResponse,
+    BatchAnalysisRequest,
+    BatchAnalysisResponse,
     ErrorAnalysisResult,
     ErrorChartResponse,
     ErrorAnalysisConfig,
@@ -23,7 +25,16 @@ from app.schemas.error_analysis import (
     MatchGroupResponse,
     TaskDetailResponse,
 )
+from app.models.error_analysis import ErrorAnalysisTask
+from app.services.error_analysis_executor import SINGLE_SOURCE_ALGORITHMS
 from app.services.error_analysis_service import ErrorAnalysisService
+from app.services.trajectory_output import (
+    TRAJECTORY_FUSED,
+    TRAJECTORY_SMOOTHED,
+    has_trajectory_output,
+    query_trajectory_output,
+    slice_trajectory_preview,
+)
 
 router = APIRouter(prefix="/error-analysis", tags=["error-analysis"])
 
@@ -33,11 +44,13 @@ async def create_analysis_task(
     request: ErrorAnalysisRequest,
     current_user: Annotated[UserResponse, Depends(get_current_active_user)],
     db: Annotated[Session, Depends(get_db)],
-    background_tasks: BackgroundTasks
 ):
     """
     创建误差分析任务
 
+    任务进入任务队列，由独立的工作进程（backend/worker.py）领取执行，
+    通过 /tasks/{task_id} 查询进度。
+
     - **file_id**: 数据文件ID
     - **config**: 分析配置参数（可选）
       - grid_resolution: 网格分辨率（度）
@@ -48,15 +61,51 @@ async def create_analysis_task(
       - range_optimization_steps: 距离优化步长序列
       - cost_weights: 代价函数权重
       - max_match_groups: 最大匹配组数
+    - **force_recompute**: 强制重新计算；默认已有相同算法、配置、雷达站、轨迹和源数据的
+      已完成任务时，新任务直接复用其结果（返回时即为 completed，result_task_id 为来源任务）
+    - **priority**: 任务优先级（-10 ~ 10，越大越先执行）
     """
     try:
         service = ErrorAnalysisService(db)
-        task = service.create_analysis_task(request, current_user.id)
+        return service.create_analysis_task(request, current_user.id)
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"创建分析任务失败: {str(e)}"
+        )
 
-        # 在后台执行分析
-        background_tasks.add_task(execute_analysis_task, db, task.task_id)
 
-        return task
+@router.post("/analyze/batch", response_model=BatchAnalysisResponse)
+async def create_batch_analysis(
+    request: BatchAnalysisRequest,
+    current_user: Annotated[UserResponse, Depends(get_current_active_user)],
+    db: Annotated[Session, Depends(get_db)],
+):
+    """
+    创建批量误差分析（多源算法对比）
+
+    同一组雷达站和轨迹上运行多个多源算法：预处理只执行一次，
+    匹配结果并行分发给各算法求解。每个算法生成一个独立任务，
+    任务结果元数据 batch 字段中记录各算法的耗时对比。
+
+    - **radar_station_ids**: 雷达站ID列表
+    - **track_ids**: 轨迹编号列表
+    - **algorithms**: 算法列表，每项包含 algorithm 和可选的 config
+    - **priority**: 任务优先级（-10 ~ 10，越大越先执行）
+
+    批次作为一个作业进入任务队列，由一个工作进程领取执行。
+    """
+    try:
+        service = ErrorAnalysisService(db)
+        batch = service.create_batch_analysis_tasks(request, current_user.id)
+
+        return batch
 
     except ValueError as e:
         raise HTTPException(
@@ -66,7 +115,7 @@ async def create_analysis_task(
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"创建分析任务失败: {str(e)}"
+            detail=f"创建批量分析失败: {str(e)}"
         )
 
 
@@ -576,25 +625,6 @@ async def get_task_detail_full(
         )
 
 
-def execute_analysis_task(db: Session, task_id: str):
-    """
-    后台执行分析任务的函数
-
-    Args:
-        db: 数据库会话
-        task_id: 任务ID
-    """
-    from core.logging import get_logger
-    logger = get_logger(__name__)
-
-    try:
-        service = ErrorAnalysisService(db)
-        service.execute_analysis(task_id)
-        logger.info(f"后台任务完成: {task_id}")
-    except Exception as e:
-        logger.error(f"后台任务失败: {task_id}, 错误: {str(e)}")
-
-
 # ========== 算法管理端点 ==========
 
 from app.algorithms import registry, AlgorithmFactory
@@ -700,6 +730,10 @@ async def get_algorithm_presets(
         "responsive": "快速响应",
         "tight": "紧密贴合",
         "interpolated": "插值模式",
+        "joint": "联合最小二乘求解",
+        "rts_metric": "RTS 平滑（米制坐标）",
+        "adaptive": "自适应平滑（GCV）",
+        "agile": "高机动",
     }
 
     return {
@@ -742,14 +776,22 @@ async def validate_algorithm_config(
 async def get_fused_trajectory(
     task_id: str,
     current_user: Annotated[UserResponse, Depends(get_current_active_user)],
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[Session, Depends(get_db)],
+    offset: Annotated[int, Query(ge=0, description="跳过的点数")] = 0,
+    limit: Annotated[int, Query(ge=1, le=10000, description="每页点数")] = 1000,
+    start_time: Annotated[Optional[float], Query(description="时间下限（秒，含）")] = None,
+    end_time: Annotated[Optional[float], Query(description="时间上限（秒，含）")] = None,
 ):
     """
     获取融合轨迹数据
 
     - **task_id**: 任务ID
+    - **offset** / **limit**: 分页（在时间范围筛选之后）
+    - **start_time** / **end_time**: 时间范围；融合轨迹为匹配组时间（秒），
+      单源算法的平滑轨迹为 UTC 时间戳（秒）
 
-    返回加权融合后的轨迹点列表，仅对 weighted_lstsq 算法任务有效。
+    返回 weighted_lstsq 算法的加权融合轨迹，或单源算法的平滑轨迹（完整输出，按页读取）。
+    轨迹输出表建立之前完成的任务只能读取元数据中保存的预览点。
     """
     try:
         task = db.query(ErrorAnalysisTask).filter(
@@ -760,15 +802,30 @@ async def get_fused_trajectory(
             raise HTTPException(status_code=404, detail="任务不存在")
 
         metadata = task.result_metadata or {}
-        fused_trajectory = metadata.get("fused_trajectory", [])
         match_stats = metadata.get("match_statistics", {})
 
+        if task.algorithm_name in SINGLE_SOURCE_ALGORITHMS:
+            kind, preview_key = TRAJECTORY_SMOOTHED, "smoothed_trajectory"
+        else:
+            kind, preview_key = TRAJECTORY_FUSED, "fused_trajectory"
+
+        source_id = task.result_source_id
+        if has_trajectory_output(db, source_id, kind):
+            total, points = query_trajectory_output(db, source_id, kind, offset, limit, start_time, end_time)
+        else:
+            total, points = slice_trajectory_preview(
+                metadata.get(preview_key, []), kind, offset, limit, start_time, end_time
+            )
+
         return {
             "task_id": task_id,
             "algorithm": task.algorithm_name,
-            "fused_trajectory": fused_trajectory,
+            "trajectory_type": kind,
+            "fused_trajectory": points,
             "station_weights": match_stats.get("station_weights", {}),
-            "total_points": len(fused_trajectory),
+            "total_points": total,
+            "offset": offset,
+            "limit": limit,
             "outlier_removed": match_stats.get("outlier_removed", 0),
         }
     except HTTPException:
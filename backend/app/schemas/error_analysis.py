@@ -71,6 +71,8 @@ class ErrorAnalysisRequest(BaseModel):
     end_time: Optional[datetime] = Field(default=None, description="分析结束时间")
     algorithm: str = Field(default="mrra", description="算法名称（如：mrra）")
     config: Optional[ErrorAnalysisConfig] = Field(default=None, description="分析配置参数")
+    force_recompute: bool = Field(default=False, description="强制重新计算（不复用相同任务的已有结果）")
+    priority: int = Field(default=0, ge=-10, le=10, description="任务优先级（越大越先执行）")
 
 
 class ErrorAnalysisTaskResponse(BaseModel):
@@ -87,11 +89,32 @@ class ErrorAnalysisTaskResponse(BaseModel):
     created_at: datetime
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
+    result_task_id: Optional[str] = None  # 复用结果的来源任务ID（为空表示结果由本任务计算）
 
     class Config:
         from_attributes = True
 
 
+class BatchAlgorithmSpec(BaseModel):
+    """批量分析中的单个算法"""
+    algorithm: str = Field(..., description="算法名称（多源算法，如 mrra、ransac）")
+    config: Optional[Dict[str, Any]] = Field(default=None, description="算法配置参数（按算法配置类校验）")
+
+
+class BatchAnalysisRequest(BaseModel):
+    """批量误差分析请求（同一选择上对比多种多源算法，预处理只执行一次）"""
+    radar_station_ids: List[int] = Field(..., min_length=1, description="雷达站ID列表")
+    track_ids: List[str] = Field(..., min_length=1, description="轨迹编号列表")
+    algorithms: List[BatchAlgorithmSpec] = Field(..., min_length=1, description="参与对比的算法列表")
+    priority: int = Field(default=0, ge=-10, le=10, description="任务优先级（越大越先执行）")
+
+
+class BatchAnalysisResponse(BaseModel):
+    """批量误差分析响应"""
+    batch_id: str
+    tasks: List[ErrorAnalysisTaskResponse]
+
+
 class TrackSegmentResponse(BaseModel):
     """航迹段响应"""
     id: int
@@ -132,6 +155,18 @@ class MatchGroupResponse(BaseModel):
         from_attributes = True
 
 
+class ConfidenceIntervalResponse(BaseModel):
+    """误差置信区间响应（自助法）"""
+    lower: float
+    upper: float
+    std_error: Optional[float] = None
+    confidence_level: float
+    replicate_count: int
+
+    class Config:
+        from_attributes = True
+
+
 class ErrorResultResponse(BaseModel):
     """误差结果响应"""
     id: int
@@ -143,6 +178,9 @@ class ErrorResultResponse(BaseModel):
     confidence: Optional[float] = None
     iterations: Optional[int] = None
     final_cost: Optional[float] = None
+    confidence_intervals: Dict[str, ConfidenceIntervalResponse] = Field(
+        default_factory=dict, description="误差分量 -> 置信区间（未启用自助法时为空）"
+    )
 
     class Config:
         from_attributes = True
@@ -276,6 +314,9 @@ class ErrorResultDetail(BaseModel):
     azimuth_quality: str = "unknown"
     range_quality: str = "unknown"
     elevation_quality: str = "unknown"
+    confidence_intervals: Dict[str, ConfidenceIntervalResponse] = Field(
+        default_factory=dict, description="误差分量 -> 置信区间（未启用自助法时为空）"
+    )
 
     class Config:
         from_attributes = True
@@ -0,0 +1,415 @@
+"""
+误差分析任务队列
+
+任务表（error_analysis_tasks）是任务状态的唯一来源，队列只负责按优先级分发：
+- redis：有序集合，分值为 优先级 × PRIORITY_SCALE − 入队时间，同优先级先进先出；
+  工作进程阻塞弹出，入队重复的任务只保留一份
+- database：不另设队列，工作进程按 优先级、创建时间 轮询可领取的 PENDING 任务（测试和无 Redis 部署使用）
+
+工作进程领取任务时以一条条件 UPDATE 写入 worker_id 和租约到期时间，同一任务只会被一个进程领取；
+执行期间心跳续约。Redis 弹出作业即从队列删除，API 入队失败或工作进程弹出后、领取前崩溃时
+作业不在队列中，工作进程定期把未领取的 PENDING 任务重新入队（重复入队只保留一份）。租约过期而任务仍未结束（工作进程崩溃，任务停留在 EXTRACTING、MATCHING 等状态）时，
+清除已写入的部分结果并重新排队，执行次数达到上限后标记为失败。
+原工作进程可能仍在执行（卡顿而非崩溃），任务的结束状态和结果以 finish_task 的条件 UPDATE
+写入（防护检查：worker_id 仍是执行开始时的值），租约被回收后原进程的结果整体回滚，不覆盖新一轮的执行。
+批量分析的任务共用一次预处理，以批次为单位排队和领取。
+"""
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models.error_analysis import (
+    ErrorAnalysisTask,
+    ErrorAnalysisTaskStatus,
+    ErrorConfidenceInterval,
+    ErrorResult,
+    MatchGroup,
+    SmoothedTrajectoryResult,
+    TrackInterpolatedPoint,
+    TrackSegment,
+    TrajectoryOutputPoint,
+)
+from core.config import ANALYSIS_QUEUE_BACKEND, REDIS_URL
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 任务类型：单个任务 / 批量分析批次
+JOB_TASK = "task"
+JOB_BATCH = "batch"
+
+# Redis 有序集合的键
+REDIS_QUEUE_KEY = "rftip:analysis:queue"
+
+# 优先级在分值中的权重（大于入队时间戳的取值范围，优先级总是先于入队时间比较）
+PRIORITY_SCALE = 1e10
+
+# 已结束的任务状态
+FINISHED_STATUSES = (ErrorAnalysisTaskStatus.COMPLETED, ErrorAnalysisTaskStatus.FAILED)
+
+
+class LeaseLostError(RuntimeError):
+    """任务的租约已被回收（已交给其他工作进程或已结束），本进程不再写入结果"""
+
+
+@dataclass(frozen=True)
+class AnalysisJob:
+    """队列中的作业：单个任务或一个批量分析批次"""
+    kind: str
+    job_id: str
+
+    @property
+    def key(self) -> str:
+        """队列成员标识"""
+        return f"{self.kind}:{self.job_id}"
+
+    @classmethod
+    def from_key(cls, key: str) -> "AnalysisJob":
+        """由队列成员标识还原作业"""
+        kind, job_id = key.split(":", 1)
+        return cls(kind, job_id)
+
+    @classmethod
+    def for_task(cls, task: ErrorAnalysisTask) -> "AnalysisJob":
+        """任务所属的作业（批量分析的任务按批次排队）"""
+        if task.batch_id:
+            return cls(JOB_BATCH, task.batch_id)
+        return cls(JOB_TASK, task.task_id)
+
+
+class AnalysisQueue(ABC):
+    """任务队列后端"""
+
+    @abstractmethod
+    def push(self, job: AnalysisJob, priority: int, created_at: datetime) -> None:
+        """
+        作业入队
+
+        Args:
+            job: 作业
+            priority: 优先级（越大越先执行）
+            created_at: 任务创建时间（同优先级按创建时间先后执行）
+        """
+
+    @abstractmethod
+    def pop(self, db: Session, timeout: float) -> Optional[AnalysisJob]:
+        """
+        取出优先级最高的作业，队列为空时最多等待 timeout 秒
+
+        Args:
+            db: 数据库会话
+            timeout: 等待时长（秒）
+
+        Returns:
+            作业，超时返回 None
+        """
+
+
+class DatabaseQueue(AnalysisQueue):
+    """以任务表为队列：轮询可领取的 PENDING 任务"""
+
+    def push(self, job: AnalysisJob, priority: int, created_at: datetime) -> None:
+        # 任务行即队列
+        pass
+
+    def pop(self, db: Session, timeout: float) -> Optional[AnalysisJob]:
+        task = db.query(ErrorAnalysisTask).filter(
+            ErrorAnalysisTask.status == ErrorAnalysisTaskStatus.PENDING,
+            _claimable(datetime.utcnow()),
+        ).order_by(
+            ErrorAnalysisTask.priority.desc(),
+            ErrorAnalysisTask.created_at,
+            ErrorAnalysisTask.id,
+        ).first()
+        if task is None:
+            time.sleep(timeout)
+            return None
+        return AnalysisJob.for_task(task)
+
+
+class RedisQueue(AnalysisQueue):
+    """Redis 有序集合队列"""
+
+    def __init__(self, client=None, key: str = REDIS_QUEUE_KEY):
+        """
+        Args:
+            client: Redis 客户端（None 表示按 REDIS_URL 创建）
+            key: 有序集合的键
+        """
+        if client is None:
+            import redis
+            client = redis.from_url(REDIS_URL)
+        self.client = client
+        self.key = key
+
+    def push(self, job: AnalysisJob, priority: int, created_at: datetime) -> None:
+        self.client.zadd(self.key, {job.key: job_score(priority, created_at)})
+
+    def pop(self, db: Session, timeout: float) -> Optional[AnalysisJob]:
+        # BZPOPMAX 的超时以整秒计，0 表示无限等待
+        popped = self.client.bzpopmax(self.key, timeout=max(1, int(round(timeout))))
+        if not popped:
+            return None
+        member = popped[1]
+        return AnalysisJob.from_key(member.decode() if isinstance(member, bytes) else member)
+
+
+def job_score(priority: int, created_at: datetime) -> float:
+    """有序集合分值：优先级高的在前，同优先级创建早的在前"""
+    return priority * PRIORITY_SCALE - created_at.timestamp()
+
+
+def create_queue(backend: Optional[str] = None) -> AnalysisQueue:
+    """
+    按配置创建队列后端
+
+    Args:
+        backend: redis / database（None 表示按 ANALYSIS_QUEUE_BACKEND，未配置时按是否有 REDIS_URL 选择）
+
+    Returns:
+        AnalysisQueue
+    """
+    backend = backend or ANALYSIS_QUEUE_BACKEND or ("redis" if REDIS_URL else "database")
+    if backend == "redis":
+        return RedisQueue()
+    if backend == "database":
+        return DatabaseQueue()
+    raise ValueError(f"不支持的任务队列后端: {backend}")
+
+
+def _claimable(now: datetime):
+    """未被领取或租约已过期"""
+    return or_(ErrorAnalysisTask.worker_id.is_(None), ErrorAnalysisTask.lease_expires_at < now)
+
+
+def enqueue_tasks(db: Session, tasks: Sequence[ErrorAnalysisTask], queue: Optional[AnalysisQueue] = None) -> None:
+    """
+    待执行任务入队（批量分析的任务按批次只入队一次）
+
+    Args:
+        db: 数据库会话
+        tasks: 任务列表（状态为 PENDING 的任务才入队）
+        queue: 队列后端（None 表示按配置创建）
+    """
+    queue = queue or create_queue()
+    jobs: Dict[AnalysisJob, ErrorAnalysisTask] = {}
+    for task in tasks:
+        if task.status == ErrorAnalysisTaskStatus.PENDING:
+            jobs.setdefault(AnalysisJob.for_task(task), task)
+    for job, task in jobs.items():
+        queue.push(job, task.priority or 0, task.created_at or datetime.utcnow())
+        logger.info(f"分析作业入队: {job.key}, 优先级 {task.priority or 0}")
+
+
+def requeue_pending_tasks(db: Session, queue: AnalysisQueue) -> int:
+    """
+    将所有未领取的 PENDING 任务重新入队（重复入队无副作用）
+
+    工作进程启动时及每隔 ANALYSIS_REQUEUE_SECONDS 调用，补回 Redis 重启、API 入队失败
+    或弹出后未领取而不在队列中的作业。
+
+    Returns:
+        入队的任务数
+    """
+    tasks = db.query(ErrorAnalysisTask).filter(
+        ErrorAnalysisTask.status == ErrorAnalysisTaskStatus.PENDING,
+        _claimable(datetime.utcnow()),
+    ).all()
+    enqueue_tasks(db, tasks, queue)
+    return len(tasks)
+
+
+def claim_job(
+    db: Session,
+    job: AnalysisJob,
+    worker_id: str,
+    lease_seconds: float,
+) -> List[ErrorAnalysisTask]:
+    """
+    领取作业中的待执行任务
+
+    一条条件 UPDATE 同时写入 worker_id、租约到期时间并增加执行次数，
+    已被其他进程领取（租约有效）或已开始执行的任务不会被领取。
+
+    Args:
+        db: 数据库会话
+        job: 作业
+        worker_id: 工作进程标识
+        lease_seconds: 租约时长（秒）
+
+    Returns:
+        领取到的任务（按创建顺序），为空表示作业已被领取或不再需要执行
+    """
+    now = datetime.utcnow()
+    if job.kind == JOB_BATCH:
+        scope = ErrorAnalysisTask.batch_id == job.job_id
+    else:
+        scope = ErrorAnalysisTask.task_id == job.job_id
+
+    claimed = db.query(ErrorAnalysisTask).filter(
+        scope,
+        ErrorAnalysisTask.status == ErrorAnalysisTaskStatus.PENDING,
+        _claimable(now),
+    ).update({
+        ErrorAnalysisTask.worker_id: worker_id,
+        ErrorAnalysisTask.lease_expires_at: now + timedelta(seconds=lease_seconds),
+        ErrorAnalysisTask.attempts: ErrorAnalysisTask.attempts + 1,
+    }, synchronize_session=False)
+    db.commit()
+    if not claimed:
+        return []
+
+    return db.query(ErrorAnalysisTask).filter(
+        scope,
+        ErrorAnalysisTask.worker_id == worker_id,
+        ErrorAnalysisTask.status == ErrorAnalysisTaskStatus.PENDING,
+    ).order_by(ErrorAnalysisTask.id).all()
+
+
+def renew_lease(db: Session, task_ids: Sequence[str], worker_id: str, lease_seconds: float) -> int:
+    """
+    续约（心跳）：延长本进程持有的未结束任务的租约
+
+    Returns:
+        续约的任务数（为 0 表示租约已被回收）
+    """
+    renewed = db.query(ErrorAnalysisTask).filter(
+        ErrorAnalysisTask.task_id.in_(task_ids),
+        ErrorAnalysisTask.worker_id == worker_id,
+        ErrorAnalysisTask.status.notin_(FINISHED_STATUSES),
+    ).update({
+        ErrorAnalysisTask.lease_expires_at: datetime.utcnow() + timedelta(seconds=lease_seconds),
+    }, synchronize_session=False)
+    db.commit()
+    return renewed
+
+
+def release_tasks(db: Session, task_ids: Sequence[str], worker_id: str) -> None:
+    """执行结束后释放本进程持有的租约"""
+    db.query(ErrorAnalysisTask).filter(
+        ErrorAnalysisTask.task_id.in_(task_ids),
+        ErrorAnalysisTask.worker_id == worker_id,
+    ).update({
+        ErrorAnalysisTask.worker_id: None,
+        ErrorAnalysisTask.lease_expires_at: None,
+    }, synchronize_session=False)
+    db.commit()
+
+
+def finish_task(db: Session, task_id: str, worker_id: Optional[str], values: Dict) -> None:
+    """
+    写入任务的结束状态（完成或失败），带防护检查
+
+    条件 UPDATE 只更新仍由 worker_id 持有且未结束的任务。不提交：调用方把结果与结束状态
+    在同一事务中提交，抛出 LeaseLostError 时回滚该事务，已回收的任务不会被原进程覆盖。
+
+    Args:
+        db: 数据库会话
+        task_id: 任务ID
+        worker_id: 执行开始时任务的 worker_id（不经队列直接执行的任务为 None）
+        values: 列 -> 值
+
+    Raises:
+        LeaseLostError: 任务已被其他工作进程接手或已结束
+    """
+    if worker_id is None:
+        owner = ErrorAnalysisTask.worker_id.is_(None)
+    else:
+        owner = ErrorAnalysisTask.worker_id == worker_id
+
+    updated = db.query(ErrorAnalysisTask).filter(
+        ErrorAnalysisTask.task_id == task_id,
+        owner,
+        ErrorAnalysisTask.status.notin_(FINISHED_STATUSES),
+    ).update(values, synchronize_session=False)
+    if not updated:
+        raise LeaseLostError(f"任务 {task_id} 已不由工作进程 {worker_id} 持有")
+
+
+def recover_expired_tasks(db: Session, queue: AnalysisQueue, max_attempts: int) -> int:
+    """
+    回收租约过期的未结束任务
+
+    工作进程崩溃后任务停留在 PENDING（已领取）或 EXTRACTING、MATCHING 等执行中状态。
+    执行次数未达上限的任务清除部分结果、重置为 PENDING 并重新入队，否则标记为失败。
+
+    Args:
+        db: 数据库会话
+        queue: 队列后端
+        max_attempts: 最多执行次数
+
+    Returns:
+        回收的任务数
+    """
+    now = datetime.utcnow()
+    expired = db.query(ErrorAnalysisTask).filter(
+        ErrorAnalysisTask.worker_id.isnot(None),
+        ErrorAnalysisTask.lease_expires_at < now,
+        ErrorAnalysisTask.status.notin_(FINISHED_STATUSES),
+    ).all()
+
+    requeued = []
+    for task in expired:
+        # 条件更新，多个进程同时回收时只有一个成功
+        exhausted = (task.attempts or 0) >= max_attempts
+        values = {
+            ErrorAnalysisTask.worker_id: None,
+            ErrorAnalysisTask.lease_expires_at: None,
+        }
+        if exhausted:
+            values.update({
+                ErrorAnalysisTask.status: ErrorAnalysisTaskStatus.FAILED,
+                ErrorAnalysisTask.error_message: f"工作进程 {task.worker_id} 未完成任务，已执行 {task.attempts} 次",
+                ErrorAnalysisTask.completed_at: now,
+            })
+        else:
+            values.update({
+                ErrorAnalysisTask.status: ErrorAnalysisTaskStatus.PENDING,
+                ErrorAnalysisTask.progress: 0,
+                ErrorAnalysisTask.started_at: None,
+                ErrorAnalysisTask.error_message: None,
+            })
+        updated = db.query(ErrorAnalysisTask).filter(
+            ErrorAnalysisTask.id == task.id,
+            ErrorAnalysisTask.worker_id == task.worker_id,
+            ErrorAnalysisTask.lease_expires_at < now,
+            ErrorAnalysisTask.status.notin_(FINISHED_STATUSES),
+        ).update(values, synchronize_session=False)
+        if not updated:
+            continue
+
+        logger.warning(
+            f"任务 {task.task_id} 的租约已过期（工作进程 {task.worker_id}, 状态 {task.status.value}），"
+            + ("已达最大执行次数，标记为失败" if exhausted else "重新排队")
+        )
+        if not exhausted:
+            clear_partial_results(db, task.task_id)
+            requeued.append(task)
+    db.commit()
+
+    for task in requeued:
+        db.refresh(task)
+    enqueue_tasks(db, requeued, queue)
+    return len(expired)
+
+
+def clear_partial_results(db: Session, task_id: str) -> None:
+    """删除任务已写入的中间结果和结果（重新执行前调用，不提交）"""
+    result_ids = db.query(ErrorResult.id).filter(ErrorResult.task_id == task_id)
+    db.query(ErrorConfidenceInterval).filter(
+        ErrorConfidenceInterval.error_result_id.in_(result_ids.scalar_subquery())
+    ).delete(synchronize_session=False)
+    for model in (
+        ErrorResult,
+        MatchGroup,
+        TrackSegment,
+        TrackInterpolatedPoint,
+        SmoothedTrajectoryResult,
+        TrajectoryOutputPoint,
+    ):
+        db.query(model).filter(model.task_id == task_id).delete(synchronize_session=False)
@@ -0,0 +1,212 @@
+"""
+误差分析工作进程
+
+工作进程独立于 API 进程运行，循环：回收租约过期的任务 → 从队列取出作业 → 领取任务 →
+执行（后台线程按心跳间隔续约）→ 释放租约。多个工作进程（同一主机或多台主机）可同时运行，
+并发数即工作进程数。
+
+启动方式见 backend/worker.py。
+"""
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.error_analysis import ErrorAnalysisTask
+from app.services.analysis_queue import (
+    JOB_BATCH,
+    AnalysisJob,
+    AnalysisQueue,
+    claim_job,
+    create_queue,
+    recover_expired_tasks,
+    release_tasks,
+    renew_lease,
+    requeue_pending_tasks,
+)
+from core.config import (
+    ANALYSIS_HEARTBEAT_SECONDS,
+    ANALYSIS_LEASE_SECONDS,
+    ANALYSIS_MAX_ATTEMPTS,
+    ANALYSIS_QUEUE_POLL_SECONDS,
+    ANALYSIS_REQUEUE_SECONDS,
+)
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _default_worker_id() -> str:
+    """主机名:进程号:随机后缀"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class AnalysisWorker:
+    """从任务队列领取并执行误差分析任务"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        queue: Optional[AnalysisQueue] = None,
+        worker_id: Optional[str] = None,
+        lease_seconds: float = ANALYSIS_LEASE_SECONDS,
+        heartbeat_seconds: float = ANALYSIS_HEARTBEAT_SECONDS,
+        max_attempts: int = ANALYSIS_MAX_ATTEMPTS,
+        poll_seconds: float = ANALYSIS_QUEUE_POLL_SECONDS,
+        requeue_seconds: float = ANALYSIS_REQUEUE_SECONDS,
+    ):
+        """
+        Args:
+            session_factory: 数据库会话工厂（心跳线程使用独立会话）
+            queue: 队列后端（None 表示按配置创建）
+            worker_id: 工作进程标识（None 表示按主机名和进程号生成）
+            lease_seconds: 租约时长（秒）
+            heartbeat_seconds: 续约间隔（秒）
+            max_attempts: 任务最多执行次数
+            poll_seconds: 队列为空时的等待时长（秒）
+            requeue_seconds: 未领取的 PENDING 任务重新入队的间隔（秒）
+        """
+        self.session_factory = session_factory
+        self.queue = queue or create_queue()
+        self.worker_id = worker_id or _default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_attempts = max_attempts
+        self.poll_seconds = poll_seconds
+        self.requeue_seconds = requeue_seconds
+        self._next_requeue = 0.0
+
+    def run(self, stop_event: threading.Event) -> None:
+        """
+        循环执行作业直到 stop_event 被设置（当前作业执行完才退出）
+
+        Args:
+            stop_event: 停止信号
+        """
+        logger.info(f"分析工作进程启动: {self.worker_id}")
+        while not stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"工作进程 {self.worker_id} 处理作业出错: {e}")
+                stop_event.wait(self.poll_seconds)
+        logger.info(f"分析工作进程退出: {self.worker_id}")
+
+    def run_once(self) -> bool:
+        """
+        回收过期租约、按间隔补回不在队列中的待执行任务，取出并执行一个作业
+
+        Returns:
+            是否执行了任务
+        """
+        with self.session_factory() as db:
+            recover_expired_tasks(db, self.queue, self.max_attempts)
+            self._requeue_if_due(db)
+
+            job = self.queue.pop(db, self.poll_seconds)
+            if job is None:
+                return False
+
+            tasks = claim_job(db, job, self.worker_id, self.lease_seconds)
+            if not tasks:
+                logger.debug(f"作业 {job.key} 已被领取或无需执行")
+                return False
+
+            self._execute(db, job, tasks)
+            return True
+
+    def _requeue_if_due(self, db: Session) -> None:
+        """启动后首次调用及每隔 requeue_seconds 将未领取的 PENDING 任务重新入队"""
+        now = time.monotonic()
+        if now < self._next_requeue:
+            return
+        self._next_requeue = now + self.requeue_seconds
+        requeued = requeue_pending_tasks(db, self.queue)
+        if requeued:
+            logger.debug(f"重新入队 {requeued} 个待执行任务")
+
+    def _execute(self, db: Session, job: AnalysisJob, tasks: List[ErrorAnalysisTask]) -> None:
+        """执行已领取的任务，执行期间后台线程续约"""
+        from app.services.error_analysis_service import ErrorAnalysisService
+
+        task_ids = [task.task_id for task in tasks]
+        logger.info(f"工作进程 {self.worker_id} 开始执行作业 {job.key}: {task_ids}")
+
+        finished = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(task_ids, finished), name=f"heartbeat-{job.key}", daemon=True
+        )
+        heartbeat.start()
+        try:
+            service = ErrorAnalysisService(db)
+            if job.kind == JOB_BATCH:
+                service.execute_batch_analysis(job.job_id, task_ids)
+            else:
+                service.execute_analysis(job.job_id)
+            logger.info(f"作业完成: {job.key}")
+        except Exception as e:
+            # 任务状态和错误信息已由执行器写入
+            db.rollback()
+            logger.error(f"作业失败: {job.key}, 错误: {e}")
+        finally:
+            finished.set()
+            heartbeat.join()
+            release_tasks(db, task_ids, self.worker_id)
+
+    def _heartbeat(self, task_ids: List[str], finished: threading.Event) -> None:
+        """按心跳间隔续约，直到任务执行结束"""
+        while not finished.wait(self.heartbeat_seconds):
+            try:
+                with self.session_factory() as db:
+                    if not renew_lease(db, task_ids, self.worker_id, self.lease_seconds):
+                        logger.warning(f"工作进程 {self.worker_id} 的任务租约已失效: {task_ids}")
+            except Exception as e:
+                logger.error(f"任务续约失败: {task_ids}, 错误: {e}")
+
+
+def _worker_main() -> None:
+    """工作子进程入口：SIGTERM / SIGINT 时执行完当前作业再退出"""
+    from core.database import SessionLocal, engine
+
+    # fork 继承的连接池属于父进程，子进程使用新连接
+    engine.dispose(close=False)
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    AnalysisWorker(SessionLocal).run(stop_event)
+
+
+def run_workers(concurrency: int) -> None:
+    """
+    启动 concurrency 个工作进程并等待其退出（收到 SIGTERM / SIGINT 时转发给各进程）
+
+    Args:
+        concurrency: 工作进程数
+    """
+    if concurrency <= 1:
+        _worker_main()
+        return
+
+    processes = [
+        multiprocessing.Process(target=_worker_main, name=f"analysis-worker-{k}")
+        for k in range(concurrency)
+    ]
+    for process in processes:
+        process.start()
+    logger.info(f"已启动 {concurrency} 个分析工作进程")
+
+    def forward(signum, _frame):
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signum)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for process in processes:
+        process.join()
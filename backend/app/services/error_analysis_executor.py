@@ -3,15 +3,17 @@
 
 负责任务的算法调度和执行
 """
+import time
 from datetime import datetime
-from collections import defaultdict
-from typing import Dict
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
 from app.models.error_analysis import (
     ErrorAnalysisTask,
     ErrorAnalysisTaskStatus,
+    ErrorConfidenceInterval,
     ErrorResult,
     SmoothedTrajectoryResult,
 )
@@ -21,17 +23,27 @@ from app.algorithms.multi_source.preprocessing.track_extractor import load_track
 from app.algorithms.multi_source.preprocessing.track_interpolator import interpolate_and_save_tracks
 from app.algorithms.multi_source.preprocessing.track_matcher import match_tracks_from_database, save_matched_groups
 from app.algorithms.multi_source.preprocessing.error_calculator import calculate_error_results
+from app.algorithms.multi_source.preprocessing.cache import CACHE_KEY_CONFIG_FIELDS
+from app.algorithms.multi_source.preprocessing.pipeline import run_preprocessing, save_preprocessing_outputs
+from app.algorithms.parallel import create_process_pool, resolve_worker_count
+from app.services.analysis_queue import LeaseLostError, finish_task
+from app.services.trajectory_output import TRAJECTORY_FUSED, TRAJECTORY_SMOOTHED, save_trajectory_output
 from core.logging import get_logger
 
 logger = get_logger(__name__)
 
 # 单源盲测算法列表
-SINGLE_SOURCE_ALGORITHMS = ("kalman", "particle_filter", "spline")
+SINGLE_SOURCE_ALGORITHMS = ("kalman", "particle_filter", "spline", "imm")
+
+# 多源参考算法列表（共用预处理流程，支持批量分析）
+MULTI_SOURCE_ALGORITHMS = ("mrra", "ransac", "ransac_heuristic", "weighted_lstsq")
 
 
 def execute_analysis(db: Session, task: ErrorAnalysisTask) -> None:
     """执行误差分析任务"""
     task_id = task.task_id
+    # 领取时写入的 worker_id，写入结果时用于防护检查
+    worker_id = task.worker_id
     algorithm_name = task.algorithm_name or "mrra"
     # 兼容旧名称
     if algorithm_name == "gradient_descent":
@@ -49,27 +61,58 @@ def execute_analysis(db: Session, task: ErrorAnalysisTask) -> None:
 
         logger.info(f"使用算法 {algorithm_name} 执行任务 {task_id}")
 
-        if algorithm_name in ("mrra", "ransac", "ransac_heuristic", "weighted_lstsq", "kalman", "particle_filter", "spline"):
-            _execute_with_algorithm_interface(db, task, algorithm)
+        if algorithm_name in MULTI_SOURCE_ALGORITHMS + SINGLE_SOURCE_ALGORITHMS:
+            _execute_with_algorithm_interface(db, task, algorithm, worker_id)
         else:
             _execute_with_legacy_flow(db, task, algorithm)
-
-        task.status = ErrorAnalysisTaskStatus.COMPLETED
-        task.progress = 100
-        task.completed_at = datetime.utcnow()
-        db.commit()
+            finish_task(db, task_id, worker_id, _completed_values())
+            db.commit()
         logger.info(f"误差分析任务完成: {task_id}")
 
+    except LeaseLostError:
+        db.rollback()
+        logger.warning(f"任务 {task_id} 的租约已被回收，丢弃本次执行的结果")
+        raise
+
     except Exception as e:
         logger.error(f"误差分析任务失败: {task_id}, 错误: {str(e)}")
-        task.status = ErrorAnalysisTaskStatus.FAILED
-        task.error_message = str(e)
-        task.completed_at = datetime.utcnow()
-        db.commit()
+        db.rollback()
+        _fail_task(db, task_id, worker_id, str(e))
         raise
 
 
-def _execute_with_algorithm_interface(db: Session, task: ErrorAnalysisTask, algorithm) -> None:
+def _completed_values(result_metadata: Optional[Dict[str, Any]] = None) -> Dict:
+    """任务完成时写入的列"""
+    values = {
+        ErrorAnalysisTask.status: ErrorAnalysisTaskStatus.COMPLETED,
+        ErrorAnalysisTask.progress: 100,
+        ErrorAnalysisTask.completed_at: datetime.utcnow(),
+    }
+    if result_metadata:
+        values[ErrorAnalysisTask.result_metadata] = result_metadata
+    return values
+
+
+def _fail_task(db: Session, task_id: str, worker_id: Optional[str], message: str) -> None:
+    """标记任务失败（租约已被回收时不覆盖新一轮的执行）"""
+    try:
+        finish_task(db, task_id, worker_id, {
+            ErrorAnalysisTask.status: ErrorAnalysisTaskStatus.FAILED,
+            ErrorAnalysisTask.error_message: message,
+            ErrorAnalysisTask.completed_at: datetime.utcnow(),
+        })
+        db.commit()
+    except LeaseLostError:
+        db.rollback()
+        logger.warning(f"任务 {task_id} 的租约已被回收，不再标记失败")
+
+
+def _execute_with_algorithm_interface(
+    db: Session,
+    task: ErrorAnalysisTask,
+    algorithm,
+    worker_id: Optional[str],
+) -> None:
     """使用算法框架的 analyze() 接口执行分析"""
     result = algorithm.analyze(
         task_id=task.task_id,
@@ -81,6 +124,31 @@ def _execute_with_algorithm_interface(db: Session, task: ErrorAnalysisTask, algo
     if result.status == "failed":
         raise RuntimeError(result.error_message or "算法执行失败")
 
+    _save_algorithm_result(db, task, result, worker_id)
+
+
+def _save_algorithm_result(
+    db: Session,
+    task: ErrorAnalysisTask,
+    result,
+    worker_id: Optional[str],
+    extra_metadata: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    保存算法执行结果（误差结果或平滑轨迹，以及结果元数据）并标记任务完成
+
+    结果与完成状态在同一事务中提交，任务已被其他工作进程接手时整体回滚。
+
+    Args:
+        db: 数据库会话
+        task: 任务
+        result: 算法执行结果
+        worker_id: 执行开始时任务的 worker_id
+        extra_metadata: 追加到结果元数据的字段
+
+    Raises:
+        LeaseLostError: 任务的租约已被回收（调用方回滚）
+    """
     algorithm_name = task.algorithm_name or ""
     is_single_source = algorithm_name in SINGLE_SOURCE_ALGORITHMS
 
@@ -89,30 +157,209 @@ def _execute_with_algorithm_interface(db: Session, task: ErrorAnalysisTask, algo
     else:
         _save_error_results_from_result(db, task.task_id, result)
 
-    if result.metadata:
-        task.result_metadata = result.metadata
-
+    result_metadata = dict(result.metadata or {})
     if result.match_statistics:
-        if not task.result_metadata:
-            task.result_metadata = {}
-        task.result_metadata["match_statistics"] = result.match_statistics
+        result_metadata["match_statistics"] = result.match_statistics
+    result_metadata.update(extra_metadata or {})
 
+    # 完整输出轨迹单独写入轨迹输出表（元数据中只保留预览）
+    if result.trajectory:
+        kind = TRAJECTORY_SMOOTHED if is_single_source else TRAJECTORY_FUSED
+        save_trajectory_output(db, task.task_id, kind, result.trajectory, commit=False)
+
+    finish_task(db, task.task_id, worker_id, _completed_values(result_metadata))
     db.commit()
 
 
+# 批量求解子进程的共享输入（fork 时由父进程直接继承，不经过序列化）
+_batch_solve_inputs: Dict[str, Any] = {}
+
+
+def _init_batch_solve_worker(matched_groups: List[List[Dict]], radar_positions: Dict[int, Tuple]) -> None:
+    """批量求解子进程初始化"""
+    _batch_solve_inputs['matched_groups'] = matched_groups
+    _batch_solve_inputs['radar_positions'] = radar_positions
+
+
+def _run_batch_solve(algorithm) -> Tuple[Any, float]:
+    """执行单个算法的求解步骤，返回 (求解结果, 耗时秒数)"""
+    solve_start = time.perf_counter()
+    solved = algorithm.solve(
+        _batch_solve_inputs['matched_groups'],
+        _batch_solve_inputs['radar_positions'],
+    )
+    return solved, time.perf_counter() - solve_start
+
+
+def _solve_algorithms(
+    algorithms: List[Any],
+    matched_groups: List[List[Dict]],
+    radar_positions: Dict[int, Tuple],
+) -> List[Tuple[Optional[Any], float, Optional[str]]]:
+    """
+    将匹配组分发到各算法的求解步骤（多个算法时并行执行）
+
+    Returns:
+        与 algorithms 顺序一致的 [(求解结果, 耗时, 错误信息), ...]
+    """
+    workers = resolve_worker_count(task_count=len(algorithms))
+
+    if workers <= 1:
+        _init_batch_solve_worker(matched_groups, radar_positions)
+        outcomes = []
+        for algorithm in algorithms:
+            try:
+                solved, seconds = _run_batch_solve(algorithm)
+                outcomes.append((solved, seconds, None))
+            except Exception as e:
+                logger.error(f"算法 {algorithm.ALGORITHM_NAME} 求解失败: {str(e)}", exc_info=True)
+                outcomes.append((None, 0.0, str(e)))
+        _batch_solve_inputs.clear()
+        return outcomes
+
+    outcomes = []
+    with create_process_pool(
+        workers,
+        initializer=_init_batch_solve_worker,
+        initargs=(matched_groups, radar_positions),
+    ) as executor:
+        futures = [executor.submit(_run_batch_solve, algorithm) for algorithm in algorithms]
+        for algorithm, future in zip(algorithms, futures):
+            try:
+                solved, seconds = future.result()
+                outcomes.append((solved, seconds, None))
+            except Exception as e:
+                logger.error(f"算法 {algorithm.ALGORITHM_NAME} 求解失败: {str(e)}", exc_info=True)
+                outcomes.append((None, 0.0, str(e)))
+    return outcomes
+
+
+def execute_batch_analysis(db: Session, tasks: List[ErrorAnalysisTask], batch_id: str) -> None:
+    """
+    批量执行多源算法任务
+
+    所有任务使用相同的雷达站、航迹和预处理参数：预处理只执行一次，
+    匹配组分发到各算法的求解步骤并行计算，每个任务独立记录结果和耗时对比。
+
+    Args:
+        db: 数据库会话
+        tasks: 同一批次的任务列表（第一个任务执行预处理，其余任务复制其插值点、航迹段和匹配组）
+        batch_id: 批次ID
+    """
+    from app.algorithms.factory import AlgorithmFactory
+
+    # 领取时写入的 worker_id，写入结果时用于防护检查
+    worker_ids = {task.task_id: task.worker_id for task in tasks}
+
+    def fail_tasks(targets: List[ErrorAnalysisTask], message: str) -> None:
+        db.rollback()
+        for task in targets:
+            _fail_task(db, task.task_id, worker_ids[task.task_id], message)
+
+    owner = tasks[0]
+    started_at = datetime.utcnow()
+
+    try:
+        for task in tasks:
+            task.status = ErrorAnalysisTaskStatus.EXTRACTING
+            task.started_at = started_at
+        db.commit()
+
+        algorithms = []
+        for task in tasks:
+            if task.algorithm_name not in MULTI_SOURCE_ALGORITHMS:
+                raise ValueError(f"批量分析仅支持多源算法: {task.algorithm_name}")
+            algorithms.append(
+                AlgorithmFactory.create_algorithm_from_dict(task.algorithm_name, task.config or {})
+            )
+
+        mrra_configs = [algorithm._build_mrra_config() for algorithm in algorithms]
+        for config in mrra_configs[1:]:
+            for field_name in CACHE_KEY_CONFIG_FIELDS:
+                if getattr(config, field_name) != getattr(mrra_configs[0], field_name):
+                    raise ValueError(f"批量分析中各算法的预处理参数必须一致: {field_name}")
+
+        def report_progress(fraction: float, task_progress: int, message: str):
+            for task in tasks:
+                task.progress = task_progress
+            db.commit()
+
+        preprocessing_start = time.perf_counter()
+        preprocessing = run_preprocessing(
+            db, owner.task_id, owner.radar_station_ids, owner.track_ids,
+            mrra_configs[0], report_progress=report_progress
+        )
+        # 其余任务复制首个任务的插值点，匹配组中的点ID指向各自复制的点
+        for task in tasks[1:]:
+            save_preprocessing_outputs(
+                db, task.task_id, owner.task_id, preprocessing.segments,
+                preprocessing.matched_groups, preprocessing.reference_time
+            )
+        preprocessing_seconds = time.perf_counter() - preprocessing_start
+
+    except Exception as e:
+        logger.error(f"批量分析 {batch_id} 预处理失败: {str(e)}", exc_info=True)
+        fail_tasks(tasks, str(e))
+        raise
+
+    for task in tasks:
+        task.status = ErrorAnalysisTaskStatus.CALCULATING
+        task.progress = 80
+    db.commit()
+
+    outcomes = _solve_algorithms(
+        algorithms, preprocessing.matched_groups, preprocessing.radar_positions
+    )
+
+    solve_timings = {
+        task.algorithm_name: round(seconds, 3)
+        for task, (_, seconds, error) in zip(tasks, outcomes)
+        if error is None
+    }
+    batch_metadata = {
+        "batch_id": batch_id,
+        "preprocessing_task_id": owner.task_id,
+        "preprocessing_seconds": round(preprocessing_seconds, 3),
+        "solve_seconds": solve_timings,
+    }
+    logger.info(
+        f"批量分析 {batch_id} 完成: 预处理 {preprocessing_seconds:.2f} 秒, 各算法求解耗时 {solve_timings}"
+    )
+
+    for task, algorithm, (solved, seconds, error) in zip(tasks, algorithms, outcomes):
+        if error is not None:
+            fail_tasks([task], error)
+            continue
+
+        try:
+            result = algorithm.complete_result(
+                algorithm.new_result(task.task_id, started_at), preprocessing, solved, seconds
+            )
+            _save_algorithm_result(
+                db, task, result, worker_ids[task.task_id], extra_metadata={"batch": batch_metadata}
+            )
+        except LeaseLostError:
+            db.rollback()
+            logger.warning(f"批量分析任务 {task.task_id} 的租约已被回收，丢弃本次执行的结果")
+        except Exception as e:
+            logger.error(f"批量分析任务 {task.task_id} 保存结果失败: {str(e)}", exc_info=True)
+            db.rollback()
+            fail_tasks([task], str(e))
+
+
 def _save_smoothed_trajectory_results(db: Session, task_id: str, result) -> None:
     """保存单源盲测的平滑轨迹结果"""
     metadata = result.metadata or {}
-    smoothed_trajectory = metadata.get("smoothed_trajectory", [])
-
-    trajectories_by_key = defaultdict(list)
-    for point in smoothed_trajectory:
-        key = (point.get("station_id"), point.get("batch_id", "unknown"))
-        trajectories_by_key[key].append(point)
+    smoothed_trajectory = result.trajectory or metadata.get("smoothed_trajectory", [])
 
     errors = result.errors or {}
 
-    for (station_id, batch_id), points in trajectories_by_key.items():
+    # 按 (雷达站, 批次) 稳定排序后分组，不依赖算法输出的顺序，同一航迹内的点保持原有顺序
+    def group_key(point: Dict[str, Any]) -> Tuple[Any, str]:
+        return point.get("station_id"), point.get("batch_id", "unknown")
+
+    for (station_id, batch_id), group in groupby(sorted(smoothed_trajectory, key=group_key), key=group_key):
+        points = list(group)
         original_points = []
         smoothed_points = []
 
@@ -153,6 +400,7 @@ def _save_smoothed_trajectory_results(db: Session, task_id: str, result) -> None
 
 def _save_error_results_from_result(db: Session, task_id: str, result) -> None:
     """从算法执行结果保存误差结果（多源参考算法）"""
+    bootstrap = (result.metadata or {}).get("bootstrap") or {}
     for station_id, errors in result.errors.items():
         error_record = ErrorResult(
             task_id=task_id,
@@ -163,9 +411,26 @@ def _save_error_results_from_result(db: Session, task_id: str, result) -> None:
             match_count=result.match_statistics.get("total_match_groups", 0),
             confidence=result.match_statistics.get("station_weights", {}).get(str(station_id)),
         )
+        error_record.confidence_intervals = _confidence_intervals(bootstrap, station_id)
         db.add(error_record)
 
 
+def _confidence_intervals(bootstrap: Dict[str, Any], station_id: int) -> List[ErrorConfidenceInterval]:
+    """从自助法结果元数据构建某站的误差置信区间记录"""
+    components = bootstrap.get("stations", {}).get(str(station_id), {})
+    return [
+        ErrorConfidenceInterval(
+            component=component,
+            lower=interval["lower"],
+            upper=interval["upper"],
+            std_error=interval.get("std_error"),
+            confidence_level=bootstrap["confidence_level"],
+            replicate_count=bootstrap["replicates"],
+        )
+        for component, interval in components.items()
+    ]
+
+
 def _execute_with_legacy_flow(db: Session, task: ErrorAnalysisTask, algorithm) -> None:
     """使用旧的 MRRA 流程执行分析（向后兼容）"""
     if task.config:
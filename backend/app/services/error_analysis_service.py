@@ -22,8 +22,11 @@ from app.schemas.error_analysis import (
     ErrorAnalysisConfig,
     ErrorAnalysisRequest,
     ErrorAnalysisTaskResponse,
+    BatchAnalysisRequest,
+    BatchAnalysisResponse,
     ErrorAnalysisResult,
     ErrorChartResponse,
+    ConfidenceIntervalResponse,
     MatchStatistics,
     ErrorAnalysisSummary,
     ErrorResultResponse,
@@ -31,7 +34,15 @@ from app.schemas.error_analysis import (
     TrackSegmentResponse,
 )
 from app.algorithms.multi_source.preprocessing.config import MrraConfig
-from app.services.error_analysis_executor import execute_analysis, SINGLE_SOURCE_ALGORITHMS
+from app.algorithms.multi_source.preprocessing.track_matcher import decode_match_points
+from app.services.error_analysis_executor import (
+    execute_analysis,
+    execute_batch_analysis,
+    SINGLE_SOURCE_ALGORITHMS,
+    MULTI_SOURCE_ALGORITHMS,
+)
+from app.services.analysis_queue import enqueue_tasks
+from app.services.task_fingerprint import compute_task_fingerprint, find_completed_task
 from core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -48,8 +59,25 @@ class ErrorAnalysisService:
         request: ErrorAnalysisRequest,
         user_id: int,
     ) -> ErrorAnalysisTaskResponse:
+        """
+        创建误差分析任务
+
+        已有指纹相同的已完成任务且未要求强制重新计算时，新任务直接关联其结果并标记为完成，
+        无需再执行（返回的 status 为 completed，result_task_id 为来源任务）。
+        否则任务进入任务队列，由工作进程领取执行。
+
+        Args:
+            request: 分析请求
+            user_id: 用户ID
+
+        Returns:
+            ErrorAnalysisTaskResponse
+        """
         task_id = str(uuid.uuid4())
         config_dict = request.config.model_dump() if request.config else {}
+        fingerprint = compute_task_fingerprint(
+            self.db, request.algorithm, config_dict, request.radar_station_ids, request.track_ids
+        )
 
         task = ErrorAnalysisTask(
             task_id=task_id,
@@ -60,21 +88,49 @@ class ErrorAnalysisService:
             config=config_dict,
             status=ErrorAnalysisTaskStatus.PENDING,
             progress=0,
+            fingerprint=fingerprint,
+            priority=request.priority,
         )
 
+        source = None
+        if fingerprint and not request.force_recompute:
+            source = find_completed_task(self.db, fingerprint)
+        if source:
+            self._link_results(task, source)
+
         self.db.add(task)
         self.db.commit()
         self.db.refresh(task)
+        self._enqueue([task])
 
         logger.info(
             f"创建误差分析任务: {task_id}, "
             f"算法: {request.algorithm}, "
             f"雷达站: {request.radar_station_ids}, "
             f"轨迹: {request.track_ids}"
+            + (f", 复用任务 {task.result_task_id} 的结果" if source else "")
         )
 
         return self._task_to_response(task)
 
+    @staticmethod
+    def _link_results(task: ErrorAnalysisTask, source: ErrorAnalysisTask) -> None:
+        """将任务标记为完成，结果数据关联到来源任务（不复制结果行）"""
+        now = datetime.utcnow()
+        task.result_task_id = source.result_source_id
+        task.result_metadata = {**(source.result_metadata or {}), "reused_from": task.result_task_id}
+        task.status = ErrorAnalysisTaskStatus.COMPLETED
+        task.progress = 100
+        task.started_at = now
+        task.completed_at = now
+
+    def _enqueue(self, tasks: List[ErrorAnalysisTask]) -> None:
+        """任务入队；队列不可用时任务已保存，由工作进程定期重新入队"""
+        try:
+            enqueue_tasks(self.db, tasks)
+        except Exception as e:
+            logger.error(f"分析作业入队失败，将由工作进程重新入队: {e}")
+
     def execute_analysis(self, task_id: str) -> None:
         task = self.db.query(ErrorAnalysisTask).filter(
             ErrorAnalysisTask.task_id == task_id
@@ -88,6 +144,96 @@ class ErrorAnalysisService:
 
         execute_analysis(self.db, task)
 
+    def create_batch_analysis_tasks(
+        self,
+        request: BatchAnalysisRequest,
+        user_id: int,
+    ) -> BatchAnalysisResponse:
+        """
+        创建批量分析任务（每个算法一个任务，共享同一次预处理）
+
+        Args:
+            request: 批量分析请求
+            user_id: 用户ID
+
+        Returns:
+            BatchAnalysisResponse
+
+        Raises:
+            ValueError: 算法不是多源算法或配置无效
+        """
+        from app.algorithms.factory import AlgorithmFactory
+
+        batch_id = str(uuid.uuid4())
+        tasks = []
+
+        for spec in request.algorithms:
+            if spec.algorithm not in MULTI_SOURCE_ALGORITHMS:
+                raise ValueError(f"批量分析仅支持多源算法: {spec.algorithm}")
+
+            # 按算法配置类校验并补全默认值
+            algorithm = AlgorithmFactory.create_algorithm_from_dict(spec.algorithm, spec.config or {})
+            config_dict = algorithm.config.model_dump()
+
+            task = ErrorAnalysisTask(
+                task_id=str(uuid.uuid4()),
+                radar_station_ids=request.radar_station_ids,
+                track_ids=request.track_ids,
+                user_id=user_id,
+                algorithm_name=spec.algorithm,
+                config=config_dict,
+                status=ErrorAnalysisTaskStatus.PENDING,
+                progress=0,
+                fingerprint=compute_task_fingerprint(
+                    self.db, spec.algorithm, config_dict, request.radar_station_ids, request.track_ids
+                ),
+                priority=request.priority,
+                batch_id=batch_id,
+            )
+            self.db.add(task)
+            tasks.append(task)
+
+        self.db.commit()
+        for task in tasks:
+            self.db.refresh(task)
+        self._enqueue(tasks)
+
+        logger.info(
+            f"创建批量误差分析: {batch_id}, "
+            f"算法: {[spec.algorithm for spec in request.algorithms]}, "
+            f"雷达站: {request.radar_station_ids}, "
+            f"轨迹: {request.track_ids}"
+        )
+
+        return BatchAnalysisResponse(
+            batch_id=batch_id,
+            tasks=[self._task_to_response(task) for task in tasks],
+        )
+
+    def execute_batch_analysis(self, batch_id: str, task_ids: List[str]) -> None:
+        """
+        执行批量分析任务
+
+        Args:
+            batch_id: 批次ID
+            task_ids: 批次内的任务ID列表（顺序与创建时一致）
+        """
+        tasks = self.db.query(ErrorAnalysisTask).filter(
+            ErrorAnalysisTask.task_id.in_(task_ids)
+        ).all()
+        tasks_by_id = {task.task_id: task for task in tasks}
+
+        missing = [task_id for task_id in task_ids if task_id not in tasks_by_id]
+        if missing:
+            raise ValueError(f"任务不存在: {missing}")
+
+        ordered = [tasks_by_id[task_id] for task_id in task_ids]
+        for task in ordered:
+            if task.status != ErrorAnalysisTaskStatus.PENDING:
+                raise ValueError(f"任务状态不正确: {task.status}")
+
+        execute_batch_analysis(self.db, ordered, batch_id)
+
     def update_progress(self, task_id: str, progress: int, message: Optional[str] = None) -> None:
         task = self.db.query(ErrorAnalysisTask).filter(
             ErrorAnalysisTask.task_id == task_id
@@ -119,18 +265,19 @@ class ErrorAnalysisService:
         if task.status != ErrorAnalysisTaskStatus.COMPLETED:
             raise ValueError(f"任务未完成: {task.status}")
 
+        source_id = task.result_source_id
         error_results = self.db.query(ErrorResult).filter(
-            ErrorResult.task_id == task_id
+            ErrorResult.task_id == source_id
         ).all()
 
         match_groups = self.db.query(MatchGroup).filter(
-            MatchGroup.task_id == task_id
+            MatchGroup.task_id == source_id
         ).all()
 
         match_statistics = self._calculate_match_statistics(match_groups)
 
         segments_count = self.db.query(TrackSegment).filter(
-            TrackSegment.task_id == task_id
+            TrackSegment.task_id == source_id
         ).count()
 
         processing_time = 0.0
@@ -155,6 +302,10 @@ class ErrorAnalysisService:
                 confidence=e.confidence,
                 iterations=e.iterations,
                 final_cost=e.final_cost,
+                confidence_intervals={
+                    interval.component: ConfidenceIntervalResponse.model_validate(interval)
+                    for interval in e.confidence_intervals
+                },
             )
             for e in error_results
         ]
@@ -183,8 +334,9 @@ class ErrorAnalysisService:
         if not task:
             raise ValueError(f"任务不存在: {task_id}")
 
+        source_id = task.result_source_id
         error_results = self.db.query(ErrorResult).filter(
-            ErrorResult.task_id == task_id
+            ErrorResult.task_id == source_id
         ).order_by(ErrorResult.station_id).all()
 
         radar_stations = self.db.query(RadarStation).all()
@@ -206,7 +358,7 @@ class ErrorAnalysisService:
             match_counts.append(e.match_count)
 
         match_groups = self.db.query(MatchGroup).filter(
-            MatchGroup.task_id == task_id
+            MatchGroup.task_id == source_id
         ).all()
 
         group_size_distribution = {}
@@ -226,7 +378,7 @@ class ErrorAnalysisService:
 
     def get_track_segments(self, task_id: str, limit: int = 100) -> List[TrackSegmentResponse]:
         segments = self.db.query(TrackSegment).filter(
-            TrackSegment.task_id == task_id
+            TrackSegment.task_id == self._result_source_id(task_id)
         ).limit(limit).all()
 
         return [
@@ -248,7 +400,7 @@ class ErrorAnalysisService:
         from app.schemas.error_analysis import MatchPoint
 
         groups = self.db.query(MatchGroup).filter(
-            MatchGroup.task_id == task_id
+            MatchGroup.task_id == self._result_source_id(task_id)
         ).limit(limit).all()
 
         result = []
@@ -261,7 +413,7 @@ class ErrorAnalysisService:
                     latitude=p['latitude'],
                     altitude=p.get('altitude'),
                 )
-                for p in g.match_points
+                for p in decode_match_points(g.match_points)
             ]
 
             result.append(MatchGroupResponse(
@@ -336,10 +488,11 @@ class ErrorAnalysisService:
         else:
             config = ErrorAnalysisConfig()
         process_steps = self._build_process_steps(task, processing_time)
+        source_id = task.result_source_id
 
         # 航迹段数据
         segments = self.db.query(TrackSegment).filter(
-            TrackSegment.task_id == task_id
+            TrackSegment.task_id == source_id
         ).all()
 
         segments_detail = []
@@ -380,7 +533,7 @@ class ErrorAnalysisService:
         interpolated_points = []
         if include_points:
             points = self.db.query(TrackInterpolatedPoint).filter(
-                TrackInterpolatedPoint.task_id == task_id
+                TrackInterpolatedPoint.task_id == source_id
             ).limit(10000).all()
 
             points_by_station = {}
@@ -419,10 +572,10 @@ class ErrorAnalysisService:
             )
         else:
             total_points = self.db.query(TrackInterpolatedPoint).filter(
-                TrackInterpolatedPoint.task_id == task_id
+                TrackInterpolatedPoint.task_id == source_id
             ).count()
             original_points = self.db.query(TrackInterpolatedPoint).filter(
-                TrackInterpolatedPoint.task_id == task_id,
+                TrackInterpolatedPoint.task_id == source_id,
                 TrackInterpolatedPoint.is_original == 1,
             ).count()
 
@@ -431,7 +584,7 @@ class ErrorAnalysisService:
                 TrackInterpolatedPoint.station_id,
                 func.count(TrackInterpolatedPoint.id).label('count'),
             ).filter(
-                TrackInterpolatedPoint.task_id == task_id,
+                TrackInterpolatedPoint.task_id == source_id,
             ).group_by(TrackInterpolatedPoint.station_id).all()
 
             for p in points:
@@ -447,13 +600,15 @@ class ErrorAnalysisService:
 
         # 匹配组数据
         match_groups_db = self.db.query(MatchGroup).filter(
-            MatchGroup.task_id == task_id
+            MatchGroup.task_id == source_id
         ).all()
 
+        match_points_by_group = {g.id: decode_match_points(g.match_points) for g in match_groups_db}
+
         match_groups_detail = []
         for g in match_groups_db:
             station_ids = list(set(
-                p.get('station_id') for p in (g.match_points or [])
+                p.get('station_id') for p in match_points_by_group[g.id]
                 if isinstance(p, dict) and p.get('station_id') is not None
             ))
 
@@ -461,7 +616,7 @@ class ErrorAnalysisService:
                 id=g.id,
                 group_id=g.group_id,
                 match_time=g.match_time,
-                match_points=g.match_points,
+                match_points=match_points_by_group[g.id],
                 point_count=g.point_count,
                 avg_distance=g.avg_distance,
                 max_distance=g.max_distance,
@@ -474,7 +629,7 @@ class ErrorAnalysisService:
             avg_distances = [g.avg_distance for g in match_groups_db if g.avg_distance is not None]
             all_station_ids = set()
             for g in match_groups_db:
-                for p in (g.match_points or []):
+                for p in match_points_by_group[g.id]:
                     if isinstance(p, dict) and p.get('station_id') is not None:
                         all_station_ids.add(p.get('station_id'))
             match_summary = {
@@ -493,7 +648,7 @@ class ErrorAnalysisService:
 
         # 误差结果
         error_results_db = self.db.query(ErrorResult).filter(
-            ErrorResult.task_id == task_id
+            ErrorResult.task_id == source_id
         ).all()
 
         error_results_detail = []
@@ -516,6 +671,10 @@ class ErrorAnalysisService:
                 azimuth_quality=azimuth_quality,
                 range_quality=range_quality,
                 elevation_quality=elevation_quality,
+                confidence_intervals={
+                    interval.component: ConfidenceIntervalResponse.model_validate(interval)
+                    for interval in e.confidence_intervals
+                },
             ))
 
         # 平滑轨迹结果（单源盲测算法）
@@ -525,7 +684,7 @@ class ErrorAnalysisService:
 
         if algorithm_name in SINGLE_SOURCE_ALGORITHMS:
             smoothed_results = self.db.query(SmoothedTrajectoryResult).filter(
-                SmoothedTrajectoryResult.task_id == task_id
+                SmoothedTrajectoryResult.task_id == source_id
             ).all()
 
             for sr in smoothed_results:
@@ -618,6 +777,13 @@ class ErrorAnalysisService:
             max_group_size=int(np.max(sizes)),
         )
 
+    def _result_source_id(self, task_id: str) -> str:
+        """任务结果数据所在的任务ID（复用结果的任务指向来源任务）"""
+        result_task_id = self.db.query(ErrorAnalysisTask.result_task_id).filter(
+            ErrorAnalysisTask.task_id == task_id
+        ).scalar()
+        return result_task_id or task_id
+
     def _task_to_response(self, task: ErrorAnalysisTask) -> ErrorAnalysisTaskResponse:
         station_ids_display = task.radar_station_ids or []
         if task.radar_station_ids:
@@ -639,6 +805,7 @@ class ErrorAnalysisService:
             created_at=task.created_at,
             started_at=task.started_at,
             completed_at=task.completed_at,
+            result_task_id=task.result_task_id,
         )
 
     def _build_process_steps(self, task: ErrorAnalysisTask, processing_time: float) -> List[Dict]:
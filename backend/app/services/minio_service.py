@@ -175,6 +175,36 @@ class MinIOService:
             logger.error(f"文件上传失败: {e}")
             raise
 
+    def put_object_bytes(
+        self,
+        object_name: str,
+        data: bytes,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        """
+        以指定对象名称写入二进制数据（覆盖同名对象）
+
+        Args:
+            object_name: 对象名称（包含路径）
+            data: 二进制数据
+            content_type: MIME 类型
+
+        Returns:
+            对象名称
+        """
+        try:
+            self.client.put_object(
+                self._bucket,
+                object_name,
+                data=BytesIO(data),
+                length=len(data),
+                content_type=content_type,
+            )
+            return object_name
+        except S3Error as e:
+            logger.error(f"对象写入失败: {e}")
+            raise
+
     def upload_data_file(
         self,
         file_data: bytes,
@@ -0,0 +1,105 @@
+"""
+误差分析任务指纹
+
+相同的算法（含版本）、规范化后的配置、雷达站、轨迹和源数据得到相同的分析结果。
+任务指纹是这些输入的 SHA-256 哈希，新任务与已完成任务的指纹相同时直接复用其结果。
+
+- 配置按算法配置类校验并补全默认值后参与哈希，只改变并行方式、不改变结果的字段不参与
+- 源数据版本由所选轨迹的记录数、最大ID和最新创建时间，以及雷达站位置组成，
+  数据追加或雷达站位置修改后指纹随之变化
+- 结果不可复现的配置（随机种子为空且实际随机抽样、自助法受时间预算限制）不生成指纹
+"""
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.error_analysis import ErrorAnalysisTask, ErrorAnalysisTaskStatus
+from app.models.flight_track import RadarStation
+from app.algorithms.multi_source.preprocessing.pipeline import get_source_data_version
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 只影响并行方式、不影响结果的配置字段
+RESULT_NEUTRAL_CONFIG_FIELDS: Tuple[str, ...] = (
+    "batch_workers",
+    "bootstrap_workers",
+    "match_workers",
+)
+
+# 指纹格式版本（参与哈希的内容变化时递增）
+FINGERPRINT_FORMAT_VERSION = 3
+
+
+def compute_task_fingerprint(
+    db: Session,
+    algorithm_name: str,
+    config_dict: Dict[str, Any],
+    radar_station_ids: Iterable[int],
+    track_ids: Iterable[str],
+) -> Optional[str]:
+    """
+    计算误差分析任务指纹
+
+    Args:
+        db: 数据库会话
+        algorithm_name: 算法名称
+        config_dict: 任务配置
+        radar_station_ids: 雷达站ID列表
+        track_ids: 轨迹编号列表
+
+    Returns:
+        SHA-256 十六进制字符串；算法或配置无效、结果不可复现时返回 None
+    """
+    from app.algorithms.factory import AlgorithmFactory
+
+    try:
+        algorithm = AlgorithmFactory.create_algorithm_from_dict(algorithm_name, config_dict or {})
+    except ValueError:
+        return None
+
+    station_ids = sorted({int(sid) for sid in radar_station_ids})
+    if not algorithm.is_deterministic(len(station_ids)):
+        return None
+
+    config = algorithm.config
+    normalized = config.model_dump(mode="json") if hasattr(config, "model_dump") else dict(config)
+    for field in RESULT_NEUTRAL_CONFIG_FIELDS:
+        normalized.pop(field, None)
+
+    track_ids = sorted({str(tid) for tid in track_ids})
+    stations = db.query(
+        RadarStation.id, RadarStation.longitude, RadarStation.latitude, RadarStation.altitude
+    ).filter(RadarStation.id.in_(station_ids)).order_by(RadarStation.id).all()
+
+    payload = {
+        "format": FINGERPRINT_FORMAT_VERSION,
+        "algorithm": algorithm.ALGORITHM_NAME,
+        "version": algorithm.ALGORITHM_VERSION,
+        "config": normalized,
+        "radar_station_ids": station_ids,
+        "track_ids": track_ids,
+        "stations": [[sid, lon, lat, alt] for sid, lon, lat, alt in stations],
+        "source_version": get_source_data_version(db, track_ids),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def find_completed_task(db: Session, fingerprint: str) -> Optional[ErrorAnalysisTask]:
+    """
+    查找指纹相同的已完成任务（最近完成的优先）
+
+    Args:
+        db: 数据库会话
+        fingerprint: 任务指纹
+
+    Returns:
+        已完成的任务，不存在时返回 None
+    """
+    return db.query(ErrorAnalysisTask).filter(
+        ErrorAnalysisTask.fingerprint == fingerprint,
+        ErrorAnalysisTask.status == ErrorAnalysisTaskStatus.COMPLETED,
+    ).order_by(ErrorAnalysisTask.completed_at.desc()).first()
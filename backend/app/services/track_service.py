@@ -170,9 +170,11 @@ class RANSACAlgorithm(TrackCorrectionAlgorithm):
         min_samples: int = 2,
         time_window: float = PreprocessingConfig.TIME_WINDOW_MATCH,
         position_threshold: float = PreprocessingConfig.POSITION_THRESHOLD,
+        random_state: Optional[int] = 0,
     ):
         self.residual_threshold = residual_threshold
         self.min_samples = min_samples
+        self.random_state = random_state
         self.time_window = time_window
         self.position_threshold = position_threshold
 
@@ -185,6 +187,7 @@ class RANSACAlgorithm(TrackCorrectionAlgorithm):
             "min_samples": self.min_samples,
             "time_window": self.time_window,
             "position_threshold": self.position_threshold,
+            "random_state": self.random_state,
         }
 
     def set_parameters(self, params: Dict):
@@ -196,6 +199,7 @@ class RANSACAlgorithm(TrackCorrectionAlgorithm):
         self.position_threshold = params.get(
             "position_threshold", self.position_threshold
         )
+        self.random_state = params.get("random_state", self.random_state)
 
     def correct(self, observations: List[Dict]) -> Dict:
         """
@@ -276,6 +280,7 @@ class RANSACAlgorithm(TrackCorrectionAlgorithm):
         ransac = RANSACRegressor(
             residual_threshold=self.residual_threshold,
             min_samples=self.min_samples,
+            random_state=self.random_state,
         )
 
         try:
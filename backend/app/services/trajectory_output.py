@@ -0,0 +1,203 @@
+"""
+算法输出轨迹存储
+
+融合轨迹（weighted_lstsq）和平滑轨迹（单源算法）的完整输出按点批量写入 trajectory_output_points 表，
+任务元数据（result_metadata）中只保留前若干点用于预览，避免每次查询任务都读出整条轨迹。
+查询按点序号分页，并可按时间范围截取。
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.error_analysis import TrajectoryOutputPoint
+from core.database import bulk_insert
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 轨迹类型
+TRAJECTORY_FUSED = "fused"
+TRAJECTORY_SMOOTHED = "smoothed"
+
+
+def _utc_seconds(timestamp: datetime) -> float:
+    """时间戳转换为 UTC 秒数（无时区的时间按 UTC 处理）"""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def _fused_row(task_id: str, sequence: int, point: Dict[str, Any]) -> Dict[str, Any]:
+    """融合轨迹点 -> 表行"""
+    return {
+        "task_id": task_id,
+        "kind": TRAJECTORY_FUSED,
+        "sequence": sequence,
+        "time_seconds": point.get("time_seconds"),
+        "longitude": point["longitude"],
+        "latitude": point["latitude"],
+        "altitude": point.get("altitude"),
+        "group_size": point.get("match_group_size"),
+        "station_ids": point.get("station_ids"),
+    }
+
+
+def _smoothed_row(task_id: str, sequence: int, point: Dict[str, Any]) -> Dict[str, Any]:
+    """平滑轨迹点 -> 表行"""
+    timestamp = datetime.fromisoformat(point["timestamp"]) if point.get("timestamp") else None
+    return {
+        "task_id": task_id,
+        "kind": TRAJECTORY_SMOOTHED,
+        "sequence": sequence,
+        "time_seconds": _utc_seconds(timestamp) if timestamp else None,
+        "timestamp": timestamp.replace(tzinfo=None) if timestamp else None,
+        "station_id": point.get("station_id"),
+        "batch_id": point.get("batch_id"),
+        "longitude": point["longitude"],
+        "latitude": point["latitude"],
+        "altitude": point.get("altitude"),
+        "orig_longitude": point.get("orig_lon"),
+        "orig_latitude": point.get("orig_lat"),
+        "orig_altitude": point.get("orig_alt"),
+        "covariance_trace": point.get("covariance_trace"),
+    }
+
+
+def _to_point(row: TrajectoryOutputPoint) -> Dict[str, Any]:
+    """表行 -> 轨迹点（字段名与算法输出一致）"""
+    if row.kind == TRAJECTORY_FUSED:
+        return {
+            "latitude": row.latitude,
+            "longitude": row.longitude,
+            "altitude": row.altitude,
+            "match_group_size": row.group_size,
+            "time_seconds": row.time_seconds,
+            "station_ids": row.station_ids or [],
+        }
+    return {
+        "batch_id": row.batch_id,
+        "station_id": row.station_id,
+        "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+        "latitude": row.latitude,
+        "longitude": row.longitude,
+        "altitude": row.altitude,
+        "orig_lat": row.orig_latitude,
+        "orig_lon": row.orig_longitude,
+        "orig_alt": row.orig_altitude,
+        "covariance_trace": row.covariance_trace,
+    }
+
+
+def save_trajectory_output(
+    db: Session,
+    task_id: str,
+    kind: str,
+    points: List[Dict[str, Any]],
+    commit: bool = True,
+) -> int:
+    """
+    保存任务的完整输出轨迹（覆盖该任务同类型的已有输出）
+
+    Args:
+        db: 数据库会话
+        task_id: 任务ID
+        kind: 轨迹类型（TRAJECTORY_FUSED / TRAJECTORY_SMOOTHED）
+        points: 算法输出的轨迹点列表
+        commit: 是否分批提交（False 时由调用方与任务状态一起提交）
+
+    Returns:
+        写入的点数
+    """
+    make_row = _fused_row if kind == TRAJECTORY_FUSED else _smoothed_row
+
+    db.query(TrajectoryOutputPoint).filter(
+        TrajectoryOutputPoint.task_id == task_id,
+        TrajectoryOutputPoint.kind == kind,
+    ).delete(synchronize_session=False)
+
+    rows = [make_row(task_id, sequence, point) for sequence, point in enumerate(points)]
+    saved = bulk_insert(db, TrajectoryOutputPoint, rows, commit=commit)
+    logger.info(f"[{task_id}] 保存输出轨迹 {kind}: {saved} 个点")
+    return saved
+
+
+def query_trajectory_output(
+    db: Session,
+    task_id: str,
+    kind: str,
+    offset: int = 0,
+    limit: int = 1000,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    分页查询任务的输出轨迹
+
+    Args:
+        db: 数据库会话
+        task_id: 任务ID
+        kind: 轨迹类型
+        offset: 跳过的点数（在时间范围筛选之后）
+        limit: 返回的最大点数
+        start_time: 时间下限（秒，含），为空时不限
+        end_time: 时间上限（秒，含），为空时不限
+
+    Returns:
+        (时间范围内的总点数, 本页轨迹点列表)，按算法输出顺序排列
+    """
+    query = db.query(TrajectoryOutputPoint).filter(
+        TrajectoryOutputPoint.task_id == task_id,
+        TrajectoryOutputPoint.kind == kind,
+    )
+    if start_time is not None:
+        query = query.filter(TrajectoryOutputPoint.time_seconds >= start_time)
+    if end_time is not None:
+        query = query.filter(TrajectoryOutputPoint.time_seconds <= end_time)
+
+    total = query.count()
+    rows = query.order_by(TrajectoryOutputPoint.sequence).offset(offset).limit(limit).all()
+    return total, [_to_point(row) for row in rows]
+
+
+def has_trajectory_output(db: Session, task_id: str, kind: str) -> bool:
+    """任务是否已保存该类型的输出轨迹（轨迹输出表建立之前完成的任务没有）"""
+    return db.query(TrajectoryOutputPoint.id).filter(
+        TrajectoryOutputPoint.task_id == task_id,
+        TrajectoryOutputPoint.kind == kind,
+    ).first() is not None
+
+
+def slice_trajectory_preview(
+    points: List[Dict[str, Any]],
+    kind: str,
+    offset: int = 0,
+    limit: int = 1000,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    对元数据中的轨迹预览按与 query_trajectory_output() 相同的规则截取和分页
+
+    Args:
+        points: 元数据中保存的轨迹点列表
+        kind: 轨迹类型
+        offset, limit, start_time, end_time: 同 query_trajectory_output()
+
+    Returns:
+        (时间范围内的总点数, 本页轨迹点列表)
+    """
+    if start_time is not None or end_time is not None:
+        make_row = _fused_row if kind == TRAJECTORY_FUSED else _smoothed_row
+        selected = []
+        for point in points:
+            time_seconds = make_row("", 0, point)["time_seconds"]
+            if time_seconds is None:
+                continue
+            if start_time is not None and time_seconds < start_time:
+                continue
+            if end_time is not None and time_seconds > end_time:
+                continue
+            selected.append(point)
+        points = selected
+    return len(points), points[offset:offset + limit]
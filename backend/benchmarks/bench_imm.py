@@ -0,0 +1,189 @@
+"""
+交互式多模型（IMM）滤波基准测试
+
+生成含转弯、加减速和爬升/下降机动的合成航迹（局部米制坐标积分后换算为经纬度，叠加观测噪声），
+对比 IMM、卡尔曼滤波（米制坐标、白噪声加速度模型）和粒子滤波的每点耗时，
+以及相对真实位置的水平、垂直均方根误差（米），误差分别统计全部点和机动段的点。
+
+粒子滤波的似然把高度（米）与经纬度（度）的差直接相加，高度项会压倒水平项，
+因此粒子滤波只对水平位置运行（不报告垂直误差）；其噪声参数为在该场景下网格搜索得到的最优值。
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_imm --tracks 20 --points 300 --particles 1000 5000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from app.algorithms.single_source.imm.algorithm import ImmAlgorithm
+from app.algorithms.single_source.imm.config import ImmAlgorithmConfig
+from app.algorithms.single_source.kalman.algorithm import KalmanAlgorithm
+from app.algorithms.single_source.kalman.config import KalmanAlgorithmConfig
+from app.algorithms.single_source.local_frame import local_metric_frame
+from app.algorithms.single_source.particle_filter.algorithm import ParticleFilterAlgorithm
+from app.algorithms.single_source.particle_filter.config import ParticleFilterAlgorithmConfig
+
+# 真实轨迹的积分步长（秒）
+_INTEGRATION_STEP = 0.1
+
+
+def make_manoeuvring_track(
+    point_count: int,
+    seed: int = 0,
+    horizontal_noise: float = 50.0,
+    vertical_noise: float = 30.0,
+) -> Tuple[List[SimpleNamespace], np.ndarray, np.ndarray]:
+    """
+    生成一条机动航迹
+
+    航迹由若干 30–120 秒的航段组成，每段随机为直线、协调转弯（1.5–4°/s）、
+    纵向加减速（±3 m/s²）或爬升/下降（垂直速度变化至 ±15 m/s）。
+
+    Returns:
+        (航迹点, 真实位置（北、东、天，米）, 各点是否处于机动段)
+    """
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 5, 1, 8, 0, 0)
+    sample_times = np.cumsum(rng.uniform(3.0, 5.0, point_count))
+    sample_times -= sample_times[0]
+
+    position = np.zeros(3)
+    heading = rng.uniform(0, 2 * np.pi)
+    speed = rng.uniform(180.0, 250.0)
+    vertical_speed = 0.0
+
+    truth = np.zeros((point_count, 3))
+    manoeuvring = np.zeros(point_count, dtype=bool)
+    time_now, segment_end, sample = 0.0, 0.0, 0
+    turn_rate = acceleration = target_vertical_speed = 0.0
+    while sample < point_count:
+        if time_now >= segment_end:
+            segment_end = time_now + rng.uniform(30.0, 120.0)
+            kind = rng.choice(["straight", "turn", "speed", "climb"], p=[0.4, 0.3, 0.15, 0.15])
+            turn_rate = np.radians(rng.uniform(1.5, 4.0)) * rng.choice([-1, 1]) if kind == "turn" else 0.0
+            acceleration = rng.uniform(-3.0, 3.0) if kind == "speed" else 0.0
+            target_vertical_speed = rng.uniform(-15.0, 15.0) if kind == "climb" else 0.0
+        while sample < point_count and sample_times[sample] <= time_now:
+            truth[sample] = position
+            manoeuvring[sample] = bool(turn_rate or acceleration or abs(vertical_speed) > 1.0)
+            sample += 1
+        heading += turn_rate * _INTEGRATION_STEP
+        speed = float(np.clip(speed + acceleration * _INTEGRATION_STEP, 120.0, 300.0))
+        vertical_speed += np.clip(target_vertical_speed - vertical_speed, -0.5, 0.5) * _INTEGRATION_STEP * 10
+        position = position + _INTEGRATION_STEP * np.array(
+            [speed * np.cos(heading), speed * np.sin(heading), vertical_speed]
+        )
+        time_now += _INTEGRATION_STEP
+
+    truth[:, 2] += 8000.0
+    observed = truth + rng.normal(0, [horizontal_noise, horizontal_noise, vertical_noise], truth.shape)
+    frame = local_metric_frame(np.array([39.5, 116.3, 0.0]))
+    geodetic = frame.to_geodetic(observed)
+    points = [
+        SimpleNamespace(
+            batch_id=f"B{seed}", radar_station_id=1, timestamp=start + timedelta(seconds=float(t)),
+            latitude=float(lat), longitude=float(lon), altitude=float(alt),
+        )
+        for t, (lat, lon, alt) in zip(sample_times, geodetic)
+    ]
+    return points, truth, manoeuvring
+
+
+def _rms_errors(
+    smoothed: List[List[dict]],
+    truths: List[np.ndarray],
+    masks: List[np.ndarray],
+) -> Tuple[float, float, float]:
+    """(全部点水平 RMSE, 全部点垂直 RMSE, 机动段水平 RMSE)，单位米"""
+    frame = local_metric_frame(np.array([39.5, 116.3, 0.0]))
+    horizontal, vertical, manoeuvre = [], [], []
+    for points, truth, mask in zip(smoothed, truths, masks):
+        estimated = frame.to_local(np.array([(p["latitude"], p["longitude"], p["altitude"]) for p in points]))
+        squared = (estimated - truth) ** 2
+        horizontal.append(squared[:, :2].sum(axis=1))
+        vertical.append(squared[:, 2])
+        manoeuvre.append(squared[mask, :2].sum(axis=1))
+    return tuple(float(np.sqrt(np.concatenate(values).mean())) for values in (horizontal, vertical, manoeuvre))
+
+
+def _run(
+    label: str,
+    process: Callable,
+    groups: List,
+    truths: List,
+    masks: List,
+    point_count: int,
+    horizontal_only: bool = False,
+) -> None:
+    """执行一种滤波并输出耗时和误差（horizontal_only 时输入不含高度）"""
+    if horizontal_only:
+        groups = [[SimpleNamespace(**{**vars(p), "altitude": None}) for p in points] for points in groups]
+    start = time.perf_counter()
+    smoothed = process(groups)
+    seconds = time.perf_counter() - start
+    if horizontal_only:
+        for points, original in zip(smoothed, truths):
+            for point, truth in zip(points, original):
+                point["altitude"] = truth[2]
+    horizontal, vertical, manoeuvre = _rms_errors(smoothed, truths, masks)
+    vertical_text = "      —" if horizontal_only else f"{vertical:7.1f}"
+    print(
+        f"{label:>14}: {seconds / point_count * 1e3:9.4f} ms/点  "
+        f"水平 {horizontal:8.1f} m  垂直 {vertical_text} m  机动段水平 {manoeuvre:8.1f} m"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IMM 滤波基准测试")
+    parser.add_argument("--tracks", type=int, default=20, help="航迹数量")
+    parser.add_argument("--points", type=int, default=300, help="每条航迹点数")
+    parser.add_argument("--particles", type=int, nargs="*", default=[1000, 5000], help="粒子滤波的粒子数")
+    parser.add_argument("--noise", type=float, default=50.0, help="水平观测噪声标准差（米）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+
+    tracks = [
+        make_manoeuvring_track(args.points, args.seed + k, horizontal_noise=args.noise) for k in range(args.tracks)
+    ]
+    groups = [points for points, _, _ in tracks]
+    truths = [truth for _, truth, _ in tracks]
+    masks = [mask for _, _, mask in tracks]
+    point_count = sum(len(points) for points in groups)
+    print(f"场景: {args.tracks} 条机动航迹, {point_count} 个点（机动段 {int(sum(m.sum() for m in masks))} 个）")
+
+    raw = [[{"latitude": p.latitude, "longitude": p.longitude, "altitude": p.altitude} for p in g] for g in groups]
+    horizontal, vertical, manoeuvre = _rms_errors(raw, truths, masks)
+    print(
+        f"{'观测':>14}: {'':>15}  "
+        f"水平 {horizontal:8.1f} m  垂直 {vertical:7.1f} m  机动段水平 {manoeuvre:8.1f} m"
+    )
+
+    imm = ImmAlgorithm(ImmAlgorithmConfig(measurement_std=args.noise))
+    _run("IMM", imm._apply_imm_filters, groups, truths, masks, point_count)
+
+    for process_noise in (1.0, 50.0):
+        kalman = KalmanAlgorithm(KalmanAlgorithmConfig(
+            coordinate_frame="local_metric",
+            process_noise_model="white_acceleration",
+            metric_process_noise=process_noise,
+            metric_measurement_std=args.noise,
+        ))
+        _run(f"卡尔曼 q={process_noise:g}", kalman._apply_kalman_filters, groups, truths, masks, point_count)
+
+    for particles in args.particles:
+        pf = ParticleFilterAlgorithm(ParticleFilterAlgorithmConfig(
+            num_particles=particles, process_noise_std=0.005, measurement_noise_std=0.02, random_seed=args.seed,
+        ))
+        _run(
+            f"粒子滤波 {particles}",
+            lambda batch: [pf._apply_particle_filter(points) for points in batch],
+            groups, truths, masks, point_count, horizontal_only=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
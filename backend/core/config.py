@@ -57,6 +57,39 @@ VERIFICATION_CODE_LENGTH = int(os.getenv("VERIFICATION_CODE_LENGTH", "6"))
 VERIFICATION_CODE_EXPIRE_MINUTES = int(os.getenv("VERIFICATION_CODE_EXPIRE_MINUTES", "5"))
 LOG_VERIFICATION_CODE = os.getenv("LOG_VERIFICATION_CODE", "True").lower() == "true"
 
+# Analysis Compute Settings
+# 算法并行计算的最大进程数（0 表示按 CPU 核数自动选择）
+ANALYSIS_MAX_WORKERS = int(os.getenv("ANALYSIS_MAX_WORKERS", "0"))
+
+# Preprocessing Cache Settings
+# 多源算法预处理结果缓存（内存 LRU，淘汰后落盘，可选同步到 MinIO）
+PREPROCESS_CACHE_ENABLED = os.getenv("PREPROCESS_CACHE_ENABLED", "True").lower() == "true"
+PREPROCESS_CACHE_MAX_ENTRIES = int(os.getenv("PREPROCESS_CACHE_MAX_ENTRIES", "8"))
+PREPROCESS_CACHE_DIR = os.getenv("PREPROCESS_CACHE_DIR", "")
+PREPROCESS_CACHE_DISK_ENTRIES = int(os.getenv("PREPROCESS_CACHE_DISK_ENTRIES", "64"))
+PREPROCESS_CACHE_MINIO = os.getenv("PREPROCESS_CACHE_MINIO", "False").lower() == "true"
+
+# Analysis Queue Settings
+# 分析任务队列后端：redis（有序集合，按优先级分发）或 database（工作进程直接轮询任务表）；
+# 留空时配置了 REDIS_URL 则使用 redis，否则使用 database
+ANALYSIS_QUEUE_BACKEND = os.getenv("ANALYSIS_QUEUE_BACKEND", "").lower()
+# 每个工作节点的并发任务数（工作进程数）
+ANALYSIS_WORKER_CONCURRENCY = int(os.getenv("ANALYSIS_WORKER_CONCURRENCY", "1"))
+# 任务租约时长（秒），工作进程超过该时间未续约视为崩溃，任务被回收
+ANALYSIS_LEASE_SECONDS = int(os.getenv("ANALYSIS_LEASE_SECONDS", "300"))
+# 工作进程续约（心跳）间隔（秒）
+ANALYSIS_HEARTBEAT_SECONDS = int(os.getenv("ANALYSIS_HEARTBEAT_SECONDS", "30"))
+# 任务最多执行次数（租约过期回收后重新排队，超过后标记为失败）
+ANALYSIS_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_MAX_ATTEMPTS", "3"))
+# 队列为空时的等待间隔（秒），同时是回收过期租约的检查间隔
+ANALYSIS_QUEUE_POLL_SECONDS = float(os.getenv("ANALYSIS_QUEUE_POLL_SECONDS", "2"))
+# 未领取的 PENDING 任务重新入队的间隔（秒）；入队失败或工作进程取出作业后、领取前崩溃时作业不在队列中，由此补回
+ANALYSIS_REQUEUE_SECONDS = int(os.getenv("ANALYSIS_REQUEUE_SECONDS", "60"))
+
+# Analysis Persistence Settings
+# 匹配点存储格式：json（点字典列表）或 packed（二进制紧凑编码，体积约为 json 的一半）
+MATCH_POINTS_ENCODING = os.getenv("MATCH_POINTS_ENCODING", "json").lower()
+
 
 def get_cors_origins() -> List[str]:
     """将 CORS_ORIGINS 字符串转换为列表"""
@@ -121,4 +154,22 @@ def get_settings():
         verification_code_length=VERIFICATION_CODE_LENGTH,
         verification_code_expire_minutes=VERIFICATION_CODE_EXPIRE_MINUTES,
         log_verification_code=LOG_VERIFICATION_CODE,
+
+        # Analysis Compute
+        analysis_max_workers=ANALYSIS_MAX_WORKERS,
+        preprocess_cache_enabled=PREPROCESS_CACHE_ENABLED,
+        preprocess_cache_max_entries=PREPROCESS_CACHE_MAX_ENTRIES,
+        preprocess_cache_dir=PREPROCESS_CACHE_DIR,
+        preprocess_cache_disk_entries=PREPROCESS_CACHE_DISK_ENTRIES,
+        preprocess_cache_minio=PREPROCESS_CACHE_MINIO,
+        match_points_encoding=MATCH_POINTS_ENCODING,
+
+        # Analysis Queue
+        analysis_queue_backend=ANALYSIS_QUEUE_BACKEND,
+        analysis_worker_concurrency=ANALYSIS_WORKER_CONCURRENCY,
+        analysis_lease_seconds=ANALYSIS_LEASE_SECONDS,
+        analysis_heartbeat_seconds=ANALYSIS_HEARTBEAT_SECONDS,
+        analysis_max_attempts=ANALYSIS_MAX_ATTEMPTS,
+        analysis_queue_poll_seconds=ANALYSIS_QUEUE_POLL_SECONDS,
+        analysis_requeue_seconds=ANALYSIS_REQUEUE_SECONDS,
     )
@@ -14,3 +14,31 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# 批量插入每批行数
+BULK_INSERT_BATCH_SIZE = 2000
+
+
+def bulk_insert(db, model, rows, batch_size=BULK_INSERT_BATCH_SIZE, commit=True):
+    """
+    按批执行 executemany INSERT（不经过 ORM 工作单元），每批提交一次
+
+    Args:
+        db: 数据库会话
+        model: ORM 模型类
+        rows: 列名 -> 值 的字典列表
+        batch_size: 每批行数
+        commit: 是否每批提交（False 时由调用方与其他写入一起提交）
+
+    Returns:
+        插入的行数
+    """
+    from sqlalchemy import insert
+
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(model), rows[start:start + batch_size])
+        if commit:
+            db.commit()
+
+    return len(rows)
@@ -0,0 +1,98 @@
+"""
+数据库结构升级模块
+
+Base.metadata.create_all 只创建缺失的表，不会修改已有的表。新版本增加的表以及为已有表增加的
+列和索引在这里登记，upgrade_schema 对照数据库的当前结构只补齐缺失的部分，可以重复执行。
+
+用法见 migrate.py。
+"""
+from typing import Dict, List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+
+from core.database import Base
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 新增的表（表定义取自模型）
+ADDED_TABLES: List[str] = [
+    "error_confidence_intervals",
+    "trajectory_output_points",
+]
+
+# 已有表新增的列：表名 -> 列名列表（列定义取自模型，非空列需在模型中设置 server_default）
+ADDED_COLUMNS: Dict[str, List[str]] = {
+    "error_analysis_tasks": [
+        "fingerprint",
+        "result_task_id",
+        "priority",
+        "batch_id",
+        "worker_id",
+        "lease_expires_at",
+        "attempts",
+    ],
+}
+
+# 已有表新增的索引：表名 -> 索引名列表（索引定义取自模型）
+ADDED_INDEXES: Dict[str, List[str]] = {
+    "error_analysis_tasks": ["idx_fingerprint_status", "idx_queue"],
+}
+
+
+def upgrade_schema(engine: Engine) -> List[str]:
+    """
+    创建缺失的新增表，为已有的表补齐缺失的列和索引（调用前需导入 app.models 注册模型）
+
+    登记了新增列的表不存在时跳过（由 create_all 按模型创建完整的表）。
+
+    Args:
+        engine: 数据库引擎
+
+    Returns:
+        执行的变更描述列表（结构已是最新时为空）
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    preparer = engine.dialect.identifier_preparer
+    changes = []
+
+    missing_tables = [name for name in ADDED_TABLES if name not in existing_tables]
+    if missing_tables:
+        Base.metadata.create_all(
+            bind=engine, tables=[Base.metadata.tables[name] for name in missing_tables]
+        )
+        changes.extend(f"{name}: 创建表" for name in missing_tables)
+
+    for table_name, column_names in ADDED_COLUMNS.items():
+        if table_name not in existing_tables:
+            continue
+        table = Base.metadata.tables[table_name]
+        existing_columns = {column['name'] for column in inspector.get_columns(table_name)}
+
+        for name in column_names:
+            if name in existing_columns:
+                continue
+            column_ddl = CreateColumn(table.c[name]).compile(dialect=engine.dialect)
+            with engine.begin() as connection:
+                connection.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_ddl}"))
+            changes.append(f"{table_name}: 增加列 {name}")
+
+    for table_name, index_names in ADDED_INDEXES.items():
+        if table_name not in existing_tables:
+            continue
+        table = Base.metadata.tables[table_name]
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table_name)}
+        indexes = {index.name: index for index in table.indexes}
+
+        for name in index_names:
+            if name in existing_indexes:
+                continue
+            indexes[name].create(bind=engine)
+            changes.append(f"{table_name}: 增加索引 {name}")
+
+    for change in changes:
+        logger.info(f"数据库结构升级: {change}")
+    return changes
@@ -0,0 +1,26 @@
+"""
+RFTIP 数据库结构升级入口
+
+创建缺失的表，并为已有的表补齐新版本增加的列和索引。可以重复执行，
+升级已部署的数据库时在启动新版本的 API 与工作进程之前运行一次。
+
+用法（在 backend 目录下）:
+    python migrate.py
+"""
+from core.database import Base, engine
+from core.logging import setup_logging, get_logger
+from core.migrations import upgrade_schema
+# Import models to ensure they are registered with Base
+import app.models  # noqa: F401
+
+
+def main():
+    setup_logging()
+    logger = get_logger(__name__)
+    Base.metadata.create_all(bind=engine)
+    changes = upgrade_schema(engine)
+    logger.info(f"数据库结构升级完成: {len(changes)} 项变更" if changes else "数据库结构已是最新")
+
+
+if __name__ == "__main__":
+    main()
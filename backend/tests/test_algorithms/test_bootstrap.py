@@ -0,0 +1,163 @@
+"""
+测试误差估计的自助法置信区间
+"""
+import multiprocessing
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.algorithms.multi_source.preprocessing.bootstrap import (
+    bootstrap_metadata,
+    bootstrap_radar_errors,
+    summarize_replicates,
+)
+from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from app.models.error_analysis import ErrorConfidenceInterval, ErrorResult
+from app.services.error_analysis_executor import _save_error_results_from_result
+
+RADAR_POSITIONS = {1: (115.6, 39.2, 50.0), 2: (116.5, 39.9, 120.0)}
+
+
+def _mean_offsets(match_groups, radar_positions, initial_errors=None):
+    """以组内各站的观测偏差均值作为误差估计（代替真实求解器）"""
+    offsets = {sid: [] for sid in radar_positions}
+    for group in match_groups:
+        for point in group:
+            offsets[point['station_id']].append(point['offset'])
+    return {sid: tuple(np.mean(values, axis=0)) for sid, values in offsets.items()}
+
+
+def _slow_mean_offsets(match_groups, radar_positions, initial_errors=None):
+    time.sleep(0.05)
+    return _mean_offsets(match_groups, radar_positions, initial_errors)
+
+
+def _stuck_mean_offsets(match_groups, radar_positions, initial_errors=None):
+    time.sleep(60)
+    return _mean_offsets(match_groups, radar_positions, initial_errors)
+
+
+@pytest.fixture(scope="module")
+def match_groups():
+    rng = np.random.default_rng(5)
+    return [
+        [
+            {'station_id': 1, 'offset': rng.normal([0.2, 100.0, 0.05], [0.1, 50.0, 0.02])},
+            {'station_id': 2, 'offset': rng.normal([-0.1, -40.0, 0.0], [0.1, 50.0, 0.02])},
+        ]
+        for _ in range(400)
+    ]
+
+
+def test_percentile_intervals_and_standard_errors():
+    replicates = [{1: (float(k), 10.0 * k, 0.0)} for k in range(101)]
+    result = summarize_replicates(replicates, {1: (50.0, 500.0, 0.0)}, 0.9)
+
+    assert result.intervals[1]["azimuth_error"] == pytest.approx((5.0, 95.0))
+    assert result.intervals[1]["range_error"] == pytest.approx((50.0, 950.0))
+    assert result.standard_errors[1]["azimuth_error"] == pytest.approx(np.std(np.arange(101), ddof=1))
+    assert result.intervals[1]["elevation_error"] == (0.0, 0.0)
+
+
+def test_intervals_cover_estimate_and_match_analytic_standard_error(match_groups):
+    config = MrraConfig(bootstrap_samples=200, bootstrap_seed=7, bootstrap_workers=1)
+    estimate = _mean_offsets(match_groups, RADAR_POSITIONS)
+    result = bootstrap_radar_errors(_mean_offsets, match_groups, RADAR_POSITIONS, estimate, config)
+
+    assert result.replicate_count == 200
+    for sid, point in estimate.items():
+        for k, component in enumerate(("azimuth_error", "range_error", "elevation_error")):
+            lower, upper = result.intervals[sid][component]
+            assert lower < point[k] < upper
+        # 均值的标准误差约为 σ/√n
+        assert result.standard_errors[sid]["range_error"] == pytest.approx(50.0 / np.sqrt(400), rel=0.25)
+
+    metadata = bootstrap_metadata(result)["bootstrap"]
+    assert metadata["replicates"] == 200
+    assert set(metadata["stations"]["1"]) == {"azimuth_error", "range_error", "elevation_error"}
+
+
+def test_pool_gives_same_intervals_as_serial(match_groups):
+    estimate = _mean_offsets(match_groups, RADAR_POSITIONS)
+    serial = bootstrap_radar_errors(
+        _mean_offsets, match_groups, RADAR_POSITIONS, estimate,
+        MrraConfig(bootstrap_samples=30, bootstrap_seed=3, bootstrap_workers=1)
+    )
+    pooled = bootstrap_radar_errors(
+        _mean_offsets, match_groups, RADAR_POSITIONS, estimate,
+        MrraConfig(bootstrap_samples=30, bootstrap_seed=3, bootstrap_workers=2)
+    )
+
+    assert pooled.replicate_count == 30
+    for sid in RADAR_POSITIONS:
+        for component, interval in serial.intervals[sid].items():
+            assert pooled.intervals[sid][component] == pytest.approx(interval)
+
+
+def test_time_budget_stops_resampling(match_groups):
+    estimate = _mean_offsets(match_groups, RADAR_POSITIONS)
+    config = MrraConfig(bootstrap_samples=1000, bootstrap_time_budget=1.0, bootstrap_workers=1)
+
+    start = time.perf_counter()
+    result = bootstrap_radar_errors(_slow_mean_offsets, match_groups, RADAR_POSITIONS, estimate, config)
+
+    assert time.perf_counter() - start < 2.0
+    assert 10 <= result.replicate_count < 1000
+    assert result.requested_count == 1000
+
+    # 时间预算内完成的重抽样过少时不输出置信区间
+    config = config.model_copy(update={"bootstrap_time_budget": 0.2})
+    assert bootstrap_radar_errors(_slow_mean_offsets, match_groups, RADAR_POSITIONS, estimate, config) is None
+
+
+def test_time_budget_terminates_running_replicates(match_groups):
+    estimate = _mean_offsets(match_groups, RADAR_POSITIONS)
+    config = MrraConfig(bootstrap_samples=20, bootstrap_time_budget=0.5, bootstrap_workers=2)
+
+    start = time.perf_counter()
+    assert bootstrap_radar_errors(_stuck_mean_offsets, match_groups, RADAR_POSITIONS, estimate, config) is None
+
+    # 超时后仍在计算的子进程被终止，而不是在后台继续算完
+    assert time.perf_counter() - start < 5.0
+    assert multiprocessing.active_children() == []
+
+
+def test_disabled_by_default(match_groups):
+    estimate = _mean_offsets(match_groups, RADAR_POSITIONS)
+    assert bootstrap_radar_errors(_mean_offsets, match_groups, RADAR_POSITIONS, estimate, MrraConfig()) is None
+    assert bootstrap_metadata(None) == {}
+
+
+def test_intervals_are_saved_with_error_results(match_groups):
+    engine = create_engine("sqlite://")
+    ErrorResult.__table__.create(engine)
+    ErrorConfidenceInterval.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+
+    estimate = _mean_offsets(match_groups, RADAR_POSITIONS)
+    bootstrap = bootstrap_radar_errors(
+        _mean_offsets, match_groups, RADAR_POSITIONS, estimate,
+        MrraConfig(bootstrap_samples=50, bootstrap_seed=1, bootstrap_workers=1)
+    )
+    result = SimpleNamespace(
+        errors={
+            sid: {"azimuth_error": az, "range_error": rng, "elevation_error": el}
+            for sid, (az, rng, el) in estimate.items()
+        },
+        match_statistics={"total_match_groups": len(match_groups)},
+        metadata=bootstrap_metadata(bootstrap),
+    )
+    _save_error_results_from_result(session, "task-1", result)
+    session.commit()
+
+    saved = session.query(ErrorResult).filter(ErrorResult.station_id == 1).one()
+    intervals = {interval.component: interval for interval in saved.confidence_intervals}
+    assert set(intervals) == {"azimuth_error", "range_error", "elevation_error"}
+    assert intervals["range_error"].lower == pytest.approx(bootstrap.intervals[1]["range_error"][0])
+    assert intervals["range_error"].replicate_count == 50
+    assert intervals["range_error"].confidence_level == 0.95
+    session.close()
@@ -0,0 +1,108 @@
+"""
+测试增量代价引擎（试探代价与全量代价函数一致）
+"""
+import numpy as np
+import pytest
+
+from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from app.algorithms.multi_source.preprocessing.cost_engine import IncrementalCostEngine
+from app.algorithms.multi_source.preprocessing.error_calculator import ErrorCalculator
+from app.algorithms.multi_source.preprocessing.group_table import build_match_group_table
+
+RADAR_POSITIONS = {
+    1: (116.0, 39.0, 50.0),
+    2: (116.6, 39.4, 120.0),
+    3: (115.7, 39.8, 80.0),
+}
+# 5 号站在误差字典中但没有位置，只影响正则项
+STATIONS = [1, 2, 3, 5]
+
+
+@pytest.fixture
+def match_groups():
+    rng = np.random.default_rng(5)
+    groups = []
+    for _ in range(400):
+        center = rng.uniform([115.8, 39.1], [116.5, 39.7])
+        altitude = rng.uniform(3000, 9000)
+        stations = rng.choice([1, 2, 3, 4], size=int(rng.integers(2, 5)), replace=False)
+        groups.append([
+            {
+                'station_id': int(sid),
+                'longitude': float(center[0] + rng.normal(0, 0.01)),
+                'latitude': float(center[1] + rng.normal(0, 0.01)),
+                'altitude': float(altitude + rng.normal(0, 50)),
+            }
+            for sid in stations
+        ])
+    return groups
+
+
+def _random_moves(kinds, count=60):
+    rng = np.random.default_rng(9)
+    steps = {"azimuth": 0.05, "range": 25.0, "elevation": 0.05}
+    for _ in range(count):
+        kind = kinds[int(rng.integers(len(kinds)))]
+        yield kind, STATIONS[int(rng.integers(len(STATIONS)))], steps[kind] * rng.choice([-3, -1, 1, 2])
+
+
+def test_horizontal_trials_match_full_cost(match_groups):
+    calculator = ErrorCalculator(MrraConfig())
+    positions_2d = {sid: pos[:2] for sid, pos in RADAR_POSITIONS.items()}
+    errors = {
+        "azimuth": {sid: 0.0 for sid in STATIONS},
+        "range": {sid: 0.0 for sid in STATIONS},
+    }
+    table = build_match_group_table(match_groups, positions_2d)
+    engine = IncrementalCostEngine(table, calculator.config.cost_weights, errors["azimuth"], errors["range"])
+
+    assert engine.cost == pytest.approx(
+        calculator.calculate_cost(match_groups, errors["azimuth"], positions_2d, errors["range"]), rel=1e-12
+    )
+
+    for index, (kind, sid, delta) in enumerate(_random_moves(["azimuth", "range"])):
+        trial = {name: dict(values) for name, values in errors.items()}
+        trial[kind][sid] += delta
+        expected = calculator.calculate_cost(match_groups, trial["azimuth"], positions_2d, trial["range"])
+
+        assert engine.try_move(kind, sid, delta) == pytest.approx(expected, rel=1e-10)
+        # 隔一步接受一次，未接受的试探不能改变引擎状态
+        if index % 2 == 0:
+            engine.accept()
+            errors = trial
+
+    assert engine.errors("azimuth") == errors["azimuth"]
+    assert engine.errors("range") == errors["range"]
+
+
+def test_elevation_trials_match_full_cost(match_groups):
+    calculator = ErrorCalculator(MrraConfig())
+    errors = {
+        "azimuth": {sid: 0.1 for sid in STATIONS},
+        "range": {sid: -40.0 for sid in STATIONS},
+        "elevation": {sid: 0.0 for sid in STATIONS},
+    }
+    table = build_match_group_table(match_groups, RADAR_POSITIONS, require_altitude=True)
+    engine = IncrementalCostEngine(
+        table, calculator.config.cost_weights, errors["azimuth"], errors["range"], errors["elevation"]
+    )
+
+    for index, (kind, sid, delta) in enumerate(_random_moves(["azimuth", "range", "elevation"])):
+        trial = {name: dict(values) for name, values in errors.items()}
+        trial[kind][sid] += delta
+        expected = calculator.calculate_cost_with_elevation(
+            match_groups, trial["azimuth"], trial["range"], trial["elevation"], RADAR_POSITIONS
+        )
+
+        assert engine.try_move(kind, sid, delta) == pytest.approx(expected, rel=1e-10)
+        if index % 3 != 0:
+            engine.accept()
+            errors = trial
+
+
+def test_accept_without_trial_is_rejected(match_groups):
+    table = build_match_group_table(match_groups, RADAR_POSITIONS)
+    engine = IncrementalCostEngine(table, MrraConfig().cost_weights, {1: 0.0}, {1: 0.0})
+
+    with pytest.raises(ValueError):
+        engine.accept()
@@ -0,0 +1,167 @@
+"""
+测试向量化代价函数（与逐点 geod.inv/geod.fwd 的标量实现对照）
+"""
+import math
+
+import numpy as np
+import pyproj
+import pytest
+
+from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from app.algorithms.multi_source.preprocessing.error_calculator import ErrorCalculator
+from app.algorithms.multi_source.preprocessing.group_table import build_match_group_table
+
+geod = pyproj.Geod(ellps='WGS84')
+
+RADAR_POSITIONS = {
+    1: (116.0, 39.0, 50.0),
+    2: (116.6, 39.4, 120.0),
+    3: (115.7, 39.8, 80.0),
+}
+
+
+def _reference_cost(config, match_groups, azimuth_errors, radar_positions, range_errors):
+    """逐点标量实现（向量化之前的算法）"""
+    variances = []
+    for group in match_groups:
+        corrected = []
+        for point in group:
+            sid = point['station_id']
+            if sid not in radar_positions:
+                continue
+            r_lon, r_lat = radar_positions[sid][:2]
+            az, _, dist = geod.inv(r_lon, r_lat, point['longitude'], point['latitude'])
+            new_lon, new_lat, _ = geod.fwd(
+                r_lon, r_lat, az - azimuth_errors.get(sid, 0.0), dist - range_errors.get(sid, 0.0)
+            )
+            corrected.append((new_lon, new_lat))
+        if len(corrected) < 2:
+            continue
+        coords = np.array(corrected)
+        variances.append(float(np.sqrt(((coords - coords.mean(axis=0)) ** 2).sum(axis=1).mean())))
+
+    if not variances:
+        return 0.0
+    weights = config.cost_weights
+    return (
+        weights.variance * float(np.mean(variances))
+        + weights.azimuth_error_square * float(np.mean(np.array(list(azimuth_errors.values())) ** 2))
+        + weights.range_error_square * float(np.mean(np.array(list(range_errors.values())) ** 2))
+    )
+
+
+def _reference_cost_with_elevation(config, match_groups, azimuth_errors, range_errors,
+                                   elevation_errors, radar_positions):
+    """逐点标量实现（含俯仰角）"""
+    variances = []
+    for group in match_groups:
+        corrected = []
+        for point in group:
+            sid = point['station_id']
+            if sid not in radar_positions:
+                continue
+            r_lon, r_lat, r_alt = radar_positions[sid]
+            lon, lat, alt = point['longitude'], point['latitude'], point['altitude']
+            az, _, dist = geod.inv(r_lon, r_lat, lon, lat)
+            dx = (lon - r_lon) * 111000 * math.cos(math.radians(r_lat))
+            dy = (lat - r_lat) * 111000
+            elevation = math.degrees(math.atan2(alt - r_alt, math.hypot(dx, dy)))
+            corr_dist = dist - range_errors.get(sid, 0.0)
+            new_lon, new_lat, _ = geod.fwd(r_lon, r_lat, az - azimuth_errors.get(sid, 0.0), corr_dist)
+            corr_elevation = elevation - elevation_errors.get(sid, 0.0)
+            new_alt = r_alt + corr_dist * math.sin(math.radians(corr_elevation)) if corr_dist > 0 else alt
+            corrected.append([new_lon * 111000 * math.cos(math.radians(new_lat)), new_lat * 111000, new_alt])
+        if len(corrected) < 2:
+            continue
+        coords = np.array(corrected)
+        variances.append(float(np.sqrt(((coords - coords.mean(axis=0)) ** 2).sum(axis=1).mean())))
+
+    weights = config.cost_weights
+    return (
+        weights.variance * float(np.mean(variances))
+        + weights.azimuth_error_square * float(np.mean(np.array(list(azimuth_errors.values())) ** 2))
+        + weights.range_error_square * float(np.mean(np.array(list(range_errors.values())) ** 2))
+        + weights.elevation_error_square * float(np.mean(np.array(list(elevation_errors.values())) ** 2))
+    )
+
+
+@pytest.fixture
+def match_groups():
+    rng = np.random.default_rng(7)
+    groups = []
+    for _ in range(300):
+        center = rng.uniform([115.8, 39.1], [116.5, 39.7])
+        altitude = rng.uniform(3000, 9000)
+        size = int(rng.integers(1, 5))
+        stations = rng.choice([1, 2, 3, 4], size=size, replace=False)
+        groups.append([
+            {
+                'station_id': int(sid),
+                'longitude': float(center[0] + rng.normal(0, 0.01)),
+                'latitude': float(center[1] + rng.normal(0, 0.01)),
+                'altitude': float(altitude + rng.normal(0, 50)),
+            }
+            for sid in stations
+        ])
+    return groups
+
+
+@pytest.mark.parametrize("azimuth_errors,range_errors", [
+    ({1: 0.0, 2: 0.0, 3: 0.0}, {1: 0.0, 2: 0.0, 3: 0.0}),
+    ({1: 0.35, 2: -0.2, 3: 0.05}, {1: 120.0, 2: -300.0, 3: 0.0}),
+])
+def test_calculate_cost_matches_scalar_reference(match_groups, azimuth_errors, range_errors):
+    config = MrraConfig()
+    calculator = ErrorCalculator(config)
+    positions_2d = {sid: pos[:2] for sid, pos in RADAR_POSITIONS.items()}
+
+    expected = _reference_cost(config, match_groups, azimuth_errors, positions_2d, range_errors)
+    assert calculator.calculate_cost(match_groups, azimuth_errors, positions_2d, range_errors) == pytest.approx(
+        expected, rel=1e-9
+    )
+
+    # 预先展开的扁平表与逐次展开结果一致
+    table = build_match_group_table(match_groups, positions_2d)
+    assert calculator.calculate_cost(table, azimuth_errors, positions_2d, range_errors) == pytest.approx(
+        expected, rel=1e-9
+    )
+
+
+def test_calculate_cost_with_elevation_matches_scalar_reference(match_groups):
+    config = MrraConfig()
+    calculator = ErrorCalculator(config)
+    azimuth_errors = {1: 0.2, 2: -0.1, 3: 0.0}
+    range_errors = {1: 50.0, 2: 0.0, 3: -80.0}
+    elevation_errors = {1: 0.05, 2: -0.3, 3: 0.1}
+
+    expected = _reference_cost_with_elevation(
+        config, match_groups, azimuth_errors, range_errors, elevation_errors, RADAR_POSITIONS
+    )
+    actual = calculator.calculate_cost_with_elevation(
+        match_groups, azimuth_errors, range_errors, elevation_errors, RADAR_POSITIONS
+    )
+    assert actual == pytest.approx(expected, rel=1e-9)
+
+
+def test_group_table_drops_groups_without_two_known_stations(match_groups):
+    table = build_match_group_table(match_groups, RADAR_POSITIONS)
+
+    expected_groups = [
+        index for index, group in enumerate(match_groups)
+        if sum(point['station_id'] in RADAR_POSITIONS for point in group) >= 2
+    ]
+    assert table.source_groups.tolist() == expected_groups
+    assert set(table.stations[table.station_index].tolist()) <= set(RADAR_POSITIONS)
+    assert table.group_sizes.min() >= 2
+
+
+def test_empty_inputs_keep_previous_return_values():
+    calculator = ErrorCalculator(MrraConfig())
+    lonely_group = [[{'station_id': 1, 'longitude': 116.1, 'latitude': 39.1, 'altitude': 5000.0}]]
+
+    assert calculator.calculate_cost([], {1: 0.0}, RADAR_POSITIONS) == 0.0
+    assert calculator.calculate_cost(lonely_group, {1: 0.0}, RADAR_POSITIONS) == 0.0
+    assert calculator.calculate_cost_with_elevation([], {1: 0.0}, {1: 0.0}, {1: 0.0}, RADAR_POSITIONS) == 0.0
+    assert calculator.calculate_cost_with_elevation(
+        lonely_group, {1: 0.0}, {1: 0.0}, {1: 0.0}, RADAR_POSITIONS
+    ) == float('inf')
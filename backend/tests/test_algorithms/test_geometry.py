@@ -0,0 +1,133 @@
+"""
+测试雷达站局部坐标系（enu 几何后端）
+"""
+import numpy as np
+import pyproj
+import pytest
+from scipy.optimize._numdiff import approx_derivative
+
+from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from app.algorithms.multi_source.preprocessing.cost_engine import IncrementalCostEngine, corrected_horizontal
+from app.algorithms.multi_source.preprocessing.error_calculator import ErrorCalculator
+from app.algorithms.multi_source.preprocessing.geometry import geodetic_to_ecef, polar_to_common, station_frames
+from app.algorithms.multi_source.preprocessing.group_table import build_match_group_table, geod
+from app.algorithms.multi_source.preprocessing.joint_solver import JointLeastSquaresSolver, _group_pairs
+
+RADAR_POSITIONS = {
+    1: (115.6, 39.2, 50.0),
+    2: (116.5, 39.9, 120.0),
+    3: (116.4, 39.0, 80.0),
+}
+
+
+@pytest.fixture(scope="module")
+def match_groups():
+    rng = np.random.default_rng(8)
+    groups = []
+    for _ in range(300):
+        lon, lat = rng.uniform(115.8, 116.3), rng.uniform(39.3, 39.7)
+        alt = rng.uniform(4000, 9000)
+        groups.append([
+            {
+                'station_id': sid,
+                'longitude': lon + rng.normal(0, 0.01),
+                'latitude': lat + rng.normal(0, 0.01),
+                'altitude': alt + rng.normal(0, 50),
+            }
+            for sid in RADAR_POSITIONS
+        ])
+    return groups
+
+
+def _frames_and_points(count=500):
+    rng = np.random.default_rng(1)
+    radar_lon = np.array([p[0] for p in RADAR_POSITIONS.values()])
+    radar_lat = np.array([p[1] for p in RADAR_POSITIONS.values()])
+    station_index = rng.integers(0, len(radar_lon), count)
+    az = rng.uniform(-180, 180, count)
+    dist = rng.uniform(20000, 150000, count)
+    lon, lat, _ = geod.fwd(radar_lon[station_index], radar_lat[station_index], az, dist)
+    return station_frames(radar_lon, radar_lat), radar_lon, radar_lat, station_index, lon, lat
+
+
+def test_ecef_matches_pyproj():
+    transformer = pyproj.Transformer.from_crs("EPSG:4979", "EPSG:4978", always_xy=True)
+    lon = np.array([116.0, 115.2, 117.9])
+    lat = np.array([39.5, 40.1, 38.2])
+    alt = np.array([0.0, 5000.0, 12000.0])
+
+    expected = np.stack(transformer.transform(lon, lat, alt), axis=-1)
+    assert np.allclose(geodetic_to_ecef(lon, lat, alt), expected, atol=1e-3)
+
+
+def test_surface_polar_close_to_geodesic_inverse():
+    frames, radar_lon, radar_lat, station_index, lon, lat = _frames_and_points()
+    distance, azimuth, _ = frames.surface_polar(station_index, lon, lat)
+    geo_az, _, geo_dist = geod.inv(radar_lon[station_index], radar_lat[station_index], lon, lat)
+
+    # 切平面水平距离比大地线距离略短（150 km 处约 14 m）
+    assert np.all(np.abs(distance - geo_dist) < 1.5e-4 * geo_dist)
+    assert np.all(np.abs((azimuth - geo_az + 180) % 360 - 180) < 0.01)
+
+
+def test_frames_are_cached():
+    frames, radar_lon, radar_lat, *_ = _frames_and_points(1)
+    assert station_frames(radar_lon.copy(), radar_lat.copy()) is frames
+
+
+def test_corrected_positions_match_geodesic_model(match_groups):
+    geodesic = build_match_group_table(match_groups, RADAR_POSITIONS, geometry_backend="geodesic")
+    enu = build_match_group_table(match_groups, RADAR_POSITIONS, geometry_backend="enu")
+
+    for az_error, range_error in [(0.0, 0.0), (0.3, 400.0), (-0.2, -250.0)]:
+        az_offsets = np.full(geodesic.point_count, az_error)
+        range_offsets = np.full(geodesic.point_count, range_error)
+        lon, lat, _ = corrected_horizontal(geodesic, slice(None), az_offsets, range_offsets)
+        east, north, _ = corrected_horizontal(enu, slice(None), az_offsets, range_offsets)
+
+        # 大地线修正后的位置换算到公共 ENU 坐标后与 enu 后端的结果比较
+        expected_east, expected_north = polar_to_common(
+            enu.local_transform, *enu.frames.surface_polar(enu.station_index, lon, lat)
+        )
+        assert np.all(np.hypot(east - expected_east, north - expected_north) < 1.0)
+
+
+def test_incremental_trials_match_full_cost_with_local_frames(match_groups):
+    calculator = ErrorCalculator(MrraConfig(geometry_backend="enu"))
+    errors = {
+        "azimuth": {1: 0.1, 2: 0.0, 3: -0.1},
+        "range": {1: 50.0, 2: 0.0, 3: 0.0},
+        "elevation": {1: 0.0, 2: 0.0, 3: 0.0},
+    }
+    table = build_match_group_table(match_groups, RADAR_POSITIONS, require_altitude=True, geometry_backend="enu")
+    engine = IncrementalCostEngine(
+        table, calculator.config.cost_weights, errors["azimuth"], errors["range"], errors["elevation"]
+    )
+
+    for kind, sid, delta in [("azimuth", 1, 0.05), ("range", 2, -100.0), ("elevation", 3, 0.02)]:
+        trial = {name: dict(values) for name, values in errors.items()}
+        trial[kind][sid] += delta
+        expected = calculator.calculate_cost_with_elevation(
+            match_groups, trial["azimuth"], trial["range"], trial["elevation"], RADAR_POSITIONS
+        )
+        assert engine.try_move(kind, sid, delta) == pytest.approx(expected, rel=1e-10)
+        engine.accept()
+        errors = trial
+
+
+def test_local_frame_jacobian_matches_finite_differences(match_groups):
+    table = build_match_group_table(
+        match_groups[:50], RADAR_POSITIONS, require_altitude=True, geometry_backend="enu"
+    )
+    solver = JointLeastSquaresSolver(MrraConfig(geometry_backend="enu"))
+    params = np.array([0.1, -0.2, 0.05, 120.0, -60.0, 10.0, 0.02, 0.0, -0.03])
+
+    analytic = solver.jacobian(params, table, _group_pairs(table)).toarray()
+    numeric = approx_derivative(lambda p: solver.residuals(p, table), params, method='3-point')
+
+    assert np.allclose(analytic, numeric, rtol=1e-4, atol=1e-5 * np.abs(numeric).max())
+
+
+def test_unknown_geometry_backend_is_rejected():
+    with pytest.raises(ValueError):
+        MrraConfig(geometry_backend="utm")
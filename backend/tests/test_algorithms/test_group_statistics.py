@@ -0,0 +1,234 @@
+"""
+测试按扁平数组计算的逐组统计（与逐组循环的实现逐位一致）
+"""
+import math
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+from app.algorithms.multi_source.preprocessing.flat_groups import (
+    flatten_match_groups,
+    grouped_mean,
+    grouped_std,
+    sequential_group_sum,
+)
+from app.algorithms.multi_source.ransac_heuristic.algorithm import RansacHeuristicAlgorithm
+from app.algorithms.multi_source.ransac_heuristic.config import RansacHeuristicAlgorithmConfig
+from app.algorithms.multi_source.weighted_lstsq.algorithm import WeightedLstsqAlgorithm
+from app.algorithms.multi_source.weighted_lstsq.config import WeightedLstsqAlgorithmConfig
+from benchmarks.bench_group_statistics import make_groups
+
+
+def _loop_fault_detection(matched_groups, config):
+    """逐组循环的故障站检测（向量化之前的实现）"""
+    station_total = defaultdict(int)
+    station_outlier_count = defaultdict(int)
+    for group in matched_groups:
+        if len(group) < 2:
+            continue
+        center_lat = np.mean(np.array([p["latitude"] for p in group]))
+        center_lon = np.mean(np.array([p["longitude"] for p in group]))
+        deviations = []
+        for point in group:
+            deviation = np.sqrt((point["latitude"] - center_lat) ** 2 + (point["longitude"] - center_lon) ** 2)
+            deviations.append((point["station_id"], deviation))
+            station_total[point["station_id"]] += 1
+        deviations.sort(key=lambda x: x[1])
+
+        healthy_count = config.min_healthy_stations
+        jumps = [(i + 1, deviations[i + 1][1] - deviations[i][1]) for i in range(len(deviations) - 1)]
+        max_jump_idx, max_jump = max(jumps, key=lambda x: x[1])
+        if max_jump > config.jump_threshold:
+            healthy_count = max(healthy_count, max_jump_idx)
+        for sid, _ in deviations[healthy_count:]:
+            station_outlier_count[sid] += 1
+
+    return {sid: round(station_outlier_count[sid] / station_total[sid], 4) for sid in station_total}
+
+
+def _loop_fault_references(matched_groups, healthy, faulty, radar_positions):
+    """逐组循环的故障站观测与健康站共识位置（向量化之前的实现）"""
+    station_ids, observed, reference = [], [], []
+    for group in matched_groups:
+        if len(group) < 2:
+            continue
+        healthy_points = [p for p in group if p["station_id"] in healthy]
+        faulty_points = [p for p in group if p["station_id"] in faulty]
+        if len(healthy_points) < 2 or not faulty_points:
+            continue
+        ref_lat = np.mean([p["latitude"] for p in healthy_points])
+        ref_lon = np.mean([p["longitude"] for p in healthy_points])
+        ref_alt = np.mean([p.get("altitude", 0) or 0 for p in healthy_points])
+        for point in faulty_points:
+            if point["station_id"] not in radar_positions:
+                continue
+            station_ids.append(point["station_id"])
+            observed.append((point["longitude"], point["latitude"], point.get("altitude", 0) or 0))
+            reference.append((ref_lon, ref_lat, ref_alt))
+    return station_ids, observed, reference
+
+
+def _loop_fusion(matched_groups, radar_positions, config):
+    """逐组循环的权重、离群点移除与加权融合（向量化之前的实现）"""
+    station_deviations = defaultdict(list)
+    station_match_count = defaultdict(int)
+    for group in matched_groups:
+        if len(group) < 2:
+            continue
+        centroid_lat = np.mean([p["latitude"] for p in group])
+        centroid_lon = np.mean([p["longitude"] for p in group])
+        for point in group:
+            station_match_count[point["station_id"]] += 1
+            station_deviations[point["station_id"]].append(math.sqrt(
+                (point["latitude"] - centroid_lat) ** 2 + (point["longitude"] - centroid_lon) ** 2
+            ))
+
+    station_weights = {}
+    for sid in radar_positions:
+        if not station_deviations.get(sid):
+            station_weights[sid] = 1.0
+            continue
+        devs = np.array(station_deviations[sid])
+        variance = np.var(devs) if len(devs) > 1 else 1.0
+        if config.weighting_method == "inverse_variance":
+            station_weights[sid] = 1.0 / (variance + 1e-10)
+        elif config.weighting_method == "match_count":
+            station_weights[sid] = float(station_match_count.get(sid, 1))
+        else:
+            station_weights[sid] = 1.0
+    total_weight = sum(station_weights.values())
+    station_weights = {k: v / total_weight for k, v in station_weights.items()}
+
+    removed = 0
+    filtered_groups = []
+    for group in matched_groups:
+        if not config.outlier_removal or len(group) < 3:
+            filtered_groups.append(group)
+            continue
+        lats = np.array([p["latitude"] for p in group])
+        lons = np.array([p["longitude"] for p in group])
+        distances = np.sqrt((lats - np.mean(lats)) ** 2 + (lons - np.mean(lons)) ** 2)
+        mean_dist, std_dist = np.mean(distances), np.std(distances)
+        filtered = []
+        for i, point in enumerate(group):
+            if std_dist > 0 and distances[i] > mean_dist + 3 * std_dist:
+                removed += 1
+            else:
+                filtered.append(point)
+        filtered_groups.append(filtered if filtered else group)
+
+    fused = []
+    for group in filtered_groups:
+        if not group:
+            continue
+        total_w = w_lat = w_lon = w_alt = 0.0
+        for point in group:
+            w = station_weights.get(point["station_id"], 1.0 / len(radar_positions))
+            w_lat += w * point["latitude"]
+            w_lon += w * point["longitude"]
+            w_alt += w * (point.get("altitude", 0.0) or 0.0)
+            total_w += w
+        fused.append({
+            "latitude": w_lat / total_w,
+            "longitude": w_lon / total_w,
+            "altitude": w_alt / total_w,
+            "match_group_size": len(group),
+            "time_seconds": group[0].get("time_seconds", 0.0),
+            "station_ids": [p["station_id"] for p in group],
+        })
+
+    return {str(k): round(v, 6) for k, v in station_weights.items()}, filtered_groups, fused, removed
+
+
+@pytest.fixture(scope="module")
+def scenario():
+    groups, radar_positions = make_groups(3000, 16, fault_stations=2, seed=4)
+    rng = np.random.default_rng(8)
+    for group in groups[::20]:
+        # 偶发的大偏差观测（离群点移除）、缺失高度、单点组与空组
+        group[0]["latitude"] += rng.uniform(0.5, 1.0)
+        group[-1]["altitude"] = None
+    groups[7] = groups[7][:1]
+    groups[9] = []
+    # 不在雷达站位置表中的站
+    groups[11].append(dict(groups[11][0], station_id=99))
+    return groups, radar_positions
+
+
+def test_grouped_reductions_match_numpy():
+    rng = np.random.default_rng(0)
+    sizes = rng.integers(0, 12, 500)
+    starts = np.cumsum(sizes) - sizes
+    values = rng.uniform(30, 40, sizes.sum())
+    groups = np.split(values, np.cumsum(sizes)[:-1])
+
+    nonempty = sizes > 0
+    assert np.array_equal(grouped_mean(values, starts, sizes)[nonempty], [np.mean(g) for g in groups if len(g)])
+    assert np.array_equal(grouped_std(values, starts, sizes)[nonempty], [np.std(g) for g in groups if len(g)])
+    assert np.isnan(grouped_mean(values, starts, sizes)[~nonempty]).all()
+
+    totals = []
+    for group in groups:
+        total = 0.0
+        for value in group:
+            total += float(value)
+        totals.append(total)
+    assert np.array_equal(sequential_group_sum(values, starts, sizes), totals)
+
+
+def test_flatten_keeps_group_layout(scenario):
+    groups, _ = scenario
+    flat = flatten_match_groups(groups)
+
+    assert flat.group_count == len(groups)
+    assert flat.point_count == sum(map(len, groups))
+    assert flat.group_sizes[9] == 0 and flat.group_sizes[7] == 1
+    assert flat.station_ids.tolist() == [p["station_id"] for g in groups for p in g]
+    assert flat.altitude.tolist() == [p.get("altitude") or 0.0 for g in groups for p in g]
+
+
+@pytest.mark.parametrize("config", [
+    RansacHeuristicAlgorithmConfig(),
+    RansacHeuristicAlgorithmConfig(jump_threshold=0.005, min_healthy_stations=3, outlier_ratio_threshold=0.3),
+    RansacHeuristicAlgorithmConfig(jump_threshold=0.02, min_healthy_stations=2, outlier_ratio_threshold=0.7),
+])
+def test_heuristic_fault_detection_matches_loop(scenario, config):
+    groups, radar_positions = scenario
+    algorithm = RansacHeuristicAlgorithm(config)
+    result = algorithm._heuristic_ransac(groups, radar_positions)
+
+    rates = _loop_fault_detection(groups, config)
+    assert list(result["outlier_rates"].items()) == list(rates.items())
+    assert result["fault_stations"] == sorted(s for s, r in rates.items() if r >= config.outlier_ratio_threshold)
+    assert result["healthy_stations"] == sorted(s for s, r in rates.items() if r < config.outlier_ratio_threshold)
+
+
+def test_heuristic_fault_references_match_loop(scenario):
+    groups, radar_positions = scenario
+    algorithm = RansacHeuristicAlgorithm(RansacHeuristicAlgorithmConfig())
+    healthy, faulty = set(range(3, 15)) | {99}, {1, 2, 15}
+
+    station_ids, observed, reference = algorithm._fault_references(
+        flatten_match_groups(groups), healthy, faulty, radar_positions
+    )
+    expected = _loop_fault_references(groups, healthy, faulty, radar_positions)
+    assert station_ids.tolist() == expected[0]
+    assert np.array_equal(observed, np.array(expected[1]))
+    assert np.array_equal(reference, np.array(expected[2]))
+
+
+@pytest.mark.parametrize("weighting_method", ["inverse_variance", "match_count", "uniform"])
+@pytest.mark.parametrize("outlier_removal", [True, False])
+def test_weighted_fusion_matches_loop(scenario, weighting_method, outlier_removal):
+    groups, radar_positions = scenario
+    config = WeightedLstsqAlgorithmConfig(weighting_method=weighting_method, outlier_removal=outlier_removal)
+    weights, filtered_groups, fused, removed = WeightedLstsqAlgorithm(config)._fuse_groups(groups, radar_positions)
+
+    expected = _loop_fusion(groups, radar_positions, config)
+    assert {str(k): round(v, 6) for k, v in weights.items()} == expected[0]
+    assert filtered_groups == expected[1]
+    assert fused == expected[2]
+    assert removed == expected[3]
+    if outlier_removal:
+        assert removed > 0
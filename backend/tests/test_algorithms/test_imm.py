@@ -0,0 +1,202 @@
+"""
+测试交互式多模型（IMM）滤波引擎与算法
+"""
+from dataclasses import replace
+
+import numpy as np
+import pytest
+from filterpy.kalman import IMMEstimator, KalmanFilter
+
+from app.algorithms.registry import AlgorithmRegistry
+from app.algorithms.single_source.imm.algorithm import ImmAlgorithm
+from app.algorithms.single_source.imm.config import ImmAlgorithmConfig
+from app.algorithms.single_source.imm.engine import (
+    IMM_MODELS,
+    ImmParameters,
+    batch_imm_filter,
+    model_transition_matrix,
+    predict_ca,
+    predict_ct,
+    predict_cv,
+)
+from app.algorithms.single_source.kalman.engine import batch_kalman_filter
+from app.algorithms.single_source.local_frame import local_metric_frame
+from benchmarks.bench_imm import make_manoeuvring_track
+
+PARAMS = ImmParameters(
+    measurement_std=50.0,
+    cv_process_noise=0.1,
+    ct_process_noise=0.1,
+    turn_rate_noise=1e-5,
+    ca_process_noise=3.0,
+    initial_velocity_std=300.0,
+    initial_acceleration_std=10.0,
+    initial_turn_rate_std=0.05,
+    model_stay_probability=0.95,
+)
+
+# 过程噪声和先验方差均为 0（用于检查预测方程本身）
+NOISE_FREE = replace(
+    PARAMS, cv_process_noise=0.0, ct_process_noise=0.0, turn_rate_noise=0.0, ca_process_noise=0.0,
+    initial_acceleration_std=0.0, initial_turn_rate_std=0.0,
+)
+
+
+def _turning_track(n=120, dt=4.0, speed=200.0, turn_rate=0.05, seed=0):
+    """匀速直线 40 个点后进入恒定转弯率的协调转弯，返回 (观测, 时间间隔, 真实位置)"""
+    rng = np.random.default_rng(seed)
+    intervals = np.full(n, dt)
+    intervals[0] = 0.0
+    heading = np.concatenate([np.zeros(40), turn_rate * dt * np.arange(1, n - 39)])
+    velocity = speed * np.c_[np.cos(heading), np.sin(heading), np.zeros(n)]
+    truth = np.cumsum(velocity * dt, axis=0) - velocity[0] * dt
+    truth[:, 2] = 8000.0
+    return truth + rng.normal(0, 50.0, truth.shape), intervals, truth
+
+
+def _linear_model(predict, dt, params):
+    """ω = 0 时三个模型都是线性的：由单位向量的预测得到 F，由零状态、零协方差的预测得到 Q"""
+    zero_P = np.zeros((1, 10, 10))
+    F = np.column_stack([predict(np.eye(10)[k][None], zero_P, dt, params)[0][0] for k in range(10)])
+    Q = predict(np.zeros((1, 10)), zero_P, dt, params)[1][0]
+    return F, Q
+
+
+def _filterpy_imm(z, dt, params):
+    """转弯率恒为 0 时用 filterpy 的 IMMEstimator 作为参考"""
+    filters = []
+    for _ in IMM_MODELS:
+        kf = KalmanFilter(dim_x=10, dim_z=3)
+        kf.H = np.hstack([np.eye(3), np.zeros((3, 7))])
+        kf.R = np.eye(3) * params.measurement_std ** 2
+        kf.P = np.diag(
+            [params.measurement_std ** 2] * 3 + [params.initial_velocity_std ** 2] * 3
+            + [params.initial_acceleration_std ** 2] * 3 + [0.0]
+        )
+        kf.x = np.r_[z[0], np.zeros(7)].reshape(10, 1)
+        filters.append(kf)
+    imm = IMMEstimator(filters, np.full(3, 1 / 3), model_transition_matrix(params.model_stay_probability))
+
+    positions = []
+    for i in range(len(z)):
+        if i > 0:
+            for kf, predict in zip(filters, (predict_cv, predict_ct, predict_ca)):
+                kf.F, kf.Q = _linear_model(predict, np.array([dt[i]]), params)
+            imm.predict()
+        imm.update(z[i])
+        positions.append(imm.x[:3, 0].copy())
+    return np.array(positions)
+
+
+def test_matches_filterpy_imm_with_linear_models():
+    """转弯率固定为 0 时，组合估计与 filterpy IMMEstimator 一致"""
+    params = replace(PARAMS, turn_rate_noise=0.0, initial_turn_rate_std=0.0)
+    rng = np.random.default_rng(3)
+    z, dt, _ = _turning_track(n=60, turn_rate=0.0)
+    dt[1:] = rng.uniform(2.0, 6.0, len(dt) - 1)
+
+    output = batch_imm_filter([z], [dt], params)[0]
+    assert np.allclose(output.positions, _filterpy_imm(z, dt, params), rtol=0, atol=1e-6)
+
+
+def test_ct_prediction_follows_constant_turn():
+    """无噪声时 ct 模型沿协调转弯圆弧精确外推，速度方向旋转 ωT"""
+    speed, omega, dt = 200.0, 0.05, 4.0
+    x = np.zeros((1, 10))
+    x[0, 3], x[0, 9] = speed, omega
+    predicted, _ = predict_ct(x, np.zeros((1, 10, 10)), np.array([dt]), NOISE_FREE)
+
+    radius = speed / omega
+    expected_position = [radius * np.sin(omega * dt), radius * (1 - np.cos(omega * dt)), 0.0]
+    expected_velocity = speed * np.array([np.cos(omega * dt), np.sin(omega * dt), 0.0])
+    assert np.allclose(predicted[0, :3], expected_position)
+    assert np.allclose(predicted[0, 3:6], expected_velocity)
+    assert predicted[0, 9] == omega
+
+
+@pytest.mark.parametrize("omega", [0.04, 1e-6, 0.0, -0.07])
+def test_ct_jacobian_matches_finite_difference(omega):
+    """ct 模型协方差传播使用的雅可比矩阵与数值差分一致（含小转弯率的级数展开分支）"""
+    rng = np.random.default_rng(1)
+    x = rng.normal(0, 1, (1, 10)) * [500, 500, 100, 200, 200, 10, 1, 1, 1, 0]
+    x[0, 9] = omega
+    dt = np.array([4.5])
+
+    # P 只有 ω 分量时，预测协方差的 ω 列即雅可比矩阵的 ω 列
+    P = np.zeros((1, 10, 10))
+    P[0, 9, 9] = 1.0
+    _, predicted_P = predict_ct(x, P, dt, NOISE_FREE)
+
+    eps = 1e-6
+    plus, minus = x.copy(), x.copy()
+    plus[0, 9] += eps
+    minus[0, 9] -= eps
+    numeric = (
+        predict_ct(plus, P, dt, NOISE_FREE)[0] - predict_ct(minus, P, dt, NOISE_FREE)[0]
+    )[0] / (2 * eps)
+    assert np.allclose(predicted_P[0, :, 9], numeric, rtol=1e-6, atol=1e-4)
+
+
+def test_batch_matches_individual_tracks():
+    """多条长度不一的航迹批量滤波与逐条滤波结果一致"""
+    tracks = [_turning_track(n=n, seed=k) for k, n in enumerate([80, 45, 120, 45, 50])]
+    measurements = [z for z, _, _ in tracks]
+    intervals = [dt for _, dt, _ in tracks]
+    # 只有 3 个点的航迹
+    measurements[-1], intervals[-1] = measurements[-1][:3], intervals[-1][:3]
+
+    batched = batch_imm_filter(measurements, intervals, PARAMS)
+    for z, dt, output in zip(measurements, intervals, batched):
+        single = batch_imm_filter([z], [dt], PARAMS)[0]
+        assert len(output.positions) == len(z)
+        assert np.allclose(output.positions, single.positions, rtol=0, atol=1e-8)
+        assert np.allclose(output.model_probabilities, single.model_probabilities, rtol=0, atol=1e-10)
+
+
+def test_turn_is_tracked_without_constant_velocity_lag():
+    """协调转弯段 IMM 误差远小于匀速卡尔曼滤波，且 ct 模型概率占优"""
+    z, dt, truth = _turning_track()
+    output = batch_imm_filter([z], [dt], PARAMS)[0]
+    kalman = batch_kalman_filter(
+        [z], [dt], PARAMS.cv_process_noise, PARAMS.measurement_std ** 2, PARAMS.measurement_std ** 2,
+        PARAMS.initial_velocity_std ** 2, "white_acceleration",
+    )[0]
+
+    turn = slice(60, None)
+    imm_error = np.sqrt(((output.positions - truth)[turn, :2] ** 2).sum(axis=1).mean())
+    kalman_error = np.sqrt(((kalman.positions - truth)[turn, :2] ** 2).sum(axis=1).mean())
+    assert imm_error < 60.0
+    assert imm_error < kalman_error / 5
+
+    assert np.allclose(output.model_probabilities.sum(axis=1), 1.0)
+    assert output.model_probabilities[turn, IMM_MODELS.index("ct")].mean() > 0.8
+    assert output.model_probabilities[10:40, IMM_MODELS.index("cv")].mean() > 0.5
+
+
+def test_algorithm_output_on_manoeuvring_track():
+    """算法在经纬度上输出平滑轨迹和各点模型概率，误差小于观测噪声"""
+    points, truth, _ = make_manoeuvring_track(150, seed=2)
+    algorithm = ImmAlgorithm(ImmAlgorithmConfig(measurement_std=50.0))
+    smoothed = algorithm._apply_imm_filters([points])[0]
+
+    assert len(smoothed) == len(points)
+    assert set(smoothed[0]["model_probabilities"]) == set(IMM_MODELS)
+    assert smoothed[0]["orig_lat"] == points[0].latitude
+
+    frame = local_metric_frame(np.array([39.5, 116.3, 0.0]))
+    estimated = frame.to_local(np.array([(p["latitude"], p["longitude"], p["altitude"]) for p in smoothed]))
+    observed = frame.to_local(np.array([(p.latitude, p.longitude, p.altitude) for p in points]))
+    estimated_error = np.sqrt(((estimated - truth)[:, :2] ** 2).sum(axis=1).mean())
+    observed_error = np.sqrt(((observed - truth)[:, :2] ** 2).sum(axis=1).mean())
+    assert estimated_error < observed_error
+
+
+def test_registered_as_single_source_algorithm():
+    """IMM 算法已注册，并被执行器按单源算法处理"""
+    from app.algorithms.algorithms_init import register_all_algorithms
+    from app.services.error_analysis_executor import SINGLE_SOURCE_ALGORITHMS
+
+    register_all_algorithms()
+    assert AlgorithmRegistry().get("imm") is ImmAlgorithm
+    assert "imm" in SINGLE_SOURCE_ALGORITHMS
+    assert set(ImmAlgorithm(ImmAlgorithmConfig()).get_config_preset_profiles()) >= {"standard", "smooth", "agile"}
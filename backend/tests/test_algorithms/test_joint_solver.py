@@ -0,0 +1,92 @@
+"""
+测试联合最小二乘误差求解器
+"""
+import math
+
+import numpy as np
+import pytest
+from scipy.optimize._numdiff import approx_derivative
+
+from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from app.algorithms.multi_source.preprocessing.error_calculator import ErrorCalculator
+from app.algorithms.multi_source.preprocessing.group_table import (
+    METERS_PER_DEGREE,
+    build_match_group_table,
+    geod,
+)
+from app.algorithms.multi_source.preprocessing.joint_solver import JointLeastSquaresSolver, _group_pairs
+
+RADAR_POSITIONS = {
+    1: (115.6, 39.2, 50.0),
+    2: (116.5, 39.9, 120.0),
+    3: (116.4, 39.0, 80.0),
+}
+TRUE_ERRORS = {
+    1: (0.25, 300.0, 0.1),
+    2: (-0.15, -150.0, -0.05),
+    3: (0.05, 80.0, 0.0),
+}
+
+
+@pytest.fixture(scope="module")
+def biased_groups():
+    """按已知系统误差（与误差修正模型一致）生成的匹配组"""
+    rng = np.random.default_rng(21)
+    groups = []
+    for _ in range(600):
+        lon, lat = rng.uniform(115.8, 116.3), rng.uniform(39.3, 39.7)
+        alt = rng.uniform(4000, 9000)
+        group = []
+        for sid, (r_lon, r_lat, r_alt) in RADAR_POSITIONS.items():
+            da, dr, de = TRUE_ERRORS[sid]
+            az, _, dist = geod.inv(r_lon, r_lat, lon, lat)
+            obs_lon, obs_lat, _ = geod.fwd(r_lon, r_lat, az + da, dist + dr + rng.normal(0, 10))
+            elevation = math.asin((alt - r_alt) / dist) + math.radians(de)
+            dx = (obs_lon - r_lon) * METERS_PER_DEGREE * math.cos(math.radians(r_lat))
+            dy = (obs_lat - r_lat) * METERS_PER_DEGREE
+            obs_alt = r_alt + math.hypot(dx, dy) * math.tan(elevation)
+            group.append({'station_id': sid, 'longitude': obs_lon, 'latitude': obs_lat, 'altitude': obs_alt})
+        groups.append(group)
+    return groups
+
+
+def test_analytic_jacobian_matches_finite_differences(biased_groups):
+    table = build_match_group_table(biased_groups[:50], RADAR_POSITIONS, require_altitude=True)
+    solver = JointLeastSquaresSolver(MrraConfig())
+    params = np.array([0.1, -0.2, 0.05, 120.0, -60.0, 10.0, 0.02, 0.0, -0.03])
+
+    analytic = solver.jacobian(params, table, _group_pairs(table)).toarray()
+    numeric = approx_derivative(lambda p: solver.residuals(p, table), params, method='3-point')
+
+    assert np.allclose(analytic, numeric, rtol=1e-4, atol=1e-5 * np.abs(numeric).max())
+
+
+def test_least_squares_recovers_known_biases(biased_groups):
+    errors = ErrorCalculator(MrraConfig(solver="least_squares")).calculate_radar_errors(
+        biased_groups, RADAR_POSITIONS
+    )
+
+    for sid, (da, dr, de) in TRUE_ERRORS.items():
+        assert errors[sid][0] == pytest.approx(da, abs=0.01)
+        assert errors[sid][1] == pytest.approx(dr, abs=10.0)
+        assert errors[sid][2] == pytest.approx(de, abs=0.01)
+
+
+def test_least_squares_cost_not_worse_than_descent(biased_groups):
+    def final_cost(solver):
+        calculator = ErrorCalculator(MrraConfig(solver=solver))
+        errors = calculator.calculate_radar_errors(biased_groups, RADAR_POSITIONS)
+        return calculator.calculate_cost_with_elevation(
+            biased_groups,
+            {sid: e[0] for sid, e in errors.items()},
+            {sid: e[1] for sid, e in errors.items()},
+            {sid: e[2] for sid, e in errors.items()},
+            RADAR_POSITIONS
+        )
+
+    assert final_cost("least_squares") <= final_cost("descent")
+
+
+def test_unknown_solver_is_rejected():
+    with pytest.raises(ValueError):
+        MrraConfig(solver="newton")
@@ -0,0 +1,205 @@
+"""
+测试批量卡尔曼滤波引擎（与逐航迹使用 filterpy 的结果对比）
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from filterpy.kalman import KalmanFilter
+
+from app.algorithms.single_source.kalman import engine
+from app.algorithms.single_source.kalman.algorithm import KalmanAlgorithm
+from app.algorithms.single_source.kalman.config import KalmanAlgorithmConfig
+from app.algorithms.single_source.kalman.engine import batch_kalman_filter, process_noise_matrices
+from app.algorithms.single_source.local_frame import local_metric_frame
+
+
+def _filterpy_track(z, dt, config):
+    """逐点 predict / update（批量引擎之前的实现）"""
+    kf = KalmanFilter(dim_x=6, dim_z=3)
+    kf.H = np.hstack([np.eye(3), np.zeros((3, 3))])
+    kf.Q = np.eye(6) * config.process_noise
+    kf.R = np.eye(3) * config.measurement_noise
+    kf.P = np.eye(6) * config.initial_uncertainty
+    kf.x = np.array([z[0, 0], z[0, 1], z[0, 2], 0, 0, 0]).reshape(6, 1)
+
+    positions, traces = [], []
+    for i in range(len(z)):
+        if i > 0:
+            kf.F = np.eye(6)
+            kf.F[0, 3] = kf.F[1, 4] = kf.F[2, 5] = dt[i]
+            kf.predict()
+        kf.update(z[i])
+        positions.append(kf.x[:3, 0].copy())
+        traces.append(np.trace(kf.P))
+    return np.array(positions), np.array(traces)
+
+
+def _filterpy_smoothed_track(z, dt, q, r, p0):
+    """filterpy 前向滤波（白噪声加速度 Q）+ rts_smoother"""
+    kf = KalmanFilter(dim_x=6, dim_z=3)
+    kf.H = np.hstack([np.eye(3), np.zeros((3, 3))])
+    kf.R = np.eye(3) * r
+    kf.P = p0.copy()
+    kf.x = np.array([z[0, 0], z[0, 1], z[0, 2], 0, 0, 0]).reshape(6, 1)
+
+    xs, Ps, Fs, Qs = [], [], [], []
+    for i in range(len(z)):
+        F = np.eye(6)
+        F[0, 3] = F[1, 4] = F[2, 5] = dt[i]
+        Q = process_noise_matrices(np.array([dt[i]]), q, "white_acceleration")[0]
+        if i > 0:
+            kf.predict(F=F, Q=Q)
+        kf.update(z[i])
+        xs.append(kf.x.copy())
+        Ps.append(kf.P.copy())
+        Fs.append(F)
+        Qs.append(Q)
+    x, P, _, _ = kf.rts_smoother(np.array(xs), np.array(Ps), Fs=Fs, Qs=Qs)
+    return x[:, :3, 0], np.trace(P, axis1=1, axis2=2)
+
+
+def _random_tracks(count, rng):
+    measurements, intervals = [], []
+    for _ in range(count):
+        n = int(rng.integers(1, 60))
+        dt = np.maximum(rng.exponential(4.0, n), 0.1)
+        velocity = rng.normal(0, [1e-3, 1e-3, 5.0])
+        truth = np.array([39.5, 116.3, 8000.0]) + np.cumsum(dt)[:, None] * velocity
+        measurements.append(truth + rng.normal(0, [1e-3, 1e-3, 30.0], (n, 3)))
+        intervals.append(dt)
+    return measurements, intervals
+
+
+@pytest.mark.parametrize("config", [
+    KalmanAlgorithmConfig(),
+    KalmanAlgorithmConfig(process_noise=0.01, measurement_noise=5.0),
+    KalmanAlgorithmConfig(process_noise=1.0, measurement_noise=0.1, initial_uncertainty=10.0),
+])
+def test_batched_filter_matches_filterpy(config, monkeypatch):
+    # 分块边界：块内与块间航迹长度不一
+    monkeypatch.setattr(engine, "KALMAN_BATCH_TRACKS", 16)
+    measurements, intervals = _random_tracks(50, np.random.default_rng(3))
+
+    outputs = batch_kalman_filter(
+        measurements, intervals, config.process_noise, config.measurement_noise, config.initial_uncertainty
+    )
+
+    for z, dt, output in zip(measurements, intervals, outputs):
+        positions, traces = _filterpy_track(z, dt, config)
+        np.testing.assert_allclose(output.positions, positions, rtol=1e-10, atol=1e-9)
+        np.testing.assert_allclose(output.covariance_traces, traces, rtol=1e-9)
+
+
+def test_rts_smoother_matches_filterpy(monkeypatch):
+    monkeypatch.setattr(engine, "KALMAN_BATCH_TRACKS", 16)
+    rng = np.random.default_rng(5)
+    measurements, intervals = _random_tracks(40, rng)
+    measurements = [local_metric_frame(z[0]).to_local(z) for z in measurements]
+    q, r, velocity_variance = 2.0, 100.0 ** 2, 300.0 ** 2
+
+    outputs = batch_kalman_filter(
+        measurements, intervals, q, r, r,
+        initial_velocity_uncertainty=velocity_variance,
+        process_noise_model="white_acceleration",
+        smooth=True,
+    )
+
+    p0 = np.diag([r] * 3 + [velocity_variance] * 3)
+    for z, dt, output in zip(measurements, intervals, outputs):
+        positions, traces = _filterpy_smoothed_track(z, dt, q, r, p0)
+        np.testing.assert_allclose(output.positions, positions, rtol=1e-9, atol=1e-6)
+        np.testing.assert_allclose(output.covariance_traces, traces, rtol=1e-8)
+
+
+def test_smoother_chunking_by_memory_budget(monkeypatch):
+    measurements, intervals = _random_tracks(30, np.random.default_rng(8))
+    expected = batch_kalman_filter(measurements, intervals, 0.1, 1.0, 100.0, smooth=True)
+
+    # 每块只能放下少量航迹
+    monkeypatch.setattr(engine, "KALMAN_SMOOTHER_MAX_ELEMENTS", 60 * 36 * 3)
+    outputs = batch_kalman_filter(measurements, intervals, 0.1, 1.0, 100.0, smooth=True)
+    for a, b in zip(outputs, expected):
+        np.testing.assert_allclose(a.positions, b.positions, rtol=1e-12)
+
+
+def test_white_acceleration_noise_scales_with_interval():
+    Q = process_noise_matrices(np.array([1.0, 2.0]), 3.0, "white_acceleration")
+    assert Q[0, 0, 0] == pytest.approx(1.0) and Q[0, 0, 3] == pytest.approx(1.5) and Q[0, 3, 3] == pytest.approx(3.0)
+    assert Q[1, 2, 2] == pytest.approx(8.0) and Q[1, 5, 2] == pytest.approx(6.0) and Q[1, 4, 4] == pytest.approx(6.0)
+    with pytest.raises(ValueError):
+        batch_kalman_filter([np.zeros((3, 3))], [np.ones(3)], 0.1, 1.0, 1.0, process_noise_model="singer")
+
+
+def test_local_metric_frame_round_trip():
+    frame = local_metric_frame(np.array([39.5, 116.3, 8000.0]))
+    positions = np.array([[39.5, 116.3, 8000.0], [39.6, 116.5, 9000.0]])
+    local = frame.to_local(positions)
+
+    np.testing.assert_allclose(local[0], 0.0)
+    # 纬度 0.1° 约 11.1 km，该纬度处经度 0.2° 约 17.2 km
+    assert local[1, 0] == pytest.approx(11104, rel=1e-3)
+    assert local[1, 1] == pytest.approx(17193, rel=1e-3)
+    np.testing.assert_allclose(frame.to_geodetic(local), positions, rtol=0, atol=1e-9)
+
+
+def test_algorithm_outputs_follow_track_order():
+    start = datetime(2024, 5, 1, 8, 0, 0)
+    groups = [
+        [
+            SimpleNamespace(
+                batch_id=f"B{k}", radar_station_id=k % 2 + 1, timestamp=start + timedelta(seconds=4 * i),
+                latitude=39.5 + 1e-4 * i, longitude=116.3 - 1e-4 * i, altitude=None if i == 2 else 8000.0,
+            )
+            for i in range(length)
+        ]
+        for k, length in enumerate([3, 12, 7])
+    ]
+    algorithm = KalmanAlgorithm(KalmanAlgorithmConfig())
+    results = algorithm._apply_kalman_filters(groups)
+
+    assert [len(r) for r in results] == [3, 12, 7]
+    assert results[1][0]["batch_id"] == "B1" and results[1][0]["timestamp"] == start.isoformat()
+    assert results[0][2]["orig_alt"] == 0
+    assert results[2] == algorithm._apply_kalman_filter(groups[2])
+
+
+def test_rts_metric_smoothing_reduces_error():
+    rng = np.random.default_rng(11)
+    start = datetime(2024, 5, 1, 8, 0, 0)
+    seconds = np.cumsum(np.maximum(rng.exponential(4.0, 80), 0.5))
+    truth = np.array([39.5, 116.3, 8000.0]) + seconds[:, None] * np.array([2e-3, -1.5e-3, 2.0])
+    observed = truth + rng.normal(0, [1e-3, 1e-3, 100.0], truth.shape)
+    group = [
+        SimpleNamespace(
+            batch_id="B1", radar_station_id=1, timestamp=start + timedelta(seconds=float(t)),
+            latitude=lat, longitude=lon, altitude=alt,
+        )
+        for t, (lat, lon, alt) in zip(seconds, observed)
+    ]
+
+    def position_error(config):
+        smoothed = KalmanAlgorithm(config)._apply_kalman_filters([group])[0]
+        positions = np.array([(p["latitude"], p["longitude"], p["altitude"]) for p in smoothed])
+        return local_metric_frame(truth[0]).to_local(positions) - local_metric_frame(truth[0]).to_local(truth)
+
+    raw = local_metric_frame(truth[0]).to_local(observed) - local_metric_frame(truth[0]).to_local(truth)
+    filtered = position_error(KalmanAlgorithmConfig(
+        coordinate_frame="local_metric", process_noise_model="white_acceleration"
+    ))
+    smoothed = position_error(KalmanAlgorithm(KalmanAlgorithmConfig()).get_config_preset_profiles()["rts_metric"])
+
+    def rms(error):
+        return float(np.sqrt((error ** 2).sum(axis=1).mean()))
+
+    assert rms(smoothed) < rms(filtered) < rms(raw)
+    # 后向平滑明显改善航迹起始段
+    assert rms(smoothed[:10]) < 0.7 * rms(filtered[:10])
+
+
+def test_config_rejects_unknown_options():
+    with pytest.raises(ValueError):
+        KalmanAlgorithmConfig(coordinate_frame="ecef")
+    with pytest.raises(ValueError):
+        KalmanAlgorithmConfig(process_noise_model="singer")
@@ -0,0 +1,90 @@
+"""
+测试匹配组持久化（向量化质量指标、紧凑编码、批量插入）
+"""
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.algorithms.multi_source.preprocessing.track_matcher import (
+    compute_group_statistics,
+    decode_match_points,
+    encode_match_points,
+    save_matched_groups,
+)
+from app.models.error_analysis import MatchGroup
+
+
+@pytest.fixture
+def matched_groups():
+    rng = np.random.default_rng(3)
+    groups = []
+    point_id = 1
+    for _ in range(200):
+        size = int(rng.integers(2, 6))
+        center = rng.uniform([110.0, 30.0], [120.0, 40.0])
+        group = []
+        for station_id in range(1, size + 1):
+            lon, lat = center + rng.normal(0, 0.02, size=2)
+            group.append({
+                'id': point_id,
+                'station_id': station_id,
+                'track_id': f"T{station_id}",
+                'time_seconds': 100.0,
+                'longitude': float(lon),
+                'latitude': float(lat),
+                'altitude': float(rng.uniform(5000, 9000)),
+            })
+            point_id += 1
+        groups.append(group)
+    return groups
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    MatchGroup.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_group_statistics_match_per_group_numpy(matched_groups):
+    statistics = compute_group_statistics(matched_groups)
+
+    for index, group in enumerate(matched_groups):
+        positions = np.array([[p['longitude'], p['latitude']] for p in group])
+        distances = np.sqrt(np.sum((positions - positions.mean(axis=0)) ** 2, axis=1))
+        assert statistics['avg_distance'][index] == pytest.approx(np.mean(distances), rel=1e-9)
+        assert statistics['max_distance'][index] == pytest.approx(np.max(distances), rel=1e-9)
+        assert statistics['variance'][index] == pytest.approx(np.var(distances), rel=1e-6, abs=1e-15)
+
+
+def test_packed_encoding_round_trip():
+    points = [
+        {'station_id': 1, 'point_id': 10, 'longitude': 116.123456789, 'latitude': 39.5, 'altitude': 8000.25},
+        {'station_id': 3, 'point_id': None, 'longitude': 117.0, 'latitude': 40.0, 'altitude': 0.0},
+    ]
+
+    assert encode_match_points(points, "json") is points
+    assert decode_match_points(encode_match_points(points, "packed")) == points
+    assert decode_match_points(points) == points
+    assert decode_match_points(None) == []
+
+
+@pytest.mark.parametrize("encoding", ["json", "packed"])
+def test_save_matched_groups_bulk_insert(db, matched_groups, encoding):
+    groups = matched_groups + [[]]
+    saved = save_matched_groups(db, "task-1", groups, datetime(2024, 1, 1), encoding=encoding)
+
+    assert saved == len(matched_groups)
+    records = db.query(MatchGroup).order_by(MatchGroup.group_id).all()
+    assert [r.group_id for r in records] == list(range(1, len(matched_groups) + 1))
+
+    for record, group in zip(records, matched_groups):
+        points = decode_match_points(record.match_points)
+        assert record.point_count == len(group)
+        assert [p['point_id'] for p in points] == [p['id'] for p in group]
+        assert [p['longitude'] for p in points] == [p['longitude'] for p in group]
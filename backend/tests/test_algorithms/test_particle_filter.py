@@ -0,0 +1,95 @@
+"""
+测试粒子滤波的向量化重采样、随机种子与 float32 粒子
+"""
+import numpy as np
+import pytest
+
+from app.algorithms.single_source.particle_filter.algorithm import ParticleFilterAlgorithm
+from app.algorithms.single_source.particle_filter.config import ParticleFilterAlgorithmConfig
+from benchmarks.bench_particle_filter import make_track
+
+
+def _loop_resample_indices(positions, weights):
+    """原 while 循环实现（采样位置有序）"""
+    N = len(weights)
+    indices = np.zeros(N, dtype=int)
+    cumsum = np.cumsum(weights)
+    i, j = 0, 0
+    while i < N:
+        if positions[i] < cumsum[j]:
+            indices[i] = j
+            i += 1
+        else:
+            j += 1
+    return indices
+
+
+def test_systematic_resampling_matches_loop():
+    algorithm = ParticleFilterAlgorithm(ParticleFilterAlgorithmConfig())
+    weights = np.random.default_rng(1).gamma(0.3, size=700)
+    # 含零权重粒子
+    weights[::7] = 0.0
+    weights /= weights.sum()
+    particles = np.arange(700, dtype=np.float64)[:, None] * np.ones(6)
+
+    resampled = algorithm._resample(particles, weights, np.random.default_rng(2))
+
+    u = np.random.default_rng(2).random()
+    expected = _loop_resample_indices((np.arange(700) + u) / 700, weights)
+    np.testing.assert_array_equal(resampled[:, 0], expected)
+    assert not np.isin(np.flatnonzero(weights == 0), resampled[:, 0]).any()
+
+
+def test_multinomial_resampling_follows_weights():
+    algorithm = ParticleFilterAlgorithm(ParticleFilterAlgorithmConfig(resampling_method="multinomial"))
+    weights = np.array([0.1, 0.0, 0.6, 0.3])
+    particles = np.arange(4, dtype=np.float64)[:, None] * np.ones(6)
+
+    samples = np.concatenate([
+        algorithm._resample(particles, weights, rng)[:, 0]
+        for rng in [np.random.default_rng(seed) for seed in range(500)]
+    ])
+    frequencies = np.bincount(samples.astype(int), minlength=4) / len(samples)
+    np.testing.assert_allclose(frequencies, weights, atol=0.02)
+
+    # 累积权重末项舍入后小于 1 时不越界
+    rounded = np.full(4, 0.25 - 1e-12)
+    assert algorithm._resample(particles, rounded, np.random.default_rng(0)).shape == (4, 6)
+
+
+def test_seeded_runs_are_reproducible():
+    points, _ = make_track(60, seed=2)
+    config = ParticleFilterAlgorithmConfig(
+        num_particles=500, process_noise_std=0.0005, measurement_noise_std=0.005, random_seed=7
+    )
+
+    first = ParticleFilterAlgorithm(config)._apply_particle_filter(points)
+    second = ParticleFilterAlgorithm(config)._apply_particle_filter(points)
+    other = ParticleFilterAlgorithm(config.model_copy(update={"random_seed": 8}))._apply_particle_filter(points)
+
+    assert first == second
+    assert first != other
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_filter_tracks_truth(dtype):
+    points, truth = make_track(200, seed=3)
+    config = ParticleFilterAlgorithmConfig(
+        num_particles=2000, process_noise_std=0.0005, measurement_noise_std=0.005,
+        particle_dtype=dtype, random_seed=0,
+    )
+    smoothed = ParticleFilterAlgorithm(config)._apply_particle_filter(points)
+
+    states = np.array([(p["latitude"], p["longitude"]) for p in smoothed])
+    observed = np.array([(p.latitude, p.longitude) for p in points])
+    filtered_error = np.sqrt(((states - truth[:, :2]) ** 2).sum(axis=1).mean())
+    raw_error = np.sqrt(((observed - truth[:, :2]) ** 2).sum(axis=1).mean())
+    assert filtered_error < raw_error
+    assert all(isinstance(p["latitude"], float) for p in smoothed)
+
+
+def test_config_rejects_unknown_options():
+    with pytest.raises(ValueError):
+        ParticleFilterAlgorithmConfig(particle_dtype="float16")
+    with pytest.raises(ValueError):
+        ParticleFilterAlgorithmConfig(resampling_method="stratified")
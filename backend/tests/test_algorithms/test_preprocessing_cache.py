@@ -0,0 +1,173 @@
+"""
+测试预处理结果缓存
+"""
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from app.algorithms.multi_source.preprocessing.cache import (
+    PreprocessingCache,
+    build_cache_key,
+    decode_entry,
+    encode_entry,
+)
+from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from app.algorithms.multi_source.preprocessing.pipeline import save_preprocessing_outputs
+from app.algorithms.multi_source.preprocessing.track_interpolator import TrackInterpolator
+from app.algorithms.multi_source.preprocessing.track_matcher import decode_match_points
+from app.models.error_analysis import MatchGroup, TrackInterpolatedPoint, TrackSegment
+
+
+RADAR_POSITIONS = {1: (116.0, 39.0, 50.0), 2: (117.0, 40.0, 80.0)}
+
+
+def _entry(task_id):
+    return {
+        'source_task_id': task_id,
+        'reference_time': datetime(2024, 1, 1),
+        'key_tracks': {},
+        'matched_groups': [[{'station_id': 1}, {'station_id': 2}]],
+    }
+
+
+class TestBuildCacheKey:
+    """测试缓存键"""
+
+    def test_key_ignores_input_order(self):
+        """航迹与雷达站顺序不影响缓存键"""
+        config = MrraConfig()
+        key_a = build_cache_key(["T1", "T2"], RADAR_POSITIONS, config, "10:10:")
+        key_b = build_cache_key(["T2", "T1"], dict(reversed(list(RADAR_POSITIONS.items()))), config, "10:10:")
+        assert key_a == key_b
+
+    def test_key_depends_on_preprocessing_fields_and_version(self):
+        """预处理参数或源数据版本变化时缓存键变化，误差计算参数不影响缓存键"""
+        base = build_cache_key(["T1"], RADAR_POSITIONS, MrraConfig(), "10:10:")
+
+        assert build_cache_key(["T1"], RADAR_POSITIONS, MrraConfig(time_window=90), "10:10:") != base
+        assert build_cache_key(["T1"], RADAR_POSITIONS, MrraConfig(), "11:11:") != base
+        assert build_cache_key(["T1"], RADAR_POSITIONS, MrraConfig(max_match_groups=5000), "10:10:") == base
+
+
+class TestPreprocessingCache:
+    """测试缓存的 LRU 淘汰与落盘"""
+
+    def test_put_writes_through_to_disk(self, tmp_path):
+        """写入即落盘：其他进程的缓存立即命中，内存淘汰的条目仍可命中"""
+        cache = PreprocessingCache(max_entries=1, cache_dir=str(tmp_path))
+        cache.put("a", _entry("task-a"))
+        assert (tmp_path / "a.json.gz").exists()
+        assert PreprocessingCache(cache_dir=str(tmp_path)).get("a") == _entry("task-a")
+
+        cache.put("b", _entry("task-b"))
+        assert cache.get("a")['source_task_id'] == "task-a"
+        assert cache.get("b")['source_task_id'] == "task-b"
+
+    def test_put_writes_through_to_minio(self, tmp_path, monkeypatch):
+        """启用 MinIO 时写入即上传，其他主机从 MinIO 命中"""
+        from app.services.minio_service import minio_service
+
+        objects = {}
+        monkeypatch.setattr(minio_service, "put_object_bytes", lambda name, data: objects.setdefault(name, data))
+        monkeypatch.setattr(minio_service, "download_file", lambda name: objects[name])
+
+        PreprocessingCache(cache_dir=str(tmp_path / "host-a"), use_minio=True).put("a", _entry("task-a"))
+        assert list(objects) == ["preprocess-cache/a.json.gz"]
+        other_host = PreprocessingCache(cache_dir=str(tmp_path / "host-b"), use_minio=True)
+        assert other_host.get("a") == _entry("task-a")
+
+    def test_disk_entries_are_trimmed(self, tmp_path):
+        """磁盘条目超过上限时删除最旧的条目"""
+        cache = PreprocessingCache(max_entries=1, cache_dir=str(tmp_path), max_disk_entries=1)
+        for key in ("a", "b", "c"):
+            cache.put(key, _entry(key))
+
+        assert sorted(p.name for p in tmp_path.glob("*.json.gz")) == ["c.json.gz"]
+
+    def test_entries_are_stored_as_data_only_json(self, tmp_path):
+        """条目以 JSON 存储：日期时间和 numpy 值可还原，pickle 数据不会被加载"""
+        entry = {
+            'reference_time': datetime(2024, 1, 1, 8, 30, 15),
+            'matched_groups': [[{'station_id': np.int64(1), 'longitude': np.float64(116.5)}]],
+        }
+        decoded = decode_entry(encode_entry(entry))
+        assert decoded['reference_time'] == datetime(2024, 1, 1, 8, 30, 15)
+        assert decoded['matched_groups'] == [[{'station_id': 1, 'longitude': 116.5}]]
+
+        (tmp_path / "a.json.gz").write_bytes(pickle.dumps(_entry("task-a")))
+        assert PreprocessingCache(cache_dir=str(tmp_path)).get("a") is None
+
+    def test_disabled_cache(self, tmp_path):
+        """禁用时不写入也不命中"""
+        cache = PreprocessingCache(cache_dir=str(tmp_path), enabled=False)
+        cache.put("a", _entry("task-a"))
+        assert cache.get("a") is None
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    TrackInterpolatedPoint.__table__.create(engine)
+    # SQLite 的索引名全库唯一，与插值点表同名的索引不创建
+    with engine.begin() as connection:
+        connection.execute(CreateTable(TrackSegment.__table__))
+        connection.execute(CreateTable(MatchGroup.__table__))
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _save_source_points(db, task_id):
+    """写入源任务的插值点，返回带数据库ID的匹配组"""
+    points = [
+        {
+            'station_id': station_id, 'track_id': f"T{station_id}", 'time_seconds': float(t),
+            'longitude': 116.0 + 0.01 * t, 'latitude': 39.0, 'altitude': 8000.0, 'segment_index': station_id,
+        }
+        for t in range(3) for station_id in (1, 2)
+    ]
+    TrackInterpolator(MrraConfig()).save_to_database(db, task_id, points, [], datetime(2024, 1, 1))
+    rows = db.query(TrackInterpolatedPoint).filter(TrackInterpolatedPoint.task_id == task_id).order_by(
+        TrackInterpolatedPoint.id
+    ).all()
+    point_dicts = [
+        {'id': row.id, 'station_id': row.station_id, 'longitude': row.longitude, 'latitude': row.latitude,
+         'altitude': row.altitude}
+        for row in rows
+    ]
+    return [point_dicts[k:k + 2] for k in range(0, len(point_dicts), 2)]
+
+
+def test_outputs_copy_points_and_remap_match_point_ids(db):
+    """复用的匹配组指向本任务复制的插值点，源任务的点删除后仍然有效"""
+    matched_groups = _save_source_points(db, "source")
+    segments = [{'station_id': 1, 'segment_id': 1, 'track_id': "T1", 'start_seconds': 0, 'end_seconds': 2,
+                 'point_count': 3}]
+
+    assert save_preprocessing_outputs(db, "reuse", "source", segments, matched_groups, datetime(2024, 1, 1))
+    db.query(TrackInterpolatedPoint).filter(TrackInterpolatedPoint.task_id == "source").delete()
+    db.commit()
+
+    copied = {
+        row.id: row for row in db.query(TrackInterpolatedPoint).filter(TrackInterpolatedPoint.task_id == "reuse")
+    }
+    assert len(copied) == 6
+    groups = db.query(MatchGroup).filter(MatchGroup.task_id == "reuse").order_by(MatchGroup.group_id).all()
+    assert len(groups) == 3
+    for group, expected in zip(groups, matched_groups):
+        for point, source in zip(decode_match_points(group.match_points), expected):
+            row = copied[point['point_id']]
+            assert (row.station_id, row.longitude) == (source['station_id'], source['longitude'])
+    assert db.query(TrackSegment).filter(TrackSegment.task_id == "reuse").count() == 1
+
+
+def test_outputs_skipped_when_source_points_are_gone(db):
+    """源任务的插值点已删除时不写入任何记录（调用方按缓存未命中重新计算）"""
+    assert not save_preprocessing_outputs(db, "reuse", "missing", [], [[{'id': 1, 'station_id': 1}]],
+                                          datetime(2024, 1, 1))
+    assert db.query(MatchGroup).count() == 0
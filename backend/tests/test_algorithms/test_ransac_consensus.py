@@ -0,0 +1,116 @@
+"""
+测试批量 RANSAC 一致集搜索（与 sklearn RANSACRegressor 对比）
+"""
+import warnings
+
+import numpy as np
+import pytest
+from sklearn.linear_model import RANSACRegressor
+
+from app.algorithms.multi_source.ransac.consensus import best_consensus, consensus_inlier_mask, subset_combinations
+
+RESIDUAL_THRESHOLD = 0.05
+
+
+@pytest.fixture(scope="module")
+def groups():
+    """
+    各组点在一条直线附近，每站有各自的离群概率
+
+    每组至少保留 3 个正常点，使最优一致集唯一（两点组或多条两点直线并列时，
+    RANSACRegressor 取决于随机抽样顺序，无法逐组比较）
+    """
+    rng = np.random.default_rng(21)
+    outlier_probability = {1: 0.02, 2: 0.05, 3: 0.4, 4: 0.1, 5: 0.02, 6: 0.3}
+    result = []
+    for _ in range(300):
+        size = int(rng.integers(4, 7))
+        stations = rng.choice(list(outlier_probability), size=size, replace=False)
+        slope, intercept = rng.uniform(-1, 1), rng.uniform(110, 120)
+        lats = rng.uniform(30, 40, size)
+        lons = intercept + slope * (lats - 35) + rng.normal(0, 0.01, size)
+        outliers = [k for k, sid in enumerate(stations) if rng.random() < outlier_probability[sid]]
+        for k in outliers[:size - 3]:
+            lons[k] += rng.choice([-1, 1]) * rng.uniform(0.2, 1.0)
+        result.append((stations, lats, lons))
+    return result
+
+
+def _sklearn_mask(lats, lons, min_samples):
+    ransac = RANSACRegressor(
+        residual_threshold=RESIDUAL_THRESHOLD,
+        min_samples=min_samples,
+        max_trials=200,
+        stop_probability=0.9999,
+        random_state=0,
+    )
+    try:
+        with warnings.catch_warnings():
+            # 只有 1 个内点的样本模型无法计算 R²
+            warnings.simplefilter("ignore")
+            ransac.fit(lats.reshape(-1, 1), lons)
+    except ValueError:
+        # 找不到一致集时整组视为内点
+        return np.ones(len(lats), dtype=bool)
+    return ransac.inlier_mask_
+
+
+def _outlier_rates(groups, masks):
+    total, outliers = {}, {}
+    for (stations, _, _), mask in zip(groups, masks):
+        for sid, inlier in zip(stations, mask):
+            total[sid] = total.get(sid, 0) + 1
+            outliers[sid] = outliers.get(sid, 0) + (not inlier)
+    return {sid: round(outliers[sid] / total[sid], 4) for sid in total}
+
+
+@pytest.mark.parametrize("min_samples", [2, 3])
+def test_outlier_rates_match_sklearn(groups, min_samples):
+    sizes = np.array([len(stations) for stations, _, _ in groups])
+    mask = consensus_inlier_mask(
+        np.concatenate([lats for _, lats, _ in groups]),
+        np.concatenate([lons for _, _, lons in groups]),
+        sizes,
+        min_samples=min_samples,
+        residual_threshold=RESIDUAL_THRESHOLD,
+        max_trials=200,
+    )
+    batched = np.split(mask, np.cumsum(sizes)[:-1])
+    reference = [
+        _sklearn_mask(lats, lons, min_samples) if len(lats) >= min_samples else np.ones(len(lats), dtype=bool)
+        for _, lats, lons in groups
+    ]
+
+    agreement = np.mean([np.array_equal(a, b) for a, b in zip(batched, reference)])
+    # 其余差异来自 RANSACRegressor 随机抽样提前停止（穷举总能找到内点最多的一致集）
+    assert agreement > 0.98
+    assert _outlier_rates(groups, batched) == pytest.approx(_outlier_rates(groups, reference), abs=0.01)
+
+
+def test_degenerate_samples_follow_linear_regression():
+    # 纬度相同的样本拟合为水平线（截距为样本经度均值）
+    x = np.array([[35.0, 35.0, 35.0]])
+    y = np.array([[116.0, 116.03, 117.0]])
+    mask = best_consensus(x, y, subset_combinations(3, 2, 100, np.random.default_rng()), RESIDUAL_THRESHOLD)
+    assert mask.tolist() == [[True, True, False]]
+    assert _sklearn_mask(x[0], y[0], 2).tolist() == [True, True, False]
+
+
+def test_large_groups_sample_max_trials_combinations():
+    combinations = subset_combinations(30, 3, 50, np.random.default_rng(0))
+    assert combinations.shape == (50, 3)
+    assert np.all(np.diff(combinations, axis=1) > 0)
+    assert len(subset_combinations(6, 2, 50, np.random.default_rng(0))) == 15
+
+
+def test_sampled_combinations_are_reproducible_with_seed():
+    """组合数超过 max_trials 时随机抽样，种子相同则内点掩码相同"""
+    rng = np.random.default_rng(4)
+    x = rng.uniform(30, 40, 40)
+    y = 115 + 0.3 * (x - 35) + rng.normal(0, 0.01, 40)
+    y[rng.choice(40, 12, replace=False)] += rng.uniform(0.1, 0.5, 12)
+
+    def mask(seed):
+        return consensus_inlier_mask(x, y, np.array([20, 20]), 3, RESIDUAL_THRESHOLD, max_trials=30, seed=seed)
+
+    assert np.array_equal(mask(11), mask(11))
@@ -0,0 +1,136 @@
+"""
+测试匹配组分层抽样与渐进加密求解
+"""
+import math
+
+import numpy as np
+import pytest
+
+from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from app.algorithms.multi_source.preprocessing.error_calculator import ErrorCalculator
+from app.algorithms.multi_source.preprocessing.group_table import METERS_PER_DEGREE, geod
+from app.algorithms.multi_source.preprocessing.sampling import (
+    group_strata,
+    limit_match_groups,
+    sampling_order,
+    stratified_sample,
+)
+
+RADAR_POSITIONS = {
+    1: (115.6, 39.2, 50.0),
+    2: (116.5, 39.9, 120.0),
+    3: (116.4, 39.0, 80.0),
+}
+TRUE_ERRORS = {
+    1: (0.2, 250.0, 0.08),
+    2: (-0.1, -120.0, -0.04),
+    3: (0.05, 60.0, 0.0),
+}
+
+
+def _make_groups(count, seed=3):
+    """按时间顺序生成匹配组：前半段只有 1、2 号站，后半段才出现 3 号站"""
+    rng = np.random.default_rng(seed)
+    groups = []
+    for index in range(count):
+        lon, lat = rng.uniform(115.8, 116.3), rng.uniform(39.3, 39.7)
+        alt = rng.uniform(4000, 9000)
+        stations = [1, 2] if index < count // 2 else [1, 2, 3]
+        group = []
+        for sid in stations:
+            r_lon, r_lat, r_alt = RADAR_POSITIONS[sid]
+            da, dr, de = TRUE_ERRORS[sid]
+            az, _, dist = geod.inv(r_lon, r_lat, lon, lat)
+            obs_lon, obs_lat, _ = geod.fwd(r_lon, r_lat, az + da, dist + dr + rng.normal(0, 10))
+            elevation = math.asin((alt - r_alt) / dist) + math.radians(de)
+            dx = (obs_lon - r_lon) * METERS_PER_DEGREE * math.cos(math.radians(r_lat))
+            dy = (obs_lat - r_lat) * METERS_PER_DEGREE
+            group.append({
+                'station_id': sid,
+                'longitude': obs_lon,
+                'latitude': obs_lat,
+                'altitude': r_alt + math.hypot(dx, dy) * math.tan(elevation),
+                'time_seconds': float(index),
+            })
+        groups.append(group)
+    return groups
+
+
+@pytest.fixture(scope="module")
+def match_groups():
+    return _make_groups(4000)
+
+
+def test_stratified_sample_is_proportional_across_strata(match_groups):
+    strata = group_strata(match_groups)
+    order = sampling_order(match_groups)
+    sample = order[:400]
+
+    expected = np.bincount(strata) * len(sample) / len(match_groups)
+    actual = np.bincount(strata[sample], minlength=len(expected))
+    assert np.all(np.abs(actual - expected) <= 1)
+
+    # 截取前 N 组完全看不到后半段才出现的 3 号站
+    assert all(3 not in {p['station_id'] for p in g} for g in match_groups[:400])
+    sampled_with_3 = sum(3 in {p['station_id'] for p in g} for g in stratified_sample(match_groups, 400))
+    assert sampled_with_3 == pytest.approx(200, abs=5)
+
+
+def test_smaller_samples_are_nested_and_keep_time_order(match_groups):
+    small = stratified_sample(match_groups, 300)
+    large = stratified_sample(match_groups, 900)
+    large_ids = {id(g) for g in large}
+
+    assert all(id(g) in large_ids for g in small)
+    times = [g[0]['time_seconds'] for g in large]
+    assert times == sorted(times)
+    assert stratified_sample(match_groups, 300) == small
+
+
+def test_limit_match_groups_strategies(match_groups):
+    assert limit_match_groups(match_groups, 5000) is match_groups
+    assert limit_match_groups(match_groups, 1000, "truncate") == match_groups[:1000]
+    assert limit_match_groups(match_groups, 1000, "stratified") == stratified_sample(match_groups, 1000)
+
+
+def test_progressive_refinement_stops_early_near_full_estimate(match_groups, monkeypatch):
+    config = MrraConfig(
+        solver="least_squares", group_sampling="progressive", sample_initial_groups=500, max_match_groups=4000
+    )
+    calculator = ErrorCalculator(config)
+    sizes = []
+    original = calculator._solve_radar_errors
+
+    def recording(groups, positions, initial_errors=None):
+        sizes.append(len(groups))
+        return original(groups, positions, initial_errors)
+
+    monkeypatch.setattr(calculator, "_solve_radar_errors", recording)
+    errors = calculator.calculate_radar_errors(match_groups, RADAR_POSITIONS)
+
+    assert sizes[0] == 500
+    assert sizes[-1] < len(match_groups)
+
+    full = ErrorCalculator(config.model_copy(update={"group_sampling": "truncate"}))
+    full_errors = full.calculate_radar_errors(match_groups, RADAR_POSITIONS)
+    for sid in RADAR_POSITIONS:
+        assert errors[sid][0] == pytest.approx(full_errors[sid][0], abs=0.01)
+        assert errors[sid][1] == pytest.approx(full_errors[sid][1], abs=5.0)
+        assert errors[sid][2] == pytest.approx(full_errors[sid][2], abs=0.01)
+
+
+def test_progressive_refinement_is_opt_in(match_groups, monkeypatch):
+    calculator = ErrorCalculator(MrraConfig(sample_initial_groups=500, max_match_groups=4000))
+    monkeypatch.setattr(calculator, "calculate_radar_errors_progressively", None)
+    sizes = []
+    monkeypatch.setattr(
+        calculator, "_solve_radar_errors", lambda groups, positions, initial_errors=None: sizes.append(len(groups))
+    )
+
+    calculator.calculate_radar_errors(match_groups, RADAR_POSITIONS)
+    assert sizes == [len(match_groups)]
+
+
+def test_unknown_group_sampling_is_rejected():
+    with pytest.raises(ValueError):
+        MrraConfig(group_sampling="random")
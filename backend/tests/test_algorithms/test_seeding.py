@@ -0,0 +1,97 @@
+"""
+测试随机种子的生成、记录与算法可复现性判断
+"""
+import numpy as np
+
+from app.algorithms.multi_source.preprocessing.bootstrap import bootstrap_metadata, bootstrap_radar_errors
+from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from app.algorithms.multi_source.ransac.algorithm import RansacAlgorithm
+from app.algorithms.multi_source.ransac.config import RansacAlgorithmConfig
+from app.algorithms.seeding import GENERATED_SEED_BITS, resolve_seed
+from app.algorithms.single_source.kalman.algorithm import KalmanAlgorithm
+from app.algorithms.single_source.kalman.config import KalmanAlgorithmConfig
+from app.algorithms.single_source.particle_filter.algorithm import ParticleFilterAlgorithm
+from app.algorithms.single_source.particle_filter.config import ParticleFilterAlgorithmConfig
+from app.algorithms.single_source.runner import TrackGroupSummary
+from benchmarks.bench_particle_filter import make_track
+
+RADAR_POSITIONS = {1: (115.6, 39.2, 50.0), 2: (116.5, 39.9, 120.0)}
+
+
+def _mean_offsets(match_groups, radar_positions, initial_errors=None):
+    offsets = {sid: [] for sid in radar_positions}
+    for group in match_groups:
+        for point in group:
+            offsets[point['station_id']].append(point['offset'])
+    return {sid: tuple(np.mean(values, axis=0)) for sid, values in offsets.items()}
+
+
+def test_resolve_seed_keeps_configured_seed():
+    assert resolve_seed(0) == 0
+    assert resolve_seed(42) == 42
+
+    generated = {resolve_seed(None) for _ in range(20)}
+    assert len(generated) > 1
+    assert all(0 <= seed < 2 ** GENERATED_SEED_BITS for seed in generated)
+
+
+def test_is_deterministic_follows_seed_fields():
+    assert KalmanAlgorithm(KalmanAlgorithmConfig()).is_deterministic()
+
+    assert not ParticleFilterAlgorithm(ParticleFilterAlgorithmConfig()).is_deterministic()
+    assert ParticleFilterAlgorithm(ParticleFilterAlgorithmConfig(random_seed=3)).is_deterministic()
+
+    assert not RansacAlgorithm(RansacAlgorithmConfig()).is_deterministic()
+    assert RansacAlgorithm(RansacAlgorithmConfig(random_seed=3)).is_deterministic()
+    # 雷达站数的组合数不超过最大迭代次数时穷举全部组合，不需要随机种子
+    assert RansacAlgorithm(RansacAlgorithmConfig()).is_deterministic(station_count=5)
+    assert not RansacAlgorithm(RansacAlgorithmConfig(max_iterations=10)).is_deterministic(station_count=6)
+    # 自助法受时间预算限制，即使给出自助法种子也不可复现
+    assert not RansacAlgorithm(RansacAlgorithmConfig(random_seed=3, bootstrap_samples=50)).is_deterministic()
+    assert not RansacAlgorithm(
+        RansacAlgorithmConfig(random_seed=3, bootstrap_samples=50, bootstrap_seed=1)
+    ).is_deterministic()
+
+
+def test_generated_bootstrap_seed_reproduces_intervals():
+    """未配置种子时记录自动生成的种子，用它重新运行得到相同的置信区间"""
+    rng = np.random.default_rng(5)
+    match_groups = [
+        [
+            {'station_id': 1, 'offset': rng.normal([0.2, 100.0, 0.05], [0.1, 50.0, 0.02])},
+            {'station_id': 2, 'offset': rng.normal([-0.1, -40.0, 0.0], [0.1, 50.0, 0.02])},
+        ]
+        for _ in range(100)
+    ]
+    estimate = _mean_offsets(match_groups, RADAR_POSITIONS)
+    config = MrraConfig(bootstrap_samples=20, bootstrap_workers=1)
+
+    first = bootstrap_radar_errors(_mean_offsets, match_groups, RADAR_POSITIONS, estimate, config)
+    seed = bootstrap_metadata(first)["bootstrap"]["seed"]
+    assert seed is not None
+
+    rerun = bootstrap_radar_errors(
+        _mean_offsets, match_groups, RADAR_POSITIONS, estimate, config.model_copy(update={"bootstrap_seed": seed})
+    )
+    assert rerun.seed == seed
+    assert rerun.intervals == first.intervals
+
+
+def test_particle_filter_records_generated_seed(monkeypatch):
+    """粒子滤波未配置种子时，结果中记录的种子可复现各批次的滤波结果"""
+    groups = [make_track(40, seed=1)[0]]
+    module = "app.algorithms.single_source.particle_filter.algorithm"
+    monkeypatch.setattr(
+        f"{module}.summarize_track_groups",
+        lambda *args: TrackGroupSummary(len(groups), len(groups), sum(len(g) for g in groups)),
+    )
+    monkeypatch.setattr(f"{module}.iter_track_groups", lambda *args: iter(groups))
+    config = ParticleFilterAlgorithmConfig(num_particles=200, process_noise_std=0.0005, measurement_noise_std=0.005)
+
+    first = ParticleFilterAlgorithm(config).analyze("t1", [1], ["B1"], None)
+    seed = first.match_statistics["random_seed"]
+    assert isinstance(seed, int)
+
+    rerun = ParticleFilterAlgorithm(config.model_copy(update={"random_seed": seed})).analyze("t2", [1], ["B1"], None)
+    assert rerun.match_statistics["random_seed"] == seed
+    assert rerun.trajectory == first.trajectory
@@ -0,0 +1,158 @@
+"""
+测试单源算法批次执行器（分片并行、顺序返回、进度报告）
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.algorithms.base import ProgressCallback
+from app.algorithms.single_source import runner
+from app.algorithms.single_source.kalman.algorithm import KalmanAlgorithm
+from app.algorithms.single_source.kalman.config import KalmanAlgorithmConfig
+from app.algorithms.single_source.particle_filter.algorithm import ParticleFilterAlgorithm
+from app.algorithms.single_source.particle_filter.config import ParticleFilterAlgorithmConfig
+from app.algorithms.single_source.runner import (
+    TrackGroupSummary,
+    iter_shards,
+    iter_track_groups,
+    run_batches,
+    summarize_track_groups,
+)
+from app.algorithms.single_source.spline.algorithm import SplineAlgorithm
+from app.algorithms.single_source.spline.config import SplineAlgorithmConfig
+from app.models.flight_track import FlightTrackRaw
+
+
+class RecordingCallback(ProgressCallback):
+    def __init__(self):
+        self.calls = []
+
+    def on_progress(self, progress, message):
+        self.calls.append((progress, message))
+
+
+def _square_shard(tasks):
+    return [task * task for task in tasks]
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    FlightTrackRaw.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    start = datetime(2024, 5, 1, 8, 0, 0)
+    rng = np.random.default_rng(0)
+    rows = []
+    # 乱序写入，点数不一，B3 点数不足；B0 同时被 2 号站观测（与 1 号站时间交错）
+    tracks = [("B0", 1, 40), ("B1", 2, 25), ("B2", 1, 60), ("B3", 2, 3), ("B4", 1, 33), ("B0", 2, 30)]
+    for k, (batch_id, station, length) in enumerate(tracks):
+        for i in range(length):
+            rows.append(FlightTrackRaw(
+                file_id=1, batch_id=batch_id, station_id=str(station), radar_station_id=station,
+                timestamp=start + timedelta(seconds=4 * i + k),
+                latitude=39.5 + 2e-5 * i + rng.normal(0, 1e-4),
+                longitude=116.3 - 1e-5 * i + rng.normal(0, 1e-4),
+                altitude=None if i == 5 else 8000.0 + rng.normal(0, 20),
+            ))
+    rng.shuffle(rows)
+    session.add_all(rows)
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_results_stream_in_task_order(workers, monkeypatch):
+    monkeypatch.setattr(runner, "PARALLEL_MIN_POINTS", 0)
+    callback = RecordingCallback()
+    tasks = list(range(37))
+
+    results = list(run_batches(
+        iter(tasks), lambda task: task % 5 + 1, _square_shard, total=37, total_weight=111,
+        workers=workers, progress_callback=callback, progress_range=(0.2, 0.8), label="测试",
+    ))
+
+    assert results == [task * task for task in tasks]
+    progress = [p for p, _ in callback.calls]
+    assert progress == sorted(progress)
+    assert progress[-1] == pytest.approx(0.8)
+    assert callback.calls[-1][1] == "测试: 已完成 37/37 批次"
+
+
+def test_shards_are_cut_by_weight():
+    consumed = []
+
+    def tasks():
+        for task in range(100):
+            consumed.append(task)
+            yield task
+
+    shards = iter_shards(tasks(), lambda task: 10, shard_weight=300)
+    assert next(shards) == list(range(30))
+    # 分片按需读取，不提前消费整个任务序列
+    assert len(consumed) == 30
+    assert [len(shard) for shard in shards] == [30, 30, 10]
+    assert len(list(iter_shards(range(100), lambda task: 10, shard_weight=0))) == 100
+
+
+def test_groups_are_split_by_station_and_batch(session, monkeypatch):
+    # 游标分批读取时，组可能跨越读取批次的边界
+    monkeypatch.setattr(runner, "TRACK_QUERY_BATCH_SIZE", 7)
+    groups = list(iter_track_groups(session, ["B0", "B1", "B2", "B3", "B4"], [1, 2]))
+
+    keys = [(g[0].radar_station_id, g[0].batch_id) for g in groups]
+    assert keys == [(1, "B0"), (1, "B2"), (1, "B4"), (2, "B0"), (2, "B1"), (2, "B3")]
+    assert [len(g) for g in groups] == [40, 60, 33, 30, 25, 3]
+    for group in groups:
+        assert len({(p.radar_station_id, p.batch_id) for p in group}) == 1
+        assert all(a.timestamp < b.timestamp for a, b in zip(group, group[1:]))
+    assert groups[0][5].altitude is None
+
+    track_ids = ["B0", "B1", "B2", "B3", "B4"]
+    assert summarize_track_groups(session, track_ids, [1, 2], min_points=5) == TrackGroupSummary(6, 5, 188)
+    kept = list(iter_track_groups(session, track_ids, [1, 2], min_points=5))
+    assert [len(g) for g in kept] == [40, 60, 33, 30, 25]
+    assert summarize_track_groups(session, ["B1", "B4"], [2]) == TrackGroupSummary(1, 1, 25)
+    assert list(iter_track_groups(session, ["B1", "B4"], [2])) == [groups[4]]
+
+
+def test_interleaved_groups_are_rejected():
+    # 流式分组依赖查询按 (雷达站, 批次) 排序，组不连续时报错而不是拆成重复的组
+    rows = [
+        SimpleNamespace(radar_station_id=station, batch_id=batch)
+        for station, batch in [(1, "B0"), (1, "B0"), (2, "B0"), (1, "B0")]
+    ]
+    groups = runner._split_groups(rows)
+    assert len(next(groups)) == 2
+    assert len(next(groups)) == 1
+    with pytest.raises(ValueError, match="不连续"):
+        next(groups)
+
+
+@pytest.mark.parametrize("algorithm", [
+    KalmanAlgorithm(KalmanAlgorithmConfig(batch_workers=2)),
+    ParticleFilterAlgorithm(
+        ParticleFilterAlgorithmConfig(num_particles=200, random_seed=3, batch_workers=2)
+    ),
+    SplineAlgorithm(SplineAlgorithmConfig(batch_workers=2)),
+])
+def test_parallel_analysis_matches_serial(algorithm, session, monkeypatch):
+    track_ids = ["B0", "B1", "B2", "B3", "B4"]
+    serial = algorithm.analyze("task-serial", [1, 2], track_ids, session)
+
+    monkeypatch.setattr(runner, "PARALLEL_MIN_POINTS", 0)
+    callback = RecordingCallback()
+    parallel = algorithm.analyze("task-parallel", [1, 2], track_ids, session, callback)
+
+    assert serial.status == parallel.status == "completed"
+    assert parallel.trajectory == serial.trajectory
+    assert parallel.errors == serial.errors
+    assert len(parallel.trajectory) == 40 + 60 + 33 + 30 + 25
+    group_keys = [(p["station_id"], p["batch_id"]) for p in parallel.trajectory]
+    assert group_keys[::40][:3] == [(1, "B0"), (1, "B2"), (1, "B2")]
+    assert group_keys[133] == (2, "B0")
+    assert any("已完成 5/5 批次" in message for _, message in callback.calls)
@@ -0,0 +1,102 @@
+"""
+测试 GCV 三次平滑样条（与 scipy 平滑样条和稠密帽子矩阵对比）
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from scipy.interpolate import make_smoothing_spline
+
+from app.algorithms.single_source.spline import gcv
+from app.algorithms.single_source.spline.algorithm import SplineAlgorithm
+from app.algorithms.single_source.spline.config import SplineAlgorithmConfig
+from app.algorithms.single_source.spline.gcv import gcv_smoothing_splines
+
+
+def _track(n, noise, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.cumsum(rng.uniform(1.0, 8.0, n))
+    truth = 39.5 + 0.05 * np.sin(t / 80.0)
+    return t, truth, truth + rng.normal(0, noise, n)
+
+
+def _fit(t, y, alpha):
+    bands = gcv._penalty_bands(t)
+    _, trace_residual, gamma = gcv._evaluate_grid(np.array([alpha]), y[None], bands)
+    return y - alpha * gcv._apply_q(gamma[0, 0], bands[5], len(t)), trace_residual[0]
+
+
+def _dense_gcv(t, y, alpha):
+    """稠密帽子矩阵的 GCV（逐列平滑单位向量）"""
+    n = len(t)
+    hat = np.column_stack([_fit(t, e, alpha)[0] for e in np.eye(n)])
+    residual = y - hat @ y
+    return n * residual @ residual / (n - np.trace(hat)) ** 2, n - np.trace(hat)
+
+
+@pytest.mark.parametrize("alpha", [1.0, 1e3, 1e6])
+def test_fixed_alpha_matches_scipy_smoothing_spline(alpha):
+    t, _, y = _track(120, 0.002)
+    fitted, _ = _fit(t, y, alpha)
+    np.testing.assert_allclose(fitted, make_smoothing_spline(t, y, lam=alpha)(t), rtol=1e-9)
+
+
+def test_trace_and_gcv_match_dense_hat_matrix():
+    t, _, y = _track(60, 0.002, seed=1)
+    bands = gcv._penalty_bands(t)
+    alphas = np.array([10.0, 1e3, 1e5])
+    values, trace_residual, _ = gcv._evaluate_grid(alphas, y[None], bands)
+
+    for alpha, value, trace in zip(alphas, values[:, 0], trace_residual):
+        dense_value, dense_trace = _dense_gcv(t, y, alpha)
+        assert trace == pytest.approx(dense_trace, rel=1e-9)
+        assert value == pytest.approx(dense_value, rel=1e-7)
+
+
+def test_selected_alpha_minimizes_gcv_per_axis():
+    t, truth, lat = _track(150, 0.002, seed=2)
+    _, _, alt = _track(150, 40.0, seed=3)
+    result = gcv_smoothing_splines(t, np.vstack([lat, alt]))
+
+    # 各轴独立选择，与单轴计算一致
+    for axis, values in enumerate([lat, alt]):
+        single = gcv_smoothing_splines(t, values[None])
+        assert result.alphas[axis] == single.alphas[0]
+        np.testing.assert_allclose(result.fitted[axis], single.fitted[0], rtol=1e-12)
+    assert result.alphas[0] != result.alphas[1]
+
+    # 选中的 α 不差于其附近的稠密 GCV
+    chosen, _ = _dense_gcv(t, lat, result.alphas[0])
+    for factor in (0.5, 2.0):
+        assert chosen <= _dense_gcv(t, lat, result.alphas[0] * factor)[0] * (1 + 1e-9)
+
+    # 样条在观测时刻的值即平滑值，且比观测更接近真值
+    np.testing.assert_allclose(result.splines[0](t), result.fitted[0], rtol=1e-12)
+    assert np.abs(result.fitted[0] - truth).mean() < 0.6 * np.abs(lat - truth).mean()
+    assert 2 < result.effective_dof[0] < 150
+
+
+def test_gcv_mode_in_algorithm():
+    start = datetime(2024, 5, 1, 8, 0, 0)
+    t, truth, lat = _track(80, 0.002, seed=4)
+    points = [
+        SimpleNamespace(
+            batch_id="B1", radar_station_id=1, timestamp=start + timedelta(seconds=float(ti)),
+            latitude=float(y), longitude=116.3, altitude=None,
+        )
+        for ti, y in zip(t, lat)
+    ]
+
+    adaptive = SplineAlgorithm(SplineAlgorithm.get_default_config()).get_config_preset_profiles()["adaptive"]
+    smoothed = SplineAlgorithm(adaptive)._apply_spline(points)
+    fitted = np.array([p["latitude"] for p in smoothed])
+    assert np.abs(fitted - truth).mean() < 0.6 * np.abs(lat - truth).mean()
+    assert all(p["altitude"] == pytest.approx(0.0) for p in smoothed)
+
+    # 点数不足 GCV_MIN_POINTS 时回退到固定平滑因子
+    short = SplineAlgorithm(adaptive)._apply_spline(points[:4])
+    assert len(short) == 4
+
+    with pytest.raises(ValueError):
+        SplineAlgorithmConfig(smoothing_mode="aic")
@@ -0,0 +1,220 @@
+"""
+测试流式预处理（与批量提取、插值、匹配流程的结果对照）
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from app.algorithms.multi_source.preprocessing import streaming
+from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from app.algorithms.multi_source.preprocessing.streaming import StreamingTrackProcessor, run_streaming_preprocessing
+from app.algorithms.multi_source.preprocessing.track_extractor import TrackPoint, extract_key_tracks
+from app.algorithms.multi_source.preprocessing.track_interpolator import (
+    TrackInterpolator,
+    summarize_track_segments,
+)
+from app.algorithms.multi_source.preprocessing.track_matcher import load_matched_groups, match_points_by_time
+from app.models.error_analysis import MatchGroup, TrackInterpolatedPoint, TrackSegment
+from app.models.flight_track import FlightTrackRaw
+
+
+def _point_order(point):
+    return point['time_seconds'], point['station_id'], point['track_id']
+
+
+@pytest.fixture
+def station_data():
+    """三部雷达观测四批目标的原始航迹点（含一段超过 100 秒的观测中断）"""
+    rng = np.random.default_rng(11)
+    stations = [(1, 0.01, 0.004), (2, -0.008, 0.0), (3, 0.0, -0.006)]
+    data = defaultdict(list)
+
+    for target in range(4):
+        start_lon = 116.2 + 0.25 * target
+        start_lat = 39.3 + 0.15 * target
+        velocity = 0.0025 if target % 2 == 0 else -0.0025
+
+        for station_id, lon_bias, lat_bias in stations:
+            t = rng.uniform(0, 5)
+            while t < 1500:
+                # 2 号雷达对 1 号目标有 200 秒的观测中断
+                if not (station_id == 2 and target == 1 and 600 < t < 800):
+                    data[station_id].append(TrackPoint(
+                        station_id=station_id,
+                        track_id=f"A{target}",
+                        time_seconds=float(t),
+                        longitude=start_lon + velocity * t + lon_bias + rng.normal(0, 0.002),
+                        latitude=start_lat + 0.0012 * t + lat_bias + rng.normal(0, 0.002),
+                        altitude=8000.0 + rng.normal(0, 20)
+                    ))
+                t += rng.uniform(3.5, 5.0)
+
+    for points in data.values():
+        points.sort(key=lambda p: p.time_seconds)
+    return dict(data)
+
+
+def _batch_preprocess(station_data, config):
+    """批量流程：一次性提取、插值、匹配"""
+    key_tracks = extract_key_tracks(station_data, config)
+    interpolator = TrackInterpolator(config)
+
+    original_points = []
+    interpolated_points = []
+    segment_index = 1
+    for station_id, track_segments in key_tracks.items():
+        for track_id, segment_points in track_segments:
+            originals, interpolated = interpolator.interpolate_track_segment(
+                station_id, track_id, segment_points, segment_index
+            )
+            original_points.extend(originals)
+            interpolated_points.extend(interpolated)
+            segment_index += 1
+
+    original_points.sort(key=_point_order)
+    interpolated_points.sort(key=_point_order)
+    groups = match_points_by_time(original_points, interpolated_points, config)
+    return summarize_track_segments(key_tracks), groups
+
+
+def _stream_preprocess(station_data, config, advance_every):
+    """流式流程：按时间顺序逐点输入，定期推进水位线"""
+    bounds = {}
+    for station_id, points in station_data.items():
+        coords = np.array([[p.longitude, p.latitude] for p in points])
+        bounds[station_id] = (coords.min(axis=0), coords.max(axis=0))
+
+    processor = StreamingTrackProcessor(config, bounds)
+    all_points = sorted(
+        (p for points in station_data.values() for p in points),
+        key=lambda p: p.time_seconds
+    )
+
+    groups = []
+    for index, point in enumerate(all_points, start=1):
+        processor.add_point(point)
+        if index % advance_every == 0:
+            groups.extend(processor.advance())
+    groups.extend(processor.advance(final=True))
+    return processor.segments, groups
+
+
+def _group_signature(groups):
+    return [
+        [(p['station_id'], p['track_id'], p['time_seconds'], p['longitude'], p['latitude']) for p in group]
+        for group in groups
+    ]
+
+
+def _segment_signature(segments):
+    return sorted(
+        (s['station_id'], s['track_id'], s['start_seconds'], s['end_seconds'], s['point_count'])
+        for s in segments
+    )
+
+
+@pytest.mark.parametrize("advance_every", [1, 37, 500])
+def test_streaming_matches_batch_pipeline(station_data, advance_every):
+    config = MrraConfig()
+
+    batch_segments, batch_groups = _batch_preprocess(station_data, config)
+    stream_segments, stream_groups = _stream_preprocess(station_data, config, advance_every)
+
+    assert len(batch_groups) > 100
+    assert _segment_signature(stream_segments) == _segment_signature(batch_segments)
+    assert _group_signature(stream_groups) == _group_signature(batch_groups)
+
+
+def test_streaming_emits_groups_incrementally(station_data):
+    config = MrraConfig()
+    bounds = {
+        station_id: (
+            np.array([min(p.longitude for p in points), min(p.latitude for p in points)]),
+            np.array([max(p.longitude for p in points), max(p.latitude for p in points)])
+        )
+        for station_id, points in station_data.items()
+    }
+    processor = StreamingTrackProcessor(config, bounds)
+    all_points = sorted(
+        (p for points in station_data.values() for p in points),
+        key=lambda p: p.time_seconds
+    )
+
+    emitted_before_end = 0
+    for point in all_points:
+        processor.add_point(point)
+        if point.time_seconds > 750 and not emitted_before_end:
+            emitted_before_end = len(processor.advance())
+
+    assert emitted_before_end > 0
+    # 早于水位线的插值点已被消费，缓冲区只保留窗口内的数据
+    assert all(p['time_seconds'] > 500 for p in processor._interpolated)
+
+
+def test_streaming_without_points_returns_nothing():
+    processor = StreamingTrackProcessor(MrraConfig(), {})
+    assert processor.advance() == []
+    assert processor.advance(final=True) == []
+
+
+@pytest.fixture
+def db(station_data):
+    engine = create_engine("sqlite://")
+    FlightTrackRaw.__table__.create(engine)
+    TrackInterpolatedPoint.__table__.create(engine)
+    # SQLite 的索引名全库唯一，与插值点表同名的索引不创建
+    with engine.begin() as connection:
+        connection.execute(CreateTable(TrackSegment.__table__))
+        connection.execute(CreateTable(MatchGroup.__table__))
+    session = sessionmaker(bind=engine)()
+
+    start = datetime(2024, 5, 1, 8, 0, 0)
+    session.add_all(
+        FlightTrackRaw(
+            file_id=1, batch_id=p.track_id, station_id=str(station_id), radar_station_id=station_id,
+            timestamp=start + timedelta(seconds=p.time_seconds),
+            longitude=p.longitude, latitude=p.latitude, altitude=p.altitude,
+        )
+        for station_id, points in station_data.items() for p in points
+    )
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_streaming_saves_groups_per_window(db, monkeypatch):
+    read_pages = streaming.iter_raw_track_pages
+    monkeypatch.setattr(
+        streaming, "iter_raw_track_pages", lambda *args: read_pages(*args, page_size=500)
+    )
+    saved_batches = []
+    save = streaming.save_matched_groups
+
+    def record_save(db, task_id, groups, reference_time, **kwargs):
+        saved_batches.append(groups)
+        return save(db, task_id, groups, reference_time, **kwargs)
+
+    monkeypatch.setattr(streaming, "save_matched_groups", record_save)
+
+    reference_time, segments, group_count = run_streaming_preprocessing(
+        db, "task-1", [1, 2, 3], ["A0", "A1", "A2", "A3"], MrraConfig()
+    )
+
+    # 匹配组随窗口分批写入，不在处理结束后一次性保存
+    assert len(saved_batches) > 2
+    saved = [group for groups in saved_batches for group in groups]
+    assert group_count == len(saved) > 100
+    assert [g for (g,) in db.query(MatchGroup.group_id).order_by(MatchGroup.id)] == list(range(1, group_count + 1))
+
+    loaded = load_matched_groups(db, "task-1", reference_time)
+    assert len(loaded) == group_count
+    for stored, group in zip(loaded, saved):
+        assert [(p['id'], p['station_id'], p['longitude'], p['latitude']) for p in stored] == [
+            (p['id'], p['station_id'], p['longitude'], p['latitude']) for p in group
+        ]
+        assert stored[0]['time_seconds'] == pytest.approx(group[0]['time_seconds'], abs=1e-6)
@@ -0,0 +1,136 @@
+"""
+测试航迹匹配（按时刻分桶与并行匹配）
+"""
+import numpy as np
+import pytest
+
+from app.algorithms.multi_source.preprocessing import track_matcher
+from app.algorithms.multi_source.preprocessing.config import MrraConfig
+from app.algorithms.multi_source.preprocessing.track_interpolator import TrackInterpolator
+from app.algorithms.multi_source.preprocessing.track_matcher import TrackMatcher, match_points_by_time
+
+
+def _legacy_match(original_points, interpolated_points, config):
+    """逐秒遍历的原始匹配流程（作为对照）"""
+    coords = np.array([[p['longitude'], p['latitude']] for p in interpolated_points])
+    matcher = TrackMatcher(config, coords.min(axis=0), coords.max(axis=0))
+
+    groups = []
+    index_a = 0
+    index_b = 0
+    min_time = int(interpolated_points[0]['time_seconds'])
+    max_time = int(interpolated_points[-1]['time_seconds']) + 1
+
+    for current_time in range(min_time, max_time + 1):
+        points_a = []
+        while index_a < len(original_points) and original_points[index_a]['time_seconds'] <= current_time:
+            points_a.append(original_points[index_a])
+            index_a += 1
+        if not points_a:
+            continue
+
+        points_b = []
+        while index_b < len(interpolated_points) and interpolated_points[index_b]['time_seconds'] <= current_time:
+            points_b.append(interpolated_points[index_b])
+            index_b += 1
+        if not points_b:
+            continue
+
+        groups.extend(matcher.match_points(current_time, points_a, points_b))
+
+    for group in groups:
+        group.sort(key=lambda p: (p['station_id'], p['track_id']))
+    return groups
+
+
+@pytest.fixture
+def synthetic_points():
+    """三部雷达观测同一批目标（带噪声、非整数采样时刻）的插值点数据"""
+    rng = np.random.default_rng(7)
+    config = MrraConfig()
+    interpolator = TrackInterpolator(config)
+
+    original_points = []
+    interpolated_points = []
+    segment_index = 1
+
+    for target in range(6):
+        start_lon = 116.0 + 0.3 * target
+        start_lat = 39.0 + 0.2 * target
+        for station_id in (1, 2, 3):
+            times = np.cumsum(rng.uniform(3.0, 6.0, size=60)) + rng.uniform(0, 50)
+            segment = [
+                (
+                    station_id,
+                    f"S{station_id}T{target}",
+                    float(t),
+                    start_lon + 0.002 * t + rng.normal(0, 0.01),
+                    start_lat + 0.001 * t + rng.normal(0, 0.01),
+                    8000.0 + rng.normal(0, 50)
+                )
+                for t in times
+            ]
+            originals, interpolated = interpolator.interpolate_track_segment(
+                station_id, f"S{station_id}T{target}", segment, segment_index
+            )
+            original_points.extend(originals)
+            interpolated_points.extend(interpolated)
+            segment_index += 1
+
+    original_points.sort(key=lambda p: p['time_seconds'])
+    interpolated_points.sort(key=lambda p: p['time_seconds'])
+    for index, point in enumerate(original_points + interpolated_points):
+        point['id'] = index + 1
+
+    return original_points, interpolated_points
+
+
+def _as_ids(groups):
+    return [[p['id'] for p in group] for group in groups]
+
+
+class TestMatchPointsByTime:
+    """测试按时刻分桶的匹配结果与原始逐秒流程一致"""
+
+    def test_serial_matches_legacy(self, synthetic_points):
+        """串行分桶匹配与逐秒匹配结果完全一致"""
+        original_points, interpolated_points = synthetic_points
+        config = MrraConfig()
+
+        expected = _legacy_match(original_points, interpolated_points, config)
+        actual = match_points_by_time(original_points, interpolated_points, config)
+
+        assert len(expected) > 0
+        assert _as_ids(actual) == _as_ids(expected)
+
+    def test_parallel_matches_serial(self, synthetic_points, monkeypatch):
+        """多进程时间片匹配按时间顺序合并，结果与串行一致"""
+        original_points, interpolated_points = synthetic_points
+        serial = match_points_by_time(original_points, interpolated_points, MrraConfig())
+
+        monkeypatch.setattr(track_matcher, "PARALLEL_MATCH_MIN_POINTS", 0)
+        parallel = match_points_by_time(original_points, interpolated_points, MrraConfig(match_workers=3))
+
+        assert _as_ids(parallel) == _as_ids(serial)
+
+    def test_originals_after_last_second_are_not_matched(self):
+        """逐秒流程只遍历到 max_time，ceil(t) 超出该时刻的原始点不参与匹配"""
+        def point(point_id, station_id, t):
+            return {
+                'id': point_id, 'station_id': station_id, 'track_id': f"T{station_id}",
+                'time_seconds': t, 'longitude': 116.0, 'latitude': 39.0,
+            }
+
+        original_points = [point(1, 1, 0.0), point(2, 1, 11.5)]
+        interpolated_points = [point(10 + t, 2, float(t)) for t in range(1, 11)]
+        config = MrraConfig()
+
+        expected = _legacy_match(original_points, interpolated_points, config)
+        actual = match_points_by_time(original_points, interpolated_points, config)
+
+        assert len(expected) == 1
+        assert _as_ids(actual) == _as_ids(expected)
+
+    def test_empty_input(self):
+        """空输入返回空列表"""
+        assert match_points_by_time([], [], MrraConfig()) == []
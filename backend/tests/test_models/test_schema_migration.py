@@ -0,0 +1,64 @@
+"""
+测试数据库结构升级（为已部署的旧表补齐新增的列和索引）
+"""
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  注册模型
+from app.models.error_analysis import ErrorAnalysisTask
+from core.migrations import ADDED_COLUMNS, ADDED_INDEXES, ADDED_TABLES, upgrade_schema
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """升级前结构的误差分析任务表（含一条已有任务）"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE error_analysis_tasks ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, task_id VARCHAR(36) NOT NULL UNIQUE, "
+            "radar_station_ids JSON NOT NULL, track_ids JSON NOT NULL, user_id INTEGER NOT NULL, "
+            "algorithm_name VARCHAR(50), config JSON, status VARCHAR(13) NOT NULL, progress INTEGER, "
+            "error_message TEXT, result_metadata JSON, "
+            "created_at DATETIME, started_at DATETIME, completed_at DATETIME)"
+        ))
+        connection.execute(text(
+            "INSERT INTO error_analysis_tasks (task_id, radar_station_ids, track_ids, user_id, status) "
+            "VALUES ('old-task', '[1]', '[\"T1\"]', 1, 'COMPLETED')"
+        ))
+    return engine
+
+
+def test_upgrade_adds_missing_columns_and_indexes(legacy_engine):
+    changes = upgrade_schema(legacy_engine)
+
+    inspector = inspect(legacy_engine)
+    columns = {column['name'] for column in inspector.get_columns("error_analysis_tasks")}
+    indexes = {index['name'] for index in inspector.get_indexes("error_analysis_tasks")}
+    assert set(ADDED_COLUMNS["error_analysis_tasks"]) <= columns
+    assert set(ADDED_INDEXES["error_analysis_tasks"]) <= indexes
+    assert set(ADDED_TABLES) <= set(inspector.get_table_names())
+    assert len(changes) == (
+        len(ADDED_TABLES)
+        + len(ADDED_COLUMNS["error_analysis_tasks"])
+        + len(ADDED_INDEXES["error_analysis_tasks"])
+    )
+
+    # 已有的任务行补齐默认值，按新模型可以正常查询
+    with sessionmaker(bind=legacy_engine)() as session:
+        task = session.query(ErrorAnalysisTask).one()
+        assert task.task_id == "old-task"
+        assert (task.fingerprint, task.result_task_id, task.batch_id, task.worker_id) == (None, None, None, None)
+        assert (task.priority, task.attempts) == (0, 0)
+
+    # 重复执行不做任何变更
+    assert upgrade_schema(legacy_engine) == []
+
+
+def test_only_added_tables_are_created_on_empty_database():
+    # 其余表由 create_all 按模型创建
+    engine = create_engine("sqlite://")
+    assert upgrade_schema(engine) == [f"{name}: 创建表" for name in ADDED_TABLES]
+    assert sorted(inspect(engine).get_table_names()) == sorted(ADDED_TABLES)
+    assert upgrade_schema(engine) == []
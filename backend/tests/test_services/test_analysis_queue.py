@@ -0,0 +1,318 @@
+"""
+测试误差分析任务队列：优先级分发、领取、心跳续约与崩溃回收
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+import app.models  # noqa: F401  注册外键引用的模型表
+from app.algorithms.base import AnalysisResult
+from app.models.error_analysis import (
+    ErrorAnalysisTask,
+    ErrorAnalysisTaskStatus,
+    ErrorConfidenceInterval,
+    ErrorResult,
+    MatchGroup,
+    SmoothedTrajectoryResult,
+    TrackInterpolatedPoint,
+    TrackSegment,
+    TrajectoryOutputPoint,
+)
+from app.services.analysis_queue import (
+    JOB_BATCH,
+    AnalysisJob,
+    DatabaseQueue,
+    LeaseLostError,
+    RedisQueue,
+    claim_job,
+    enqueue_tasks,
+    finish_task,
+    recover_expired_tasks,
+    release_tasks,
+    renew_lease,
+)
+from app.services.analysis_worker import AnalysisWorker
+from app.services.error_analysis_executor import execute_analysis
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # 心跳线程使用独立连接，用文件数据库
+    engine = create_engine(f"sqlite:///{tmp_path / 'queue.db'}")
+    for model in (ErrorAnalysisTask, ErrorResult, ErrorConfidenceInterval, MatchGroup, TrajectoryOutputPoint):
+        model.__table__.create(engine)
+    # SQLite 的索引名全库唯一，与误差结果表同名的索引不创建
+    with engine.begin() as connection:
+        for model in (TrackSegment, TrackInterpolatedPoint, SmoothedTrajectoryResult):
+            connection.execute(CreateTable(model.__table__))
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+def _add_task(db, task_id, priority=0, created_at=None, batch_id=None, status=ErrorAnalysisTaskStatus.PENDING):
+    task = ErrorAnalysisTask(
+        task_id=task_id, radar_station_ids=[1], track_ids=["T1"], user_id=1, algorithm_name="mrra",
+        status=status, priority=priority, batch_id=batch_id,
+        created_at=created_at or datetime(2024, 5, 1, 8, 0, 0),
+    )
+    db.add(task)
+    db.commit()
+    return task
+
+
+class FakeRedis:
+    """只实现有序集合 ZADD / BZPOPMAX 的 Redis 客户端"""
+
+    def __init__(self):
+        self.members = {}
+
+    def zadd(self, key, mapping):
+        self.members.update(mapping)
+
+    def bzpopmax(self, key, timeout):
+        if not self.members:
+            return None
+        member = max(self.members, key=self.members.get)
+        return key, member.encode(), self.members.pop(member)
+
+
+def test_database_queue_orders_by_priority_then_creation(db):
+    start = datetime(2024, 5, 1, 8, 0, 0)
+    _add_task(db, "old-low", created_at=start)
+    _add_task(db, "new-high", priority=5, created_at=start + timedelta(minutes=2))
+    _add_task(db, "new-low", created_at=start + timedelta(minutes=1))
+    queue = DatabaseQueue()
+
+    order = []
+    while (job := queue.pop(db, timeout=0)) is not None:
+        order.append(job.job_id)
+        assert claim_job(db, job, "w1", lease_seconds=60)
+    assert order == ["new-high", "old-low", "new-low"]
+
+
+def test_redis_queue_orders_by_priority_then_creation(db):
+    start = datetime(2024, 5, 1, 8, 0, 0)
+    tasks = [
+        _add_task(db, "old-low", created_at=start),
+        _add_task(db, "new-high", priority=5, created_at=start + timedelta(minutes=2)),
+        _add_task(db, "new-low", created_at=start + timedelta(minutes=1)),
+        _add_task(db, "b1", batch_id="batch-1", priority=1),
+        _add_task(db, "b2", batch_id="batch-1", priority=1),
+    ]
+    queue = RedisQueue(client=FakeRedis())
+    enqueue_tasks(db, tasks, queue)
+    # 重复入队只保留一份
+    enqueue_tasks(db, tasks, queue)
+
+    order = []
+    while (job := queue.pop(db, timeout=0)) is not None:
+        order.append(job)
+    assert order == [
+        AnalysisJob("task", "new-high"),
+        AnalysisJob(JOB_BATCH, "batch-1"),
+        AnalysisJob("task", "old-low"),
+        AnalysisJob("task", "new-low"),
+    ]
+
+
+def test_claim_is_exclusive_and_covers_whole_batch(db):
+    _add_task(db, "b1", batch_id="batch-1")
+    _add_task(db, "b2", batch_id="batch-1")
+    job = AnalysisJob(JOB_BATCH, "batch-1")
+
+    claimed = claim_job(db, job, "w1", lease_seconds=60)
+    assert [task.task_id for task in claimed] == ["b1", "b2"]
+    assert all(task.attempts == 1 for task in claimed)
+    assert claim_job(db, job, "w2", lease_seconds=60) == []
+    # 已领取的任务不再被轮询取出
+    assert DatabaseQueue().pop(db, timeout=0) is None
+
+    assert renew_lease(db, ["b1", "b2"], "w1", lease_seconds=60) == 2
+    assert renew_lease(db, ["b1", "b2"], "w2", lease_seconds=60) == 0
+    release_tasks(db, ["b1", "b2"], "w1")
+    db.expire_all()
+    assert db.query(ErrorAnalysisTask).filter(ErrorAnalysisTask.worker_id.isnot(None)).count() == 0
+
+
+def test_expired_lease_requeues_stuck_task_and_clears_partial_results(db):
+    task = _add_task(db, "t1")
+    claim_job(db, AnalysisJob("task", "t1"), "crashed", lease_seconds=60)
+    # 工作进程在匹配阶段崩溃：已写入部分结果，租约过期
+    task.status = ErrorAnalysisTaskStatus.MATCHING
+    task.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    result = ErrorResult(task_id="t1", station_id=1)
+    db.add_all([
+        TrackSegment(task_id="t1", segment_id=1, station_id=1, track_id="T1",
+                     start_time=datetime.utcnow(), end_time=datetime.utcnow(), point_count=3),
+        MatchGroup(task_id="t1", group_id=1, match_time=datetime.utcnow(), match_points=[], point_count=0),
+        result,
+    ])
+    db.flush()
+    db.add(ErrorConfidenceInterval(
+        error_result_id=result.id, component="range_error", lower=0, upper=1, confidence_level=0.95,
+        replicate_count=10,
+    ))
+    db.commit()
+
+    queue = RedisQueue(client=FakeRedis())
+    assert recover_expired_tasks(db, queue, max_attempts=2) == 1
+    db.expire_all()
+    task = db.query(ErrorAnalysisTask).filter(ErrorAnalysisTask.task_id == "t1").one()
+    assert task.status == ErrorAnalysisTaskStatus.PENDING
+    assert task.worker_id is None
+    for model in (TrackSegment, MatchGroup, ErrorResult, ErrorConfidenceInterval):
+        assert db.query(model).count() == 0
+    assert queue.pop(db, timeout=0) == AnalysisJob("task", "t1")
+
+    # 第二次执行也崩溃后达到最大执行次数
+    claim_job(db, AnalysisJob("task", "t1"), "crashed-again", lease_seconds=-1)
+    assert recover_expired_tasks(db, queue, max_attempts=2) == 1
+    db.expire_all()
+    task = db.query(ErrorAnalysisTask).filter(ErrorAnalysisTask.task_id == "t1").one()
+    assert task.status == ErrorAnalysisTaskStatus.FAILED
+    assert task.attempts == 2
+    assert "crashed-again" in task.error_message
+
+
+def test_live_lease_is_not_recovered(db):
+    _add_task(db, "t1")
+    claim_job(db, AnalysisJob("task", "t1"), "w1", lease_seconds=60)
+    assert recover_expired_tasks(db, DatabaseQueue(), max_attempts=3) == 0
+
+
+class StalledAlgorithm:
+    """执行期间租约过期：任务被回收并由另一个工作进程领取，之后才返回结果或失败"""
+
+    def __init__(self, fails):
+        self.fails = fails
+
+    def analyze(self, task_id, radar_station_ids, track_ids, db_session):
+        db_session.query(ErrorAnalysisTask).filter(ErrorAnalysisTask.task_id == task_id).update({
+            ErrorAnalysisTask.lease_expires_at: datetime.utcnow() - timedelta(seconds=1),
+        }, synchronize_session=False)
+        db_session.commit()
+        assert recover_expired_tasks(db_session, DatabaseQueue(), max_attempts=3) == 1
+        assert claim_job(db_session, AnalysisJob("task", task_id), "fresh", lease_seconds=60)
+
+        if self.fails:
+            raise RuntimeError("求解发散")
+        return AnalysisResult(
+            task_id=task_id, algorithm_name="mrra", algorithm_version="1.0", status="completed", progress=1.0,
+            errors={1: {"azimuth_error": 0.1, "range_error": 5.0, "elevation_error": 0.2}},
+            metadata={"stale": True},
+            trajectory=[{"longitude": 116.0, "latitude": 39.0, "time_seconds": 0.0}],
+        )
+
+
+@pytest.mark.parametrize("fails", [False, True])
+def test_stale_worker_cannot_overwrite_recovered_task(db, monkeypatch, fails):
+    _add_task(db, "t1")
+    [task] = claim_job(db, AnalysisJob("task", "t1"), "stale", lease_seconds=60)
+    monkeypatch.setattr(
+        "app.algorithms.factory.AlgorithmFactory.create_algorithm_from_dict",
+        staticmethod(lambda name, config: StalledAlgorithm(fails)),
+    )
+
+    with pytest.raises(LeaseLostError if not fails else RuntimeError):
+        execute_analysis(db, task)
+
+    # 新一轮的执行不受原进程的结果或失败影响
+    db.expire_all()
+    task = db.query(ErrorAnalysisTask).filter(ErrorAnalysisTask.task_id == "t1").one()
+    assert task.status == ErrorAnalysisTaskStatus.PENDING
+    assert task.worker_id == "fresh"
+    assert task.result_metadata is None and task.error_message is None
+    assert db.query(ErrorResult).count() == 0
+    assert db.query(TrajectoryOutputPoint).count() == 0
+
+
+def test_finish_task_requires_current_owner(db):
+    _add_task(db, "t1")
+    claim_job(db, AnalysisJob("task", "t1"), "w1", lease_seconds=60)
+    completed = {ErrorAnalysisTask.status: ErrorAnalysisTaskStatus.COMPLETED}
+
+    with pytest.raises(LeaseLostError):
+        finish_task(db, "t1", "w2", completed)
+    finish_task(db, "t1", "w1", completed)
+    db.commit()
+    # 已结束的任务不再被改写
+    with pytest.raises(LeaseLostError):
+        finish_task(db, "t1", "w1", {ErrorAnalysisTask.status: ErrorAnalysisTaskStatus.FAILED})
+
+
+def test_worker_executes_job_with_heartbeat(session_factory, db, monkeypatch):
+    _add_task(db, "t1")
+    leases = []
+
+    def fake_execute(service, task_id):
+        task = service.db.query(ErrorAnalysisTask).filter(ErrorAnalysisTask.task_id == task_id).one()
+        leases.append(task.lease_expires_at)
+        time.sleep(0.3)
+        service.db.expire_all()
+        leases.append(service.db.get(ErrorAnalysisTask, task.id).lease_expires_at)
+        task.status = ErrorAnalysisTaskStatus.COMPLETED
+        service.db.commit()
+
+    monkeypatch.setattr("app.services.error_analysis_service.ErrorAnalysisService.execute_analysis", fake_execute)
+    worker = AnalysisWorker(
+        session_factory, queue=DatabaseQueue(), worker_id="w1",
+        lease_seconds=60, heartbeat_seconds=0.05, poll_seconds=0,
+    )
+    assert worker.run_once()
+    assert leases[1] > leases[0]
+
+    db.expire_all()
+    task = db.query(ErrorAnalysisTask).filter(ErrorAnalysisTask.task_id == "t1").one()
+    assert task.status == ErrorAnalysisTaskStatus.COMPLETED
+    assert task.worker_id is None
+    assert not worker.run_once()
+
+
+def test_worker_loop_stops_on_event(session_factory):
+    worker = AnalysisWorker(session_factory, queue=DatabaseQueue(), worker_id="w1", poll_seconds=0.01)
+    stop_event = threading.Event()
+    thread = threading.Thread(target=worker.run, args=(stop_event,))
+    thread.start()
+    stop_event.set()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_worker_requeues_jobs_missing_from_queue(session_factory, db, monkeypatch):
+    queue = RedisQueue(client=FakeRedis())
+    _add_task(db, "t1")
+    # 作业从未入队（入队失败），或弹出后工作进程在领取前崩溃
+    enqueue_tasks(db, [_add_task(db, "t2")], queue)
+    assert queue.pop(db, timeout=0) == AnalysisJob("task", "t2")
+
+    executed = []
+
+    def fake_execute(service, task_id):
+        executed.append(task_id)
+        task = service.db.query(ErrorAnalysisTask).filter(ErrorAnalysisTask.task_id == task_id).one()
+        task.status = ErrorAnalysisTaskStatus.COMPLETED
+        service.db.commit()
+
+    monkeypatch.setattr("app.services.error_analysis_service.ErrorAnalysisService.execute_analysis", fake_execute)
+    worker = AnalysisWorker(session_factory, queue=queue, worker_id="w1", poll_seconds=0, requeue_seconds=3600)
+    while worker.run_once():
+        pass
+    assert sorted(executed) == ["t1", "t2"]
+
+    # 间隔未到时不重复扫描任务表
+    _add_task(db, "t3")
+    assert not worker.run_once()
+    worker._next_requeue = 0.0
+    assert worker.run_once()
+    assert executed[-1] == "t3"
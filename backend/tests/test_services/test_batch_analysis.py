@@ -0,0 +1,94 @@
+"""
+测试批量分析：各任务都有自己的预处理记录
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+import app.models  # noqa: F401  注册外键引用的模型表
+from app.algorithms.algorithms_init import register_all_algorithms
+from app.algorithms.multi_source.preprocessing.pipeline import PreprocessingResult
+from app.algorithms.multi_source.preprocessing.track_interpolator import TrackInterpolator
+from app.algorithms.multi_source.preprocessing.track_matcher import decode_match_points, save_matched_groups
+from app.models.error_analysis import (
+    ErrorAnalysisTask,
+    ErrorAnalysisTaskStatus,
+    MatchGroup,
+    TrackInterpolatedPoint,
+    TrackSegment,
+)
+from app.services import error_analysis_executor
+
+REFERENCE_TIME = datetime(2024, 5, 1)
+
+
+@pytest.fixture
+def db():
+    register_all_algorithms()
+    engine = create_engine("sqlite://")
+    for model in (ErrorAnalysisTask, TrackInterpolatedPoint):
+        model.__table__.create(engine)
+    # SQLite 的索引名全库唯一，与插值点表同名的索引不创建
+    with engine.begin() as connection:
+        connection.execute(CreateTable(TrackSegment.__table__))
+        connection.execute(CreateTable(MatchGroup.__table__))
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _fake_preprocessing(db, task_id, radar_station_ids, track_ids, config, report_progress=None):
+    """只为首个任务写入插值点和匹配组"""
+    points = [
+        {
+            'station_id': station_id, 'track_id': f"T{station_id}", 'time_seconds': float(t),
+            'longitude': 116.0 + 0.01 * t, 'latitude': 39.0, 'altitude': 8000.0, 'segment_index': station_id,
+        }
+        for t in range(3) for station_id in (1, 2)
+    ]
+    TrackInterpolator(config).save_to_database(db, task_id, points, [], REFERENCE_TIME)
+    rows = db.query(TrackInterpolatedPoint).order_by(TrackInterpolatedPoint.id).all()
+    matched_groups = [
+        [{'id': row.id, 'station_id': row.station_id, 'longitude': row.longitude, 'latitude': row.latitude,
+          'altitude': row.altitude} for row in rows[k:k + 2]]
+        for k in range(0, len(rows), 2)
+    ]
+    save_matched_groups(db, task_id, matched_groups, REFERENCE_TIME)
+    return PreprocessingResult(
+        radar_positions={1: (116.0, 39.0, 0.0), 2: (116.5, 39.5, 0.0)},
+        segments=[],
+        matched_groups=matched_groups,
+        reference_time=REFERENCE_TIME,
+    )
+
+
+def test_every_batch_task_owns_its_interpolated_points(db, monkeypatch):
+    monkeypatch.setattr(error_analysis_executor, "run_preprocessing", _fake_preprocessing)
+    monkeypatch.setattr(
+        error_analysis_executor, "_solve_algorithms",
+        lambda algorithms, groups, positions: [(None, 0.0, "未求解")] * len(algorithms),
+    )
+    tasks = [
+        ErrorAnalysisTask(task_id=task_id, radar_station_ids=[1, 2], track_ids=["T1", "T2"], user_id=1,
+                          algorithm_name=algorithm, config={}, status=ErrorAnalysisTaskStatus.PENDING,
+                          batch_id="batch-1")
+        for task_id, algorithm in (("owner", "mrra"), ("second", "ransac"), ("third", "weighted_lstsq"))
+    ]
+    db.add_all(tasks)
+    db.commit()
+
+    error_analysis_executor.execute_batch_analysis(db, tasks, "batch-1")
+
+    for task in tasks:
+        points = {
+            row.id: row
+            for row in db.query(TrackInterpolatedPoint).filter(TrackInterpolatedPoint.task_id == task.task_id)
+        }
+        assert len(points) == 6
+        groups = db.query(MatchGroup).filter(MatchGroup.task_id == task.task_id).all()
+        assert len(groups) == 3
+        for group in groups:
+            assert all(point['point_id'] in points for point in decode_match_points(group.match_points))
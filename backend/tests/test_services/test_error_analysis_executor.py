@@ -0,0 +1,46 @@
+"""
+测试误差分析执行器保存单源平滑轨迹结果
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  注册外键引用的模型表
+from app.algorithms.base import AnalysisResult
+from app.models.error_analysis import SmoothedTrajectoryResult
+from app.services.error_analysis_executor import _save_smoothed_trajectory_results
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    SmoothedTrajectoryResult.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_interleaved_trajectory_is_grouped_by_station_and_batch(db):
+    # 两部雷达观测同一批次，输出的点交错排列
+    trajectory = [
+        {"station_id": station, "batch_id": batch, "timestamp": f"2024-05-01T08:00:{second:02d}",
+         "longitude": 116.0 + second * 1e-4, "latitude": 39.0, "altitude": 8000.0}
+        for second, station, batch in [
+            (0, 2, "B1"), (1, 1, "B1"), (2, 2, "B1"), (3, 1, "B0"), (4, 1, "B1"), (5, 2, "B1"),
+        ]
+    ]
+    result = AnalysisResult(
+        task_id="t1", algorithm_name="kalman", algorithm_version="1.0", status="completed", progress=1.0,
+        errors={1: {"range_error": 111.0}}, trajectory=trajectory,
+    )
+
+    _save_smoothed_trajectory_results(db, "t1", result)
+    db.commit()
+
+    records = db.query(SmoothedTrajectoryResult).order_by(
+        SmoothedTrajectoryResult.station_id, SmoothedTrajectoryResult.batch_id
+    ).all()
+    assert [(r.station_id, r.batch_id, r.point_count) for r in records] == [(1, "B0", 1), (1, "B1", 2), (2, "B1", 3)]
+    # 同一航迹内保持原有的时间顺序
+    assert [p["timestamp"][-2:] for p in records[2].smoothed_trajectory] == ["00", "02", "05"]
+    assert records[0].rmse_lon == pytest.approx(0.001)
@@ -0,0 +1,132 @@
+"""
+测试误差分析任务指纹与结果复用
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+import app.models  # noqa: F401  注册外键引用的模型表
+from app.algorithms.algorithms_init import register_all_algorithms
+from app.models.error_analysis import (
+    ErrorAnalysisTask,
+    ErrorAnalysisTaskStatus,
+    ErrorConfidenceInterval,
+    ErrorResult,
+    MatchGroup,
+    TrackSegment,
+)
+from app.models.flight_track import FlightTrackRaw, RadarStation
+from app.schemas.error_analysis import ErrorAnalysisRequest
+from app.services.error_analysis_service import ErrorAnalysisService
+from app.services.task_fingerprint import compute_task_fingerprint
+
+
+@pytest.fixture
+def session():
+    register_all_algorithms()
+    engine = create_engine("sqlite://")
+    for model in (RadarStation, FlightTrackRaw, ErrorAnalysisTask, ErrorResult, ErrorConfidenceInterval, MatchGroup):
+        model.__table__.create(engine)
+    # SQLite 的索引名全库唯一，与误差结果表同名的索引不创建
+    with engine.begin() as connection:
+        connection.execute(CreateTable(TrackSegment.__table__))
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        RadarStation(id=1, file_id=1, station_id="S1", latitude=39.2, longitude=115.6, altitude=50.0),
+        RadarStation(id=2, file_id=1, station_id="S2", latitude=39.9, longitude=116.5, altitude=120.0),
+    ])
+    _add_track_points(session, "T1", 5)
+    _add_track_points(session, "T2", 5)
+    session.commit()
+    yield session
+    session.close()
+
+
+def _add_track_points(session, batch_id, count):
+    start = datetime(2024, 5, 1, 8, 0, 0)
+    for k in range(count):
+        session.add(FlightTrackRaw(
+            file_id=1, batch_id=batch_id, station_id="S1", radar_station_id=1,
+            timestamp=start + timedelta(seconds=4 * k), latitude=39.5, longitude=116.3, altitude=8000.0,
+            created_at=start,
+        ))
+
+
+def _fingerprint(session, algorithm="kalman", config=None, stations=(1, 2), tracks=("T1", "T2")):
+    return compute_task_fingerprint(session, algorithm, config or {}, list(stations), list(tracks))
+
+
+def _complete(session, task_id, errors=None):
+    """模拟任务执行完成并写入误差结果"""
+    task = session.query(ErrorAnalysisTask).filter(ErrorAnalysisTask.task_id == task_id).one()
+    for station_id, range_error in (errors or {}).items():
+        session.add(ErrorResult(task_id=task_id, station_id=station_id, range_error=range_error, match_count=10))
+    task.status = ErrorAnalysisTaskStatus.COMPLETED
+    task.started_at = task.completed_at = datetime.utcnow()
+    task.result_metadata = {"match_statistics": {"total_match_groups": 10}}
+    session.commit()
+
+
+def test_fingerprint_ignores_order_and_worker_settings(session):
+    base = _fingerprint(session)
+    assert base is not None
+    assert _fingerprint(session, stations=(2, 1), tracks=("T2", "T1")) == base
+    # 显式给出默认值、只改变并行进程数都不改变指纹
+    assert _fingerprint(session, config={"batch_workers": 4}) == base
+    assert _fingerprint(session, config={"rts_smoothing": False}) == base
+
+
+def test_fingerprint_changes_with_inputs(session):
+    base = _fingerprint(session)
+    assert _fingerprint(session, algorithm="spline") != base
+    assert _fingerprint(session, config={"rts_smoothing": True}) != base
+    assert _fingerprint(session, tracks=("T1",)) != base
+
+    # 源数据追加或雷达站位置修改
+    _add_track_points(session, "T2", 1)
+    session.commit()
+    appended = _fingerprint(session)
+    assert appended != base
+    session.get(RadarStation, 2).altitude = 130.0
+    session.commit()
+    assert _fingerprint(session) != appended
+
+
+def test_nondeterministic_config_has_no_fingerprint(session):
+    assert _fingerprint(session, algorithm="particle_filter") is None
+    assert _fingerprint(session, algorithm="particle_filter", config={"random_seed": 1}) is not None
+    assert _fingerprint(session, algorithm="unknown") is None
+    # 两个雷达站时 RANSAC 穷举组合，随机种子为空也可复用
+    assert _fingerprint(session, algorithm="ransac") is not None
+    assert _fingerprint(session, algorithm="mrra", config={"bootstrap_samples": 50, "bootstrap_seed": 1}) is None
+
+
+def test_identical_request_reuses_completed_results(session):
+    service = ErrorAnalysisService(session)
+    request = ErrorAnalysisRequest(radar_station_ids=[1, 2], track_ids=["T1", "T2"], algorithm="ransac_heuristic")
+
+    first = service.create_analysis_task(request, user_id=1)
+    assert first.status == ErrorAnalysisTaskStatus.PENDING
+    # 未完成的任务不被复用
+    assert service.create_analysis_task(request, user_id=1).result_task_id is None
+    _complete(session, first.task_id, {1: 120.0, 2: -40.0})
+
+    reused = service.create_analysis_task(request, user_id=2)
+    assert reused.status == ErrorAnalysisTaskStatus.COMPLETED
+    assert reused.result_task_id == first.task_id
+    chart = service.get_chart_data(reused.task_id)
+    assert chart.range_errors == [120.0, -40.0]
+    assert chart.match_counts == [10, 10]
+
+    # 复用任务再被复用时指向原始任务
+    session.query(ErrorAnalysisTask).filter(ErrorAnalysisTask.task_id == first.task_id).one().completed_at -= \
+        timedelta(minutes=1)
+    session.commit()
+    assert service.create_analysis_task(request, user_id=3).result_task_id == first.task_id
+
+    forced = service.create_analysis_task(request.model_copy(update={"force_recompute": True}), user_id=1)
+    assert forced.status == ErrorAnalysisTaskStatus.PENDING
+    assert forced.result_task_id is None
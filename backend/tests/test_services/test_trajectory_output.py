@@ -0,0 +1,96 @@
+"""
+测试算法输出轨迹的存储与分页查询
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.error_analysis import TrajectoryOutputPoint
+from app.services.trajectory_output import (
+    TRAJECTORY_FUSED,
+    TRAJECTORY_SMOOTHED,
+    has_trajectory_output,
+    query_trajectory_output,
+    save_trajectory_output,
+    slice_trajectory_preview,
+)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    TrajectoryOutputPoint.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _fused_points(count):
+    return [
+        {
+            "latitude": 39.0 + k * 1e-3,
+            "longitude": 116.0 + k * 1e-3,
+            "altitude": 8000.0 + k,
+            "match_group_size": 3,
+            "time_seconds": 100.0 + 2 * k,
+            "station_ids": [1, 2, 3],
+        }
+        for k in range(count)
+    ]
+
+
+def test_fused_trajectory_is_stored_in_full_and_paged(session):
+    points = _fused_points(2500)
+    assert save_trajectory_output(session, "task-1", TRAJECTORY_FUSED, points) == 2500
+    assert has_trajectory_output(session, "task-1", TRAJECTORY_FUSED)
+    assert not has_trajectory_output(session, "task-1", TRAJECTORY_SMOOTHED)
+
+    total, page = query_trajectory_output(session, "task-1", TRAJECTORY_FUSED, offset=1000, limit=500)
+    assert total == 2500
+    assert page == points[1000:1500]
+
+    # 时间范围截取后再分页
+    total, page = query_trajectory_output(
+        session, "task-1", TRAJECTORY_FUSED, offset=10, limit=1000, start_time=200.0, end_time=299.0
+    )
+    assert total == 50
+    assert page == points[60:100]
+
+
+def test_saving_again_replaces_previous_output(session):
+    save_trajectory_output(session, "task-1", TRAJECTORY_FUSED, _fused_points(30))
+    save_trajectory_output(session, "task-1", TRAJECTORY_FUSED, _fused_points(10))
+    save_trajectory_output(session, "task-2", TRAJECTORY_FUSED, _fused_points(5))
+
+    total, _ = query_trajectory_output(session, "task-1", TRAJECTORY_FUSED)
+    assert total == 10
+
+
+def test_smoothed_trajectory_round_trip_and_time_range(session):
+    points = [
+        {
+            "batch_id": "B1",
+            "station_id": 2,
+            "timestamp": f"2024-05-01T08:00:{second:02d}",
+            "latitude": 39.5,
+            "longitude": 116.5,
+            "altitude": 9000.0,
+            "orig_lat": 39.501,
+            "orig_lon": 116.499,
+            "orig_alt": 9010.0,
+            "covariance_trace": 0.5,
+        }
+        for second in range(60)
+    ]
+    save_trajectory_output(session, "task-1", TRAJECTORY_SMOOTHED, points)
+
+    # 2024-05-01T08:00:00Z
+    start = 1714550400.0
+    total, page = query_trajectory_output(
+        session, "task-1", TRAJECTORY_SMOOTHED, start_time=start + 10, end_time=start + 19
+    )
+    assert total == 10
+    assert page == points[10:20]
+
+    # 元数据预览按相同规则截取
+    assert slice_trajectory_preview(points, TRAJECTORY_SMOOTHED, 0, 1000, start + 10, start + 19) == (10, points[10:20])
@@ -0,0 +1,35 @@
+"""
+RFTIP 误差分析工作进程入口
+
+从任务队列领取误差分析任务并执行，与 API 进程（main.py）分开部署。
+
+用法（在 backend 目录下）:
+    python worker.py --concurrency 4
+"""
+import argparse
+
+from core.config import ANALYSIS_WORKER_CONCURRENCY
+from core.database import Base, engine
+from core.logging import setup_logging, get_logger
+# Import models to ensure they are registered with Base
+import app.models  # noqa: F401
+from app.services.analysis_worker import run_workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RFTIP 误差分析工作进程")
+    parser.add_argument(
+        "--concurrency", type=int, default=ANALYSIS_WORKER_CONCURRENCY,
+        help="工作进程数（同时执行的任务数）",
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    logger = get_logger(__name__)
+    Base.metadata.create_all(bind=engine)
+    logger.info(f"启动误差分析工作进程: 并发数 {args.concurrency}")
+    run_workers(args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@
 
 // ========== 算法模式常量 ==========
 
-export const SINGLE_SOURCE_ALGORITHMS = ['kalman', 'particle_filter', 'spline'] as const
+export const SINGLE_SOURCE_ALGORITHMS = ['kalman', 'particle_filter', 'spline', 'imm'] as const
 
 // ========== 代价函数权重 ==========
 
@@ -184,6 +184,7 @@ export interface ErrorAnalysisTask {
   created_at: string
   started_at?: string
   completed_at?: string
+  result_task_id?: string  // 复用结果的来源任务ID（为空表示结果由本任务计算）
 }
 
 /**
@@ -314,6 +315,7 @@ export interface CreateAnalysisRequest {
   start_time?: string
   end_time?: string
   config?: Partial<ErrorAnalysisConfig>
+  force_recompute?: boolean  // 强制重新计算（不复用相同任务的已有结果）
 }
 
 /**